@@ -1,4 +1,4 @@
 # Agent Config Module
-from .config_loader import AgentConfig, ProviderConfig, SharedConfig
+from .config_loader import AgentConfig, ProviderConfig, SharedConfig, get_config, load_config
 
-__all__ = ["AgentConfig", "ProviderConfig", "SharedConfig"]
+__all__ = ["AgentConfig", "ProviderConfig", "SharedConfig", "get_config", "load_config"]
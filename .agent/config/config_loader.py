@@ -4,6 +4,11 @@ config_loader.py — 配置抽象层加载器 (T-304)
 从 agent_config.md 读取配置，提供统一的 Python API 访问。
 支持按 provider 获取能力映射、路径配置和共享设置。
 
+Provider 定义与共享设置解析自 agent_config.md 中的 ```yaml 代码块；
+文件缺失或未定义 Provider 时回退到内置默认值。
+解析结果按文件路径做进程级缓存，以 (mtime_ns, size) 失效:
+热路径上每次访问只有一次 stat，修改配置文件后无需重启即可生效。
+
 Usage:
     from config.config_loader import AgentConfig
     config = AgentConfig()
@@ -16,11 +21,16 @@ Usage:
     
     # 获取所有 provider 信息
     info = config.get_provider_info()
+
+    # 进程级共享实例 (推荐在热路径中使用)
+    from config.config_loader import get_config
+    window = get_config().get_feature("context_window")
 """
 
 from __future__ import annotations
 
 import re
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
@@ -48,6 +58,24 @@ class SharedConfig:
     dispatcher: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class ParsedConfig:
+    """agent_config.md 的解析结果 (不可变快照，供缓存共享)。"""
+    active_provider: str
+    providers: dict[str, ProviderConfig]
+    shared: SharedConfig
+
+
+# 解析缓存: 绝对路径 → ((mtime_ns, size) | None, ParsedConfig)
+_PARSE_CACHE: dict[Path, tuple[tuple[int, int] | None, ParsedConfig]] = {}
+_INSTANCES: dict[Path, "AgentConfig"] = {}
+_CACHE_LOCK = threading.Lock()
+
+_YAML_BLOCK_RE = re.compile(r"^```ya?ml[ \t]*\n(.*?)^```", re.MULTILINE | re.DOTALL)
+_SHARED_GROUPS = ("project", "paths", "guards", "evolution", "dispatcher")
+_PROVIDER_FIELDS = ("display_name", "global_config_path", "adapter_path")
+
+
 class AgentConfig:
     """
     Axiom 配置管理器。
@@ -56,7 +84,7 @@ class AgentConfig:
     提供统一的 API 供各模块使用。
     """
 
-    # 预定义 Provider 配置 (与 agent_config.md 保持同步)
+    # 内置默认 Provider 配置 (agent_config.md 缺失或未定义 Provider 时使用)
     _PROVIDERS: dict[str, ProviderConfig] = {
         "gemini": ProviderConfig(
             name="gemini",
@@ -180,15 +208,13 @@ class AgentConfig:
         Args:
             config_path: agent_config.md 路径。None 则自动查找。
         """
-        self._active_provider = "gemini"
+        self._override_provider: str | None = None
 
         if config_path:
             self._config_file = Path(config_path)
         else:
             self._config_file = self._find_config_file()
 
-        self._load_active_provider()
-
     def _find_config_file(self) -> Path:
         """查找 agent_config.md。"""
         current = Path.cwd()
@@ -199,44 +225,41 @@ class AgentConfig:
             current = current.parent
         return Path(".agent/config/agent_config.md")
 
-    def _load_active_provider(self) -> None:
-        """从 agent_config.md 读取 ACTIVE_PROVIDER。"""
-        try:
-            if not self._config_file.exists():
-                return
-
-            content = self._config_file.read_text(encoding="utf-8")
-            match = re.search(r"ACTIVE_PROVIDER:\s*(\w+)", content)
-            if match:
-                provider = match.group(1).strip()
-                if provider in self._PROVIDERS:
-                    self._active_provider = provider
-        except Exception:
-            pass  # 使用默认值
+    @property
+    def _config(self) -> ParsedConfig:
+        """当前配置快照 (文件未变化时直接命中缓存)。"""
+        return load_config(self._config_file)
+
+    @property
+    def _providers(self) -> dict[str, ProviderConfig]:
+        return self._config.providers
 
     # ── Public API ──────────────────────────────────────
 
     @property
     def active_provider(self) -> str:
         """当前激活的 Provider 名称。"""
-        return self._active_provider
+        if self._override_provider and self._override_provider in self._providers:
+            return self._override_provider
+        return self._config.active_provider
 
     @active_provider.setter
     def active_provider(self, value: str) -> None:
         """设置当前 Provider (不持久化)。"""
-        if value not in self._PROVIDERS:
+        if value not in self._providers:
             raise ValueError(
                 f"Unknown provider: {value}. "
-                f"Available: {list(self._PROVIDERS.keys())}"
+                f"Available: {list(self._providers.keys())}"
             )
-        self._active_provider = value
+        self._override_provider = value
 
     def get_provider(self, name: str | None = None) -> ProviderConfig:
         """获取 Provider 配置。"""
-        name = name or self._active_provider
-        if name not in self._PROVIDERS:
+        name = name or self.active_provider
+        providers = self._providers
+        if name not in providers:
             raise ValueError(f"Unknown provider: {name}")
-        return self._PROVIDERS[name]
+        return providers[name]
 
     def get_capability(self, capability: str, provider: str | None = None) -> str:
         """获取某个能力的 API 名称。
@@ -264,15 +287,15 @@ class AgentConfig:
     @property
     def shared(self) -> SharedConfig:
         """共享配置。"""
-        return self._SHARED
+        return self._config.shared
 
     def get_path(self, key: str) -> str:
         """获取 Axiom 路径配置。"""
-        return self._SHARED.paths.get(key, "")
+        return self._config.shared.paths.get(key, "")
 
     def get_all_providers(self) -> list[str]:
         """获取所有可用 Provider 名称。"""
-        return list(self._PROVIDERS.keys())
+        return list(self._providers.keys())
 
     def get_provider_info(self, provider: str | None = None) -> dict:
         """获取 Provider 摘要信息 (适合展示)。"""
@@ -293,6 +316,159 @@ class AgentConfig:
 
     def __repr__(self) -> str:
         return (
-            f"AgentConfig(provider={self._active_provider!r}, "
+            f"AgentConfig(provider={self.active_provider!r}, "
             f"config={self._config_file})"
         )
+
+
+# ── 缓存加载 ────────────────────────────────────────────
+
+def get_config(config_path: str | Path | None = None) -> AgentConfig:
+    """
+    进程级共享的 AgentConfig 实例 (按配置文件路径区分)。
+
+    实例本身不保存解析结果，每次访问经 load_config 校验 mtime，
+    因此长期持有也能读到最新配置。
+    """
+    path = Path(config_path) if config_path else AgentConfig()._config_file
+    key = path.resolve()
+    with _CACHE_LOCK:
+        instance = _INSTANCES.get(key)
+        if instance is None:
+            instance = _INSTANCES[key] = AgentConfig(key)
+    return instance
+
+
+def load_config(config_path: str | Path) -> ParsedConfig:
+    """解析 agent_config.md，按 (mtime_ns, size) 缓存。"""
+    path = Path(config_path).resolve()
+    try:
+        st = path.stat()
+        stamp: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+
+    with _CACHE_LOCK:
+        cached = _PARSE_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    content = ""
+    if stamp is not None:
+        try:
+            content = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            stamp = None
+    parsed = parse_config(content)
+    with _CACHE_LOCK:
+        _PARSE_CACHE[path] = (stamp, parsed)
+    return parsed
+
+
+def clear_config_cache() -> None:
+    """清空解析缓存与共享实例 (测试用)。"""
+    with _CACHE_LOCK:
+        _PARSE_CACHE.clear()
+        _INSTANCES.clear()
+
+
+def parse_config(content: str) -> ParsedConfig:
+    """从 agent_config.md 文本解析配置，缺失部分使用内置默认值。"""
+    data: dict[str, Any] = {}
+    for block in _YAML_BLOCK_RE.findall(content):
+        for key, value in _parse_yaml_block(block).items():
+            data.setdefault(key, value)   # 同名键以首次出现为准 (切换指南中的示例不覆盖)
+
+    providers = {
+        name: _provider_from_dict(name, value)
+        for name, value in data.items()
+        if isinstance(value, dict) and "capabilities" in value
+    }
+    if not providers:
+        providers = dict(AgentConfig._PROVIDERS)
+
+    shared_data = data.get("shared") if isinstance(data.get("shared"), dict) else {}
+    shared = SharedConfig(**{
+        group: shared_data[group] if isinstance(shared_data.get(group), dict)
+        else dict(getattr(AgentConfig._SHARED, group))
+        for group in _SHARED_GROUPS
+    })
+
+    # 未找到 yaml 块时兼容裸写的 ACTIVE_PROVIDER 行
+    active = data.get("ACTIVE_PROVIDER")
+    if active is None:
+        match = re.search(r"ACTIVE_PROVIDER:\s*(\w+)", content)
+        active = match.group(1) if match else None
+    active = str(active) if active is not None else ""
+    if active not in providers:
+        active = "gemini" if "gemini" in providers else next(iter(providers))
+    return ParsedConfig(active_provider=active, providers=providers, shared=shared)
+
+
+def _provider_from_dict(name: str, data: dict) -> ProviderConfig:
+    def section(key: str) -> dict:
+        value = data.get(key)
+        return dict(value) if isinstance(value, dict) else {}
+
+    return ProviderConfig(
+        name=name,
+        **{f: str(data.get(f, "")) for f in _PROVIDER_FIELDS},
+        capabilities={k: str(v) for k, v in section("capabilities").items()},
+        commands={k: str(v) for k, v in section("commands").items()},
+        features=section("features"),
+    )
+
+
+def _parse_yaml_block(block: str) -> dict[str, Any]:
+    """
+    解析 agent_config.md 使用的 YAML 子集: 按缩进嵌套的 key: value 映射，
+    标量支持引号字符串 / 布尔 / 整数 / 浮点，忽略 # 注释。
+    """
+    root: dict[str, Any] = {}
+    stack: list[tuple[int, dict[str, Any]]] = [(-1, root)]
+    for raw in block.splitlines():
+        line = _strip_comment(raw).rstrip()
+        if not line.strip() or ":" not in line:
+            continue
+        indent = len(line) - len(line.lstrip())
+        key, _, value = line.strip().partition(":")
+        while stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1]
+        value = value.strip()
+        if value:
+            parent[key.strip()] = _parse_scalar(value)
+        else:
+            child: dict[str, Any] = {}
+            parent[key.strip()] = child
+            stack.append((indent, child))
+    return root
+
+
+def _strip_comment(line: str) -> str:
+    quote = ""
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "#" and (i == 0 or line[i - 1].isspace()):
+            return line[:i]
+    return line
+
+
+def _parse_scalar(value: str) -> Any:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    lowered = value.lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
@@ -0,0 +1,219 @@
+"""
+async_worker.py — asyncio 版 Worker
+
+基于 `asyncio.create_subprocess_exec` 运行 Codex CLI:
+- stdout / stderr 在同一事件循环中并发逐行读取，不为每个进程创建线程
+- 每行经 JSONLParser 解析为 JSONLEvent
+- 超时通过取消读取协程实现，随后终止子进程
+- 多个 AsyncWorker 可在一个事件循环内并发运行 (见 execute_all)
+
+同步调用方 (RestartInjector / Dispatcher) 可直接使用 execute()，
+其内部以 asyncio.run() 驱动一次执行。
+
+使用方式:
+    worker = AsyncWorker(config)
+    result = await worker.execute_async(task)
+
+    results = await execute_all([(AsyncWorker(cfg), t) for t in tasks], max_concurrency=4)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .core import JSONLEvent, TaskSpec, Timer, WorkerResult
+from .jsonl_parser import EventSummary, JSONLParser
+from .worker import LIVE_SUMMARY_RETAINED, Worker, WorkerConfig
+
+logger = logging.getLogger(__name__)
+
+# 单行上限: 工具结果可能是很长的单行 JSON (asyncio 默认仅 64 KiB)
+STREAM_LIMIT = 16 * 1024 * 1024
+# 保留的 stderr 尾部行数
+STDERR_TAIL_LINES = 200
+
+
+class AsyncWorker(Worker):
+    """asyncio 版 Worker — 与 Worker 共享 Prompt / 命令构建与结果提取逻辑。"""
+
+    def __init__(
+        self,
+        config: WorkerConfig | None = None,
+        parser: JSONLParser | None = None,
+    ) -> None:
+        super().__init__(config, parser)
+        self._aprocess: asyncio.subprocess.Process | None = None
+        self.stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+
+    # ── 公开 API ────────────────────────────────────────────
+
+    async def execute_async(
+        self,
+        task: TaskSpec,
+        prompt: str | None = None,
+        on_event: Callable[[JSONLEvent], None] | None = None,
+    ) -> WorkerResult:
+        """在当前事件循环中执行一个任务。
+
+        Args:
+            task: 任务规格
+            prompt: 自定义 Prompt。若为 None，则自动从 task 生成。
+            on_event: 事件回调，每收到一条 JSONL 事件时在事件循环线程中调用。
+
+        Returns:
+            WorkerResult
+        """
+        effective_prompt = prompt or self._build_prompt(task)
+        timeout = task.timeout_seconds or self.config.default_timeout
+
+        timer = Timer()
+        timer.start()
+        try:
+            await self._start_process_async(effective_prompt)
+            await asyncio.wait_for(self._pump(on_event), timeout=timeout)
+            result = self._result_from_events(task, list(self._events), timer.stop())
+            if result.error_message is None and self._aprocess.returncode not in (0, None):
+                result.error_message = self._exit_message()
+            return result
+
+        except asyncio.TimeoutError:
+            duration = timer.stop()
+            await self.terminate_async()
+            logger.warning("Task %s timed out after %.1f seconds", task.id, duration)
+            return self._failure_result(task, duration, f"Timeout after {timeout}s")
+
+        except asyncio.CancelledError:
+            await asyncio.shield(self.terminate_async())
+            raise
+
+        except Exception as exc:
+            duration = timer.stop()
+            await self.terminate_async()
+            logger.error("Task %s failed with exception: %s", task.id, exc)
+            return self._failure_result(task, duration, str(exc))
+
+    def execute(
+        self,
+        task: TaskSpec,
+        prompt: str | None = None,
+        on_event: Callable[[JSONLEvent], None] | None = None,
+    ) -> WorkerResult:
+        """同步入口 (供 RestartInjector 等同步调用方使用)。"""
+        return asyncio.run(self.execute_async(task, prompt=prompt, on_event=on_event))
+
+    async def terminate_async(self) -> None:
+        """终止子进程: 先 SIGTERM，5 秒内未退出则 SIGKILL。"""
+        proc = self._aprocess
+        if proc is not None and proc.returncode is None:
+            logger.info("Terminating worker process (PID: %d)", proc.pid)
+            try:
+                proc.terminate()
+                await asyncio.wait_for(proc.wait(), timeout=5)
+            except ProcessLookupError:
+                pass
+            except asyncio.TimeoutError:
+                logger.warning("Force killing worker process")
+                proc.kill()
+                await proc.wait()
+        self._running = False
+
+    def terminate(self) -> None:
+        """发送终止信号 (非阻塞，可在事件回调中调用)；读取协程随 EOF 结束。"""
+        proc = self._aprocess
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.terminate()
+            except ProcessLookupError:
+                pass
+        self._running = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._running and self._aprocess is not None and self._aprocess.returncode is None
+
+    # ── 内部方法 ────────────────────────────────────────────
+
+    async def _start_process_async(self, prompt: str) -> None:
+        cmd = self._build_command(prompt)
+        working_dir = self.config.working_dir or str(Path.cwd())
+        logger.info("Starting async worker: %s", " ".join(cmd[:4]) + " ...")
+
+        self._events = []
+        self.summary = EventSummary(max_retained=LIVE_SUMMARY_RETAINED)
+        self.stderr_tail.clear()
+        self._aprocess = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=working_dir,
+            env=self._process_env(),
+            limit=STREAM_LIMIT,
+        )
+        self._running = True
+
+    async def _pump(self, on_event: Callable[[JSONLEvent], None] | None) -> None:
+        """并发读取 stdout / stderr 直到 EOF，再等待进程退出。"""
+        proc = self._aprocess
+        assert proc is not None and proc.stdout is not None and proc.stderr is not None
+        await asyncio.gather(
+            self._read_events(proc.stdout, on_event),
+            self._read_stderr(proc.stderr),
+        )
+        await proc.wait()
+        self._running = False
+
+    async def _read_events(
+        self,
+        stream: asyncio.StreamReader,
+        on_event: Callable[[JSONLEvent], None] | None,
+    ) -> None:
+        async for raw in stream:
+            event = self.parser.parse_line(raw.decode("utf-8", errors="replace"))
+            if event is None:
+                continue
+            self._events.append(event)
+            self.parser.update_summary(self.summary, event)
+            if on_event:
+                try:
+                    on_event(event)
+                except Exception as e:
+                    logger.warning("Event callback error: %s", e)
+
+    async def _read_stderr(self, stream: asyncio.StreamReader) -> None:
+        async for raw in stream:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line:
+                self.stderr_tail.append(line)
+                logger.debug("worker stderr: %s", line[:200])
+
+    def _exit_message(self) -> str:
+        code = self._aprocess.returncode if self._aprocess else None
+        last = self.stderr_tail[-1] if self.stderr_tail else ""
+        return f"Exit code {code}" + (f": {last}" if last else "")
+
+
+async def execute_all(
+    jobs: Iterable[tuple[AsyncWorker, TaskSpec]],
+    max_concurrency: int | None = None,
+    on_event: Callable[[str, JSONLEvent], None] | None = None,
+) -> list[WorkerResult]:
+    """在同一事件循环中并发执行多个 (worker, task)，按输入顺序返回结果。
+
+    Args:
+        jobs: (AsyncWorker, TaskSpec) 序列，每个 worker 同一时间只执行一个任务
+        max_concurrency: 同时运行的子进程上限 (None 表示不限)
+        on_event: 事件回调，签名 (task_id, event)
+    """
+    jobs = list(jobs)
+    semaphore = asyncio.Semaphore(max_concurrency or max(1, len(jobs)))
+
+    async def run(worker: AsyncWorker, task: TaskSpec) -> WorkerResult:
+        callback = (lambda event: on_event(task.id, event)) if on_event else None
+        async with semaphore:
+            return await worker.execute_async(task, on_event=callback)
+
+    return list(await asyncio.gather(*(run(w, t) for w, t in jobs)))
@@ -7,10 +7,13 @@ core.py — 核心数据类定义
 
 from __future__ import annotations
 
+import logging
 import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
 
 
 class TaskStatus(Enum):
@@ -32,11 +35,58 @@ class JSONLEvent:
     type: str  # agent_message / tool_call / tool_result / error / session_end
     timestamp: float
     content: dict[str, Any]  # 原始 JSON 内容
+    # JSONLParser 的疑问分类结果 (消息文本, 命中类别)，首次检测时填充
+    question_kinds: tuple[str | None, list[str]] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __repr__(self) -> str:
         return f"JSONLEvent(type={self.type!r}, ts={self.timestamp:.1f})"
 
 
+class LazyJSONLEvent(JSONLEvent):
+    """content 在首次访问时才完整解码的 JSONLEvent (type / timestamp 已预先读出)。
+
+    原始行解码失败时 content 退化为 {"type", "timestamp"} 两个键。
+    """
+
+    def __init__(
+        self,
+        type: str,
+        timestamp: float,
+        raw: str,
+        decode: Callable[[str], Any],
+    ) -> None:
+        self.type = type
+        self.timestamp = timestamp
+        self._raw: str | None = raw
+        self._decode = decode
+        self._content: dict[str, Any] | None = None
+
+    @property
+    def content(self) -> dict[str, Any]:
+        if self._content is None:
+            try:
+                data = self._decode(self._raw)
+            except ValueError:
+                logger.debug("Malformed JSONL payload: %s", (self._raw or "")[:80])
+                data = None
+            self._content = data if isinstance(data, dict) else {
+                "type": self.type, "timestamp": self.timestamp,
+            }
+            self._raw = None
+        return self._content
+
+    @content.setter
+    def content(self, value: dict[str, Any]) -> None:
+        self._content = value
+        self._raw = None
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._content is not None
+
+
 @dataclass
 class TaskSpec:
     """单个任务的规格描述，从 PRD 中解析得到。"""
@@ -67,6 +117,7 @@ class WorkerResult:
     duration_seconds: float = 0.0
     restart_count: int = 0  # 重启次数
     error_message: str | None = None  # 错误信息
+    interrupted: bool = False  # 是否因流式检测到提问而被提前终止
 
     @property
     def has_questions(self) -> bool:
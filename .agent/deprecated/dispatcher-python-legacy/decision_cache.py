@@ -0,0 +1,312 @@
+"""
+decision_cache.py — DecisionEngine 决策缓存
+
+Worker 在不同任务 (甚至不同批次的运行) 中经常重复提出同一类问题。
+缓存以归一化后的问题文本为键保存已做出的决策，并用 MinHash + LSH 分桶
+建立近似索引，使措辞略有差异的重复问题也能直接复用同一答案:
+
+    - 精确命中: 归一化文本完全一致 (NFKC、小写、去空白与标点)
+    - 近似命中: 字符 3-gram 的 MinHash 估计 Jaccard 相似度 ≥ 阈值
+    - 持久化: JSON 文件 (原子写入)；记录规则 / 项目上下文指纹，指纹变化时旧缓存作废
+
+使用方式:
+    cache = DecisionCache(fingerprint="...")
+    cache.open(".git/axiom-decision-cache.json")
+    decision = cache.get(question)
+    if decision is None:
+        decision = ...
+        cache.put(question, decision)
+    cache.save()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .decision_engine import Decision
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 16  # 16 × 4 行: 相似度约 0.5 以上的问题大概率落入同一桶
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20260210)  # 固定种子: 签名需跨进程 / 跨运行一致
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+
+def normalize_question(text: str) -> str:
+    """归一化问题文本: NFKC、小写，去掉空白、标点与控制字符。"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(
+        ch for ch in text
+        if unicodedata.category(ch)[0] not in ("P", "Z", "C")
+    )
+
+
+def minhash_signature(normalized: str) -> tuple[int, ...]:
+    """计算归一化文本字符 3-gram 集合的 MinHash 签名。"""
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {
+            normalized[i:i + SHINGLE_SIZE]
+            for i in range(len(normalized) - SHINGLE_SIZE + 1)
+        }
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimate_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """由两个 MinHash 签名估计 Jaccard 相似度。"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+@dataclass
+class CacheStats:
+    """缓存命中统计。"""
+    lookups: int = 0
+    exact_hits: int = 0
+    fuzzy_hits: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.fuzzy_hits
+
+    @property
+    def misses(self) -> int:
+        return self.lookups - self.hits
+
+    @property
+    def hit_rate(self) -> float:
+        if self.lookups == 0:
+            return 0.0
+        return self.hits / self.lookups
+
+    def to_dict(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+@dataclass
+class _Entry:
+    decision: Decision
+    signature: tuple[int, ...]
+    hits: int = 0
+
+
+class DecisionCache:
+    """线程安全的决策缓存 (精确键 + MinHash 近似索引)，可持久化到 JSON 文件。"""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        fingerprint: str = "",
+        threshold: float = 0.8,
+        max_entries: int = 2048,
+    ) -> None:
+        """
+        Args:
+            path: 持久化文件路径；None 表示仅内存缓存 (可稍后调用 open())
+            fingerprint: 规则 / 项目上下文指纹，与文件中记录的不一致时不加载旧条目
+            threshold: 近似命中所需的最低估计相似度
+            max_entries: 条目上限，超出时淘汰最久未使用的条目
+        """
+        self.path = Path(path) if path else None
+        self.fingerprint = fingerprint
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._buckets: dict[tuple[int, tuple[int, ...]], set[str]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.open(self.path)
+
+    # ── 公开 API ────────────────────────────────────────
+
+    def open(self, path: str | Path) -> int:
+        """绑定持久化文件并加载其中的条目。
+
+        Returns:
+            加载的条目数 (文件不存在、损坏或指纹不一致时为 0)
+        """
+        self.path = Path(path)
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable decision cache %s: %s", self.path, e)
+            return 0
+
+        if data.get("version") != CACHE_VERSION or data.get("fingerprint") != self.fingerprint:
+            logger.info("Decision cache %s is stale (rules or context changed)", self.path)
+            return 0
+
+        from .decision_engine import Decision, DecisionType
+
+        loaded = 0
+        with self._lock:
+            for key, item in data.get("entries", {}).items():
+                try:
+                    decision = Decision(
+                        type=DecisionType(item["type"]),
+                        answer=item["answer"],
+                        reason=item["reason"],
+                        confidence=float(item["confidence"]),
+                        category=item["category"],
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._insert(key, decision, hits=int(item.get("hits", 0)))
+                loaded += 1
+        logger.info("Loaded %d cached decisions from %s", loaded, self.path)
+        return loaded
+
+    def get(
+        self,
+        question: str,
+        accept: Callable[[Decision], bool] | None = None,
+    ) -> Decision | None:
+        """查找缓存的决策。
+
+        Args:
+            question: 原始问题文本
+            accept: 近似命中的额外校验；返回 False 时视为未命中
+
+        Returns:
+            命中时返回决策副本 (source 为 "cache" 或 "fuzzy")，否则 None
+        """
+        key = normalize_question(question)
+        with self._lock:
+            self.stats.lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.stats.exact_hits += 1
+                return self._touch(key, entry, "cache")
+
+            signature = minhash_signature(key)
+            best_key, best_score = None, self.threshold
+            for candidate in self._candidates(signature):
+                score = estimate_similarity(signature, self._entries[candidate].signature)
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+            if best_key is None:
+                return None
+
+            entry = self._entries[best_key]
+            if accept is not None and not accept(entry.decision):
+                return None
+            self.stats.fuzzy_hits += 1
+            return self._touch(best_key, entry, "fuzzy")
+
+    def put(self, question: str, decision: Decision) -> None:
+        """记录一条决策 (同一归一化问题以最新决策为准)。"""
+        key = normalize_question(question)
+        with self._lock:
+            self._remove(key)
+            self._insert(key, replace(decision, source="rule"))
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._dirty = True
+
+    def save(self) -> bool:
+        """有改动时原子写回持久化文件。
+
+        Returns:
+            是否写入了文件
+        """
+        if self.path is None or not self._dirty:
+            return False
+        with self._lock:
+            data = {
+                "version": CACHE_VERSION,
+                "fingerprint": self.fingerprint,
+                "entries": {
+                    key: {
+                        "type": entry.decision.type.value,
+                        "answer": entry.decision.answer,
+                        "reason": entry.decision.reason,
+                        "confidence": entry.decision.confidence,
+                        "category": entry.decision.category,
+                        "hits": entry.hits,
+                    }
+                    for key, entry in self._entries.items()
+                },
+            }
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to save decision cache %s: %s", self.path, e)
+            return False
+        return True
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ── 内部方法 ────────────────────────────────────────
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+        return [(b, signature[b * ROWS:(b + 1) * ROWS]) for b in range(BANDS)]
+
+    def _candidates(self, signature: tuple[int, ...]) -> set[str]:
+        found: set[str] = set()
+        for band in self._band_keys(signature):
+            found |= self._buckets.get(band, set())
+        return found
+
+    def _insert(self, key: str, decision: Decision, hits: int = 0) -> None:
+        signature = minhash_signature(key)
+        self._entries[key] = _Entry(decision, signature, hits)
+        for band in self._band_keys(signature):
+            self._buckets.setdefault(band, set()).add(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in self._band_keys(entry.signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _touch(self, key: str, entry: _Entry, source: str) -> Decision:
+        entry.hits += 1
+        self._entries.move_to_end(key)
+        self._dirty = True
+        return replace(entry.decision, source=source)
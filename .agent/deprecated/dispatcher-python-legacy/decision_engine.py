@@ -11,10 +11,16 @@ decision_engine.py — PM 自主决策引擎 (T-104)
     3. 需求含义不明确 → BLOCKED
     4. 涉及成本/安全/用户数据 → BLOCKED
     5. 涉及项目范围变更 → BLOCKED
+
+已做出的决策写入 DecisionCache (见 decision_cache.py)，相同或相近的问题
+在后续任务 / 后续运行中直接复用同一决策；近似命中只有在新问题按规则
+会得到同一分类时才复用，措辞相近但分类不同的问题仍按规则重新决策。
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import re
 from dataclasses import dataclass
@@ -22,6 +28,9 @@ from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from .classifier import RuleClassifier
+from .decision_cache import DecisionCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +49,7 @@ class Decision:
     reason: str  # 决策理由
     confidence: float  # 置信度 0.0 ~ 1.0
     category: str  # 问题分类
+    source: str = "rule"  # 决策来源: rule | cache (精确命中) | fuzzy (近似命中)
 
 
 # ── 自动决策规则 ──────────────────────────────────────
@@ -156,14 +166,26 @@ class DecisionEngine:
     def __init__(
         self,
         project_context: dict[str, Any] | None = None,
+        cache_path: str | Path | None = None,
+        cache: DecisionCache | None = None,
     ) -> None:
         """
         Args:
             project_context: 项目上下文（可包含 tech_stack, conventions 等），
                             用于增强决策质量。
+            cache_path: 决策缓存的持久化文件；None 表示仅在本进程内复用
+            cache: 外部共享的 DecisionCache (优先于 cache_path)
         """
         self.project_context = project_context or {}
         self._decision_log: list[Decision] = []
+        # BLOCKED 规则在前: 规则顺序即优先级
+        self._classifier = RuleClassifier(
+            [(category, pattern) for pattern, category, _ in BLOCKED_RULES]
+            + [(category, pattern) for pattern, category, _ in AUTO_RULES]
+        )
+        self.cache = cache if cache is not None else DecisionCache(fingerprint=self.fingerprint())
+        if cache is None and cache_path is not None:
+            self.cache.open(cache_path)
 
     def decide(self, task_id: str, question: str) -> Decision:
         """分析问题并做出决策。
@@ -186,43 +208,21 @@ class DecisionEngine:
             self._decision_log.append(decision)
             return decision
 
-        # 1. 先检查 BLOCKED 规则（高优先级）
-        for pattern, category, reason in BLOCKED_RULES:
-            if pattern.search(question):
-                decision = Decision(
-                    type=DecisionType.BLOCKED,
-                    answer=None,
-                    reason=reason,
-                    confidence=0.9,
-                    category=category,
-                )
-                logger.info(
-                    "Task %s BLOCKED: [%s] %s", task_id, category, reason
-                )
-                self._decision_log.append(decision)
-                return decision
-
-        # 2. 再检查自动决策规则
-        for pattern, category, default_answer in AUTO_RULES:
-            if pattern.search(question):
-                # 用项目上下文增强答案
-                answer = self._enhance_answer(category, default_answer)
-                decision = Decision(
-                    type=DecisionType.AUTO_DECIDE,
-                    answer=answer,
-                    reason=f"匹配自动决策规则: {category}",
-                    confidence=0.8,
-                    category=category,
-                )
-                logger.info(
-                    "Task %s AUTO: [%s] confidence=%.1f",
-                    task_id, category, decision.confidence,
-                )
-                self._decision_log.append(decision)
-                return decision
+        # 0. 缓存: 近似命中的决策必须与新问题按规则得到的分类一致才复用
+        decision = self.cache.get(
+            question,
+            accept=lambda d: d.category == self._category(question),
+        )
+        if decision is not None:
+            logger.info(
+                "Task %s %s (%s hit): [%s]",
+                task_id, decision.type.name, decision.source, decision.category,
+            )
+            self._decision_log.append(decision)
+            return decision
 
-        # 3. 无匹配规则 → 尝试通用决策
-        decision = self._fallback_decision(task_id, question)
+        decision = self._decide_by_rules(task_id, question)
+        self.cache.put(question, decision)
         self._decision_log.append(decision)
         return decision
 
@@ -238,13 +238,80 @@ class DecisionEngine:
 
         return callback
 
+    def classify(self, question: str) -> list[str]:
+        """一次扫描返回问题命中的全部规则分类 (BLOCKED 规则在前)。"""
+        return self._classifier.classify(question)
+
     @property
     def decision_log(self) -> list[Decision]:
         """已做出的决策日志。"""
         return list(self._decision_log)
 
+    def fingerprint(self) -> str:
+        """决策规则 + 项目上下文的指纹；任一变化都会使持久化缓存失效。"""
+        payload = json.dumps(
+            {
+                "auto": [(p.pattern, c, a) for p, c, a in AUTO_RULES],
+                "blocked": [(p.pattern, c, r) for p, c, r in BLOCKED_RULES],
+                "context": self.project_context,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
     # ── 内部方法 ────────────────────────────────────────
 
+    def _category(self, question: str) -> str:
+        """问题按规则 (含兜底) 会得到的分类，与 _decide_by_rules 一致。"""
+        index = self._classifier.first(question)
+        if index is None:
+            return "通用技术" if _is_tech_question(question) else "未分类"
+        if index < len(BLOCKED_RULES):
+            return BLOCKED_RULES[index][1]
+        return AUTO_RULES[index - len(BLOCKED_RULES)][1]
+
+    def _decide_by_rules(self, task_id: str, question: str) -> Decision:
+        """按规则表决策 (不经过缓存)。"""
+        index = self._classifier.first(question)
+
+        # 1. BLOCKED 规则（高优先级）
+        if index is not None and index < len(BLOCKED_RULES):
+            _, category, reason = BLOCKED_RULES[index]
+            decision = Decision(
+                type=DecisionType.BLOCKED,
+                answer=None,
+                reason=reason,
+                confidence=0.9,
+                category=category,
+            )
+            logger.info(
+                "Task %s BLOCKED: [%s] %s", task_id, category, reason
+            )
+            return decision
+
+        # 2. 自动决策规则
+        if index is not None:
+            _, category, default_answer = AUTO_RULES[index - len(BLOCKED_RULES)]
+            # 用项目上下文增强答案
+            answer = self._enhance_answer(category, default_answer)
+            decision = Decision(
+                type=DecisionType.AUTO_DECIDE,
+                answer=answer,
+                reason=f"匹配自动决策规则: {category}",
+                confidence=0.8,
+                category=category,
+            )
+            logger.info(
+                "Task %s AUTO: [%s] confidence=%.1f",
+                task_id, category, decision.confidence,
+            )
+            return decision
+
+        # 3. 无匹配规则 → 尝试通用决策
+        return self._fallback_decision(task_id, question)
+
     def _enhance_answer(self, category: str, default_answer: str) -> str:
         """根据项目上下文增强默认答案。"""
         # 如果有项目特定约定，追加到答案中
@@ -259,16 +326,7 @@ class DecisionEngine:
         策略: 如果问题看起来是技术实现细节，自动决定；
               否则标记 BLOCKED。
         """
-        # 简单启发式: 问题中包含代码相关词汇 → 自动决定
-        tech_hints = [
-            "代码", "code", "函数", "function", "类", "class",
-            "方法", "method", "变量", "variable", "参数", "param",
-            "返回值", "return", "类型", "type", "接口", "interface",
-        ]
-
-        is_tech = any(hint in question.lower() for hint in tech_hints)
-
-        if is_tech:
+        if _is_tech_question(question):
             return Decision(
                 type=DecisionType.AUTO_DECIDE,
                 answer="请按照最佳工程实践自行决定技术实现细节，确保代码可读、可测试、可维护。",
@@ -284,3 +342,16 @@ class DecisionEngine:
                 confidence=0.4,
                 category="未分类",
             )
+
+
+# 兜底决策的简单启发式: 问题中包含代码相关词汇 → 自动决定
+_TECH_HINTS = [
+    "代码", "code", "函数", "function", "类", "class",
+    "方法", "method", "变量", "variable", "参数", "param",
+    "返回值", "return", "类型", "type", "接口", "interface",
+]
+
+
+def _is_tech_question(question: str) -> bool:
+    lowered = question.lower()
+    return any(hint in lowered for hint in _TECH_HINTS)
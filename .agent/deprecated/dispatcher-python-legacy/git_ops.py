@@ -5,21 +5,30 @@ git_ops.py — Git 自动提交集成 (T-105)
 失败时记录日志但不阻塞。
 
 支持特性:
-    - 自动提交（ADD + COMMIT）
+    - 自动提交（ADD + COMMIT，共 2 次进程创建；提交 hash 取自 commit 输出）
     - Checkpoint Tag 创建
-    - Git 状态检查
+    - Git 状态检查（porcelain v2 解析）
+    - 对象 / 引用读取走常驻的 `git cat-file --batch` 进程，不再逐次 fork
+    - 逐命令耗时统计（GitOps.timings）
     - 操作失败不阻塞（仅日志）
+    - Worktree 管理 + cherry-pick 回主仓库（并发调度使用）
 """
 
 from __future__ import annotations
 
 import logging
+import re
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# commit 的摘要行: "[main (root-commit) 1a2b3c4] msg" / "[detached HEAD 1a2b3c4] msg"
+_COMMIT_SUMMARY = re.compile(r"^\[[^\]]*?\b([0-9a-f]{7,64})\] ", re.MULTILINE)
+
 
 @dataclass
 class GitResult:
@@ -29,12 +38,166 @@ class GitResult:
     commit_hash: str | None = None
 
 
+@dataclass
+class GitCallStats:
+    """单个 Git 命令的调用统计。"""
+    calls: int = 0
+    seconds: float = 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.seconds * 1000 / self.calls if self.calls else 0.0
+
+
+@dataclass
+class GitTimings:
+    """GitOps 的逐命令耗时 (spawns 为新建 git 进程数，常驻进程上的查询不计入)。"""
+    spawns: int = 0
+    commands: dict[str, GitCallStats] = field(default_factory=dict)
+
+    @property
+    def calls(self) -> int:
+        return sum(stats.calls for stats in self.commands.values())
+
+    @property
+    def seconds(self) -> float:
+        return sum(stats.seconds for stats in self.commands.values())
+
+    def record(self, command: str, seconds: float, spawned: bool = True) -> None:
+        stats = self.commands.setdefault(command, GitCallStats())
+        stats.calls += 1
+        stats.seconds += seconds
+        if spawned:
+            self.spawns += 1
+
+    def merge(self, other: GitTimings) -> None:
+        self.spawns += other.spawns
+        for command, stats in other.commands.items():
+            mine = self.commands.setdefault(command, GitCallStats())
+            mine.calls += stats.calls
+            mine.seconds += stats.seconds
+
+    def copy(self) -> GitTimings:
+        merged = GitTimings()
+        merged.merge(self)
+        return merged
+
+    def to_dict(self) -> dict[str, dict[str, float]]:
+        return {
+            command: {"calls": stats.calls, "seconds": round(stats.seconds, 4)}
+            for command, stats in sorted(self.commands.items())
+        }
+
+
+@dataclass
+class GitStatus:
+    """`git status --porcelain=v2 --branch` 的解析结果。"""
+    head: str | None = None    # None 表示尚无提交
+    branch: str | None = None  # None 表示 detached HEAD
+    changed: list[str] = field(default_factory=list)    # 已跟踪文件的变更 (含冲突)
+    untracked: list[str] = field(default_factory=list)
+
+    @property
+    def is_clean(self) -> bool:
+        return not self.changed and not self.untracked
+
+    @classmethod
+    def parse(cls, output: str) -> GitStatus:
+        """解析 -z 格式 (NUL 分隔) 的输出。"""
+        status = cls()
+        entries = iter(output.split("\0"))
+        for entry in entries:
+            kind, _, rest = entry.partition(" ")
+            if kind == "#":
+                key, _, value = rest.partition(" ")
+                if key == "branch.oid" and value != "(initial)":
+                    status.head = value
+                elif key == "branch.head" and value != "(detached)":
+                    status.branch = value
+            elif kind in ("1", "u"):
+                status.changed.append(rest.split(" ", 7 if kind == "1" else 9)[-1])
+            elif kind == "2":
+                status.changed.append(rest.split(" ", 8)[-1])
+                next(entries, None)  # 重命名 / 复制条目后跟原路径
+            elif kind == "?":
+                status.untracked.append(rest)
+        return status
+
+
+class _CatFileBatch:
+    """常驻的 `git cat-file --batch` 进程，按需启动，进程意外退出时自动重启一次。"""
+
+    def __init__(self, repo_path: str) -> None:
+        self.repo_path = repo_path
+        self.spawns = 0
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._lock = threading.Lock()
+
+    def read(self, rev: str) -> tuple[str, str, bytes] | None:
+        """读取对象: 返回 (sha, type, content)，对象不存在时返回 None。"""
+        with self._lock:
+            for attempt in (1, 2):
+                spawned = self._proc is None or self._proc.poll() is not None
+                if spawned:
+                    self._start()
+                try:
+                    return self._query(rev)
+                except (BrokenPipeError, OSError, ValueError):
+                    self._stop()
+                    if attempt == 2 or spawned:
+                        raise
+        return None  # pragma: no cover - 循环总会返回或抛出
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _start(self) -> None:
+        self.spawns += 1
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _query(self, rev: str) -> tuple[str, str, bytes] | None:
+        assert self._proc is not None and self._proc.stdin and self._proc.stdout
+        self._proc.stdin.write(rev.encode("utf-8") + b"\n")
+        self._proc.stdin.flush()
+        header = self._proc.stdout.readline()
+        if not header:
+            raise ValueError(f"git cat-file exited while reading {rev!r}")
+        parts = header.decode("utf-8", errors="replace").split()
+        if len(parts) != 3:
+            return None  # "<rev> missing" / "<rev> ambiguous"
+        sha, kind, size = parts
+        content = self._proc.stdout.read(int(size) + 1)[:-1]  # 去掉结尾换行
+        return sha, kind, content
+
+    def _stop(self) -> None:
+        if self._proc is None:
+            return
+        try:
+            if self._proc.stdin:
+                self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        finally:
+            if self._proc.stdout:
+                self._proc.stdout.close()
+            self._proc = None
+
+
 class GitOps:
     """Git 操作封装器。
 
     使用方式:
         git = GitOps(repo_path="/path/to/repo")
         result = git.auto_commit("T-101", "Worker 封装器")
+        git.close()  # 结束常驻的 cat-file 进程
     """
 
     def __init__(self, repo_path: str | Path | None = None) -> None:
@@ -43,6 +206,8 @@ class GitOps:
             repo_path: Git 仓库根目录路径。None 则使用当前目录。
         """
         self.repo_path = str(repo_path) if repo_path else "."
+        self.timings = GitTimings()
+        self._batch = _CatFileBatch(self.repo_path)
 
     # ── 公开 API ────────────────────────────────────────
 
@@ -50,6 +215,7 @@ class GitOps:
         """自动提交任务完成的更改。
 
         执行: git add -A && git commit -m "feat(T-{ID}): {name}"
+        (提交 hash 从 commit 的摘要行解析；仅在 commit 失败时追加一次 status 判断是否无变更)
 
         Args:
             task_id: 任务 ID (e.g., "T-101")
@@ -58,23 +224,21 @@ class GitOps:
         Returns:
             GitResult
         """
+        commit_msg = f"feat({task_id}): {task_name}"
         try:
-            # 检查是否有变更
-            if not self.has_changes():
-                return GitResult(
-                    success=True,
-                    message="No changes to commit",
-                )
-
-            # git add -A
             self._run_git("add", "-A")
+            result = self._spawn("commit", "-m", commit_msg)
+            if result.returncode != 0:
+                # 失败的常见原因是没有可提交的内容，只有此时才多花一次 status
+                if self.status().is_clean:
+                    return GitResult(success=True, message="No changes to commit")
+                raise RuntimeError(
+                    f"Git command failed: git commit -m {commit_msg!r}\n"
+                    f"stderr: {result.stderr.strip() or result.stdout.strip()}"
+                )
 
-            # git commit
-            commit_msg = f"feat({task_id}): {task_name}"
-            self._run_git("commit", "-m", commit_msg)
-
-            # 获取 commit hash
-            commit_hash = self._get_head_hash()
+            match = _COMMIT_SUMMARY.search(result.stdout)
+            commit_hash = match.group(1) if match else self._get_head_hash()
 
             logger.info("Auto-committed: %s (%s)", commit_msg, commit_hash)
             return GitResult(
@@ -111,20 +275,29 @@ class GitOps:
             logger.warning("Checkpoint creation failed: %s", exc)
             return GitResult(success=False, message=str(exc))
 
+    def status(self) -> GitStatus:
+        """工作区状态 (一次 `git status --porcelain=v2 --branch -z`)。"""
+        return GitStatus.parse(
+            self._run_git("status", "--porcelain=v2", "--branch", "-z", "--untracked-files=all")
+        )
+
     def has_changes(self) -> bool:
         """检查是否有未提交的变更。"""
         try:
-            result = self._run_git("status", "--porcelain")
-            return bool(result.strip())
+            return not self.status().is_clean
         except Exception:
             return False
 
     def get_last_commit_message(self) -> str | None:
         """获取最近一次 commit 的消息。"""
         try:
-            return self._run_git("log", "-1", "--format=%s").strip()
+            obj = self._read_object("HEAD")
         except Exception:
             return None
+        if obj is None or obj[1] != "commit":
+            return None
+        _, _, message = obj[2].decode("utf-8", errors="replace").partition("\n\n")
+        return message.split("\n", 1)[0].strip()
 
     def get_diff_stat(self) -> str | None:
         """获取当前变更的 diff 统计。"""
@@ -133,27 +306,130 @@ class GitOps:
         except Exception:
             return None
 
+    def get_head(self) -> str:
+        """获取 HEAD 的完整 hash。"""
+        obj = self._read_object("HEAD")
+        if obj is None:
+            raise RuntimeError(f"Cannot resolve HEAD in {self.repo_path}")
+        return obj[0]
+
+    def close(self) -> None:
+        """结束常驻的 cat-file 进程 (之后的读取会按需重新启动)。"""
+        self._batch.close()
+
+    def __enter__(self) -> GitOps:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def add_worktree(self, path: str | Path, ref: str = "HEAD") -> Path:
+        """在 path 创建一个 detached worktree (已存在则复用)。"""
+        target = Path(path)
+        if not (target / ".git").exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._run_git("worktree", "add", "--detach", str(target), ref)
+        return target
+
+    def move_worktree(self, path: str | Path, target: str | Path) -> Path:
+        """移动 worktree (包括未提交的改动)。"""
+        self._run_git("worktree", "move", str(path), str(target))
+        return Path(target)
+
+    def remove_worktree(self, path: str | Path) -> None:
+        """删除 worktree (失败仅记录日志)。"""
+        try:
+            self._run_git("worktree", "remove", "--force", str(path))
+        except Exception as exc:
+            logger.warning("Worktree removal failed: %s", exc)
+
+    def prune_worktrees(self) -> None:
+        """清理目录已不存在的 worktree 登记 (失败仅记录日志)。"""
+        try:
+            self._run_git("worktree", "prune")
+        except Exception as exc:
+            logger.warning("Worktree prune failed: %s", exc)
+
+    def reset_to(self, ref: str, branch: str | None = None) -> None:
+        """将当前工作区强制重置到 ref，并清除未跟踪文件。
+
+        Args:
+            ref: 目标提交
+            branch: 同时在 ref 处 (重新) 创建并切换到该分支；None 则为 detached HEAD
+        """
+        if branch is None:
+            self._run_git("checkout", "--detach", "--force", ref)
+        else:
+            self._run_git("checkout", "--force", "-B", branch, ref)
+        self._run_git("clean", "-fdq")
+
+    def delete_branches(self, branches: list[str]) -> None:
+        """一次删除多个本地分支 (失败仅记录日志)。"""
+        try:
+            self._run_git("branch", "-D", *branches)
+        except Exception as exc:
+            logger.warning("Branch deletion failed: %s", exc)
+
+    def cherry_pick(self, commit: str) -> GitResult:
+        """将其他 worktree 中的提交应用到当前仓库；冲突时中止并返回失败。"""
+        try:
+            self._run_git("cherry-pick", commit)
+        except Exception as exc:
+            try:
+                self._run_git("cherry-pick", "--abort")
+            except Exception:
+                pass
+            logger.warning("Cherry-pick %s failed: %s", commit, exc)
+            return GitResult(success=False, message=str(exc))
+        commit_hash = self._get_head_hash()
+        return GitResult(success=True, message=f"Picked {commit}", commit_hash=commit_hash)
+
+    def git_dir(self) -> Path:
+        """仓库共享的 .git 目录 (worktree 中同样指向主仓库)。"""
+        out = self._run_git("rev-parse", "--git-common-dir").strip()
+        path = Path(out)
+        return path if path.is_absolute() else Path(self.repo_path) / path
+
     # ── 内部方法 ────────────────────────────────────────
 
     def _run_git(self, *args: str) -> str:
         """执行 Git 命令并返回 stdout。"""
-        cmd = ["git", *args]
-        result = subprocess.run(
-            cmd,
-            cwd=self.repo_path,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            timeout=30,
-        )
+        result = self._spawn(*args)
         if result.returncode != 0:
             raise RuntimeError(
-                f"Git command failed: {' '.join(cmd)}\n"
+                f"Git command failed: {' '.join(['git', *args])}\n"
                 f"stderr: {result.stderr.strip()}"
             )
         return result.stdout
 
+    def _spawn(self, *args: str) -> subprocess.CompletedProcess[str]:
+        """启动一个 git 进程 (不检查返回码)，并记录耗时。"""
+        start = time.perf_counter()
+        try:
+            return subprocess.run(
+                ["git", *args],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=30,
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings.record(args[0], elapsed)
+            logger.debug("git %s: %.1f ms", args[0], elapsed * 1000)
+
+    def _read_object(self, rev: str) -> tuple[str, str, bytes] | None:
+        """经常驻的 cat-file 进程读取对象，并记录耗时。"""
+        start = time.perf_counter()
+        spawns = self._batch.spawns
+        try:
+            return self._batch.read(rev)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings.record("cat-file --batch", elapsed, spawned=self._batch.spawns != spawns)
+
     def _get_head_hash(self) -> str:
         """获取 HEAD 的短 hash。"""
-        return self._run_git("rev-parse", "--short", "HEAD").strip()
+        return self.get_head()[:7]
@@ -0,0 +1,51 @@
+"""
+json_codec.py — JSONL 行解码层
+
+- 安装了 orjson 时用 orjson.loads，否则回退到标准库 json.loads
+- read_header(): 只用一次正则匹配从行首取出 "type" / "timestamp"，不解析整行
+- 配合 core.LazyJSONLEvent，完整 payload 推迟到首次访问 content 时才解码
+  (大体积的 tool_result 等事件若无人读取 content 则永不解码)
+
+只有形如 {"type": "...", "timestamp": 1.0, ...} (type 为首个键) 的行走快速路径；
+其他形式一律回退为完整解码，结果与 json.loads 一致。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable
+
+try:  # 可选依赖
+    import orjson
+except ImportError:  # pragma: no cover - 取决于环境
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+_HEADER = re.compile(
+    r'\s*\{\s*"type"\s*:\s*"([^"\\]*)"'
+    r'(?:\s*,\s*"timestamp"\s*:\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*[,}])?'
+)
+
+
+# 两种实现解码失败时都抛出 ValueError 的子类
+loads: Callable[[str | bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+
+def read_header(line: str) -> tuple[str, float | None] | None:
+    """不完整解码地读取 (type, timestamp)。
+
+    Returns:
+        (type, timestamp)；行中没有 "timestamp" 键时 timestamp 为 None。
+        无法安全地快速读取时返回 None (调用方应完整解码)。
+    """
+    match = _HEADER.match(line)
+    if match is None or not line.rstrip().endswith("}"):
+        return None
+    event_type, timestamp = match.group(1), match.group(2)
+    if timestamp is not None:
+        return event_type, float(timestamp)
+    if '"timestamp"' in line:
+        return None  # timestamp 不紧跟在 type 之后 (或位于嵌套对象中)，交给完整解码
+    return event_type, None
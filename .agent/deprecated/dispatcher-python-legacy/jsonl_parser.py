@@ -9,23 +9,28 @@ jsonl_parser.py — JSONL 事件解析器 (T-102)
     - session_end: 会话结束
 
 支持特性:
-    - 语义疑问检测（中英文混合支持）
+    - 语义疑问检测（中英文混合支持，每条事件只分类一次）
     - 会话完成检测
     - 错误提取
     - 结构化内容摘要
+    - 快速解码: orjson (可选)；lazy=True 时行首读取 type / timestamp，payload 延迟解码
+      (见 json_codec.py，适合未安装 orjson 的环境)
+    - 流式解析 (iter_events / iter_file) + 增量 EventSummary，
+      消息正文仅保留最近 N 条，可在常量内存下分析超大转录文件
 """
 
 from __future__ import annotations
 
-import json
 import logging
 import re
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TextIO
+from typing import Iterable, Iterator
 
-from .core import JSONLEvent
+from . import json_codec
+from .core import JSONLEvent, LazyJSONLEvent
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +51,20 @@ QUESTION_PATTERNS: list[re.Pattern[str]] = [
     re.compile(r"(无法继续|无法确定|不确定|blocked|stuck|need.*input)", re.IGNORECASE),
 ]
 
+# 阻塞性提问: 明确等待回复的问题 (流式检测据此提前终止 Worker)。
+# "如何 / 什么" 等疑问词常出现在 Agent 的自述中 ("我来看看如何实现")，不单独视为阻塞。
+BLOCKING_QUESTION_PATTERNS: list[re.Pattern[str]] = [
+    re.compile(r"[\?？]\s*$"),
+    re.compile(r"(请确认|请选择|请指定|请告诉|请问|你希望|你想要)"),
+    re.compile(r"\b(should I|do you want|would you like|shall I)\b", re.IGNORECASE),
+    # 阻塞声明必须是明确的求助 ("blocked by a missing fixture" / "need to validate the input" 只是自述)
+    re.compile(r"(无法继续|无法确定)"),
+    re.compile(
+        r"\b(need (your|user|the user's) input|blocked[,:]? (waiting|until you))\b",
+        re.IGNORECASE,
+    ),
+]
+
 # 非疑问的例外模式（排除误报）
 QUESTION_EXCLUDE_PATTERNS: list[re.Pattern[str]] = [
     re.compile(r"(已完成|已解决|已修复|没有问题|没问题)"),
@@ -64,10 +83,26 @@ class JSONLParser:
         events = parser.parse_stream(file_handle)
         # 或逐行解析
         event = parser.parse_line(line)
+        # 或流式分析 (常量内存)
+        summary = parser.analyze_file("run.jsonl", max_retained=100)
     """
 
-    def __init__(self) -> None:
+    def __init__(self, lazy: bool = False) -> None:
+        """
+        Args:
+            lazy: 可快速读取行首 type / timestamp 时推迟完整解码 (返回 LazyJSONLEvent)。
+                  默认关闭: 延迟模式下格式损坏但行首可读的行仍会产出事件
+                  (content 退化为 type / timestamp)，且安装 orjson 后几乎没有收益。
+        """
+        self.lazy = lazy
         self._event_count: int = 0
+        # 疑问模式多含正则语法，RuleClassifier 的关键词预扫描对它们无效，
+        # 实测反而比逐组 search() 慢 (tests/bench_classifier.py)
+        self._rules: list[tuple[str, list[re.Pattern[str]]]] = [
+            ("exclude", QUESTION_EXCLUDE_PATTERNS),
+            ("question", QUESTION_PATTERNS),
+            ("blocking", BLOCKING_QUESTION_PATTERNS),
+        ]
 
     # ── 解析 API ────────────────────────────────────────
 
@@ -84,9 +119,20 @@ class JSONLParser:
         if not line:
             return None
 
+        header = json_codec.read_header(line) if self.lazy else None
+        if header is not None:
+            event_type, timestamp = header
+            self._event_count += 1
+            return LazyJSONLEvent(
+                type=event_type,
+                timestamp=time.time() if timestamp is None else timestamp,
+                raw=line,
+                decode=json_codec.loads,
+            )
+
         try:
-            data = json.loads(line)
-        except json.JSONDecodeError:
+            data = json_codec.loads(line)
+        except ValueError:
             logger.debug("Non-JSON line skipped: %s", line[:80])
             return None
 
@@ -102,7 +148,33 @@ class JSONLParser:
         self._event_count += 1
         return event
 
-    def parse_stream(self, stream: TextIO) -> list[JSONLEvent]:
+    def iter_events(self, stream: Iterable[str]) -> Iterator[JSONLEvent]:
+        """逐行解析 JSONL 流，按到达顺序产出事件 (跳过无效行)。
+
+        Args:
+            stream: 可遍历行的文本流（文件对象、StringIO 或行迭代器）
+
+        Yields:
+            JSONLEvent
+        """
+        for line in stream:
+            event = self.parse_line(line)
+            if event:
+                yield event
+
+    def iter_file(self, path: str | Path) -> Iterator[JSONLEvent]:
+        """流式读取 JSONL 文件 (不一次性载入整个文件)。
+
+        Args:
+            path: JSONL 文件路径
+
+        Yields:
+            JSONLEvent
+        """
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            yield from self.iter_events(f)
+
+    def parse_stream(self, stream: Iterable[str]) -> list[JSONLEvent]:
         """解析整个 JSONL 流。
 
         Args:
@@ -111,12 +183,7 @@ class JSONLParser:
         Returns:
             解析后的事件列表
         """
-        events: list[JSONLEvent] = []
-        for line in stream:
-            event = self.parse_line(line)
-            if event:
-                events.append(event)
-        return events
+        return list(self.iter_events(stream))
 
     def parse_file(self, path: str | Path) -> list[JSONLEvent]:
         """从文件解析 JSONL。
@@ -127,8 +194,7 @@ class JSONLParser:
         Returns:
             解析后的事件列表
         """
-        with open(path, "r", encoding="utf-8") as f:
-            return self.parse_stream(f)
+        return list(self.iter_file(path))
 
     # ── 语义检测 API ────────────────────────────────────
 
@@ -147,24 +213,32 @@ class JSONLParser:
         Returns:
             检测到的问题文本，或 None
         """
-        if event.type != "agent_message":
-            return None
+        message, kinds = self._question_kinds(event)
+        return message if "question" in kinds else None
 
-        message = event.content.get("message", "")
-        if not message or len(message.strip()) < 3:
-            return None
+    def detect_blocking_question(self, event: JSONLEvent) -> str | None:
+        """检测需要等待回复才能继续的提问 (detect_question 的子集)。
 
-        # 排除误报
-        for exclude in QUESTION_EXCLUDE_PATTERNS:
-            if exclude.search(message):
-                return None
+        用于事件流实时检测: 命中后 Worker 即使继续运行也只是在空转等待，
+        可以立即终止并注入答案重启。
 
-        # 检查疑问模式
-        for pattern in QUESTION_PATTERNS:
-            if pattern.search(message):
-                return message
+        Args:
+            event: JSONL 事件
+
+        Returns:
+            问题文本，或 None
+        """
+        message, kinds = self._question_kinds(event)
+        return message if "question" in kinds and "blocking" in kinds else None
+
+    def classify_message(self, message: str) -> list[str]:
+        """返回消息命中的全部模式类别 (逐组 search()，组内命中一条即停)。
 
-        return None
+        Returns:
+            "exclude" (误报排除) / "question" (疑问) / "blocking" (阻塞性提问)
+            中命中的类别
+        """
+        return [kind for kind, patterns in self._rules if any(p.search(message) for p in patterns)]
 
     def detect_completion(self, event: JSONLEvent) -> bool:
         """检测 session_end 事件。
@@ -192,82 +266,141 @@ class JSONLParser:
 
     # ── 批量分析 API ────────────────────────────────────
 
-    def analyze_events(self, events: list[JSONLEvent]) -> EventSummary:
-        """对一组事件进行综合分析。
+    def analyze_events(
+        self,
+        events: Iterable[JSONLEvent],
+        max_retained: int | None = None,
+    ) -> EventSummary:
+        """对一组事件进行综合分析 (单次遍历，可传入生成器)。
 
         Args:
-            events: 事件列表
+            events: 事件序列
+            max_retained: 消息 / 问题 / 错误 / 工具调用各保留最近多少条，None 表示全部保留
 
         Returns:
             EventSummary — 包含分类统计、检测到的问题、错误等
         """
-        summary = EventSummary()
-
+        summary = EventSummary(max_retained=max_retained)
         for event in events:
-            # 计数
-            summary.type_counts[event.type] = summary.type_counts.get(event.type, 0) + 1
-
-            # 检测问题
-            question = self.detect_question(event)
-            if question:
-                summary.questions.append(question)
-
-            # 检测完成
-            if self.detect_completion(event):
-                summary.completed = True
-
-            # 检测错误
-            error = self.detect_error(event)
-            if error:
-                summary.errors.append(error)
-
-            # 收集 agent 消息
-            if event.type == "agent_message":
-                msg = event.content.get("message", "")
-                if msg:
-                    summary.messages.append(msg)
+            self.update_summary(summary, event)
+        return summary
 
-            # 收集工具调用
-            if event.type == "tool_call":
-                tool_name = event.content.get("tool", "unknown")
-                summary.tool_calls.append(tool_name)
+    def analyze_file(self, path: str | Path, max_retained: int | None = 100) -> EventSummary:
+        """流式分析 JSONL 文件，内存占用与文件大小无关。"""
+        return self.analyze_events(self.iter_file(path), max_retained=max_retained)
 
-        summary.total_events = len(events)
-        summary.success = summary.completed and len(summary.errors) == 0
+    def update_summary(self, summary: EventSummary, event: JSONLEvent) -> str | None:
+        """把一条事件累加进 summary (可在事件到达时实时调用)。
 
-        return summary
+        Returns:
+            该事件中检测到的问题文本，或 None
+        """
+        # 计数
+        summary.total_events += 1
+        summary.type_counts[event.type] = summary.type_counts.get(event.type, 0) + 1
+
+        # 检测问题
+        question = self.detect_question(event)
+        if question:
+            summary.question_count += 1
+            summary.questions.append(question)
+
+        # 检测完成
+        if self.detect_completion(event):
+            summary.completed = True
+
+        # 检测错误
+        error = self.detect_error(event)
+        if error:
+            summary.error_count += 1
+            summary.errors.append(error)
+
+        # 收集 agent 消息
+        if event.type == "agent_message":
+            msg = event.content.get("message", "")
+            if msg:
+                summary.messages.append(msg)
+
+        # 收集工具调用
+        if event.type == "tool_call":
+            tool_name = event.content.get("tool", "unknown")
+            summary.tool_calls.append(tool_name)
+            summary.tool_counts[tool_name] = summary.tool_counts.get(tool_name, 0) + 1
+
+        summary.success = summary.completed and summary.error_count == 0
+        return question
 
     @property
     def event_count(self) -> int:
         """已解析的事件总数。"""
         return self._event_count
 
+    # ── 内部方法 ────────────────────────────────────────
+
+    def _question_kinds(self, event: JSONLEvent) -> tuple[str | None, list[str]]:
+        """返回 (agent 消息文本, 命中类别)；非疑问候选或命中排除模式时类别为空。
+
+        结果缓存在事件上: update_summary 与 QuestionInterrupt 对同一事件只分类一次。
+        """
+        if event.type != "agent_message":
+            return None, []
+        if event.question_kinds is None:
+            event.question_kinds = self._classify_event(event)
+        return event.question_kinds
+
+    def _classify_event(self, event: JSONLEvent) -> tuple[str | None, list[str]]:
+        message = event.content.get("message", "")
+        if not message or len(message.strip()) < 3:
+            return None, []
+
+        kinds = self.classify_message(message)
+        # 排除误报
+        if "exclude" in kinds:
+            return None, []
+        return message, kinds
+
 
 @dataclass
 class EventSummary:
-    """事件流的综合分析结果。"""
+    """事件流的综合分析结果 (可由 JSONLParser.update_summary 增量累加)。
+
+    max_retained 不为 None 时，messages / questions / errors / tool_calls
+    为 maxlen=max_retained 的 deque，只保留最近的条目 (不支持切片，
+    需要列表时用 list(...) 转换)；计数字段始终覆盖全部事件。
+    """
 
     total_events: int = 0
     type_counts: dict[str, int] = field(default_factory=dict)
-    messages: list[str] = field(default_factory=list)
-    questions: list[str] = field(default_factory=list)
-    errors: list[str] = field(default_factory=list)
-    tool_calls: list[str] = field(default_factory=list)
+    messages: list[str] | deque[str] = field(default_factory=list)
+    questions: list[str] | deque[str] = field(default_factory=list)
+    errors: list[str] | deque[str] = field(default_factory=list)
+    tool_calls: list[str] | deque[str] = field(default_factory=list)
     completed: bool = False
     success: bool = False
+    question_count: int = 0
+    error_count: int = 0
+    tool_counts: dict[str, int] = field(default_factory=dict)
+    max_retained: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.max_retained is not None:
+            for name in ("messages", "questions", "errors", "tool_calls"):
+                setattr(self, name, deque(getattr(self, name), maxlen=self.max_retained))
+        self.question_count = max(self.question_count, len(self.questions))
+        self.error_count = max(self.error_count, len(self.errors))
 
     @property
     def has_questions(self) -> bool:
-        return len(self.questions) > 0
+        return self.question_count > 0
 
     @property
     def has_errors(self) -> bool:
-        return len(self.errors) > 0
+        return self.error_count > 0
 
     def __repr__(self) -> str:
         return (
             f"EventSummary(events={self.total_events}, "
-            f"questions={len(self.questions)}, "
-            f"errors={len(self.errors)}, "
+            f"questions={self.question_count}, "
+            f"errors={self.error_count}, "
             f"success={self.success})"
         )
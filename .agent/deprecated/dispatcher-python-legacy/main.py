@@ -3,34 +3,49 @@ main.py — Dispatcher 入口 (Phase 1 集成)
 
 提供 `dispatch(prd_path)` 入口函数：
     1. 解析 PRD → 提取 TaskSpec 列表
-    2. 按依赖顺序调度执行
+    2. 按依赖 DAG 拓扑排序，就绪任务并发执行 (有界 Worker 池)
     3. 每个任务: Worker 执行 → 重启注入 → Git 提交 → PRD 回写
     4. 输出最终报告
 
+并发模式 (max_workers > 1) 下每个 Worker 在 WorktreePool 分配的独立 git worktree
+中运行 (.git/axiom-worktrees/slot-N，任务间循环复用)，任务开始前切到基于主仓库
+HEAD 的任务分支 axiom/<任务ID>，完成后在 worktree 中提交并按依赖顺序 cherry-pick
+回主仓库；Git / PRD 回写均在调度线程串行执行。worktree 被禁用或不可用时退回
+单槽位串行执行。
+
+决策缓存默认持久化在 .git/axiom-decision-cache.json，跨任务、跨运行复用
+PM 决策；命中率见报告中的 Decision Cache 一行。
+
 用法:
     python -m dispatcher.main --prd docs/prd/axiom-v4-dev.md
+    python -m dispatcher.main --prd docs/prd/axiom-v4-dev.md --jobs 4
 """
 
 from __future__ import annotations
 
 import argparse
+import heapq
 import logging
-import re
 import sys
-from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any
 
 from .core import TaskSpec, TaskStatus, WorkerResult
+from .decision_cache import CacheStats
 from .decision_engine import DecisionEngine
-from .git_ops import GitOps
+from .git_ops import GitOps, GitTimings
 from .jsonl_parser import JSONLParser
 from .prd_updater import PRDUpdater
 from .restart_injector import RestartInjector
 from .worker import Worker, WorkerConfig
+from .worktree_pool import Worktree, WorktreePool
 
 logger = logging.getLogger(__name__)
 
+DECISION_CACHE_FILE = "axiom-decision-cache.json"
+
 
 @dataclass
 class DispatchReport:
@@ -41,6 +56,8 @@ class DispatchReport:
     blocked: int = 0
     skipped: int = 0
     results: list[WorkerResult] = field(default_factory=list)
+    decision_cache: CacheStats = field(default_factory=CacheStats)
+    git: GitTimings = field(default_factory=GitTimings)
 
     @property
     def success_rate(self) -> float:
@@ -59,16 +76,32 @@ class DispatchReport:
             f"  🚫 Blocked: {self.blocked}\n"
             f"  ⏭️ Skipped: {self.skipped}\n"
             f"  Success Rate: {self.success_rate:.0%}\n"
+            f"  Decision Cache: {self.decision_cache.hits}/{self.decision_cache.lookups} hits"
+            f" ({self.decision_cache.hit_rate:.0%}, fuzzy {self.decision_cache.fuzzy_hits})\n"
+            f"  Git: {self.git.calls} calls, {self.git.spawns} spawns, {self.git.seconds:.2f}s\n"
             f"{'=' * 50}\n"
         )
 
 
+@dataclass
+class WorkerSlot:
+    """并发调度中的一个执行槽位 (独立的 Worker / 注入器 / 工作区)。"""
+    index: int
+    worker: Worker
+    injector: RestartInjector
+    git: GitOps
+    worktree: Worktree | None = None  # None 表示直接在主仓库中执行
+
+
 class Dispatcher:
     """Dispatcher — PRD 驱动的自动化任务调度器。
 
     使用方式:
         dispatcher = Dispatcher(prd_path="docs/prd/my-prd.md")
         report = dispatcher.run()
+
+        # 最多 4 个任务并发，每个 Worker 使用独立 worktree
+        dispatcher = Dispatcher(prd_path="docs/prd/my-prd.md", max_workers=4)
     """
 
     def __init__(
@@ -77,12 +110,21 @@ class Dispatcher:
         worker_config: WorkerConfig | None = None,
         repo_path: str | Path | None = None,
         dry_run: bool = False,
+        max_workers: int = 1,
+        use_worktrees: bool = True,
+        decision_cache: str | Path | None = None,
     ) -> None:
         self.prd_path = Path(prd_path)
         self.dry_run = dry_run
+        self.max_workers = max(1, max_workers)
+        self.use_worktrees = use_worktrees
+        self.decision_cache_path = Path(decision_cache) if decision_cache else None
+        self.worker_config = worker_config or WorkerConfig()
+        self._prd_done: set[str] = set()  # PRD 中已是 DONE 的任务 (视为已满足的依赖)
+        self._pool: WorktreePool | None = None
 
         # 初始化各组件
-        self.worker = Worker(worker_config or WorkerConfig())
+        self.worker = Worker(self.worker_config)
         self.parser = JSONLParser()
         self.injector = RestartInjector(self.worker, self.parser)
         self.decision_engine = DecisionEngine()
@@ -103,131 +145,279 @@ class Dispatcher:
 
         logger.info("Found %d PENDING tasks to execute", len(tasks))
 
-        # 2. 按依赖顺序执行
-        completed: set[str] = set()
-
-        for task in tasks:
-            # 依赖检查
-            unmet = [d for d in task.dependencies if d not in completed]
-            if unmet:
-                logger.info(
-                    "Skipping %s: unmet dependencies %s", task.id, unmet
-                )
-                report.skipped += 1
-                continue
+        # 2. 拓扑排序 (依赖环中的任务无法执行)
+        order, cyclic = self.topological_order(tasks)
+        for task in cyclic:
+            logger.warning("Skipping %s: dependency cycle", task.id)
+            report.skipped += 1
 
-            if self.dry_run:
+        if self.dry_run:
+            for task in order:
                 logger.info("[DRY RUN] Would execute: %s", task.id)
                 report.skipped += 1
-                continue
-
-            # 执行任务
-            logger.info("▶ Executing %s: %s", task.id, task.name)
-            result = self.injector.execute_with_injection(
-                task,
-                answer_func=self.decision_engine.as_answer_callback(),
-            )
-            report.results.append(result)
-
-            if result.success:
-                # 成功 → Git 提交 → PRD 回写
-                report.done += 1
-                completed.add(task.id)
-
-                git_result = self.git.auto_commit(task.id, task.name)
-                if git_result.success:
-                    logger.info("  Git: %s", git_result.message)
-
-                prd_result = self.prd_updater.update_task_status(
-                    task.id, TaskStatus.DONE
-                )
-                if prd_result.success:
-                    logger.info("  PRD: %s", prd_result.message)
-
-            elif result.error_message and "BLOCKED" in result.error_message:
-                report.blocked += 1
-                self.prd_updater.update_task_status(task.id, TaskStatus.BLOCKED)
-                logger.warning("  ⚠ Task %s BLOCKED: %s", task.id, result.error_message)
-            else:
-                report.failed += 1
-                self.prd_updater.update_task_status(task.id, TaskStatus.FAILED)
-                logger.error("  ✗ Task %s FAILED: %s", task.id, result.error_message)
-
-        # 3. 输出报告
+        else:
+            # 3. 按依赖就绪情况并发执行
+            self._open_decision_cache()
+            self.decision_engine.cache.reset_stats()
+            try:
+                self._schedule(order, report)
+            finally:
+                self.decision_engine.cache.save()
+                self.git.close()
+            report.decision_cache = replace(self.decision_engine.cache.stats)
+            report.git = self.git.timings.copy()
+
+        # 4. 输出报告
         print(report.summary())
         return report
 
+    def topological_order(
+        self,
+        tasks: list[TaskSpec],
+    ) -> tuple[list[TaskSpec], list[TaskSpec]]:
+        """按依赖关系拓扑排序，无依赖关系的任务保持 PRD 中的先后顺序。
+
+        只考虑列表内部的依赖；指向列表外任务的依赖在调度时判断。
+
+        Returns:
+            (有序任务列表, 处于依赖环中的任务列表)
+        """
+        index = {task.id: i for i, task in enumerate(tasks)}
+        indegree = [0] * len(tasks)
+        dependents: list[list[int]] = [[] for _ in tasks]
+        for i, task in enumerate(tasks):
+            for dep in set(task.dependencies):
+                if dep in index:
+                    indegree[i] += 1
+                    dependents[index[dep]].append(i)
+
+        heap = [i for i in range(len(tasks)) if indegree[i] == 0]
+        heapq.heapify(heap)
+        order: list[TaskSpec] = []
+        while heap:
+            i = heapq.heappop(heap)
+            order.append(tasks[i])
+            for j in dependents[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    heapq.heappush(heap, j)
+
+        ordered = {task.id for task in order}
+        return order, [task for task in tasks if task.id not in ordered]
+
     def parse_prd(self) -> list[TaskSpec]:
         """从 PRD Markdown 文件中解析 PENDING 状态的任务。
 
         PRD 表格格式:
             | T-101 | **Worker 封装器** | ⏳ PENDING | 描述 | 3h | - | 验收标准 |
+
+        解析结果缓存在 PRDUpdater 的 PRD 文档缓存中，回写状态时无需重新解析。
         """
         if not self.prd_path.exists():
             logger.error("PRD file not found: %s", self.prd_path)
             return []
 
-        content = self.prd_path.read_text(encoding="utf-8")
-        tasks: list[TaskSpec] = []
-
-        # 匹配表格行: | ID | Name | Status | Desc | Est | Deps | Criteria |
-        table_pattern = re.compile(
-            r"\|\s*(T-\d+)\s*\|"  # Task ID
-            r"\s*\*{0,2}(.*?)\*{0,2}\s*\|"  # Name (可能有 ** 加粗)
-            r"\s*(⏳\s*PENDING|🔄\s*IN_PROGRESS|✅\s*DONE|🚫\s*BLOCKED|❌\s*FAILED)\s*\|"  # Status
-            r"\s*(.*?)\s*\|"  # Description
-            r"\s*(.*?)\s*\|"  # Estimate
-            r"\s*(.*?)\s*\|"  # Dependencies
-            r"\s*(.*?)\s*\|",  # Criteria
-        )
+        document = self.prd_updater.cache.load(self.prd_path)
+        self._prd_done = {task.id for task in document.tasks(TaskStatus.DONE)}
+        return document.tasks(TaskStatus.PENDING)
 
-        for match in table_pattern.finditer(content):
-            task_id = match.group(1).strip()
-            name = match.group(2).strip()
-            status_text = match.group(3).strip()
-            desc = match.group(4).strip()
-            deps_text = match.group(6).strip()
-
-            # 只取 PENDING 任务
-            if "PENDING" not in status_text:
-                continue
-
-            # 解析依赖
-            dependencies = []
-            if deps_text and deps_text != "-":
-                dep_matches = re.findall(r"T-\d+", deps_text)
-                dependencies = dep_matches
-
-            # 估算超时（从预估时间推算）
-            timeout = self._estimate_timeout(match.group(5).strip())
-
-            tasks.append(TaskSpec(
-                id=task_id,
-                name=name,
-                description=desc,
-                dependencies=dependencies,
-                status=TaskStatus.PENDING,
-                timeout_seconds=timeout,
-            ))
-
-        return tasks
-
-    def _estimate_timeout(self, estimate: str) -> int:
-        """从预估时间推算超时秒数。
-
-        规则: 预估时间 × 3 (留余量) + 基础 10 分钟
-        """
-        match = re.search(r"(\d+\.?\d*)\s*h", estimate, re.IGNORECASE)
-        if match:
-            hours = float(match.group(1))
-            return int(hours * 3 * 3600 + 600)
+    # ── 调度 ────────────────────────────────────────────
 
-        match = re.search(r"(\d+)\s*min", estimate, re.IGNORECASE)
-        if match:
-            minutes = int(match.group(1))
-            return minutes * 3 * 60 + 600
+    def _schedule(self, order: list[TaskSpec], report: DispatchReport) -> None:
+        """DAG 调度: 依赖全部完成的任务进入空闲槽位，每完成一个任务重新评估就绪集合。
 
-        return 600  # 默认 10 分钟
+        失败 / 阻塞 / 被跳过的任务，其所有下游任务均被跳过。
+        """
+        pending = {task.id: task for task in order}  # 保持拓扑顺序
+        completed = set(self._prd_done)
+        failed: set[str] = set()
+        running: dict[Future, tuple[TaskSpec, WorkerSlot]] = {}
+
+        slots = self._create_slots()
+        free = list(slots)
+        try:
+            with ThreadPoolExecutor(
+                max_workers=len(slots), thread_name_prefix="dispatch-worker"
+            ) as pool:
+                while pending:
+                    in_flight = {task.id for task, _ in running.values()}
+                    for task in list(pending.values()):
+                        unmet = [
+                            d for d in task.dependencies
+                            if d in failed
+                            or (d not in pending and d not in in_flight and d not in completed)
+                        ]
+                        if unmet:
+                            logger.info("Skipping %s: unmet dependencies %s", task.id, unmet)
+                            report.skipped += 1
+                            failed.add(task.id)
+                            del pending[task.id]
+
+                    checkout_failed = False
+                    for task in list(pending.values()):
+                        if not free:
+                            break
+                        if all(d in completed for d in task.dependencies):
+                            slot = free.pop(0)
+                            del pending[task.id]
+                            try:
+                                future = self._submit(pool, slot, task)
+                            except Exception as exc:
+                                # worktree 切换失败只影响该任务，槽位归还后继续调度
+                                free.append(slot)
+                                failed.add(task.id)
+                                checkout_failed = True
+                                self._handle_result(task, WorkerResult(
+                                    task_id=task.id, success=False, output="",
+                                    error_message=f"Checkout failed: {exc}",
+                                ), slot, report)
+                                continue
+                            running[future] = (task, slot)
+
+                    if not running:
+                        if checkout_failed:
+                            continue  # 重新扫描: 切换失败任务的下游需计为跳过
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task, slot = running.pop(future)
+                        free.append(slot)
+                        if self._handle_result(task, future.result(), slot, report):
+                            completed.add(task.id)
+                        else:
+                            failed.add(task.id)
+
+                # 剩余运行中的任务 (pending 已清空)
+                for future in list(running):
+                    task, slot = running.pop(future)
+                    self._handle_result(task, future.result(), slot, report)
+        finally:
+            self._release_slots()
+
+    def _submit(self, pool: ThreadPoolExecutor, slot: WorkerSlot, task: TaskSpec) -> Future:
+        """将任务提交到槽位 (worktree 先切到基于主仓库最新提交的任务分支，以包含已完成的依赖)。"""
+        if self._pool is not None and slot.worktree is not None:
+            self._pool.checkout(slot.worktree, task)
+        logger.info("▶ Executing %s: %s", task.id, task.name)
+        return pool.submit(self._execute_task, slot, task)
+
+    def _execute_task(self, slot: WorkerSlot, task: TaskSpec) -> WorkerResult:
+        """在工作线程中执行单个任务 (异常转换为失败结果)。"""
+        try:
+            return slot.injector.execute_with_injection(
+                task,
+                answer_func=self.decision_engine.as_answer_callback(),
+            )
+        except Exception as exc:
+            logger.error("Task %s raised: %s", task.id, exc)
+            return WorkerResult(
+                task_id=task.id, success=False, output="", error_message=str(exc),
+            )
+
+    def _handle_result(
+        self,
+        task: TaskSpec,
+        result: WorkerResult,
+        slot: WorkerSlot,
+        report: DispatchReport,
+    ) -> bool:
+        """记录结果并执行 Git 提交 / PRD 回写 (在调度线程中串行执行)。
+
+        Returns:
+            任务是否完成 (可解锁下游任务)
+        """
+        report.results.append(result)
+
+        if result.success:
+            # 成功 → Git 提交 (worktree 中的提交 cherry-pick 回主仓库) → PRD 回写
+            git_result = slot.git.auto_commit(task.id, task.name)
+            if self._pool is not None and slot.worktree is not None:
+                # worktree 中的改动只有提交并合入后才会进入主仓库，任一步失败都算任务失败
+                if not git_result.success:
+                    kept = self._pool.retain(slot.worktree)
+                    error = f"Commit failed: {git_result.message} (worktree kept at {kept})"
+                else:
+                    git_result = self._pool.integrate(slot.worktree, task, git_result.commit_hash)
+                    # 依赖未合入时 integrate 不会尝试 cherry-pick，原样使用其说明
+                    conflicted = slot.worktree.branch in self._pool.conflicted
+                    error = f"Merge conflict: {git_result.message}" if conflicted else git_result.message
+                if not git_result.success:
+                    result.success = False
+                    result.error_message = error
+                    report.failed += 1
+                    self.prd_updater.update_task_status(task.id, TaskStatus.FAILED)
+                    logger.error("  ✗ Task %s FAILED: %s", task.id, result.error_message)
+                    return False
+
+            report.done += 1
+            if git_result.success:
+                logger.info("  Git: %s", git_result.message)
+
+            prd_result = self.prd_updater.update_task_status(
+                task.id, TaskStatus.DONE
+            )
+            if prd_result.success:
+                logger.info("  PRD: %s", prd_result.message)
+            return True
+
+        if result.error_message and "BLOCKED" in result.error_message:
+            report.blocked += 1
+            self.prd_updater.update_task_status(task.id, TaskStatus.BLOCKED)
+            logger.warning("  ⚠ Task %s BLOCKED: %s", task.id, result.error_message)
+        else:
+            report.failed += 1
+            self.prd_updater.update_task_status(task.id, TaskStatus.FAILED)
+            logger.error("  ✗ Task %s FAILED: %s", task.id, result.error_message)
+        return False
+
+    def _create_slots(self) -> list[WorkerSlot]:
+        """创建执行槽位。单槽位时直接复用 self.worker / self.injector / self.git。
+
+        并发需要每个 Worker 独占一个 worktree；worktree 被禁用或创建失败时退回单槽位。
+        """
+        if self.max_workers == 1:
+            return [WorkerSlot(0, self.worker, self.injector, self.git)]
+
+        if self.use_worktrees:
+            pool = WorktreePool(self.git, self.max_workers)
+            try:
+                worktrees = pool.open()
+            except Exception as exc:
+                logger.warning("Worktrees unavailable, running tasks one at a time: %s", exc)
+            else:
+                self._pool = pool
+                slots: list[WorkerSlot] = []
+                for worktree in worktrees:
+                    worker = Worker(replace(self.worker_config, working_dir=str(worktree.path)))
+                    slots.append(WorkerSlot(
+                        worktree.index, worker, RestartInjector(worker, self.parser),
+                        worktree.git, worktree,
+                    ))
+                return slots
+
+        else:
+            logger.warning("Worktrees disabled, running tasks one at a time")
+        # 多个 Worker 共享同一工作区时 `git add -A` 会混入彼此的改动，只能串行
+        return [WorkerSlot(0, self.worker, self.injector, self.git)]
+
+    def _open_decision_cache(self) -> None:
+        """加载持久化的决策缓存 (默认位于主仓库共享的 .git 目录)。"""
+        path = self.decision_cache_path
+        if path is None:
+            try:
+                path = self.git.git_dir() / DECISION_CACHE_FILE
+            except (RuntimeError, OSError) as e:
+                logger.warning("Decision cache not persisted: %s", e)
+                return
+        if self.decision_engine.cache.path != path:
+            self.decision_engine.cache.open(path)
+
+    def _release_slots(self) -> None:
+        """回收 worktree 池 (删除 worktree 与已合入的任务分支)。"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
 
 
 def main() -> None:
@@ -236,6 +426,9 @@ def main() -> None:
     parser.add_argument("--prd", required=True, help="PRD 文件路径")
     parser.add_argument("--repo", default=".", help="Git 仓库路径")
     parser.add_argument("--dry-run", action="store_true", help="仅解析不执行")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="最大并发任务数")
+    parser.add_argument("--no-worktrees", action="store_true", help="不使用独立 worktree (任务随之串行执行)")
+    parser.add_argument("--decision-cache", default=None, help="决策缓存文件 (默认 .git/axiom-decision-cache.json)")
     parser.add_argument("--verbose", "-v", action="store_true", help="详细日志")
 
     args = parser.parse_args()
@@ -249,6 +442,9 @@ def main() -> None:
         prd_path=args.prd,
         repo_path=args.repo,
         dry_run=args.dry_run,
+        max_workers=args.jobs,
+        use_worktrees=not args.no_worktrees,
+        decision_cache=args.decision_cache,
     )
     report = dispatcher.run()
 
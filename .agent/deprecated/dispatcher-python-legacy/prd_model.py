@@ -0,0 +1,269 @@
+"""
+prd_model.py — PRD 任务表模型 (Dispatcher 与 PRDUpdater 共用)
+
+把 PRD Markdown 中的任务表格解析为按任务 ID 索引的 TaskSpec 行:
+
+    | T-101 | **Worker 封装器** | ⏳ PENDING | 描述 | 3h | T-100 | 验收标准 |
+
+    - 只有首个单元格恰好是任务 ID、且含状态标记的表格行才是任务行
+      (T-10 不会误匹配 T-101)；同一 ID 出现多次时以第一行为准
+    - 每行记录行号、在文件中的字符偏移以及状态标记的位置，回写状态只改动该标记
+    - PRDDocument.update(): 按行文本缓存解析结果，内容变化时只重新解析改动过的行
+    - PRDCache: 按 (mtime, size) 缓存文档，同一次调度中 Dispatcher 与 PRDUpdater
+      共享同一份解析结果；PRDUpdater 原子写回后直接刷新缓存，无需重新解析
+
+使用方式:
+    document = PRD_CACHE.load("docs/prd/axiom-v4-dev.md")
+    document.tasks(TaskStatus.PENDING)    # → [TaskSpec, ...]
+    document.status("T-101")              # → "⏳ PENDING"
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from .core import TaskSpec, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# PRD 表格中的状态标记
+STATUS_MARKERS = {
+    TaskStatus.PENDING: "⏳ PENDING",
+    TaskStatus.IN_PROGRESS: "🔄 IN_PROGRESS",
+    TaskStatus.DONE: "✅ DONE",
+    TaskStatus.BLOCKED: "🚫 BLOCKED",
+    TaskStatus.RETRY: "🔁 RETRY",
+    TaskStatus.FAILED: "❌ FAILED",
+    TaskStatus.SKIPPED: "⏭️ SKIPPED",
+}
+
+_ROW = re.compile(r"^\s*\|\s*(T-\d+)\s*\|")
+_TASK_ID = re.compile(r"T-\d+")
+# 图标与状态词之间允许任意空白 (如 "⏳PENDING")
+_STATUSES = list(STATUS_MARKERS)
+_STATUS = re.compile("|".join(
+    "(" + re.escape(marker.split(" ", 1)[0]) + r"\s*" + re.escape(marker.split(" ", 1)[1]) + ")"
+    for marker in STATUS_MARKERS.values()
+))
+
+# mtime 距今小于该秒数时，即使 (mtime, size) 未变也要比对内容
+# (文件系统时间戳精度有限，同一时间片内的两次写入无法区分)
+RACY_WINDOW_SECONDS = 2.0
+
+
+def estimate_timeout(estimate: str) -> int:
+    """从预估时间推算超时秒数。
+
+    规则: 预估时间 × 3 (留余量) + 基础 10 分钟
+    """
+    match = re.search(r"(\d+\.?\d*)\s*h", estimate, re.IGNORECASE)
+    if match:
+        hours = float(match.group(1))
+        return int(hours * 3 * 3600 + 600)
+
+    match = re.search(r"(\d+)\s*min", estimate, re.IGNORECASE)
+    if match:
+        minutes = int(match.group(1))
+        return minutes * 3 * 60 + 600
+
+    return 600  # 默认 10 分钟
+
+
+@dataclass(frozen=True)
+class _ParsedLine:
+    """单行的解析结果 (只依赖行文本，可跨版本复用)。"""
+    task: TaskSpec
+    status_span: tuple[int, int]
+
+
+@dataclass
+class PRDRow:
+    """PRD 表格中的一个任务行。"""
+    task: TaskSpec
+    line_index: int               # 0-based 行号
+    offset: int                   # 行首在文件中的字符偏移
+    status_span: tuple[int, int]  # 状态标记在该行中的 [start, end)
+
+    @property
+    def task_id(self) -> str:
+        return self.task.id
+
+    @property
+    def line_number(self) -> int:
+        return self.line_index + 1
+
+
+class PRDDocument:
+    """PRD Markdown 的内存模型: 原始行 + 按任务 ID 建立的行索引。"""
+
+    def __init__(self, content: str) -> None:
+        self.lines: list[str] = []
+        self.rows: dict[str, PRDRow] = {}
+        self._parsed: dict[str, _ParsedLine | None] = {}
+        self.update(content)
+
+    # ── 公开 API ────────────────────────────────────────
+
+    def update(self, content: str) -> int:
+        """用新内容刷新模型，只重新解析此前未见过的行。
+
+        Returns:
+            重新解析的行数
+        """
+        lines = content.splitlines(keepends=True)
+        parsed: dict[str, _ParsedLine | None] = {}
+        reparsed = 0
+        for line in lines:
+            if line in parsed:
+                continue
+            if line in self._parsed:
+                parsed[line] = self._parsed[line]
+            else:
+                parsed[line] = self._parse_line(line)
+                reparsed += 1
+        self.lines = lines
+        self._parsed = parsed
+        self._index()
+        return reparsed
+
+    def tasks(self, status: TaskStatus | None = None) -> list[TaskSpec]:
+        """按文档顺序返回任务 (副本)，可按状态过滤。"""
+        return [
+            replace(row.task, dependencies=list(row.task.dependencies))
+            for row in self.rows.values()
+            if status is None or row.task.status == status
+        ]
+
+    def status(self, task_id: str) -> str | None:
+        """任务的当前状态标记，任务不存在时返回 None。"""
+        row = self.rows.get(task_id)
+        if row is None:
+            return None
+        start, end = row.status_span
+        return self.lines[row.line_index][start:end]
+
+    def set_status(self, task_id: str, marker: str) -> str | None:
+        """把任务的状态标记替换为 marker，返回旧标记 (无法替换时返回 None)。"""
+        old = self.status(task_id)
+        if old is None:
+            return None
+        row = self.rows[task_id]
+        start, end = row.status_span
+        line = self.lines[row.line_index]
+        new_line = line[:start] + marker + line[end:]
+        if new_line not in self._parsed:
+            self._parsed[new_line] = self._parse_line(new_line)
+        self.lines[row.line_index] = new_line
+        self._index()
+        return old
+
+    def render(self) -> str:
+        return "".join(self.lines)
+
+    # ── 内部方法 ────────────────────────────────────────
+
+    def _index(self) -> None:
+        rows: dict[str, PRDRow] = {}
+        offset = 0
+        for i, line in enumerate(self.lines):
+            parsed = self._parsed[line]
+            if parsed is not None and parsed.task.id not in rows:
+                rows[parsed.task.id] = PRDRow(parsed.task, i, offset, parsed.status_span)
+            offset += len(line)
+        self.rows = rows
+
+    @staticmethod
+    def _parse_line(line: str) -> _ParsedLine | None:
+        match = _ROW.match(line)
+        if match is None:
+            return None
+        cells = [c.strip() for c in line[match.end():].rstrip().rstrip("|").split("|")]
+        cells += [""] * (5 - len(cells))
+        name, _, desc, estimate, deps = cells[:5]
+
+        # 状态位于 ID 之后的某个单元格中，取最靠前的标记；没有状态标记的行不是任务行
+        status_match = _STATUS.search(line, match.end())
+        if status_match is None:
+            return None
+
+        return _ParsedLine(
+            task=TaskSpec(
+                id=match.group(1),
+                name=name.strip("*").strip(),
+                description=desc,
+                dependencies=_TASK_ID.findall(deps),
+                status=_STATUSES[status_match.lastindex - 1],
+                timeout_seconds=estimate_timeout(estimate),
+            ),
+            status_span=status_match.span(),
+        )
+
+
+class PRDCache:
+    """按 (mtime, size) 缓存 PRDDocument；文件变化时增量刷新。
+
+    lock 用于串行化对同一批文档的读-改-写 (PRDUpdater 持有它完成整次批量回写)。
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self._entries: dict[Path, tuple[tuple[int, int], PRDDocument]] = {}
+
+    def load(self, path: str | Path) -> PRDDocument:
+        """读取 (或复用缓存的) PRD 文档。
+
+        Raises:
+            OSError: 文件不存在或无法读取
+        """
+        path = Path(path).resolve()
+        with self.lock:
+            stat = path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = self._entries.get(path)
+            if cached is not None and cached[0] == stamp and not _is_racy(stat.st_mtime):
+                return cached[1]
+
+            content = path.read_text(encoding="utf-8")
+            if cached is None:
+                document = PRDDocument(content)
+            else:
+                document = cached[1]
+                if content != document.render():
+                    reparsed = document.update(content)
+                    logger.debug("PRD %s changed: re-parsed %d lines", path.name, reparsed)
+            self._entries[path] = (stamp, document)
+            return document
+
+    def write(self, path: str | Path, document: PRDDocument) -> None:
+        """原子写入 (同目录临时文件 + os.replace) 并刷新缓存。"""
+        path = Path(path).resolve()
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with self.lock:
+            try:
+                tmp.write_text(document.render(), encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError:
+                self._entries.pop(path, None)
+                raise
+            finally:
+                tmp.unlink(missing_ok=True)
+            stat = path.stat()
+            self._entries[path] = ((stat.st_mtime_ns, stat.st_size), document)
+
+    def invalidate(self, path: str | Path) -> None:
+        with self.lock:
+            self._entries.pop(Path(path).resolve(), None)
+
+
+def _is_racy(mtime: float) -> bool:
+    return time.time() - mtime < RACY_WINDOW_SECONDS
+
+
+# 进程内共享的默认缓存
+PRD_CACHE = PRDCache()
@@ -4,20 +4,22 @@ prd_updater.py — PRD 状态回写 (T-106)
 任务完成后自动将 PRD 中对应行从 `⏳ PENDING` 更新为 `✅ DONE`。
 
 支持特性:
-    - 按任务 ID 匹配并更新状态
+    - 按任务 ID 精确匹配并更新状态 (表格首列，T-10 不会误匹配 T-101)
     - 支持 PRD Markdown 表格格式
-    - 批量更新
+    - 批量更新: 一次读取、内存中修改、一次原子写入 (临时文件 + os.replace)
+    - 进程内的并发回写串行执行，不会互相覆盖
+    - 与 Dispatcher 共享 prd_model.PRD_CACHE 中的解析结果
     - 变更日志记录
 """
 
 from __future__ import annotations
 
 import logging
-import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from pathlib import Path
 
 from .core import TaskStatus
+from .prd_model import PRD_CACHE, STATUS_MARKERS, PRDCache, PRDDocument
 
 logger = logging.getLogger(__name__)
 
@@ -42,22 +44,16 @@ class PRDUpdater:
     """
 
     # PRD 表格中的状态标记
-    STATUS_MARKERS = {
-        TaskStatus.PENDING: "⏳ PENDING",
-        TaskStatus.IN_PROGRESS: "🔄 IN_PROGRESS",
-        TaskStatus.DONE: "✅ DONE",
-        TaskStatus.BLOCKED: "🚫 BLOCKED",
-        TaskStatus.RETRY: "🔁 RETRY",
-        TaskStatus.FAILED: "❌ FAILED",
-        TaskStatus.SKIPPED: "⏭️ SKIPPED",
-    }
-
-    def __init__(self, prd_path: str | Path) -> None:
+    STATUS_MARKERS = STATUS_MARKERS
+
+    def __init__(self, prd_path: str | Path, cache: PRDCache | None = None) -> None:
         """
         Args:
             prd_path: PRD 文件路径
+            cache: PRD 文档缓存 (默认使用进程内共享的 PRD_CACHE)
         """
         self.prd_path = Path(prd_path)
+        self.cache = cache if cache is not None else PRD_CACHE
         self._update_log: list[UpdateResult] = []
 
     # ── 公开 API ────────────────────────────────────────
@@ -76,70 +72,44 @@ class PRDUpdater:
         Returns:
             UpdateResult
         """
-        if not self.prd_path.exists():
-            return UpdateResult(
-                success=False,
-                task_id=task_id,
-                old_status="",
-                new_status=self.STATUS_MARKERS.get(new_status, str(new_status)),
-                message=f"PRD file not found: {self.prd_path}",
-            )
-
-        try:
-            content = self.prd_path.read_text(encoding="utf-8")
-            new_content, old_status, line_num = self._replace_status(
-                content, task_id, new_status
-            )
-
-            if new_content == content:
-                return UpdateResult(
-                    success=False,
-                    task_id=task_id,
-                    old_status=old_status or "unknown",
-                    new_status=self.STATUS_MARKERS.get(new_status, str(new_status)),
-                    message=f"Task {task_id} not found in PRD or status unchanged",
-                )
-
-            self.prd_path.write_text(new_content, encoding="utf-8")
-
-            result = UpdateResult(
-                success=True,
-                task_id=task_id,
-                old_status=old_status or "unknown",
-                new_status=self.STATUS_MARKERS.get(new_status, str(new_status)),
-                line_number=line_num,
-                message=f"Updated {task_id}: {old_status} → {self.STATUS_MARKERS.get(new_status)}",
-            )
-            self._update_log.append(result)
-            logger.info(result.message)
-            return result
-
-        except Exception as exc:
-            logger.error("Failed to update PRD: %s", exc)
-            return UpdateResult(
-                success=False,
-                task_id=task_id,
-                old_status="",
-                new_status=self.STATUS_MARKERS.get(new_status, str(new_status)),
-                message=str(exc),
-            )
+        return self.batch_update([(task_id, new_status)])[0]
 
     def batch_update(
         self,
         updates: list[tuple[str, TaskStatus]],
     ) -> list[UpdateResult]:
-        """批量更新多个任务状态。
+        """批量更新多个任务状态: 读取一次 PRD，全部修改完成后原子写回一次。
 
         Args:
             updates: [(task_id, new_status), ...]
 
         Returns:
-            UpdateResult 列表
+            UpdateResult 列表 (与 updates 一一对应)
         """
-        results: list[UpdateResult] = []
-        for task_id, status in updates:
-            result = self.update_task_status(task_id, status)
-            results.append(result)
+        if not updates:
+            return []
+        if not self.prd_path.exists():
+            return [
+                self._failure(task_id, status, f"PRD file not found: {self.prd_path}")
+                for task_id, status in updates
+            ]
+
+        with self.cache.lock:
+            try:
+                document = self.cache.load(self.prd_path)
+                results = [self._apply(document, task_id, status) for task_id, status in updates]
+                if any(r.success for r in results):
+                    self.cache.write(self.prd_path, document)
+            except Exception as exc:
+                # 内存中的文档可能已被部分修改，丢弃缓存以便下次从磁盘重新读取
+                self.cache.invalidate(self.prd_path)
+                logger.error("Failed to update PRD: %s", exc)
+                return [self._failure(task_id, status, str(exc)) for task_id, status in updates]
+
+            for result in results:
+                if result.success:
+                    self._update_log.append(result)
+                    logger.info(result.message)
         return results
 
     def get_task_status(self, task_id: str) -> str | None:
@@ -153,14 +123,8 @@ class PRDUpdater:
         """
         if not self.prd_path.exists():
             return None
-
-        content = self.prd_path.read_text(encoding="utf-8")
-        for line in content.splitlines():
-            if task_id in line:
-                for status in self.STATUS_MARKERS.values():
-                    if status in line:
-                        return status
-        return None
+        with self.cache.lock:
+            return self.cache.load(self.prd_path).status(task_id)
 
     @property
     def update_log(self) -> list[UpdateResult]:
@@ -169,35 +133,37 @@ class PRDUpdater:
 
     # ── 内部方法 ────────────────────────────────────────
 
-    def _replace_status(
+    def _apply(self, document: PRDDocument, task_id: str, new_status: TaskStatus) -> UpdateResult:
+        """在内存模型中修改一个任务的状态。"""
+        new_marker = self.STATUS_MARKERS.get(new_status, str(new_status))
+        old_marker = document.status(task_id)
+        if old_marker is None or old_marker == new_marker:
+            return self._failure(
+                task_id, new_status,
+                f"Task {task_id} not found in PRD or status unchanged",
+                old_status=old_marker or "unknown",
+            )
+        document.set_status(task_id, new_marker)
+        return UpdateResult(
+            success=True,
+            task_id=task_id,
+            old_status=old_marker,
+            new_status=new_marker,
+            line_number=document.rows[task_id].line_number,
+            message=f"Updated {task_id}: {old_marker} → {new_marker}",
+        )
+
+    def _failure(
         self,
-        content: str,
         task_id: str,
         new_status: TaskStatus,
-    ) -> tuple[str, str | None, int | None]:
-        """在 PRD 内容中替换指定任务的状态。
-
-        Returns:
-            (new_content, old_status_text, line_number)
-        """
-        new_marker = self.STATUS_MARKERS.get(new_status, str(new_status))
-        lines = content.splitlines(keepends=True)
-        old_status: str | None = None
-        line_num: int | None = None
-
-        for i, line in enumerate(lines):
-            if task_id not in line:
-                continue
-
-            # 找到包含 task_id 的行，替换其中的状态标记
-            for status, marker in self.STATUS_MARKERS.items():
-                if marker in line:
-                    old_status = marker
-                    lines[i] = line.replace(marker, new_marker)
-                    line_num = i + 1
-                    break
-
-            if old_status:
-                break
-
-        return "".join(lines), old_status, line_num
+        message: str,
+        old_status: str = "",
+    ) -> UpdateResult:
+        return UpdateResult(
+            success=False,
+            task_id=task_id,
+            old_status=old_status,
+            new_status=self.STATUS_MARKERS.get(new_status, str(new_status)),
+            message=message,
+        )
@@ -0,0 +1,254 @@
+"""
+prompt_compressor.py — 重启 Prompt 的结构化压缩
+
+RestartInjector 每次重启都会把所有 Q&A 追加到原始 Prompt 之后。超出 token 预算时，
+按结构而不是按字符位置压缩:
+
+    1. 原始任务与每个 QAPair 都是不可拆分的单元
+    2. 答案相同的 Q&A 合并为一条 (问题列表 + 一次答案)；同一问题只保留最新答案
+    3. 最近的 Q&A 原样保留，更早的 Q&A 摘要为一行 ("问题 → 答案首句")
+    4. 仍超预算时依次: 丢弃最早的摘要行 → 收紧原始任务 (保留首尾段落)
+       最新一条 Q&A 始终完整保留
+
+预算来自 agent_config.md 的 dispatcher.prompt_max_tokens，并受当前 Provider 的
+context_window 特性限制；读取不到配置时使用 DEFAULT_PROMPT_MAX_TOKENS。
+token 估算与配置读取复用 .agent/memory 中的 context_budget (不在 .agent 下时回退为本地启发式)。
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .restart_injector import QAPair
+
+# 本包位于 .agent/deprecated/ 下，共享模块在 .agent/memory；
+# 包被移出 .agent (如 README 中的恢复路径) 时使用本地启发式与默认预算
+_AGENT_DIR = next((p for p in Path(__file__).resolve().parents if p.name == ".agent"), None)
+_MEMORY_DIR = _AGENT_DIR / "memory" if _AGENT_DIR is not None else None
+
+if _MEMORY_DIR is not None and (_MEMORY_DIR / "context_budget.py").is_file():
+    if str(_MEMORY_DIR) not in sys.path:
+        sys.path.insert(0, str(_MEMORY_DIR))
+    from context_budget import heuristic_tokens as estimate_tokens, import_get_config
+else:
+    def estimate_tokens(text: str) -> int:
+        """字节启发式 (与 .agent/memory/context_budget.heuristic_tokens 一致):
+        ASCII 4 字符 / token，非 ASCII 1 字符 / token。"""
+        if not text:
+            return 0
+        n_chars = len(text)
+        extra_bytes = len(text.encode("utf-8", errors="replace")) - n_chars
+        non_ascii = min(n_chars, (extra_bytes + 1) // 2)
+        return -(-(n_chars - non_ascii) // 4) + non_ascii
+
+    def import_get_config():
+        return None  # 没有 .agent/config，resolve_prompt_budget 使用 DEFAULT_PROMPT_MAX_TOKENS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_MAX_TOKENS = 4000
+# 原样保留的最近 Q&A 条数
+RECENT_QA = 2
+# 摘要行中问题 / 答案的最大字符数
+SUMMARY_QUESTION_CHARS = 60
+SUMMARY_ANSWER_CHARS = 80
+
+INJECTION_HEADER = "\n\n---\n## 补充信息（由 PM 自动注入）\n"
+COMPRESSION_MARKER = "[... 上下文已压缩，省略约 {tokens} tokens ...]"
+
+
+def resolve_prompt_budget(config_path: str | Path | None = None) -> int:
+    """从 AgentConfig 读取 Prompt token 预算。"""
+    get_config = import_get_config()
+    if get_config is None:
+        return DEFAULT_PROMPT_MAX_TOKENS
+    try:
+        config = get_config(config_path)
+        budget = int(config.shared.dispatcher.get("prompt_max_tokens", DEFAULT_PROMPT_MAX_TOKENS))
+        window = config.get_feature("context_window")
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        logger.debug("Falling back to default prompt budget: %s", e)
+        return DEFAULT_PROMPT_MAX_TOKENS
+    if isinstance(window, int) and window > 0:
+        budget = min(budget, window)
+    return budget
+
+
+@dataclass
+class QAUnit:
+    """合并去重后的一条问答 (questions 可能包含多个答案相同的问题)。"""
+    questions: list[str]
+    answer: str
+    restart_index: int
+
+    def render(self, index: int) -> str:
+        if len(self.questions) == 1:
+            about = f"\"{self.questions[0][:200]}\""
+        else:
+            about = " / ".join(f"\"{q[:120]}\"" for q in self.questions)
+        return f"[补充信息 {index}] 关于 {about}，答案是:\n{self.answer}\n"
+
+    def summarize(self, index: int) -> str:
+        question = _clip(self.questions[-1], SUMMARY_QUESTION_CHARS)
+        answer = _clip(_first_sentence(self.answer), SUMMARY_ANSWER_CHARS)
+        extra = f" (+{len(self.questions) - 1} 个同类问题)" if len(self.questions) > 1 else ""
+        return f"[补充信息 {index}] {question}{extra} → {answer}"
+
+
+class PromptCompressor:
+    """按 token 预算压缩 "原始任务 + Q&A" 结构的 Prompt。"""
+
+    def __init__(
+        self,
+        budget_tokens: int | None = None,
+        estimate: Callable[[str], int] = estimate_tokens,
+        recent: int = RECENT_QA,
+    ) -> None:
+        """
+        Args:
+            budget_tokens: token 预算；None 表示从 AgentConfig 读取
+            estimate: token 估算函数
+            recent: 原样保留的最近 Q&A 条数
+        """
+        self.budget_tokens = budget_tokens or resolve_prompt_budget()
+        self.estimate = estimate
+        self.recent = max(1, recent)
+
+    # ── 公开 API ────────────────────────────────────────
+
+    def render(self, original_prompt: str, qa_pairs: list[QAPair]) -> str:
+        """不压缩地渲染 Prompt (每个 QAPair 一条)。"""
+        if not qa_pairs:
+            return original_prompt
+        units = [QAUnit([qa.question], qa.answer, qa.restart_index) for qa in qa_pairs]
+        return self._assemble(original_prompt, [u.render(i) for i, u in enumerate(units, 1)])
+
+    def compress(self, original_prompt: str, qa_pairs: list[QAPair] | None = None) -> str:
+        """压缩到 token 预算以内 (已在预算内时原样返回)。"""
+        qa_pairs = qa_pairs or []
+        full = self.render(original_prompt, qa_pairs)
+        before = self.estimate(full)
+        if before <= self.budget_tokens:
+            return full
+
+        units = self.merge(qa_pairs)
+        cut = max(0, len(units) - self.recent)
+        recent_blocks = [u.render(i) for i, u in enumerate(units[cut:], cut + 1)]
+        summaries = [u.summarize(i) for i, u in enumerate(units[:cut], 1)]
+
+        # 原始任务至多预留一半预算；Q&A 放不下时先把较早的 "最近" Q&A 也摘要化
+        # (最新一条始终完整保留)，再丢弃最早的摘要行，直到放得下 (或已无摘要可丢)
+        dropped = 0
+        task_reserve = min(self.estimate(original_prompt), self.budget_tokens // 2)
+        qa_budget = self.budget_tokens - task_reserve - self.estimate(INJECTION_HEADER)
+        while len(recent_blocks) > 1 and self._qa_tokens(summaries, recent_blocks, dropped) > qa_budget:
+            recent_blocks.pop(0)
+            summaries.append(units[cut].summarize(cut + 1))
+            cut += 1
+        while summaries and self._qa_tokens(summaries, recent_blocks, dropped) > qa_budget:
+            summaries.pop(0)
+            dropped += 1
+        blocks = self._qa_blocks(summaries, recent_blocks, dropped)
+
+        # 原始任务使用剩余预算 (仅当最新一条 Q&A 本身超出预算时才保底 1/4，此时允许超出)
+        overhead = self.estimate(self._assemble("", blocks)) if blocks else 0
+        task = self.truncate(original_prompt, max(self.budget_tokens - overhead, self.budget_tokens // 4))
+        compressed = self._assemble(task, blocks) if blocks else task
+
+        logger.info(
+            "Prompt compressed: ~%d → ~%d tokens (%d Q&A → %d units, %d summarized, %d dropped)",
+            before, self.estimate(compressed), len(qa_pairs), len(units), len(summaries), dropped,
+        )
+        return compressed
+
+    def merge(self, qa_pairs: list[QAPair]) -> list[QAUnit]:
+        """去重: 同一问题只保留最新答案；答案相同的问题合并为一条。"""
+        latest: dict[str, QAPair] = {}
+        for qa in qa_pairs:
+            key = _normalize(qa.question)
+            latest.pop(key, None)  # 重新插入以更新顺序
+            latest[key] = qa
+
+        units: dict[str, QAUnit] = {}
+        for qa in latest.values():
+            key = _normalize(qa.answer)
+            unit = units.pop(key, None)
+            if unit is None:
+                unit = QAUnit([], qa.answer, qa.restart_index)
+            unit.questions.append(qa.question)
+            unit.restart_index = qa.restart_index
+            units[key] = unit  # 以最近一次出现的位置排序
+        return list(units.values())
+
+    def truncate(self, text: str, budget_tokens: int) -> str:
+        """超出预算时保留首部 (约 1/3) 与尾部 (约 2/3)，尽量在行边界截断。"""
+        total = self.estimate(text)
+        if total <= budget_tokens:
+            return text
+        marker_tokens = self.estimate(COMPRESSION_MARKER) + 8
+        usable = max(0, budget_tokens - marker_tokens)
+        head = self._prefix(text, usable // 3)
+        tail = self._suffix(text[len(head):], usable - self.estimate(head))
+        omitted = total - self.estimate(head) - self.estimate(tail)
+        return f"{head}\n\n{COMPRESSION_MARKER.format(tokens=omitted)}\n\n{tail}"
+
+    # ── 内部方法 ────────────────────────────────────────
+
+    def _assemble(self, task: str, blocks: list[str]) -> str:
+        return task + "\n".join([INJECTION_HEADER, *blocks])
+
+    def _qa_blocks(self, summaries: list[str], recent: list[str], dropped: int) -> list[str]:
+        blocks: list[str] = []
+        if dropped:
+            blocks.append(f"[... 省略 {dropped} 条更早的问答 ...]")
+        if summaries:
+            blocks.append("更早的问答摘要:\n" + "\n".join(summaries) + "\n")
+        return blocks + recent
+
+    def _qa_tokens(self, summaries: list[str], recent: list[str], dropped: int) -> int:
+        return self.estimate("\n".join(self._qa_blocks(summaries, recent, dropped)))
+
+    def _prefix(self, text: str, budget_tokens: int) -> str:
+        """不超过预算的最长前缀，优先在换行处截断。"""
+        n = self._fit(len(text), budget_tokens, lambda k: text[:k])
+        newline = text.rfind("\n", 0, n)
+        return text[:newline] if newline > n // 2 else text[:n]
+
+    def _suffix(self, text: str, budget_tokens: int) -> str:
+        """不超过预算的最长后缀，优先在换行处截断。"""
+        n = self._fit(len(text), budget_tokens, lambda k: text[len(text) - k:])
+        start = len(text) - n
+        newline = text.find("\n", start)
+        return text[newline + 1:] if 0 <= newline < start + n // 2 else text[start:]
+
+    def _fit(self, length: int, budget_tokens: int, piece: Callable[[int], str]) -> int:
+        # estimate(piece(k)) 随 k 单调不减，二分查找满足预算的最大 k
+        lo, hi = 0, length
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.estimate(piece(mid)) <= budget_tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _first_sentence(text: str) -> str:
+    text = text.strip()
+    match = re.search(r"[。！？!?.\n]", text)
+    return text[:match.end()].strip() if match else text
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
@@ -5,33 +5,33 @@ restart_injector.py — 重启注入机制 (T-103)
 同一任务最多 3 次重启。
 
 核心流程:
-    1. Worker 通过 JSONL 提出问题
+    1. Worker 通过 JSONL 提出问题 (事件流中实时检测，命中阻塞性提问立即终止 Worker)
     2. PM (决策引擎) 生成回答
     3. RestartInjector 构建新 Prompt (原始 + 所有 QA 对)
     4. 终止旧 Worker → 启动新 Worker
     5. 超过 MAX_RESTARTS 次则标记 BLOCKED
 
 支持特性:
-    - 增量 Prompt 压缩（避免 Token 爆炸）
+    - 结构化 Prompt 压缩（按 token 预算，见 prompt_compressor.py）
     - QA 历史追踪
     - 风险操作检测（拒绝注入）
+    - 流式提问检测（不必等待整轮运行结束）
 """
 
 from __future__ import annotations
 
 import logging
+import time
 from dataclasses import dataclass, field
+from typing import Callable
 
 from .core import JSONLEvent, TaskSpec, TaskStatus, WorkerResult
 from .jsonl_parser import JSONLParser
+from .prompt_compressor import PromptCompressor
 from .worker import Worker, WorkerConfig
 
 logger = logging.getLogger(__name__)
 
-# 最大 Prompt 字符数（约 4000 token ≈ 16000 字符，中文 ≈ 1 token/字）
-MAX_PROMPT_CHARS = 16000
-# 压缩后保留的字符数
-COMPRESSED_PROMPT_CHARS = 8000
 # 风险操作关键词
 RISK_KEYWORDS = [
     "删除数据库", "drop database", "rm -rf", "format",
@@ -55,12 +55,48 @@ class InjectionContext:
     original_prompt: str
     qa_pairs: list[QAPair] = field(default_factory=list)
     restart_count: int = 0
+    early_stops: int = 0  # 因流式检测到提问而提前终止的次数
 
     @property
     def total_restarts(self) -> int:
         return self.restart_count
 
 
+class QuestionInterrupt:
+    """Worker 事件回调: 检测到阻塞性提问时立即终止 Worker。
+
+    在 Worker 的读取线程 (或事件循环) 中被调用；只记录第一个问题。
+    """
+
+    def __init__(
+        self,
+        parser: JSONLParser,
+        worker: Worker,
+        forward: Callable[[JSONLEvent], None] | None = None,
+    ) -> None:
+        self.parser = parser
+        self.worker = worker
+        self.forward = forward
+        self.question: str | None = None
+        self._started = time.monotonic()
+        self.detected_after: float | None = None  # 从启动到检测到提问的秒数
+
+    def __call__(self, event: JSONLEvent) -> None:
+        if self.forward:
+            self.forward(event)
+        if self.question is not None:
+            return
+        question = self.parser.detect_blocking_question(event)
+        if question:
+            self.question = question
+            self.detected_after = time.monotonic() - self._started
+            logger.info(
+                "Blocking question after %.1fs, stopping worker: %s",
+                self.detected_after, question[:80],
+            )
+            self.worker.terminate()
+
+
 class RestartInjector:
     """重启注入器 — 管理 Worker 的"重启 → 注入 → 继续"循环。
 
@@ -75,9 +111,20 @@ class RestartInjector:
         self,
         worker: Worker,
         parser: JSONLParser | None = None,
+        interrupt_on_question: bool = True,
+        prompt_budget_tokens: int | None = None,
     ) -> None:
+        """
+        Args:
+            worker: 执行任务的 Worker
+            parser: JSONL 解析器 (用于流式提问检测)
+            interrupt_on_question: 事件流中出现阻塞性提问时是否立即终止 Worker
+            prompt_budget_tokens: 重启 Prompt 的 token 预算 (None 表示读取 AgentConfig)
+        """
         self.worker = worker
         self.parser = parser or JSONLParser()
+        self.interrupt_on_question = interrupt_on_question
+        self.compressor = PromptCompressor(prompt_budget_tokens)
         self._contexts: dict[str, InjectionContext] = {}
 
     # ── 公开 API ────────────────────────────────────────
@@ -87,6 +134,7 @@ class RestartInjector:
         task: TaskSpec,
         answer_func: AnswerCallback | None = None,
         initial_prompt: str | None = None,
+        on_event: Callable[[JSONLEvent], None] | None = None,
     ) -> WorkerResult:
         """带重启注入的任务执行。
 
@@ -96,6 +144,7 @@ class RestartInjector:
                          签名: (task_id, question) -> answer | None
                          返回 None 表示无法回答，应标记 BLOCKED。
             initial_prompt: 初始 Prompt，若 None 则自动生成。
+            on_event: 额外的事件回调 (透传给 Worker)。
 
         Returns:
             WorkerResult — 最终结果（可能经过多次重启）
@@ -112,9 +161,20 @@ class RestartInjector:
             logger.info(
                 "Executing task %s (restart #%d)", task.id, ctx.restart_count
             )
-            result = self.worker.execute(task, prompt=effective_prompt)
+            watcher = (
+                QuestionInterrupt(self.parser, self.worker, forward=on_event)
+                if self.interrupt_on_question else on_event
+            )
+            result = self.worker.execute(task, prompt=effective_prompt, on_event=watcher)
             result.restart_count = ctx.restart_count
 
+            # 流式检测到的提问优先 (Worker 已被终止，事件流不完整)
+            if isinstance(watcher, QuestionInterrupt) and watcher.question:
+                result.questions = [watcher.question]
+                result.success = False
+                result.interrupted = True
+                ctx.early_stops += 1
+
             # 没有问题或任务已完成 → 直接返回
             if not result.has_questions:
                 return result
@@ -205,55 +265,29 @@ class RestartInjector:
         Returns:
             注入答案后的新 Prompt
         """
-        if not qa_pairs:
-            return original_prompt
-
-        injections = ["\n\n---\n## 补充信息（由 PM 自动注入）\n"]
-        for i, qa in enumerate(qa_pairs, 1):
-            injections.append(
-                f"[补充信息 {i}] 关于 \"{qa.question[:200]}\"，答案是:\n"
-                f"{qa.answer}\n"
-            )
+        return self.compress_context(original_prompt, qa_pairs)
 
-        combined = original_prompt + "\n".join(injections)
-
-        # 压缩检查
-        if len(combined) > MAX_PROMPT_CHARS:
-            combined = self.compress_context(combined)
-
-        return combined
-
-    def compress_context(self, prompt: str) -> str:
-        """增量压缩: 如果 Prompt 超过阈值，保留头部指令 + 尾部 QA。
+    def compress_context(
+        self,
+        prompt: str,
+        qa_pairs: list[QAPair] | None = None,
+    ) -> str:
+        """结构化压缩: 超出 token 预算时按单元压缩，而不是按字符位置截断。
 
-        策略:
-            - 保留前 2000 字符（任务描述）
-            - 保留后 COMPRESSED_PROMPT_CHARS 字符（最新 QA）
-            - 中间用 "[... 上下文已压缩 ...]" 标记
+        策略 (见 PromptCompressor):
+            - 原始任务与每个 QA 对作为整体，不会被截成两半
+            - 答案相同的 QA 合并，同一问题只保留最新答案
+            - 最近的 QA 原样保留，更早的 QA 摘要为一行，必要时丢弃最早的摘要
+            - 原始任务过长时保留首尾段落，中间用 "[... 上下文已压缩 ...]" 标记
 
         Args:
-            prompt: 待压缩的 Prompt
+            prompt: 原始 Prompt (不含注入的 QA)
+            qa_pairs: 历史 QA 对列表
 
         Returns:
-            压缩后的 Prompt
+            预算内的 Prompt
         """
-        if len(prompt) <= MAX_PROMPT_CHARS:
-            return prompt
-
-        head_size = 2000
-        tail_size = COMPRESSED_PROMPT_CHARS
-        head = prompt[:head_size]
-        tail = prompt[-tail_size:]
-
-        compressed = (
-            f"{head}\n\n"
-            f"[... 上下文已压缩，保留最新 {tail_size} 字符 ...]\n\n"
-            f"{tail}"
-        )
-        logger.info(
-            "Prompt compressed: %d → %d chars", len(prompt), len(compressed)
-        )
-        return compressed
+        return self.compressor.compress(prompt, qa_pairs)
 
     def get_context(self, task_id: str) -> InjectionContext | None:
         """获取任务的注入上下文。"""
@@ -0,0 +1,103 @@
+"""
+bench_classifier.py — 规则分类微基准
+
+对比逐条 search() 与 RuleClassifier 单次扫描在录制的 agent 消息上的耗时。
+默认语料为 tests/fixtures/agent_messages.jsonl，可传入任意 Codex `--json` 录制文件。
+
+用法:
+    python -m dispatcher.tests.bench_classifier
+    python -m dispatcher.tests.bench_classifier run.jsonl --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+_dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
+if _dispatcher_parent not in sys.path:
+    sys.path.insert(0, _dispatcher_parent)
+
+from dispatcher.classifier import RuleClassifier
+from dispatcher.decision_engine import AUTO_RULES, BLOCKED_RULES
+from dispatcher.jsonl_parser import (
+    BLOCKING_QUESTION_PATTERNS,
+    QUESTION_EXCLUDE_PATTERNS,
+    QUESTION_PATTERNS,
+)
+
+DEFAULT_CORPUS = Path(__file__).parent / "fixtures" / "agent_messages.jsonl"
+
+
+def load_messages(path: Path) -> list[str]:
+    messages = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(event, dict) and event.get("message"):
+            messages.append(event["message"])
+    return messages
+
+
+def bench(name: str, rules, messages: list[str], repeat: int) -> None:
+    classifier = RuleClassifier(rules)
+    patterns = [p for _, p in rules]
+
+    def sequential_all() -> None:
+        for m in messages:
+            [p for p in patterns if p.search(m)]
+
+    def sequential_first() -> None:
+        for m in messages:
+            next((p for p in patterns if p.search(m)), None)
+
+    def classify_all() -> None:
+        for m in messages:
+            classifier.matched(m)
+
+    def classify_first() -> None:
+        for m in messages:
+            classifier.first(m)
+
+    per_message = len(messages) * repeat
+    print(f"{name} ({len(rules)} rules, {len(messages)} messages × {repeat})")
+    for label, func in (
+        ("sequential all", sequential_all),
+        ("single-pass all", classify_all),
+        ("sequential first", sequential_first),
+        ("single-pass first", classify_first),
+    ):
+        seconds = min(timeit.repeat(func, number=repeat, repeat=3))
+        print(f"  {label:<18} {seconds / per_message * 1e6:8.2f} µs/message")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="规则分类微基准")
+    parser.add_argument("corpus", nargs="?", default=str(DEFAULT_CORPUS), help="JSONL 录制文件")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    messages = load_messages(Path(args.corpus))
+    bench(
+        "DecisionEngine",
+        [(c, p) for p, c, _ in BLOCKED_RULES + AUTO_RULES],
+        messages,
+        args.repeat,
+    )
+    bench(
+        "JSONLParser",
+        [("exclude", p) for p in QUESTION_EXCLUDE_PATTERNS]
+        + [("question", p) for p in QUESTION_PATTERNS]
+        + [("blocking", p) for p in BLOCKING_QUESTION_PATTERNS],
+        messages,
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
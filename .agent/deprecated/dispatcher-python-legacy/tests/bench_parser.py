@@ -0,0 +1,97 @@
+"""
+bench_parser.py — JSONL 解析吞吐基准
+
+在合成的大事件流 (含大体积 tool_result) 上对比:
+    - eager/json:    标准库 json.loads 完整解码 (原实现)
+    - eager/orjson:  orjson 完整解码 (未安装时跳过)
+    - lazy/<后端>:   行首读取 type / timestamp，payload 延迟解码
+并分别测量 "只读 type" 与 "分析 (访问 agent_message / tool_call 的 content)" 两种负载。
+
+用法:
+    python -m dispatcher.tests.bench_parser
+    python -m dispatcher.tests.bench_parser --events 200000 --result-size 4096
+    python -m dispatcher.tests.bench_parser run.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+_dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
+if _dispatcher_parent not in sys.path:
+    sys.path.insert(0, _dispatcher_parent)
+
+from dispatcher import json_codec
+from dispatcher.jsonl_parser import JSONLParser
+
+
+def synthetic_stream(events: int, result_size: int, seed: int = 7) -> list[str]:
+    """按 agent_message / tool_call / tool_result 循环生成事件行。"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(events):
+        kind = ("agent_message", "tool_call", "tool_result")[i % 3]
+        event: dict = {"type": kind, "timestamp": 1760000000.0 + i}
+        if kind == "agent_message":
+            event["message"] = f"第 {i} 步: 正在修改 src/module_{i % 17}.py"
+        elif kind == "tool_call":
+            event["tool"] = rng.choice(["write_file", "run_command", "read_file"])
+            event["args"] = {"path": f"src/module_{i % 17}.py"}
+        else:
+            event["result"] = "".join(rng.choices("abcdefgh \n", k=result_size))
+        lines.append(json.dumps(event, ensure_ascii=False))
+    lines.append(json.dumps({"type": "session_end", "timestamp": 1760000000.0 + events}))
+    return lines
+
+
+def run(label: str, parser: JSONLParser, lines: list[str], analyze: bool, megabytes: float) -> None:
+    start = time.perf_counter()
+    if analyze:
+        parser.analyze_events(parser.iter_events(lines), max_retained=100)
+    else:
+        for event in parser.iter_events(lines):
+            event.type
+    seconds = time.perf_counter() - start
+    workload = "analyze" if analyze else "type only"
+    print(
+        f"  {label:<14} {workload:<10} {len(lines) / seconds:>12,.0f} events/s"
+        f" {megabytes / seconds:>8.1f} MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSONL 解析吞吐基准")
+    parser.add_argument("corpus", nargs="?", help="JSONL 录制文件 (默认生成合成事件流)")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--result-size", type=int, default=2048, help="tool_result 的字符数")
+    args = parser.parse_args()
+
+    if args.corpus:
+        lines = Path(args.corpus).read_text(encoding="utf-8").splitlines()
+    else:
+        lines = synthetic_stream(args.events, args.result_size)
+    megabytes = sum(len(line.encode("utf-8")) + 1 for line in lines) / 1e6
+    print(f"{len(lines):,} lines, {megabytes:.1f} MB (orjson: {json_codec.orjson is not None})")
+
+    backends = [("json", json.loads)]
+    if json_codec.orjson is not None:
+        backends.append(("orjson", json_codec.orjson.loads))
+
+    original = json_codec.loads
+    try:
+        for analyze in (False, True):
+            for name, loads in backends:
+                json_codec.loads = loads
+                run(f"eager/{name}", JSONLParser(lazy=False), lines, analyze, megabytes)
+                run(f"lazy/{name}", JSONLParser(lazy=True), lines, analyze, megabytes)
+    finally:
+        json_codec.loads = original
+
+
+if __name__ == "__main__":
+    main()
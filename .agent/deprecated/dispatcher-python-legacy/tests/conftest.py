@@ -0,0 +1,31 @@
+"""
+conftest.py — 测试共用的 Git 仓库夹具
+"""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+
+def run_git(repo: Path, *args: str) -> str:
+    """在 repo 中执行 git 命令 (失败即抛出) 并返回 stdout。"""
+    return subprocess.run(
+        ["git", *args], cwd=repo, capture_output=True, text=True, check=True,
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    """只有一个初始提交 (README.md) 的仓库，位于 tmp_path/repo (tmp_path 可放 PRD 等非仓库文件)。"""
+    path = tmp_path / "repo"
+    path.mkdir()
+    run_git(path, "init", "-q")
+    run_git(path, "config", "user.email", "dispatch@example.com")
+    run_git(path, "config", "user.name", "dispatch")
+    (path / "README.md").write_text("base\n", encoding="utf-8")
+    run_git(path, "add", "-A")
+    run_git(path, "commit", "-qm", "base")
+    return path
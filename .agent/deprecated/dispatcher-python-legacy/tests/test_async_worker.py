@@ -0,0 +1,152 @@
+"""
+test_async_worker.py — asyncio Worker 测试
+
+测试覆盖:
+  - 单事件循环内多 Worker 并发
+  - 超时取消并终止子进程
+  - stderr 捕获 / 超长单行
+  - 同步 execute() 入口
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+_dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
+if _dispatcher_parent not in sys.path:
+    sys.path.insert(0, _dispatcher_parent)
+
+from dispatcher.async_worker import AsyncWorker, execute_all
+from dispatcher.core import JSONLEvent, TaskSpec
+from dispatcher.tests.test_worker import (
+    MOCK_WORKER_ERROR,
+    MOCK_WORKER_SUCCESS,
+    MOCK_WORKER_TIMEOUT,
+    MOCK_WORKER_WITH_QUESTION,
+)
+from dispatcher.worker import WorkerConfig
+
+
+MOCK_WORKER_SLOW = textwrap.dedent("""\
+    import json, time
+    time.sleep(0.5)
+    print(json.dumps({"type": "agent_message", "message": "完成"}), flush=True)
+    print(json.dumps({"type": "session_end"}), flush=True)
+""")
+
+MOCK_WORKER_STDERR_EXIT = textwrap.dedent("""\
+    import sys
+    print("fatal: model unavailable", file=sys.stderr, flush=True)
+    sys.exit(3)
+""")
+
+MOCK_WORKER_LONG_LINE = textwrap.dedent("""\
+    import json
+    print(json.dumps({"type": "tool_result", "result": "x" * 200000}), flush=True)
+    print(json.dumps({"type": "session_end"}), flush=True)
+""")
+
+
+def make_worker(script: str) -> AsyncWorker:
+    worker = AsyncWorker(WorkerConfig(codex_bin=sys.executable))
+    worker._build_command = lambda prompt: [sys.executable, "-c", script]  # type: ignore[assignment]
+    return worker
+
+
+def make_task(task_id: str = "T-TEST", timeout: int = 600) -> TaskSpec:
+    return TaskSpec(id=task_id, name="测试任务", description="async", timeout_seconds=timeout)
+
+
+class TestAsyncWorker:
+    def test_success_and_events_via_parser(self) -> None:
+        collected: list[JSONLEvent] = []
+        result = asyncio.run(make_worker(MOCK_WORKER_SUCCESS).execute_async(
+            make_task(), on_event=collected.append,
+        ))
+
+        assert result.success is True
+        assert result.error_message is None
+        assert "任务完成" in result.output
+        assert [e.type for e in collected] == [e.type for e in result.events]
+        assert len(collected) == 5
+
+    def test_question_and_error(self) -> None:
+        question = make_worker(MOCK_WORKER_WITH_QUESTION).execute(make_task())
+        error = make_worker(MOCK_WORKER_ERROR).execute(make_task())
+
+        assert question.has_questions and question.success is False
+        assert error.success is False and "crash" in error.error_message
+
+    def test_timeout_cancels_and_kills_process(self) -> None:
+        worker = make_worker(MOCK_WORKER_TIMEOUT)
+
+        started = time.monotonic()
+        result = asyncio.run(worker.execute_async(make_task(timeout=1)))
+
+        assert time.monotonic() - started < 10
+        assert result.success is False
+        assert "Timeout" in result.error_message
+        assert len(result.events) == 1  # 超时前收到的事件被保留
+        assert worker.is_running is False
+        assert worker._aprocess.returncode is not None
+
+    def test_stderr_tail_and_exit_code(self) -> None:
+        worker = make_worker(MOCK_WORKER_STDERR_EXIT)
+        result = worker.execute(make_task())
+
+        assert result.success is False
+        assert result.error_message == "Exit code 3: fatal: model unavailable"
+        assert list(worker.stderr_tail) == ["fatal: model unavailable"]
+
+    def test_long_single_line(self) -> None:
+        result = make_worker(MOCK_WORKER_LONG_LINE).execute(make_task())
+
+        assert result.success is True
+        assert len(result.events[0].content["result"]) == 200000
+
+    def test_many_workers_share_one_loop(self) -> None:
+        jobs = [(make_worker(MOCK_WORKER_SLOW), make_task(f"T-{i}")) for i in range(6)]
+        seen: list[str] = []
+
+        started = time.monotonic()
+        results = asyncio.run(execute_all(jobs, on_event=lambda tid, e: seen.append(tid)))
+        elapsed = time.monotonic() - started
+
+        assert [r.task_id for r in results] == [f"T-{i}" for i in range(6)]
+        assert all(r.success for r in results)
+        assert len(seen) == 12
+        assert elapsed < 2.5  # 串行至少需要 3 秒
+
+    def test_max_concurrency_bounds_parallelism(self) -> None:
+        jobs = [(make_worker(MOCK_WORKER_SLOW), make_task(f"T-{i}")) for i in range(4)]
+
+        started = time.monotonic()
+        asyncio.run(execute_all(jobs, max_concurrency=2))
+
+        assert time.monotonic() - started >= 0.9
+
+    def test_cancellation_terminates_process(self) -> None:
+        worker = make_worker(MOCK_WORKER_TIMEOUT)
+
+        async def scenario() -> None:
+            run = asyncio.create_task(worker.execute_async(make_task()))
+            while not worker.events_seen():
+                await asyncio.sleep(0.05)
+            run.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await run
+
+        worker.events_seen = lambda: len(worker._events) > 0  # type: ignore[attr-defined]
+        asyncio.run(scenario())
+        assert worker._aprocess.returncode is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
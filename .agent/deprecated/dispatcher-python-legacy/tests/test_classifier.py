@@ -0,0 +1,112 @@
+"""
+test_classifier.py — 单次扫描多规则分类器测试
+
+测试覆盖:
+  - 字面关键词规则识别
+  - 一次返回全部命中分类
+  - 与逐条 search() 结果一致 (DecisionEngine / JSONLParser 规则 + 录制消息语料)
+  - 关键词互相包含 / 含正则语法的规则
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+_dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
+if _dispatcher_parent not in sys.path:
+    sys.path.insert(0, _dispatcher_parent)
+
+from dispatcher.classifier import RuleClassifier, literal_alternatives, trie_pattern
+from dispatcher.decision_engine import AUTO_RULES, BLOCKED_RULES, DecisionEngine
+from dispatcher.jsonl_parser import (
+    BLOCKING_QUESTION_PATTERNS,
+    QUESTION_EXCLUDE_PATTERNS,
+    QUESTION_PATTERNS,
+    JSONLParser,
+)
+
+CORPUS = Path(__file__).parent / "fixtures" / "agent_messages.jsonl"
+
+
+def corpus_messages() -> list[str]:
+    lines = CORPUS.read_text(encoding="utf-8").splitlines()
+    return [e["message"] for e in map(json.loads, lines) if e.get("message")]
+
+
+class TestLiteralAlternatives:
+    def test_keyword_group(self) -> None:
+        assert literal_alternatives(re.compile(r"(命名|API key|third\-party)")) == [
+            "命名", "api key", "third-party",
+        ]
+
+    def test_regex_syntax_is_not_literal(self) -> None:
+        assert literal_alternatives(re.compile(r"(错误处理|try.*catch)")) is None
+        assert literal_alternatives(re.compile(r"[\?？]\s*$")) is None
+
+
+class TestTriePattern:
+    def test_prefers_longer_keyword(self) -> None:
+        pattern = re.compile(trie_pattern(["log", "logging", "lint", "a+b"]))
+        assert pattern.findall("logging, lint, log, a+b") == ["logging", "lint", "log", "a+b"]
+
+
+class TestRuleClassifier:
+    def test_returns_all_categories_in_rule_order(self) -> None:
+        classifier = RuleClassifier([
+            ("naming", re.compile(r"(命名|变量名)")),
+            ("testing", re.compile(r"(测试|pytest)", re.IGNORECASE)),
+            ("question", re.compile(r"[\?？]\s*$")),
+        ])
+        assert classifier.classify("PyTest 的变量名怎么起？") == ["naming", "testing", "question"]
+        assert classifier.first("PyTest 的变量名怎么起？") == 0
+        assert classifier.classify("无关内容") == []
+        assert classifier.first("无关内容") is None
+
+    def test_keyword_inside_longer_keyword(self) -> None:
+        classifier = RuleClassifier([
+            ("security", re.compile(r"(key|token)", re.IGNORECASE)),
+            ("third_party", re.compile(r"(API key|SaaS)", re.IGNORECASE)),
+        ])
+        assert classifier.classify("where does the api key go") == ["security", "third_party"]
+
+    def test_keyword_straddling_previous_match(self) -> None:
+        classifier = RuleClassifier([
+            ("first", re.compile(r"(abc)")),
+            ("second", re.compile(r"(cde)")),
+        ])
+        assert classifier.classify("abcde") == ["first", "second"]
+
+    def test_case_sensitive_rule_is_verified(self) -> None:
+        classifier = RuleClassifier([("upper", re.compile(r"(PII)"))])
+        assert classifier.classify("contains pii") == []
+        assert classifier.classify("contains PII") == ["upper"]
+
+    @pytest.mark.parametrize("rules", [
+        [(c, p) for p, c, _ in BLOCKED_RULES + AUTO_RULES],
+        [("exclude", p) for p in QUESTION_EXCLUDE_PATTERNS]
+        + [(f"question-{i}", p) for i, p in enumerate(QUESTION_PATTERNS)]
+        + [(f"blocking-{i}", p) for i, p in enumerate(BLOCKING_QUESTION_PATTERNS)],
+    ], ids=["decision-rules", "question-patterns"])
+    def test_matches_sequential_search_on_corpus(self, rules) -> None:
+        classifier = RuleClassifier(rules)
+        for message in corpus_messages():
+            expected = [i for i, (_, p) in enumerate(rules) if p.search(message)]
+            assert classifier.matched(message) == expected, message
+
+
+class TestIntegration:
+    def test_engine_classify_lists_blocked_first(self) -> None:
+        categories = DecisionEngine().classify("API token 的变量名怎么命名？")
+        assert categories[0] == "安全决策"
+        assert "命名规范" in categories
+
+    def test_parser_classify_message(self) -> None:
+        parser = JSONLParser()
+        assert parser.classify_message("请确认是否继续？") == ["question", "blocking"]
+        assert parser.classify_message("已完成，没有问题？") == ["exclude", "question", "blocking"]
+        assert parser.classify_message("正在读取文件") == []
@@ -8,6 +8,7 @@ test_decision_engine.py — PM 自主决策引擎测试 (T-104)
   - 决策日志
   - as_answer_callback 集成
   - 样本问题分类正确率 ≥ 80%
+  - 决策缓存 (精确 / 近似命中、持久化、指纹失效)
 """
 
 from __future__ import annotations
@@ -21,6 +22,7 @@ _dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
 if _dispatcher_parent not in sys.path:
     sys.path.insert(0, _dispatcher_parent)
 
+from dispatcher.decision_cache import DecisionCache, normalize_question
 from dispatcher.decision_engine import DecisionEngine, DecisionType
 
 
@@ -170,5 +172,92 @@ class TestSampleClassification:
         assert accuracy >= 0.8, f"分类正确率 {accuracy:.0%} < 80%"
 
 
+class TestDecisionCache:
+    def test_normalize_ignores_case_space_and_punctuation(self) -> None:
+        assert normalize_question("  Log 级别？") == normalize_question("log级别?")
+
+    def test_exact_hit_reused_across_tasks(self) -> None:
+        engine = DecisionEngine()
+        first = engine.decide("T-001", "这个变量名用什么好？")
+        again = engine.decide("T-002", "这个变量名 用什么好?")
+
+        assert first.source == "rule"
+        assert again.source == "cache"
+        assert again.answer == first.answer
+        assert engine.cache.stats.exact_hits == 1
+        assert engine.cache.stats.hit_rate == 0.5
+
+    def test_fuzzy_hit_on_reworded_question(self) -> None:
+        engine = DecisionEngine()
+        first = engine.decide("T-001", "工具函数的单元测试应该放在哪个目录下面比较合适？")
+        again = engine.decide("T-002", "工具函数的单元测试应该放在哪个目录下面比较合适呢？")
+
+        assert again.source == "fuzzy"
+        assert again.category == first.category
+        assert engine.cache.stats.fuzzy_hits == 1
+
+    def test_unrelated_question_misses(self) -> None:
+        engine = DecisionEngine()
+        engine.decide("T-001", "这个变量名用什么好？")
+        d = engine.decide("T-002", "日志打哪个级别？")
+
+        assert d.source == "rule"
+        assert engine.cache.stats.hits == 0
+
+    def test_fuzzy_auto_answer_not_reused_for_blocked_question(self) -> None:
+        engine = DecisionEngine(cache=DecisionCache(threshold=0.5))
+        engine.decide("T-001", "配置文件的默认值放在哪个目录下面比较合适？")
+        d = engine.decide("T-002", "配置文件的默认token放在哪个目录下面比较合适？")
+
+        assert d.type == DecisionType.BLOCKED
+        assert d.source == "rule"
+        assert engine.cache.stats.hits == 0
+
+    def test_fuzzy_hit_requires_same_rule(self) -> None:
+        engine = DecisionEngine(cache=DecisionCache(threshold=0.5))
+        engine.decide("T-001", "Should I add logging to the request handler module?")
+        handling = engine.decide("T-002", "Should I add error handling to the request handler module?")
+        caching = engine.decide("T-003", "Should I add caching to the request handler module?")
+
+        assert handling.category == "错误处理"
+        assert caching.category == "依赖管理"
+        assert engine.cache.stats.hits == 0
+
+    def test_persisted_across_runs(self, tmp_path: Path) -> None:
+        path = tmp_path / "decisions.json"
+        engine = DecisionEngine(cache_path=path)
+        engine.decide("T-001", "这个类名应该叫什么？")
+        assert engine.cache.save()
+
+        reloaded = DecisionEngine(cache_path=path)
+        d = reloaded.decide("T-009", "这个类名应该叫什么？")
+        assert d.source == "cache"
+        assert len(reloaded.cache) == 1
+
+    def test_context_change_invalidates_persisted_cache(self, tmp_path: Path) -> None:
+        path = tmp_path / "decisions.json"
+        engine = DecisionEngine(cache_path=path)
+        engine.decide("T-001", "这个类名应该叫什么？")
+        engine.cache.save()
+
+        other = DecisionEngine(
+            project_context={"conventions": {"命名规范": "类名以 Axiom 开头"}},
+            cache_path=path,
+        )
+        d = other.decide("T-001", "这个类名应该叫什么？")
+        assert d.source == "rule"
+        assert "Axiom" in d.answer
+
+    def test_evicts_least_recently_used(self) -> None:
+        engine = DecisionEngine(cache=DecisionCache(max_entries=2))
+        engine.decide("T-001", "这个类名应该叫什么？")
+        engine.decide("T-001", "日志打哪个级别？")
+        engine.decide("T-001", "这个类名应该叫什么？")  # 刷新
+        engine.decide("T-001", "默认超时设多少秒？")
+
+        assert len(engine.cache) == 2
+        assert engine.decide("T-002", "日志打哪个级别？").source == "rule"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
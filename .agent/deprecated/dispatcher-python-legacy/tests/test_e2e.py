@@ -16,6 +16,7 @@ from __future__ import annotations
 import json
 import sys
 import textwrap
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -29,10 +30,13 @@ from dispatcher.core import TaskSpec, TaskStatus, WorkerResult
 from dispatcher.decision_engine import DecisionEngine, DecisionType
 from dispatcher.git_ops import GitOps, GitResult
 from dispatcher.jsonl_parser import JSONLParser
-from dispatcher.main import Dispatcher, DispatchReport
+from dispatcher.main import Dispatcher, DispatchReport, WorkerSlot
 from dispatcher.prd_updater import PRDUpdater
 from dispatcher.restart_injector import RestartInjector
 from dispatcher.worker import Worker, WorkerConfig
+from dispatcher.worktree_pool import WorktreePool
+
+from .conftest import run_git
 
 
 # ──────────────────────────────────────────────────────
@@ -307,6 +311,215 @@ class TestE2EWithMock:
         assert "🚫 BLOCKED" in content
 
 
+# ──────────────────────────────────────────────────────
+# 3b. DAG 并发调度
+# ──────────────────────────────────────────────────────
+
+# T-002 依赖表格中靠后的 T-004；T-001 依赖已完成的 T-000；T-005/T-006 互相依赖
+DAG_PRD = textwrap.dedent("""\
+    | ID | 任务 | 状态 | 描述 | 预估 | 依赖 | 验收标准 |
+    |----|------|------|------|-----|------|---------|
+    | T-000 | **已完成** | ✅ DONE | - | 1h | - | - |
+    | T-001 | **A** | ⏳ PENDING | a | 1h | T-000 | - |
+    | T-002 | **B** | ⏳ PENDING | b | 1h | T-004 | - |
+    | T-003 | **C** | ⏳ PENDING | c | 1h | - | - |
+    | T-004 | **D** | ⏳ PENDING | d | 1h | T-001 | - |
+    | T-005 | **E** | ⏳ PENDING | e | 1h | T-006 | - |
+    | T-006 | **F** | ⏳ PENDING | f | 1h | T-005 | - |
+""")
+
+PARALLEL_PRD = textwrap.dedent("""\
+    | ID | 任务 | 状态 | 描述 | 预估 | 依赖 | 验收标准 |
+    |----|------|------|------|-----|------|---------|
+    | T-001 | **A** | ⏳ PENDING | a | 1h | - | - |
+    | T-002 | **B** | ⏳ PENDING | b | 1h | - | - |
+    | T-003 | **C** | ⏳ PENDING | c | 1h | T-001, T-002 | - |
+""")
+
+CHAIN_PRD = textwrap.dedent("""\
+    | ID | 任务 | 状态 | 描述 | 预估 | 依赖 | 验收标准 |
+    |----|------|------|------|-----|------|---------|
+    | T-001 | **A** | ⏳ PENDING | a | 1h | - | - |
+    | T-002 | **B** | ⏳ PENDING | b | 1h | T-001 | - |
+""")
+
+
+
+class TestDAGScheduling:
+    def test_topological_order_and_cycles(self, tmp_path: Path) -> None:
+        prd = tmp_path / "dag.md"
+        prd.write_text(DAG_PRD, encoding="utf-8")
+        dispatcher = Dispatcher(prd_path=prd, dry_run=True)
+
+        order, cyclic = dispatcher.topological_order(dispatcher.parse_prd())
+
+        assert [t.id for t in order] == ["T-001", "T-003", "T-004", "T-002"]
+        assert sorted(t.id for t in cyclic) == ["T-005", "T-006"]
+
+    def test_out_of_order_dependencies_run(self, tmp_path: Path) -> None:
+        prd = tmp_path / "dag.md"
+        prd.write_text(DAG_PRD, encoding="utf-8")
+        dispatcher = Dispatcher(prd_path=prd, repo_path=tmp_path)
+        executed: list[str] = []
+
+        def mock_execute(task, prompt=None, on_event=None):
+            executed.append(task.id)
+            return WorkerResult(task_id=task.id, success=True, output="ok")
+
+        dispatcher.worker.execute = mock_execute
+        dispatcher.injector.worker = dispatcher.worker
+        dispatcher.git.auto_commit = MagicMock(
+            return_value=GitResult(success=True, message="ok", commit_hash="x")
+        )
+
+        report = dispatcher.run()
+
+        assert executed == ["T-001", "T-003", "T-004", "T-002"]
+        assert report.done == 4
+        assert report.skipped == 2  # 依赖环
+
+    def test_independent_tasks_run_concurrently(self, tmp_path: Path, repo: Path) -> None:
+        prd = tmp_path / "p.md"
+        prd.write_text(PARALLEL_PRD, encoding="utf-8")
+        dispatcher = Dispatcher(prd_path=prd, repo_path=repo, max_workers=3)
+        # T-001 与 T-002 必须同时在运行才能通过屏障
+        barrier = threading.Barrier(2, timeout=5)
+        order: list[str] = []
+
+        def fake_execute(self, task, prompt=None, on_event=None):
+            if task.id in ("T-001", "T-002"):
+                barrier.wait()
+            order.append(task.id)
+            return WorkerResult(task_id=task.id, success=True, output="ok")
+
+        with patch.object(Worker, "execute", fake_execute):
+            report = dispatcher.run()
+
+        assert report.done == 3
+        assert order[-1] == "T-003"
+        assert prd.read_text(encoding="utf-8").count("✅ DONE") == 3
+
+    def test_shared_checkout_runs_one_task_at_a_time(self, tmp_path: Path) -> None:
+        prd = tmp_path / "p.md"
+        prd.write_text(PARALLEL_PRD, encoding="utf-8")
+        dispatcher = Dispatcher(prd_path=prd, repo_path=tmp_path, max_workers=3, use_worktrees=False)
+        dispatcher.git.auto_commit = MagicMock(
+            return_value=GitResult(success=True, message="ok", commit_hash=None)
+        )
+        # 没有独立 worktree 时多个 Worker 会互相提交对方的改动，只保留一个槽位
+        assert [slot.worker for slot in dispatcher._create_slots()] == [dispatcher.worker]
+
+        with patch.object(Worker, "execute", lambda self, task, prompt=None, on_event=None: WorkerResult(
+            task_id=task.id, success=True, output="ok",
+        )):
+            report = dispatcher.run()
+        assert report.done == 3
+
+    def test_checkout_failure_fails_only_that_task(self, tmp_path: Path, repo: Path) -> None:
+        prd = tmp_path / "p.md"
+        prd.write_text(PARALLEL_PRD, encoding="utf-8")
+        dispatcher = Dispatcher(prd_path=prd, repo_path=repo, max_workers=2)
+        original = WorktreePool.checkout
+
+        def flaky_checkout(self, worktree, task):
+            if task.id == "T-001":
+                raise RuntimeError("Git command failed: git checkout")
+            return original(self, worktree, task)
+
+        with patch.object(WorktreePool, "checkout", flaky_checkout), patch.object(
+            Worker, "execute",
+            lambda self, task, prompt=None, on_event=None: WorkerResult(task_id=task.id, success=True, output="ok"),
+        ):
+            report = dispatcher.run()
+
+        assert report.done == 1     # T-002
+        assert report.failed == 1   # T-001
+        assert report.skipped == 1  # T-003 依赖 T-001
+        assert report.results[0].error_message.startswith("Checkout failed")
+        assert "| T-001 | **A** | ❌ FAILED |" in prd.read_text(encoding="utf-8")
+
+    def test_checkout_failure_skips_dependents_when_nothing_else_runs(self, tmp_path: Path, repo: Path) -> None:
+        prd = tmp_path / "p.md"
+        prd.write_text(CHAIN_PRD, encoding="utf-8")
+        dispatcher = Dispatcher(prd_path=prd, repo_path=repo, max_workers=2)
+
+        def failing_checkout(self, worktree, task):
+            raise RuntimeError("Git command failed: git checkout")
+
+        with patch.object(WorktreePool, "checkout", failing_checkout):
+            report = dispatcher.run()
+
+        assert report.failed == 1   # T-001
+        assert report.skipped == 1  # T-002 依赖 T-001
+        assert [r.task_id for r in report.results] == ["T-001"]
+
+    def test_unintegrated_dependency_is_not_labelled_conflict(self, tmp_path: Path) -> None:
+        prd = tmp_path / "p.md"
+        prd.write_text(CHAIN_PRD, encoding="utf-8")
+        dispatcher = Dispatcher(prd_path=prd, repo_path=tmp_path, dry_run=True)
+        dispatcher._pool = MagicMock(conflicted=[])
+        dispatcher._pool.integrate.return_value = GitResult(
+            success=False, message="Dependencies not integrated yet: T-001",
+        )
+        git = MagicMock()
+        git.auto_commit.return_value = GitResult(success=True, message="ok", commit_hash="x")
+        slot = WorkerSlot(0, dispatcher.worker, dispatcher.injector, git, MagicMock(branch="axiom/T-002"))
+        result = WorkerResult(task_id="T-002", success=True, output="ok")
+
+        assert not dispatcher._handle_result(TaskSpec("T-002", "B", "b"), result, slot, DispatchReport())
+        assert result.error_message == "Dependencies not integrated yet: T-001"
+
+    def test_worktrees_isolate_workers_and_merge_back(self, tmp_path: Path, repo: Path) -> None:
+        prd = tmp_path / "p.md"
+        prd.write_text(PARALLEL_PRD, encoding="utf-8")
+        seen: dict[str, list[str]] = {}
+
+        def fake_execute(self, task, prompt=None, on_event=None):
+            workdir = Path(self.config.working_dir)
+            seen[task.id] = sorted(p.name for p in workdir.glob("T-*.txt"))
+            (workdir / f"{task.id}.txt").write_text(task.id, encoding="utf-8")
+            return WorkerResult(task_id=task.id, success=True, output="ok")
+
+        dispatcher = Dispatcher(prd_path=prd, repo_path=repo, max_workers=2)
+        with patch.object(Worker, "execute", fake_execute):
+            report = dispatcher.run()
+
+        assert report.done == 3
+        # T-003 的 worktree 已包含两个依赖任务的提交
+        assert seen["T-003"] == ["T-001.txt", "T-002.txt"]
+        assert sorted(p.name for p in repo.glob("T-*.txt")) == ["T-001.txt", "T-002.txt", "T-003.txt"]
+        assert len(run_git(repo, "log", "--oneline").splitlines()) == 4
+        assert run_git(repo, "worktree", "list").count("\n") == 1
+        assert run_git(repo, "branch", "--list", "axiom/*") == ""
+
+    def test_worktree_commit_failure_fails_task(self, tmp_path: Path, repo: Path) -> None:
+        # 钩子目录为所有 worktree 共享: 拒绝包含 T-002.txt 的提交
+        hook = repo / ".git" / "hooks" / "pre-commit"
+        hook.write_text("#!/bin/sh\n! git diff --cached --name-only | grep -q T-002\n", encoding="utf-8")
+        hook.chmod(0o755)
+        prd = tmp_path / "p.md"
+        prd.write_text(PARALLEL_PRD, encoding="utf-8")
+
+        def fake_execute(self, task, prompt=None, on_event=None):
+            (Path(self.config.working_dir) / f"{task.id}.txt").write_text(task.id, encoding="utf-8")
+            return WorkerResult(task_id=task.id, success=True, output="ok")
+
+        dispatcher = Dispatcher(prd_path=prd, repo_path=repo, max_workers=2)
+        with patch.object(Worker, "execute", fake_execute):
+            report = dispatcher.run()
+
+        assert report.done == 1
+        assert report.failed == 1
+        failed = next(r for r in report.results if r.task_id == "T-002")
+        assert failed.error_message.startswith("Commit failed")
+        assert "| T-002 | **B** | ❌ FAILED |" in prd.read_text(encoding="utf-8")
+        assert not (repo / "T-002.txt").exists()
+        # 未提交的改动与任务分支都保留以便排查
+        kept = repo / ".git" / "axiom-worktrees" / "kept-T-002"
+        assert (kept / "T-002.txt").read_text(encoding="utf-8") == "T-002"
+        assert run_git(repo, "branch", "--list", "--format=%(refname:short)", "axiom/*").split() == ["axiom/T-002"]
+
+
 # ──────────────────────────────────────────────────────
 # 4. DispatchReport 测试
 # ──────────────────────────────────────────────────────
@@ -0,0 +1,143 @@
+"""
+test_git_ops.py — Git 自动提交测试 (T-105)
+
+测试覆盖:
+  - auto_commit: 2 次进程创建完成提交，hash 取自 commit 输出
+  - 无变更时不产生提交
+  - porcelain v2 状态解析 (含重命名 / 未跟踪文件)
+  - HEAD / 提交消息经常驻 cat-file 进程读取，进程退出后自动重启
+  - 逐命令耗时统计
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
+if _dispatcher_parent not in sys.path:
+    sys.path.insert(0, _dispatcher_parent)
+
+from dispatcher.git_ops import GitOps, GitStatus, GitTimings
+
+from .conftest import run_git
+
+
+@pytest.fixture
+def git(repo: Path):
+    with GitOps(repo) as ops:
+        yield ops
+
+
+class TestAutoCommit:
+    def test_commit_uses_two_spawns(self, repo: Path, git: GitOps) -> None:
+        (repo / "new.txt").write_text("new", encoding="utf-8")
+        (repo / "README.md").write_text("changed\n", encoding="utf-8")
+
+        result = git.auto_commit("T-101", "Worker 封装器")
+
+        assert result.success is True
+        assert git.timings.spawns == 2
+        assert set(git.timings.commands) == {"add", "commit"}
+        assert run_git(repo, "rev-parse", "HEAD").startswith(result.commit_hash)
+        assert run_git(repo, "log", "-1", "--format=%s").strip() == "feat(T-101): Worker 封装器"
+        assert run_git(repo, "status", "--porcelain") == ""
+
+    def test_no_changes(self, repo: Path, git: GitOps) -> None:
+        result = git.auto_commit("T-101", "nothing")
+
+        assert result.success is True
+        assert result.commit_hash is None
+        assert "No changes" in result.message
+        assert len(run_git(repo, "log", "--oneline").splitlines()) == 1
+
+    def test_detached_head(self, repo: Path, git: GitOps) -> None:
+        run_git(repo, "checkout", "-q", "--detach")
+        (repo / "a.txt").write_text("a", encoding="utf-8")
+
+        result = git.auto_commit("T-102", "detached")
+        assert result.commit_hash and git.get_head().startswith(result.commit_hash)
+
+
+class TestStatus:
+    def test_parse_porcelain_v2(self) -> None:
+        output = "\0".join([
+            "# branch.oid 1234567890abcdef1234567890abcdef12345678",
+            "# branch.head main",
+            "1 .M N... 100644 100644 100644 abc abc src/a b.py",
+            "2 R. N... 100644 100644 100644 abc abc R100 new.py",
+            "old.py",
+            "u UU N... 100644 100644 100644 100644 a b c conflict.py",
+            "? notes.txt",
+            "",
+        ])
+        status = GitStatus.parse(output)
+        assert status.head.startswith("1234567")
+        assert status.branch == "main"
+        assert status.changed == ["src/a b.py", "new.py", "conflict.py"]
+        assert status.untracked == ["notes.txt"]
+        assert not status.is_clean
+
+    def test_initial_and_detached(self) -> None:
+        status = GitStatus.parse("# branch.oid (initial)\0# branch.head (detached)\0")
+        assert status.head is None and status.branch is None and status.is_clean
+
+    def test_live_status(self, repo: Path, git: GitOps) -> None:
+        assert git.has_changes() is False
+        (repo / "x.txt").write_text("x", encoding="utf-8")
+        assert git.status().untracked == ["x.txt"]
+        assert git.has_changes() is True
+
+
+class TestBatchReads:
+    def test_head_and_message_share_one_process(self, repo: Path, git: GitOps) -> None:
+        head = run_git(repo, "rev-parse", "HEAD").strip()
+        assert git.get_head() == head
+        assert git.get_last_commit_message() == "base"
+
+        # 新提交对常驻进程立即可见
+        (repo / "b.txt").write_text("b", encoding="utf-8")
+        run_git(repo, "add", "-A")
+        run_git(repo, "commit", "-qm", "second\n\nbody")
+        assert git.get_head() == run_git(repo, "rev-parse", "HEAD").strip()
+        assert git.get_last_commit_message() == "second"
+
+        assert git.timings.spawns == 1
+        assert git.timings.commands["cat-file --batch"].calls == 4
+
+    def test_restarts_after_close(self, repo: Path, git: GitOps) -> None:
+        head = git.get_head()
+        git._batch._proc.kill()
+        git._batch._proc.wait()
+        assert git.get_head() == head
+        git.close()
+        assert git.get_head() == head
+        assert git.timings.spawns == 3
+
+    def test_unborn_head(self, tmp_path: Path) -> None:
+        run_git(tmp_path, "init", "-q")
+        with GitOps(tmp_path) as git:
+            assert git.get_last_commit_message() is None
+            with pytest.raises(RuntimeError):
+                git.get_head()
+
+
+class TestGitTimings:
+    def test_record_and_merge(self) -> None:
+        a, b = GitTimings(), GitTimings()
+        a.record("add", 0.01)
+        a.record("cat-file --batch", 0.001, spawned=False)
+        b.record("add", 0.02)
+        a.merge(b)
+
+        assert a.spawns == 2
+        assert a.calls == 3
+        assert a.commands["add"].calls == 2
+        assert a.commands["add"].avg_ms == pytest.approx(15.0)
+        assert a.to_dict()["add"] == {"calls": 2, "seconds": 0.03}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -3,7 +3,7 @@ test_injector.py — 重启注入机制单元测试 (T-103)
 
 测试覆盖:
   - build_injected_prompt: QA 对注入格式
-  - compress_context: Prompt 压缩
+  - compress_context: Prompt 压缩（token 预算 / QA 摘要 / 去重）
   - should_restart: 重启条件判断（次数上限 / 风险检测）
   - execute_with_injection: Mock Worker 提问 → 注入答案 → 重启
   - BLOCKED 场景: 无法回答 / 超过重启上限
@@ -12,8 +12,11 @@ test_injector.py — 重启注入机制单元测试 (T-103)
 from __future__ import annotations
 
 import json
+import shutil
+import subprocess
 import sys
 import textwrap
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -25,12 +28,14 @@ if _dispatcher_parent not in sys.path:
 
 from dispatcher.core import JSONLEvent, TaskSpec, TaskStatus, WorkerResult
 from dispatcher.jsonl_parser import JSONLParser
+from dispatcher import prompt_compressor
+from dispatcher.prompt_compressor import PromptCompressor, estimate_tokens, resolve_prompt_budget
 from dispatcher.restart_injector import (
     InjectionContext,
     QAPair,
     RestartInjector,
-    MAX_PROMPT_CHARS,
 )
+from dispatcher.async_worker import AsyncWorker
 from dispatcher.worker import Worker, WorkerConfig
 
 
@@ -101,7 +106,7 @@ class TestBuildInjectedPrompt:
 class TestCompressContext:
     def setup_method(self) -> None:
         self.worker = Worker(WorkerConfig())
-        self.injector = RestartInjector(self.worker)
+        self.injector = RestartInjector(self.worker, prompt_budget_tokens=4000)
 
     def test_no_compression_needed(self) -> None:
         short = "短文本" * 100
@@ -109,17 +114,78 @@ class TestCompressContext:
 
     def test_compression_applied(self) -> None:
         # 生成超长 Prompt
-        long_prompt = "X" * (MAX_PROMPT_CHARS + 5000)
+        long_prompt = "X" * (4000 * 4 + 5000)  # ASCII 约 4 字符 / token
         compressed = self.injector.compress_context(long_prompt)
         assert len(compressed) < len(long_prompt)
         assert "上下文已压缩" in compressed
 
     def test_head_preserved(self) -> None:
         head = "重要头部" * 400  # 确保超过 2000 字符
-        long_prompt = head + "Y" * (MAX_PROMPT_CHARS + 1000)
+        long_prompt = head + "Y" * (4000 * 4 + 1000)
         compressed = self.injector.compress_context(long_prompt)
         assert compressed.startswith("重要头部重要头部")
 
+    def test_within_token_budget(self) -> None:
+        injector = RestartInjector(self.worker, prompt_budget_tokens=500)
+        task = "任务开头\n" + "\n".join(f"步骤 {i}: 修改模块" for i in range(400)) + "\n任务结尾"
+        qa = [QAPair(f"问题{i}: 这个模块怎么处理？", f"答案{i}。" + "细节" * 40, i) for i in range(10)]
+        compressed = injector.compress_context(task, qa)
+        assert estimate_tokens(compressed) <= 500
+        assert compressed.startswith("任务开头")
+        assert compressed.rstrip().endswith("细节")
+        assert "任务结尾" in compressed
+
+    def test_recent_qa_verbatim_older_summarized(self) -> None:
+        injector = RestartInjector(self.worker, prompt_budget_tokens=400)
+        qa = [QAPair(f"问题{i}？", f"答案{i}。" + "补充说明" * 30, i) for i in range(5)]
+        compressed = injector.compress_context("执行任务", qa)
+        assert "[补充信息 1] 问题0？ → 答案0。" in compressed
+        assert "关于 \"问题4？\"，答案是:\n答案4。" + "补充说明" * 30 in compressed
+        assert compressed.count("补充说明" * 30) <= 2
+
+    def test_large_recent_qa_stays_within_budget(self) -> None:
+        injector = RestartInjector(self.worker, prompt_budget_tokens=300)
+        qa = [QAPair(f"问题{i}？", f"答案{i}。" + "补充说明" * 30, i) for i in range(5)]
+        compressed = injector.compress_context("任务描述 " * 200, qa)
+        assert estimate_tokens(compressed) <= 300
+        # 较早的 "最近" Q&A 被摘要化，只有最新一条完整保留
+        assert compressed.count("补充说明" * 30) == 1
+        assert "关于 \"问题4？\"，答案是:\n答案4。" in compressed
+
+    def test_duplicate_answers_merged(self) -> None:
+        compressor = PromptCompressor(budget_tokens=4000)
+        units = compressor.merge([
+            QAPair("用哪个数据库？", "PostgreSQL", 0),
+            QAPair("测试库用哪个？", "PostgreSQL", 1),
+            QAPair("用哪个数据库？", "PostgreSQL 15", 2),
+        ])
+        assert [(u.questions, u.answer) for u in units] == [
+            (["测试库用哪个？"], "PostgreSQL"),
+            (["用哪个数据库？"], "PostgreSQL 15"),
+        ]
+
+    def test_budget_from_agent_config(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        config = MagicMock()
+        config.shared.dispatcher = {"prompt_max_tokens": 6000}
+        config.get_feature.return_value = 5000  # Provider context_window 更小时以它为准
+        monkeypatch.setattr(prompt_compressor, "import_get_config", lambda: lambda path: config)
+
+        assert resolve_prompt_budget() == 5000
+        assert RestartInjector(self.worker).compressor.budget_tokens == 5000
+
+    def test_budget_defaults_without_config(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(prompt_compressor, "import_get_config", lambda: None)
+        assert resolve_prompt_budget() == 4000
+
+    def test_importable_outside_agent_dir(self, tmp_path: Path) -> None:
+        package = Path(__file__).resolve().parent.parent
+        shutil.copytree(package, tmp_path / "dispatcher", ignore=shutil.ignore_patterns("__pycache__"))
+        code = "import dispatcher.main, dispatcher.prompt_compressor as p; print(p.resolve_prompt_budget())"
+
+        out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True)
+        assert out.returncode == 0, out.stderr
+        assert out.stdout.strip() == "4000"
+
 
 # ──────────────────────────────────────────────────────
 # 4. should_restart
@@ -318,6 +384,68 @@ class TestExecuteWithInjection:
         assert ctx.restart_count == 2
 
 
+# ──────────────────────────────────────────────────────
+# 6. 流式提问检测 (真实子进程)
+# ──────────────────────────────────────────────────────
+
+# 未收到答案时提问后继续空转 30 秒；Prompt 中带有注入答案时直接完成
+MOCK_ASKS_THEN_HANGS = textwrap.dedent("""\
+    import json, sys, time
+    def emit(e):
+        print(json.dumps(e, ensure_ascii=False), flush=True)
+    if "补充信息" in sys.argv[1]:
+        emit({"type": "agent_message", "message": "按 PostgreSQL 完成"})
+        emit({"type": "session_end"})
+    else:
+        emit({"type": "agent_message", "message": "我先看看如何组织代码"})
+        emit({"type": "agent_message", "message": "数据库用哪个？"})
+        time.sleep(30)
+""")
+
+
+class TestStreamingInterrupt:
+    def _make(self, worker_cls):
+        worker = worker_cls(WorkerConfig(codex_bin=sys.executable))
+        worker._build_command = lambda prompt: [sys.executable, "-c", MOCK_ASKS_THEN_HANGS, prompt]
+        return worker
+
+    @pytest.mark.parametrize("worker_cls", [Worker, AsyncWorker])
+    def test_question_stops_worker_and_restarts_quickly(self, worker_cls) -> None:
+        worker = self._make(worker_cls)
+        injector = RestartInjector(worker)
+        seen: list[str] = []
+        task = TaskSpec(id="T-TEST", name="测试任务", description="流式", timeout_seconds=60)
+
+        started = time.monotonic()
+        result = injector.execute_with_injection(
+            task,
+            answer_func=lambda tid, q: "用 PostgreSQL",
+            on_event=lambda e: seen.append(e.type),
+        )
+
+        assert time.monotonic() - started < 10  # 不等待 30 秒的空转
+        assert result.success is True
+        assert result.restart_count == 1
+        ctx = injector.get_context("T-TEST")
+        assert ctx.early_stops == 1
+        assert ctx.qa_pairs[0].question == "数据库用哪个？"
+        assert "session_end" in seen
+
+    def test_interrupt_can_be_disabled(self) -> None:
+        worker = Worker(WorkerConfig())
+        calls: list = []
+
+        def mock_execute(task, prompt=None, on_event=None):
+            calls.append(on_event)
+            return WorkerResult(task_id=task.id, success=True, output="ok")
+
+        worker.execute = mock_execute
+        RestartInjector(worker, interrupt_on_question=False).execute_with_injection(
+            TaskSpec(id="T-1", name="n", description="d"),
+        )
+        assert calls == [None]
+
+
 # ──────────────────────────────────────────────────────
 # 运行入口
 # ──────────────────────────────────────────────────────
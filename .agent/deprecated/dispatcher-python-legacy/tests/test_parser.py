@@ -9,6 +9,8 @@ test_parser.py — JSONL 事件解析器单元测试 (T-102)
   - error 错误提取
   - 流式解析 / 文件解析
   - 批量分析 EventSummary
+  - 流式解析 + 增量摘要 (有界保留)
+  - 快速解码 (行首读取 type / timestamp、payload 延迟解码、标准库回退)
 """
 
 from __future__ import annotations
@@ -25,7 +27,8 @@ _dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
 if _dispatcher_parent not in sys.path:
     sys.path.insert(0, _dispatcher_parent)
 
-from dispatcher.core import JSONLEvent
+from dispatcher import json_codec
+from dispatcher.core import JSONLEvent, LazyJSONLEvent
 from dispatcher.jsonl_parser import JSONLParser, EventSummary
 
 
@@ -159,6 +162,42 @@ class TestDetectQuestion:
         assert self.parser.detect_question(e) is None
 
 
+class TestDetectBlockingQuestion:
+    def setup_method(self) -> None:
+        self.parser = JSONLParser()
+
+    def _msg(self, text: str) -> JSONLEvent:
+        return JSONLEvent("agent_message", 1.0, {"message": text})
+
+    def test_waiting_for_answer(self) -> None:
+        assert self.parser.detect_blocking_question(self._msg("数据库用哪个？")) is not None
+        assert self.parser.detect_blocking_question(self._msg("请确认是否覆盖现有配置")) is not None
+        assert self.parser.detect_blocking_question(self._msg("Should I add tests")) is not None
+
+    def test_narration_is_not_blocking(self) -> None:
+        # detect_question 命中 "如何"，但不是在等待回复
+        assert self.parser.detect_question(self._msg("我先看看如何组织代码")) is not None
+        assert self.parser.detect_blocking_question(self._msg("我先看看如何组织代码")) is None
+
+    def test_explicit_blocked_statement(self) -> None:
+        assert self.parser.detect_blocking_question(self._msg("I need your input on the schema.")) is not None
+        assert self.parser.detect_blocking_question(self._msg("Blocked, waiting for credentials.")) is not None
+
+    def test_blocked_narration_is_not_blocking(self) -> None:
+        assert self.parser.detect_blocking_question(self._msg("I need to validate the input before parsing it.")) is None
+        assert self.parser.detect_blocking_question(self._msg("Tests are blocked by a missing fixture, fixing it now.")) is None
+
+    def test_event_classified_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls = []
+        original = self.parser.classify_message
+        monkeypatch.setattr(self.parser, "classify_message", lambda m: calls.append(m) or original(m))
+        event = self._msg("数据库用哪个？")
+
+        self.parser.update_summary(EventSummary(), event)
+        assert self.parser.detect_blocking_question(event) == "数据库用哪个？"
+        assert len(calls) == 1
+
+
 # ──────────────────────────────────────────────────────
 # 3. 完成 & 错误检测
 # ──────────────────────────────────────────────────────
@@ -299,6 +338,95 @@ class TestAnalyzeEvents:
         assert summary.completed is False
 
 
+class TestStreamingAnalysis:
+    def setup_method(self) -> None:
+        self.parser = JSONLParser()
+
+    def test_iter_events_is_lazy(self) -> None:
+        def endless():
+            i = 0
+            while True:
+                i += 1
+                yield json.dumps({"type": "agent_message", "timestamp": i, "message": f"step {i}"})
+
+        events = self.parser.iter_events(endless())
+        assert [next(events).timestamp for _ in range(3)] == [1, 2, 3]
+
+    def test_analyze_file_bounded_retention(self, tmp_path: Path) -> None:
+        path = tmp_path / "big.jsonl"
+        with path.open("w", encoding="utf-8") as f:
+            for i in range(1000):
+                f.write(json.dumps({"type": "agent_message", "message": f"第 {i} 步要不要继续？"}) + "\n")
+                f.write(json.dumps({"type": "tool_call", "tool": "write_file"}) + "\n")
+            f.write("not json\n")
+            f.write(json.dumps({"type": "session_end"}) + "\n")
+
+        summary = self.parser.analyze_file(path, max_retained=10)
+
+        assert summary.total_events == 2001
+        assert summary.question_count == 1000
+        assert summary.tool_counts == {"write_file": 1000}
+        assert len(summary.messages) == len(summary.questions) == len(summary.tool_calls) == 10
+        assert summary.messages[-1] == "第 999 步要不要继续？"
+        assert summary.has_questions and summary.completed and summary.success
+
+    def test_incremental_matches_batch(self) -> None:
+        events = TestAnalyzeEvents()._make_events()
+        summary = EventSummary()
+        live = [self.parser.update_summary(summary, e) for e in events]
+
+        batch = self.parser.analyze_events(events)
+        assert summary == batch
+        assert [q for q in live if q] == batch.questions
+
+
+class TestFastDecoding:
+    def setup_method(self) -> None:
+        self.parser = JSONLParser(lazy=True)
+
+    def test_header_read_without_decoding(self) -> None:
+        line = json.dumps({"type": "tool_result", "timestamp": 3.5, "result": "x" * 1000})
+        event = self.parser.parse_line(line)
+
+        assert isinstance(event, LazyJSONLEvent)
+        assert (event.type, event.timestamp) == ("tool_result", 3.5)
+        assert not event.is_decoded
+        assert event.content == json.loads(line)
+        assert event.is_decoded
+
+    def test_missing_timestamp_defaults_to_now(self) -> None:
+        event = self.parser.parse_line('{"type": "session_end"}')
+        assert isinstance(event, LazyJSONLEvent)
+        assert event.timestamp > 0
+        assert event.content == {"type": "session_end"}
+
+    @pytest.mark.parametrize("line", [
+        '{"timestamp": 1.0, "type": "agent_message", "message": "hi"}',  # type 不是首个键
+        '{"type": "agent_message", "item": {"timestamp": 9}, "timestamp": 1.0}',
+        '{"type": "agent\\u0020message", "timestamp": 1.0}',  # 含转义
+    ])
+    def test_falls_back_to_full_decode(self, line: str) -> None:
+        event = self.parser.parse_line(line)
+        data = json.loads(line)
+        assert not isinstance(event, LazyJSONLEvent)
+        assert (event.type, event.timestamp, event.content) == (data["type"], data["timestamp"], data)
+
+    def test_truncated_payload_degrades_to_header(self) -> None:
+        event = self.parser.parse_line('{"type": "tool_result", "timestamp": 2, "result": "abc}')
+        assert event is not None
+        assert event.content == {"type": "tool_result", "timestamp": 2.0}
+
+    def test_eager_by_default_with_stdlib_backend(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(json_codec, "loads", json.loads)
+        parser = JSONLParser()
+        line = json.dumps({"type": "agent_message", "timestamp": 1.0, "message": "要不要继续？"})
+
+        event = parser.parse_line(line)
+        assert type(event) is JSONLEvent
+        assert parser.detect_question(event) == "要不要继续？"
+        assert parser.parse_line('{"type": "x", "timestamp": 1, "broken') is None
+
+
 # ──────────────────────────────────────────────────────
 # 运行入口
 # ──────────────────────────────────────────────────────
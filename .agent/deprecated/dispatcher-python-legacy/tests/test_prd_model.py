@@ -0,0 +1,166 @@
+"""
+test_prd_model.py — PRD 任务表模型测试
+
+测试覆盖:
+  - 表格行解析为 TaskSpec (名称 / 依赖 / 状态 / 超时 / 行号与偏移)
+  - 任务 ID 精确匹配、无状态标记的行被忽略
+  - 增量重新解析只处理改动过的行
+  - PRDCache: mtime 未变时复用、外部修改后刷新、写回后无需重新解析
+  - Dispatcher 与 PRDUpdater 共享同一份解析结果
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+_dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
+if _dispatcher_parent not in sys.path:
+    sys.path.insert(0, _dispatcher_parent)
+
+from dispatcher import prd_model
+from dispatcher.core import TaskStatus
+from dispatcher.main import Dispatcher
+from dispatcher.prd_model import PRDCache, PRDDocument, estimate_timeout
+
+SAMPLE_PRD = """\
+# Test PRD
+
+| ID | 任务 | 状态 | 描述 | 预估 | 依赖 | 验收标准 |
+|----|------|------|------|-----|------|---------|
+| T-101 | **Worker 封装器** | ✅ DONE | 封装 codex exec | 3h | - | 单元测试 |
+| T-102 | **JSONL 解析器** | ⏳PENDING | 解析事件流 | 30min | T-101 | 单元测试 |
+| T-10 | 短 ID | 🚫 BLOCKED | 阻塞 | - | T-101, T-102 | - |
+
+## 变更记录
+
+| T-102 | 第二次出现，不覆盖首行 | ✅ DONE |
+| T-103 | 没有状态标记 |
+"""
+
+
+def big_prd(count: int) -> str:
+    rows = "".join(
+        f"| T-{i} | 任务 {i} | ⏳ PENDING | 描述 {i} | 1h | T-{i - 1} | - |\n"
+        for i in range(1, count + 1)
+    )
+    return "| ID | 任务 | 状态 | 描述 | 预估 | 依赖 | 验收标准 |\n|--|--|--|--|--|--|--|\n" + rows
+
+
+class TestPRDDocument:
+    def test_parse_rows(self) -> None:
+        document = PRDDocument(SAMPLE_PRD)
+        assert list(document.rows) == ["T-101", "T-102", "T-10"]
+
+        worker, parser, short = document.tasks()
+        assert worker.name == "Worker 封装器"
+        assert worker.status == TaskStatus.DONE
+        assert worker.timeout_seconds == estimate_timeout("3h")
+        assert parser.status == TaskStatus.PENDING
+        assert parser.dependencies == ["T-101"]
+        assert parser.timeout_seconds == 30 * 3 * 60 + 600
+        assert short.dependencies == ["T-101", "T-102"]
+
+        row = document.rows["T-102"]
+        assert row.line_number == 6
+        assert SAMPLE_PRD[row.offset:].startswith("| T-102 | **JSONL 解析器**")
+
+    def test_filter_by_status(self) -> None:
+        document = PRDDocument(SAMPLE_PRD)
+        assert [t.id for t in document.tasks(TaskStatus.PENDING)] == ["T-102"]
+        assert document.status("T-10") == "🚫 BLOCKED"
+        assert document.status("T-1") is None
+        assert document.status("T-103") is None
+
+    def test_tasks_are_copies(self) -> None:
+        document = PRDDocument(SAMPLE_PRD)
+        document.tasks()[1].dependencies.append("T-999")
+        assert document.tasks()[1].dependencies == ["T-101"]
+
+    def test_set_status_only_touches_marker(self) -> None:
+        document = PRDDocument(SAMPLE_PRD)
+        assert document.set_status("T-102", "✅ DONE") == "⏳PENDING"
+        assert document.render() == SAMPLE_PRD.replace("⏳PENDING", "✅ DONE")
+        assert document.rows["T-102"].task.status == TaskStatus.DONE
+        assert document.set_status("T-999", "✅ DONE") is None
+
+    def test_incremental_update(self) -> None:
+        content = big_prd(300)
+        document = PRDDocument(content)
+        changed = content.replace("| T-150 | 任务 150 | ⏳ PENDING", "| T-150 | 任务 150 | ✅ DONE")
+        assert document.update(changed) == 1
+        assert document.rows["T-150"].task.status == TaskStatus.DONE
+        assert len(document.tasks(TaskStatus.PENDING)) == 299
+
+        inserted = changed.replace("| T-1 |", "| T-0 | 新任务 | ⏳ PENDING | - | 1h | - | - |\n| T-1 |", 1)
+        assert document.update(inserted) == 1
+        assert document.rows["T-1"].line_number == 4
+        assert inserted[document.rows["T-300"].offset:].startswith("| T-300 |")
+
+
+class TestPRDCache:
+    def test_reuses_document_until_file_changes(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr(prd_model, "RACY_WINDOW_SECONDS", 0.0)
+        prd = tmp_path / "prd.md"
+        prd.write_text(SAMPLE_PRD, encoding="utf-8")
+        cache = PRDCache()
+
+        document = cache.load(prd)
+        assert cache.load(prd) is document
+
+        prd.write_text(SAMPLE_PRD.replace("⏳PENDING", "🔄 IN_PROGRESS"), encoding="utf-8")
+        os.utime(prd, ns=(1, 1))
+        refreshed = cache.load(prd)
+        assert refreshed is document
+        assert document.status("T-102") == "🔄 IN_PROGRESS"
+
+    def test_racy_mtime_compares_content(self, tmp_path: Path) -> None:
+        prd = tmp_path / "prd.md"
+        prd.write_text(SAMPLE_PRD, encoding="utf-8")
+        cache = PRDCache()
+        cache.load(prd)
+
+        # 同尺寸改写并恢复 mtime: (mtime, size) 不变，但仍应读到新内容
+        stat = prd.stat()
+        prd.write_text(SAMPLE_PRD.replace("| 3h |", "| 5h |"), encoding="utf-8")
+        os.utime(prd, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert cache.load(prd).tasks()[0].timeout_seconds == estimate_timeout("5h")
+
+    def test_missing_file(self, tmp_path: Path) -> None:
+        with pytest.raises(OSError):
+            PRDCache().load(tmp_path / "missing.md")
+
+
+class TestSharedModel:
+    def test_dispatcher_and_updater_share_document(self, tmp_path: Path, monkeypatch) -> None:
+        prd = tmp_path / "prd.md"
+        prd.write_text(big_prd(200), encoding="utf-8")
+
+        dispatcher = Dispatcher(prd_path=prd, dry_run=True)
+        dispatcher.prd_updater.cache = PRDCache()
+        assert len(dispatcher.parse_prd()) == 200
+        document = dispatcher.prd_updater.cache.load(prd)
+
+        parsed: list[str] = []
+        original = PRDDocument._parse_line
+        monkeypatch.setattr(
+            PRDDocument, "_parse_line", staticmethod(lambda line: (parsed.append(line), original(line))[1]),
+        )
+        results = dispatcher.prd_updater.batch_update([
+            ("T-1", TaskStatus.DONE), ("T-2", TaskStatus.DONE),
+        ])
+        assert all(r.success for r in results)
+
+        # 回写只解析被改动的两行；再次 parse_prd 直接复用缓存
+        assert len(parsed) == 2
+        assert len(dispatcher.parse_prd()) == 198
+        assert dispatcher._prd_done == {"T-1", "T-2"}
+        assert dispatcher.prd_updater.cache.load(prd) is document
+        assert len(parsed) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,13 +6,15 @@ test_prd_updater.py — PRD 状态回写测试 (T-106)
   - 更新 PENDING → BLOCKED / FAILED
   - 文件不存在的处理
   - 任务未找到的处理
-  - 批量更新
-  - 状态查询
+  - 批量更新 (一次写入 / 原子替换)
+  - 状态查询 (任务 ID 精确匹配)
+  - 并发回写不互相覆盖
 """
 
 from __future__ import annotations
 
 import sys
+import threading
 from pathlib import Path
 
 import pytest
@@ -22,6 +24,7 @@ if _dispatcher_parent not in sys.path:
     sys.path.insert(0, _dispatcher_parent)
 
 from dispatcher.core import TaskStatus
+from dispatcher.prd_model import PRDCache
 from dispatcher.prd_updater import PRDUpdater
 
 SAMPLE_PRD = """\
@@ -138,6 +141,77 @@ class TestPRDUpdater:
 
         assert len(updater.update_log) == 2
 
+    def test_batch_update_writes_once(self, tmp_path: Path, monkeypatch) -> None:
+        prd = tmp_path / "test.md"
+        prd.write_text(SAMPLE_PRD, encoding="utf-8")
+
+        updater = PRDUpdater(prd, cache=PRDCache())
+        writes: list[str] = []
+        original = updater.cache.write
+        monkeypatch.setattr(
+            updater.cache, "write", lambda path, document: (writes.append(path), original(path, document)),
+        )
+        results = updater.batch_update([
+            ("T-101", TaskStatus.DONE),
+            ("T-999", TaskStatus.DONE),
+            ("T-103", TaskStatus.FAILED),
+        ])
+
+        assert [r.success for r in results] == [True, False, True]
+        assert len(writes) == 1
+        assert [r.line_number for r in results if r.success] == [7, 9]
+        assert prd.read_text(encoding="utf-8") == SAMPLE_PRD.replace(
+            "| T-101 | **Worker 封装器** | ⏳ PENDING", "| T-101 | **Worker 封装器** | ✅ DONE",
+        ).replace("| T-103 | **重启注入** | ⏳ PENDING", "| T-103 | **重启注入** | ❌ FAILED")
+        assert list(tmp_path.iterdir()) == [prd]  # 临时文件已被替换
+
+    def test_task_id_exact_match(self, tmp_path: Path) -> None:
+        prd = tmp_path / "test.md"
+        prd.write_text(
+            SAMPLE_PRD + "| T-10 | **短 ID** | 🔄 IN_PROGRESS | 依赖 T-101 | 1h | T-101 | - |\n",
+            encoding="utf-8",
+        )
+
+        updater = PRDUpdater(prd)
+        assert "IN_PROGRESS" in updater.get_task_status("T-10")
+        assert updater.get_task_status("T-1") is None
+
+        result = updater.update_task_status("T-10", TaskStatus.DONE)
+        assert result.success is True
+        assert "IN_PROGRESS" in result.old_status
+        assert "PENDING" in updater.get_task_status("T-101")
+
+    def test_status_unchanged(self, tmp_path: Path) -> None:
+        prd = tmp_path / "test.md"
+        prd.write_text(SAMPLE_PRD, encoding="utf-8")
+
+        updater = PRDUpdater(prd)
+        result = updater.update_task_status("T-101", TaskStatus.PENDING)
+        assert result.success is False
+        assert "unchanged" in result.message
+        assert updater.update_log == []
+
+    def test_concurrent_updates_not_lost(self, tmp_path: Path) -> None:
+        rows = "".join(
+            f"| T-{i} | 任务 {i} | ⏳ PENDING | - | 1h | - | - |\n" for i in range(200, 240)
+        )
+        prd = tmp_path / "test.md"
+        prd.write_text(SAMPLE_PRD + rows, encoding="utf-8")
+
+        updater = PRDUpdater(prd)
+        threads = [
+            threading.Thread(target=updater.update_task_status, args=(f"T-{i}", TaskStatus.DONE))
+            for i in range(200, 240)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        content = prd.read_text(encoding="utf-8")
+        assert content.count("✅ DONE") == 40
+        assert content.count("⏳ PENDING") == 3
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -314,6 +314,17 @@ class TestWorkerExecute:
         assert "Timeout" in result.error_message
         assert result.duration_seconds >= 1.5
 
+    def test_live_summary(self) -> None:
+        worker = self._make_worker_with_mock(MOCK_WORKER_SUCCESS)
+        task = TaskSpec(id="T-TEST", name="测试任务", description="实时摘要")
+        seen: list[int] = []
+
+        result = worker.execute(task, on_event=lambda e: seen.append(worker.summary.total_events))
+
+        assert worker.summary.total_events == len(result.events)
+        assert worker.summary.completed is True
+        assert seen == list(range(1, len(result.events) + 1))
+
     def test_error_handling(self) -> None:
         worker = self._make_worker_with_mock(MOCK_WORKER_ERROR)
         task = TaskSpec(id="T-TEST", name="测试任务", description="错误场景")
@@ -0,0 +1,136 @@
+"""
+test_worktree_pool.py — worktree 池测试
+
+测试覆盖:
+  - 预创建固定数量的 worktree，任务间循环复用 (磁盘占用有界)
+  - 任务分支基于主仓库 HEAD，包含已合入的依赖
+  - 依赖未合入时拒绝合入下游任务
+  - cherry-pick 冲突时保留任务分支，其余分支在 close() 时删除
+  - 提交失败的任务保留 worktree 与分支，槽位原地重建后可继续使用
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_dispatcher_parent = str(Path(__file__).resolve().parent.parent.parent)
+if _dispatcher_parent not in sys.path:
+    sys.path.insert(0, _dispatcher_parent)
+
+from dispatcher.core import TaskSpec
+from dispatcher.git_ops import GitOps
+from dispatcher.worktree_pool import WORKTREE_DIR, WorktreePool
+
+from .conftest import run_git
+
+
+def _task(task_id: str, *deps: str) -> TaskSpec:
+    return TaskSpec(id=task_id, name=task_id, description="", dependencies=list(deps))
+
+
+@pytest.fixture
+def pool(repo: Path):
+    pool = WorktreePool(GitOps(repo), size=2)
+    yield pool
+    pool.close()
+    pool.git.close()
+
+
+def run_task(pool: WorktreePool, worktree, task: TaskSpec, filename: str, content: str = "x"):
+    pool.checkout(worktree, task)
+    (worktree.path / filename).write_text(content, encoding="utf-8")
+    commit = worktree.git.auto_commit(task.id, task.name)
+    return pool.integrate(worktree, task, commit.commit_hash)
+
+
+class TestWorktreePool:
+    def test_worktrees_recycled(self, repo: Path, pool: WorktreePool) -> None:
+        first, second = pool.open()
+        assert pool.open() == [first, second]
+
+        for i in range(6):
+            worktree = (first, second)[i % 2]
+            assert run_task(pool, worktree, _task(f"T-{i}"), f"T-{i}.txt").success
+
+        assert sorted(p.name for p in repo.glob("T-*.txt")) == [f"T-{i}.txt" for i in range(6)]
+        assert len(list((repo / ".git" / WORKTREE_DIR).iterdir())) == 2
+        assert pool.integrated == [f"T-{i}" for i in range(6)]
+
+        pool.close()
+        assert run_git(repo, "worktree", "list").count("\n") == 1
+        assert run_git(repo, "branch", "--list", "axiom/*") == ""
+
+    def test_task_branch_starts_from_main_head(self, repo: Path, pool: WorktreePool) -> None:
+        first, second = pool.open()
+        run_task(pool, first, _task("T-1"), "dep.txt")
+
+        pool.checkout(second, _task("T-2", "T-1"))
+        assert run_git(second.path, "rev-parse", "--abbrev-ref", "HEAD").strip() == "axiom/T-2"
+        assert (second.path / "dep.txt").exists()
+        assert second.git.get_head() == pool.git.get_head()
+
+    def test_leftovers_cleaned_between_tasks(self, pool: WorktreePool) -> None:
+        (worktree, _) = pool.open()
+        pool.checkout(worktree, _task("T-1"))
+        (worktree.path / "scratch.txt").write_text("failed task", encoding="utf-8")
+
+        pool.checkout(worktree, _task("T-2"))
+        assert not (worktree.path / "scratch.txt").exists()
+
+    def test_dependency_must_be_integrated_first(self, pool: WorktreePool) -> None:
+        first, second = pool.open()
+        pool.checkout(first, _task("T-1"))
+
+        result = run_task(pool, second, _task("T-2", "T-1"), "b.txt")
+        assert result.success is False
+        assert "T-1" in result.message
+
+        # PRD 中早已完成 (未在池中执行) 的依赖不受限制
+        assert run_task(pool, second, _task("T-3", "T-0"), "c.txt").success
+
+    def test_no_changes_counts_as_integrated(self, pool: WorktreePool) -> None:
+        (worktree, _) = pool.open()
+        pool.checkout(worktree, _task("T-1"))
+        assert pool.integrate(worktree, _task("T-1"), None).success
+        assert pool.integrated == ["T-1"]
+
+    def test_conflict_keeps_branch(self, repo: Path, pool: WorktreePool) -> None:
+        first, second = pool.open()
+        pool.checkout(first, _task("T-1"))
+        pool.checkout(second, _task("T-2"))
+        (first.path / "README.md").write_text("one\n", encoding="utf-8")
+        (second.path / "README.md").write_text("two\n", encoding="utf-8")
+        assert pool.integrate(first, _task("T-1"), first.git.auto_commit("T-1", "a").commit_hash).success
+
+        result = pool.integrate(second, _task("T-2"), second.git.auto_commit("T-2", "b").commit_hash)
+        assert result.success is False
+        assert pool.conflicted == ["axiom/T-2"]
+
+        pool.close()
+        assert run_git(repo, "branch", "--list", "axiom/*").split() == ["axiom/T-2"]
+        assert (repo / "README.md").read_text(encoding="utf-8") == "one\n"
+
+    def test_retain_keeps_uncommitted_work(self, repo: Path, pool: WorktreePool) -> None:
+        (worktree, _) = pool.open()
+        pool.checkout(worktree, _task("T-1"))
+        (worktree.path / "draft.txt").write_text("unfinished", encoding="utf-8")
+
+        kept = pool.retain(worktree)
+        assert kept == repo / ".git" / WORKTREE_DIR / "kept-T-1"
+        assert (kept / "draft.txt").read_text(encoding="utf-8") == "unfinished"
+        assert pool.retained == {"T-1": kept}
+
+        # 槽位原地重建，下一个任务不受影响
+        assert not (worktree.path / "draft.txt").exists()
+        assert run_task(pool, worktree, _task("T-2"), "b.txt").success
+
+        pool.close()
+        assert run_git(repo, "branch", "--list", "--format=%(refname:short)", "axiom/*").split() == ["axiom/T-1"]
+        assert (kept / "draft.txt").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
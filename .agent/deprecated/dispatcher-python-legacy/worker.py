@@ -3,14 +3,14 @@ worker.py — Worker 封装器 (T-101)
 
 封装 `codex exec --json --full-auto` 调用:
 - 子进程生命周期管理（启动 / 终止 / 超时）
-- JSONL 事件流的实时读取
+- JSONL 事件流的实时读取 (summary 属性为运行中的增量摘要)
 - 超时控制（默认 10 分钟，可配置 10/15/20 min）
 """
 
 from __future__ import annotations
 
-import json
 import logging
+import os
 import subprocess
 import threading
 import time
@@ -19,9 +19,13 @@ from pathlib import Path
 from typing import Callable
 
 from .core import JSONLEvent, TaskSpec, Timer, WorkerResult
+from .jsonl_parser import EventSummary, JSONLParser
 
 logger = logging.getLogger(__name__)
 
+# 实时摘要中保留的最近消息条数
+LIVE_SUMMARY_RETAINED = 50
+
 
 @dataclass
 class WorkerConfig:
@@ -50,12 +54,18 @@ class Worker:
         - 进程状态查询
     """
 
-    def __init__(self, config: WorkerConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: WorkerConfig | None = None,
+        parser: JSONLParser | None = None,
+    ) -> None:
         self.config = config or WorkerConfig()
+        self.parser = parser or JSONLParser()
         self._process: subprocess.Popen | None = None
         self._events: list[JSONLEvent] = []
         self._lock = threading.Lock()
         self._running = False
+        self.summary = EventSummary(max_retained=LIVE_SUMMARY_RETAINED)
 
     # ── 公开 API ────────────────────────────────────────────
 
@@ -84,23 +94,7 @@ class Worker:
         try:
             self._start_process(effective_prompt)
             events = self._collect_events(timeout=timeout, on_event=on_event)
-            success = self._check_success(events)
-            questions = self._extract_questions(events)
-            output = self._extract_output(events)
-            error_msg = self._extract_error(events)
-
-            duration = timer.stop()
-
-            return WorkerResult(
-                task_id=task.id,
-                success=success and not questions,
-                output=output,
-                events=events,
-                questions=questions,
-                duration_seconds=duration,
-                restart_count=0,
-                error_message=error_msg,
-            )
+            return self._result_from_events(task, events, timer.stop())
 
         except TimeoutError:
             duration = timer.stop()
@@ -108,31 +102,13 @@ class Worker:
             logger.warning(
                 "Task %s timed out after %.1f seconds", task.id, duration
             )
-            return WorkerResult(
-                task_id=task.id,
-                success=False,
-                output="",
-                events=list(self._events),
-                questions=[],
-                duration_seconds=duration,
-                restart_count=0,
-                error_message=f"Timeout after {timeout}s",
-            )
+            return self._failure_result(task, duration, f"Timeout after {timeout}s")
 
         except Exception as exc:
             duration = timer.stop()
             self.terminate()
             logger.error("Task %s failed with exception: %s", task.id, exc)
-            return WorkerResult(
-                task_id=task.id,
-                success=False,
-                output="",
-                events=list(self._events),
-                questions=[],
-                duration_seconds=duration,
-                restart_count=0,
-                error_message=str(exc),
-            )
+            return self._failure_result(task, duration, str(exc))
 
     def terminate(self) -> None:
         """强制终止 Worker 子进程。"""
@@ -192,24 +168,26 @@ class Worker:
         logger.info("Starting worker: %s", " ".join(cmd[:4]) + " ...")
         logger.debug("Working dir: %s", working_dir)
 
-        env = None
-        if self.config.env_vars:
-            import os
-            env = {**os.environ, **self.config.env_vars}
-
         self._process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             cwd=working_dir,
-            env=env,
+            env=self._process_env(),
             text=True,
             encoding="utf-8",
             errors="replace",
         )
         self._events = []
+        self.summary = EventSummary(max_retained=LIVE_SUMMARY_RETAINED)
         self._running = True
 
+    def _process_env(self) -> dict[str, str] | None:
+        """子进程环境变量 (None 表示继承当前环境)。"""
+        if not self.config.env_vars:
+            return None
+        return {**os.environ, **self.config.env_vars}
+
     def _collect_events(
         self,
         timeout: int,
@@ -245,6 +223,7 @@ class Worker:
                     with self._lock:
                         events.append(event)
                         self._events.append(event)
+                        self.parser.update_summary(self.summary, event)
                     if on_event:
                         try:
                             on_event(event)
@@ -269,17 +248,40 @@ class Worker:
         return events
 
     def _parse_jsonl_line(self, line: str) -> JSONLEvent | None:
-        """解析单条 JSONL 行。"""
-        try:
-            data = json.loads(line)
-            return JSONLEvent(
-                type=data.get("type", "unknown"),
-                timestamp=data.get("timestamp", time.time()),
-                content=data,
-            )
-        except json.JSONDecodeError:
-            logger.debug("Skipping non-JSON line: %s", line[:100])
-            return None
+        """解析单条 JSONL 行 (委托给 JSONLParser)。"""
+        return self.parser.parse_line(line)
+
+    def _result_from_events(
+        self,
+        task: TaskSpec,
+        events: list[JSONLEvent],
+        duration: float,
+    ) -> WorkerResult:
+        """根据完整事件流构建 WorkerResult。"""
+        questions = self._extract_questions(events)
+        return WorkerResult(
+            task_id=task.id,
+            success=self._check_success(events) and not questions,
+            output=self._extract_output(events),
+            events=events,
+            questions=questions,
+            duration_seconds=duration,
+            restart_count=0,
+            error_message=self._extract_error(events),
+        )
+
+    def _failure_result(self, task: TaskSpec, duration: float, message: str) -> WorkerResult:
+        """超时 / 异常时的失败结果 (保留已收到的事件)。"""
+        return WorkerResult(
+            task_id=task.id,
+            success=False,
+            output="",
+            events=list(self._events),
+            questions=[],
+            duration_seconds=duration,
+            restart_count=0,
+            error_message=message,
+        )
 
     def _check_success(self, events: list[JSONLEvent]) -> bool:
         """根据事件流判断任务是否成功完成。"""
@@ -0,0 +1,163 @@
+"""
+worktree_pool.py — 并发 Worker 的 git worktree 池
+
+并发调度时每个 Worker 需要独立的工作区，否则 `git add -A` 会把其他任务的改动
+一起提交。WorktreePool 预先创建固定数量的 worktree 并在任务间循环复用:
+
+    1. open():      在 .git/axiom-worktrees/slot-N 创建 N 个 worktree (已存在则复用)
+    2. checkout():  任务开始前把 worktree 切到任务分支 axiom/<任务ID>，
+                    起点为主仓库当前 HEAD (因此包含所有已合入的依赖任务)
+    3. integrate(): 任务提交后 cherry-pick 回主仓库；调度器只在依赖全部合入后
+                    才启动下游任务，合入顺序因此与依赖顺序一致
+    4. retain():    任务提交失败时把 worktree (含未提交的改动) 移到 kept-<任务ID>
+                    保留排查，并在原位置重建一个空 worktree，槽位继续可用
+    5. close():     删除池中的 worktree 与任务分支；cherry-pick 冲突或被保留的
+                    任务分支不删除
+
+磁盘占用上限为 N 份工作区加上被保留的失败任务，与成功任务的数量无关。
+
+使用方式:
+    pool = WorktreePool(GitOps(repo), size=4)
+    for worktree in pool.open():
+        ...                                # 为每个 worktree 创建 Worker
+    pool.checkout(worktree, task)          # 调度线程
+    ...                                    # Worker 在 worktree.path 中执行并提交
+    pool.integrate(worktree, task, commit) # 调度线程
+    pool.close()
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from .core import TaskSpec
+from .git_ops import GitOps, GitResult
+
+logger = logging.getLogger(__name__)
+
+WORKTREE_DIR = "axiom-worktrees"
+BRANCH_PREFIX = "axiom/"
+
+
+@dataclass
+class Worktree:
+    """池中的一个 worktree。"""
+    index: int
+    path: Path
+    git: GitOps
+    task_id: str | None = None  # 当前 (或最近一次) 分配的任务
+
+    @property
+    def branch(self) -> str | None:
+        return f"{BRANCH_PREFIX}{self.task_id}" if self.task_id else None
+
+
+class WorktreePool:
+    """固定大小、可循环复用的 worktree 池 (非线程安全，只在调度线程中使用)。"""
+
+    def __init__(
+        self,
+        git: GitOps,
+        size: int,
+        root: str | Path | None = None,
+    ) -> None:
+        """
+        Args:
+            git: 主仓库的 GitOps (任务提交将 cherry-pick 到这里)
+            size: worktree 数量
+            root: worktree 所在目录 (默认为主仓库共享 .git 目录下的 axiom-worktrees)
+        """
+        self.git = git
+        self.size = max(1, size)
+        self.root = Path(root) if root is not None else None
+        self.worktrees: list[Worktree] = []
+        self.integrated: list[str] = []  # 已合入主仓库的任务 (按合入顺序)
+        self.conflicted: list[str] = []  # cherry-pick 冲突而保留的任务分支
+        self.retained: dict[str, Path] = {}  # 任务 ID → 被保留的 worktree 路径
+        self._root: Path | None = None
+        self._branches: list[str] = []
+
+    # ── 公开 API ────────────────────────────────────────
+
+    def open(self) -> list[Worktree]:
+        """创建 (或复用上次遗留的) worktree。
+
+        Raises:
+            RuntimeError: 不在 Git 仓库中或 worktree 创建失败
+        """
+        if self.worktrees:
+            return list(self.worktrees)
+        root = self.root if self.root is not None else self.git.git_dir() / WORKTREE_DIR
+        self._root = root
+        self.git.prune_worktrees()  # 清理上次异常退出后失效的登记
+        try:
+            for i in range(self.size):
+                path = self.git.add_worktree(root / f"slot-{i}")
+                self.worktrees.append(Worktree(i, path, GitOps(path)))
+        except Exception:
+            self.close()
+            raise
+        logger.info("Worktree pool ready: %d worktrees in %s", len(self.worktrees), root)
+        return list(self.worktrees)
+
+    def checkout(self, worktree: Worktree, task: TaskSpec) -> None:
+        """把 worktree 切到任务分支，起点为主仓库当前 HEAD，并清除上个任务的残留文件。"""
+        worktree.task_id = task.id
+        self._branches.append(worktree.branch)
+        worktree.git.reset_to(self.git.get_head(), branch=worktree.branch)
+
+    def integrate(self, worktree: Worktree, task: TaskSpec, commit: str | None) -> GitResult:
+        """把任务分支上的提交 cherry-pick 回主仓库 (commit 为 None 表示任务没有改动)。"""
+        # 在池中执行过的依赖必须先合入 (PRD 中已是 DONE 的依赖不在此列)
+        started = {b.removeprefix(BRANCH_PREFIX) for b in self._branches}
+        missing = [d for d in task.dependencies if d in started and d not in self.integrated]
+        if missing:
+            return GitResult(
+                success=False,
+                message=f"Dependencies not integrated yet: {', '.join(missing)}",
+            )
+        if commit is None:
+            self.integrated.append(task.id)
+            return GitResult(success=True, message="No changes to integrate")
+
+        result = self.git.cherry_pick(commit)
+        if result.success:
+            self.integrated.append(task.id)
+        else:
+            self.conflicted.append(worktree.branch)
+            logger.warning("Task branch %s kept for inspection", worktree.branch)
+        return result
+
+    def retain(self, worktree: Worktree) -> Path:
+        """保留 worktree 当前内容以便排查，并在原路径重建空 worktree 供后续任务使用。
+
+        Returns:
+            被保留的 worktree 的新路径
+        """
+        assert self._root is not None and worktree.task_id is not None
+        worktree.git.close()  # 常驻 cat-file 进程的 cwd 即将被移走
+        target = self._root / f"kept-{worktree.task_id}"
+        suffix = 1
+        while target.exists():  # 上次调度保留的同名目录不覆盖
+            suffix += 1
+            target = self._root / f"kept-{worktree.task_id}-{suffix}"
+        kept = self.git.move_worktree(worktree.path, target)
+        self.retained[worktree.task_id] = kept
+        self.git.add_worktree(worktree.path)
+        logger.warning("Task %s worktree kept at %s (branch %s)", worktree.task_id, kept, worktree.branch)
+        return kept
+
+    def close(self) -> None:
+        """删除池中的 worktree 与任务分支 (cherry-pick 冲突或被保留的分支除外)。"""
+        for worktree in self.worktrees:
+            worktree.git.close()
+            self.git.timings.merge(worktree.git.timings)
+            self.git.remove_worktree(worktree.path)
+        self.worktrees = []
+        kept = set(self.conflicted) | {f"{BRANCH_PREFIX}{task_id}" for task_id in self.retained}
+        branches = [b for b in dict.fromkeys(self._branches) if b not in kept]
+        if branches:
+            self.git.delete_branches(branches)
+        self._branches = []
@@ -1,2 +1,11 @@
 # Evolution Engine - Agent 自进化引擎
 # Phase 2: Knowledge Harvester, Pattern Detector, Reflection, Metrics
+
+import sys
+from pathlib import Path
+
+# evolution 模块共用 .agent/memory 下的 context_doc 等共享模块
+# (scripts/ 布局中它们与 evolution/ 同级，已在 sys.path 上)
+_MEMORY_DIR = Path(__file__).resolve().parents[1] / "memory"
+if _MEMORY_DIR.is_dir() and str(_MEMORY_DIR) not in sys.path:
+    sys.path.insert(0, str(_MEMORY_DIR))
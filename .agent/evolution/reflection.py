@@ -23,6 +23,12 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+from evolution.action_items import ActionItemTracker
+from context_doc import load_document  # evolution/__init__.py 已将 .agent/memory 加入 sys.path
+
+SESSION_HEADER = re.compile(r"^### (\d{4}-\d{2}-\d{2}) Session: (.+)$")
+TAIL_BLOCK_SIZE = 8192
+
 
 @dataclass
 class ReflectionReport:
@@ -89,6 +95,7 @@ class ReflectionEngine:
         self.base_dir = Path(base_dir)
         self.active_context = self.base_dir / "active_context.md"
         self.reflection_log = self.base_dir / "evolution" / "reflection_log.md"
+        self.action_items = ActionItemTracker(self.base_dir)
 
     # ── Public API ──
 
@@ -147,20 +154,25 @@ class ReflectionEngine:
             action_items=action_items or [],
         )
 
+        # 先追平外部对日志的修改，写入后只需增量登记本次 Action Items
+        self.action_items.sync()
         self._append_to_log(report)
         self._update_stats(report)
+        self._track_action_items(report)
 
         return report
 
     def parse_active_context(self) -> dict:
         """解析 active_context.md，提取任务完成统计"""
-        if not self.active_context.exists():
+        doc = load_document(self.active_context)
+        if not doc.exists:
             return {"completed": 0, "total": 0}
 
-        text = self.active_context.read_text(encoding="utf-8")
-        completed = len(re.findall(r"\[✅ DONE\]", text))
-        pending = len(re.findall(r"\[⏳ PENDING\]", text))
-        blocked = len(re.findall(r"\[🔴 BLOCKED\]", text))
+        counts = doc.task_counts()
+        completed = counts["DONE"]
+        pending = counts["PENDING"]
+        blocked = counts["BLOCKED"]
+        # total 只统计以上三种状态 (IN_PROGRESS / FAILED 不计入完成率的分母)
         total = completed + pending + blocked
 
         return {
@@ -171,33 +183,30 @@ class ReflectionEngine:
         }
 
     def get_pending_action_items(self) -> list[str]:
-        """从反思日志中提取未完成的 Action Items"""
-        if not self.reflection_log.exists():
-            return []
+        """获取未完成的 Action Items (来自 action_items 索引，仅在日志变化时重扫)"""
+        return [item.text for item in self.action_items.pending()]
 
-        text = self.reflection_log.read_text(encoding="utf-8")
-        items = re.findall(r"- \[ \] (.+)", text)
-        return items
+    def resolve_action_item(self, text_or_key: str) -> bool:
+        """将 Action Item 标记为已解决"""
+        return self.action_items.resolve(text_or_key)
 
     def get_reflection_summary(self, last_n: int = 5) -> str:
-        """获取最近 N 次反思的摘要"""
+        """获取最近 N 次反思的摘要 (从日志尾部反向读取，读够即停)"""
         if not self.reflection_log.exists():
             return "暂无反思记录"
 
-        text = self.reflection_log.read_text(encoding="utf-8")
-        # 提取 session headers
-        sessions = re.findall(
-            r"### (\d{4}-\d{2}-\d{2}) Session: (.+?)(?=\n###|\Z)",
-            text,
-            re.DOTALL,
-        )
+        sessions: list[tuple[str, str]] = []
+        for line in self._iter_lines_reversed():
+            match = SESSION_HEADER.match(line)
+            if match:
+                sessions.append((match.group(1), match.group(2).strip()))
+                if len(sessions) >= last_n:
+                    break
         if not sessions:
             return "暂无反思记录"
 
-        lines = [f"最近 {min(last_n, len(sessions))} 次反思:\n"]
-        for date, content in sessions[-last_n:]:
-            # 提取 session name
-            name = content.split("\n")[0].strip()
+        lines = [f"最近 {len(sessions)} 次反思:\n"]
+        for date, name in reversed(sessions):
             lines.append(f"- {date}: {name}")
 
         return "\n".join(lines)
@@ -223,6 +232,31 @@ class ReflectionEngine:
 
         self.reflection_log.write_text(text, encoding="utf-8")
 
+    def _track_action_items(self, report: ReflectionReport) -> None:
+        """将本次报告的 Action Items 写入索引，并记录日志签名避免重扫"""
+        if not self.reflection_log.exists():
+            return
+
+        self.action_items.add(report.action_items, session=report.session_name, date=report.date)
+        self.action_items.mark_synced()
+
+    def _iter_lines_reversed(self):
+        """按块从文件尾部向前读取，逐行产出 (最后一行最先产出)"""
+        with open(self.reflection_log, "rb") as f:
+            f.seek(0, 2)
+            pos = f.tell()
+            remainder = b""
+            while pos > 0:
+                size = min(TAIL_BLOCK_SIZE, pos)
+                pos -= size
+                f.seek(pos)
+                chunk = f.read(size) + remainder
+                parts = chunk.split(b"\n")
+                remainder = parts[0]
+                for raw in reversed(parts[1:]):
+                    yield raw.decode("utf-8", errors="replace").rstrip("\r")
+            yield remainder.decode("utf-8", errors="replace").rstrip("\r")
+
     def _update_stats(self, report: ReflectionReport) -> None:
         """更新反思统计"""
         if not self.reflection_log.exists():
@@ -0,0 +1,61 @@
+"""
+deadline_scheduler.py — 按 key 去重的截止时间最小堆
+
+session_watchdog (事件驱动模式) 与 watchdog_daemon 共用: 每个被监控文件
+至多一个有效截止时间，进程只休眠到最近的截止时间。
+
+Usage:
+    from deadline_scheduler import DeadlineScheduler
+    scheduler = DeadlineScheduler()
+    scheduler.schedule("a", time.time() + 30)
+    scheduler.next_time()           # 最近的截止时间
+    scheduler.pop_due(time.time())  # 已到期的 key
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+
+
+class DeadlineScheduler:
+    """
+    最小堆定时器: 每个 key 至多一个有效截止时间。
+
+    重新调度时不从堆中删除旧条目，而是递增 key 的代号 (generation)，
+    旧条目在弹出时被丢弃 (惰性删除)，调度 / 取消均为 O(log n)。
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._generation: dict[str, int] = {}
+        self._seq = itertools.count()
+
+    def schedule(self, key: str, when: float) -> None:
+        generation = self._generation.get(key, 0) + 1
+        self._generation[key] = generation
+        heapq.heappush(self._heap, (when, next(self._seq), key, generation))
+
+    def cancel(self, key: str) -> None:
+        self._generation[key] = self._generation.get(key, 0) + 1
+
+    def next_time(self) -> float | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[str]:
+        due = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            _, _, key, _ = heapq.heappop(self._heap)
+            self._generation[key] += 1
+            due.append(key)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._heap[0][3] != self._generation.get(self._heap[0][2]):
+            heapq.heappop(self._heap)
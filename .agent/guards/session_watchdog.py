@@ -10,11 +10,15 @@ session_watchdog.py — Session 看门狗 (T-303)
     - Windows / Unix 跨平台
     - 后台运行模式
     - 优雅退出 (Ctrl+C)
+    - 事件驱动模式 (--event): inotify 监听文件变更 (不可用时回退轮询)，
+      按精确的超时截止时间休眠，单进程可同时监控多个项目 (--project)
+    - 大量项目 (glob / socket 告警 / 资源占用报告) 见 watchdog_daemon.py
 
 Usage:
     python .agent/guards/session_watchdog.py
     python .agent/guards/session_watchdog.py --timeout 20 --interval 3
     python .agent/guards/session_watchdog.py --once  # 单次检查模式
+    python .agent/guards/session_watchdog.py --event --project ~/a --project ~/b
 """
 
 from __future__ import annotations
@@ -23,6 +27,7 @@ import argparse
 import os
 import signal
 import sys
+import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -56,6 +61,7 @@ class SessionWatchdog:
         timeout_minutes: int = DEFAULT_TIMEOUT_MINUTES,
         check_interval_minutes: int = DEFAULT_CHECK_INTERVAL_MINUTES,
         context_path: str | Path | None = None,
+        extra_context_paths: list[str | Path] | None = None,
     ) -> None:
         self.timeout_seconds = timeout_minutes * 60
         self.check_interval_seconds = check_interval_minutes * 60
@@ -68,6 +74,9 @@ class SessionWatchdog:
         else:
             self.context_file = self._find_context_file()
 
+        # 事件驱动模式下同时监控的其他项目
+        self.context_files = [self.context_file] + [Path(p) for p in extra_context_paths or []]
+
     def _find_context_file(self) -> Path:
         """从当前目录向上查找 .agent/memory/active_context.md"""
         current = Path.cwd()
@@ -80,14 +89,16 @@ class SessionWatchdog:
         # 回退到相对路径
         return Path(CONTEXT_RELATIVE_PATH)
 
-    def check_once(self) -> dict:
+    def check_once(self, context_file: Path | None = None) -> dict:
         """
         单次检查 active_context.md 的状态。
         
         Returns:
-            dict with keys: exists, stale, last_modified, age_minutes, message
+            dict with keys: file, exists, stale, last_modified, age_minutes, message
         """
+        context_file = context_file or self.context_file
         result = {
+            "file": str(context_file),
             "exists": False,
             "stale": False,
             "last_modified": None,
@@ -95,14 +106,14 @@ class SessionWatchdog:
             "message": "",
         }
 
-        if not self.context_file.exists():
-            result["message"] = f"❌ 文件不存在: {self.context_file}"
+        if not context_file.exists():
+            result["message"] = f"❌ 文件不存在: {context_file}"
             return result
 
         result["exists"] = True
 
         # 获取最后修改时间
-        mtime = os.path.getmtime(self.context_file)
+        mtime = os.path.getmtime(context_file)
         last_modified = datetime.fromtimestamp(mtime)
         age_seconds = time.time() - mtime
         age_minutes = int(age_seconds / 60)
@@ -128,6 +139,10 @@ class SessionWatchdog:
     def _print_alert(self, check_result: dict) -> None:
         """打印告警信息。"""
         now = datetime.now().strftime("%H:%M:%S")
+        message = check_result["message"]
+        if len(self.context_files) > 1 and check_result.get("file"):
+            # 多项目模式: 标注项目目录 (<project>/.agent/memory/active_context.md)
+            message = f"[{Path(check_result['file']).resolve().parents[2].name}] {message}"
 
         if check_result["stale"]:
             self._alert_count += 1
@@ -136,7 +151,7 @@ class SessionWatchdog:
             print(f"\n{'=' * 60}")
             print(f"{Colors.YELLOW}{Colors.BOLD}")
             print(f"  {severity} [{now}] SESSION WATCHDOG ALERT #{self._alert_count}")
-            print(f"  {check_result['message']}")
+            print(f"  {message}")
             print(f"")
             print(f"  💡 建议操作:")
             print(f"     1. 执行 /suspend 保存当前状态")
@@ -147,7 +162,7 @@ class SessionWatchdog:
         else:
             print(
                 f"  {Colors.GREEN}[{now}]{Colors.RESET} "
-                f"{check_result['message']}"
+                f"{message}"
             )
 
     def run(self) -> None:
@@ -175,10 +190,90 @@ class SessionWatchdog:
 
         print(f"\n{Colors.CYAN}  🐕 Watchdog 已停止。共发出 {self._alert_count} 次告警。{Colors.RESET}")
 
+    def next_deadline(self, context_file: Path, now: float | None = None) -> float:
+        """
+        下一次需要检查的时间点 (time.time() 时间戳)。
+
+        文件存在时为 mtime + 超时阈值 (精确的过期时刻)；
+        文件缺失时按检查间隔重试。
+        """
+        now = time.time() if now is None else now
+        try:
+            return os.path.getmtime(context_file) + self.timeout_seconds
+        except OSError:
+            return now + self.check_interval_seconds
+
+    def run_event_driven(
+        self,
+        stop: threading.Event | None = None,
+        backend: str = "auto",
+        on_result=None,
+    ) -> None:
+        """
+        事件驱动监控: 不做固定间隔轮询。
+
+        每个文件维护一个截止时间 (mtime + 超时阈值，存于 DeadlineScheduler
+        最小堆)，进程休眠到最近的截止时间或文件变更事件到来为止；
+        文件被更新时直接顺延截止时间。
+        已过期的文件按检查间隔重复提醒，直到再次被更新。
+
+        Args:
+            stop: 停止信号 (None 表示直到 Ctrl+C / SIGTERM)
+            backend: 文件监听后端 "auto" | "inotify" | "polling"
+            on_result: 回调 (check_once 结果)，默认打印告警
+        """
+        _guards_dir = str(Path(__file__).resolve().parent)
+        if _guards_dir not in sys.path:
+            sys.path.insert(0, _guards_dir)
+        from fs_watch import ChangeWatcher
+        from deadline_scheduler import DeadlineScheduler
+
+        on_result = on_result or self._print_alert
+        files = {str(f.resolve()): f for f in self.context_files}
+        scheduler = DeadlineScheduler()
+        for key, f in files.items():
+            scheduler.schedule(key, self.next_deadline(f))
+        stale: set[str] = set()
+
+        if stop is None:
+            signal.signal(signal.SIGINT, self._interrupt)
+            if hasattr(signal, "SIGTERM"):
+                signal.signal(signal.SIGTERM, self._interrupt)
+
+        with ChangeWatcher(list(files), debounce=0.05, backend=backend) as watcher:
+            try:
+                while self._running and (stop is None or not stop.is_set()):
+                    now = time.time()
+                    for key in scheduler.pop_due(now):
+                        result = self.check_once(files[key])
+                        on_result(result)
+                        if result["stale"] or not result["exists"]:
+                            stale.add(key)
+                            scheduler.schedule(key, now + self.check_interval_seconds)
+                        else:
+                            stale.discard(key)
+                            scheduler.schedule(key, self.next_deadline(files[key], now))
+
+                    wait = max(0.0, scheduler.next_time() - time.time())
+                    if stop is not None:
+                        wait = min(wait, 0.5)   # 定期检查停止信号
+                    for key in {str(p) for p in watcher.wait(timeout=wait)} & files.keys():
+                        scheduler.schedule(key, self.next_deadline(files[key]))
+                        if key in stale:
+                            stale.discard(key)
+                            on_result(self.check_once(files[key]))
+            except KeyboardInterrupt:
+                pass
+
     def _handle_signal(self, signum: int, frame) -> None:
         """优雅退出。"""
         self._running = False
 
+    def _interrupt(self, signum: int, frame) -> None:
+        """事件驱动模式下的退出: 打断阻塞中的等待。"""
+        self._running = False
+        raise KeyboardInterrupt
+
 
 # ── CLI 入口 ──────────────────────────────────────────
 
@@ -221,6 +316,17 @@ def main() -> None:
         action="store_true",
         help="单次检查模式 (不循环)",
     )
+    parser.add_argument(
+        "--event",
+        action="store_true",
+        help="事件驱动模式 (inotify 监听 + 精确截止时间，不可用时回退轮询)",
+    )
+    parser.add_argument(
+        "--project",
+        action="append",
+        default=[],
+        help="额外监控的项目根目录 (可重复，需配合 --event)",
+    )
 
     args = parser.parse_args()
 
@@ -228,12 +334,20 @@ def main() -> None:
         timeout_minutes=args.timeout,
         check_interval_minutes=args.interval,
         context_path=args.context,
+        extra_context_paths=[Path(p) / CONTEXT_RELATIVE_PATH for p in args.project],
     )
 
     if args.once:
-        result = watchdog.check_once()
-        print(result["message"])
-        sys.exit(1 if result["stale"] else 0)
+        results = [watchdog.check_once(f) for f in watchdog.context_files]
+        for result in results:
+            print(result["message"])
+        sys.exit(1 if any(r["stale"] for r in results) else 0)
+    elif args.event:
+        print(f"{Colors.CYAN}  🐕 Watchdog (event-driven) 监控 {len(watchdog.context_files)} 个项目，按 Ctrl+C 停止{Colors.RESET}")
+        for path in watchdog.context_files:
+            print(f"     - {path}")
+        watchdog.run_event_driven()
+        print(f"\n{Colors.CYAN}  🐕 Watchdog 已停止。共发出 {watchdog._alert_count} 次告警。{Colors.RESET}")
     else:
         watchdog.run()
 
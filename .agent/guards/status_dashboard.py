@@ -9,21 +9,164 @@ Usage:
     dashboard = StatusDashboard(base_dir=".agent")
     print(dashboard.generate())
     
+生成分两阶段: 先由线程池并发加载全部数据源 (文件读取 / git tag 子进程 /
+.git/hooks 查找)，再由各区块共享同一份加载结果渲染，每个数据源只读取一次。
+
 CLI:
     python .agent/guards/status_dashboard.py
+    python .agent/guards/status_dashboard.py --timings
+    python .agent/guards/status_dashboard.py --watch [--jsonl]
+    python .agent/guards/status_dashboard.py --json
+    python .agent/guards/status_dashboard.py --serve [--port 8765]
+
+--watch 监听 .agent/memory 与 .agent/config (Linux 用 inotify，其他平台轮询)，
+防抖合并突发写入后只重新渲染受影响的区块。
+--serve 提供 JSON / Markdown 端点，支持 ETag + If-None-Match (未变化时返回 304)。
 """
 
 from __future__ import annotations
 
-import os
 import re
 import sys
+import time
+import json
+import hashlib
+import argparse
+import threading
+import contextlib
 import subprocess
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+# 以脚本方式运行时只有 guards/ 在 sys.path 上；context_doc 位于 .agent/memory
+# (scripts/ 下的副本与其同级)
+_MEMORY_DIR = Path(__file__).resolve().parents[1] / "memory"
+if _MEMORY_DIR.is_dir() and str(_MEMORY_DIR) not in sys.path:
+    sys.path.insert(0, str(_MEMORY_DIR))
+
+# fs_watch 与本文件同级 (guards/ 或 scripts/)
+_GUARDS_DIR = Path(__file__).resolve().parent
+if str(_GUARDS_DIR) not in sys.path:
+    sys.path.insert(0, str(_GUARDS_DIR))
+
+from context_budget import import_get_config
+from context_doc import ContextDocument, load_document
+from fs_watch import ChangeWatcher
+
+
+@dataclass
+class DashboardSources:
+    """一次加载阶段得到的全部数据源 (各区块共享，只读)。"""
+    context: ContextDocument
+    context_mtime: float | None = None
+    knowledge_base: str = ""
+    pattern_library: str = ""
+    learning_queue: str = ""
+    reflection_log: str = ""
+    workflow_metrics: str = ""
+    active_provider: str = "gemini"
+    git_hooks_dir: Path = Path(".git/hooks")
+    last_checkpoint: str = "N/A"
+    timings: dict[str, float] = field(default_factory=dict)  # 数据源 → 耗时 (ms)
+
+
+# ── 结构化快照 (collect() / --json / HTTP) ──────────────
+
+@dataclass
+class SystemState:
+    status: str
+    session: str
+    provider: str
+    last_checkpoint: str
+    context_age_min: int | None = None
+
+
+@dataclass
+class TaskProgress:
+    tasks: dict[str, list[str]]   # 状态 → 任务 ID 列表
+    total: int = 0
+    done: int = 0
+    percent: int = 0
+
+
+@dataclass
+class EvolutionStats:
+    knowledge_items: int = 0
+    knowledge_categories: dict[str, int] = field(default_factory=dict)
+    active_patterns: int = 0
+    candidate_patterns: int = 0
+    learning_pending: int = 0
+    learning_processed: int = 0
+    reflections: int = 0
+    last_reflection: str = "N/A"
+
+
+@dataclass
+class ReflectionEntry:
+    date: str
+    session: str
+    learning: str
+
+
+@dataclass
+class WorkflowStat:
+    name: str
+    runs: int = 0
+    avg_duration_min: int | None = None
+    success_rate: float | None = None   # 0.0 ~ 1.0
+    last_run: str | None = None
+
+
+@dataclass
+class GuardStatus:
+    pre_commit: bool
+    post_commit: bool
+    watchdog_running: bool
+    last_checkpoint: str
+
+
+@dataclass
+class DashboardSnapshot:
+    """仪表盘结构化快照。"""
+    generated_at: str
+    etag: str
+    state: SystemState
+    progress: TaskProgress
+    evolution: EvolutionStats
+    reflections: list[ReflectionEntry]
+    workflows: list[WorkflowStat]
+    total_workflow_runs: int
+    guards: GuardStatus
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def to_json(self, indent: int | None = None) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+
+# 数据源名称 → DashboardSources 字段 (同名的不列出)
+_SOURCE_FIELDS = {
+    "active_context": "context",
+    "agent_config": "active_provider",
+    "git_hooks": "git_hooks_dir",
+    "git_tag": "last_checkpoint",
+}
+
+# 区块 → 依赖的数据源 (watch 模式据此只重新渲染受影响的区块)
+SECTION_SOURCES: dict[str, tuple[str, ...]] = {
+    "system_state": ("active_context", "agent_config"),
+    "task_progress": ("active_context",),
+    "evolution_stats": ("knowledge_base", "pattern_library", "learning_queue", "reflection_log"),
+    "recent_reflections": ("reflection_log",),
+    "workflow_metrics": ("workflow_metrics",),
+    "guard_status": ("git_hooks", "git_tag"),
+}
+
 
 class StatusDashboard:
     """系统仪表盘生成器。"""
@@ -35,93 +178,403 @@ class StatusDashboard:
         self.config_dir = self.base_dir / "config"
         self.knowledge_dir = self.memory_dir / "knowledge"
 
+        self.timings: dict[str, float] = {}
+
     # ── 主入口 ──────────────────────────────────────────
 
     def generate(self) -> str:
         """生成完整仪表盘 Markdown。"""
-        sections = [
-            self._header(),
-            self._system_state(),
-            self._task_progress(),
-            self._evolution_stats(),
-            self._recent_reflections(),
-            self._workflow_metrics(),
-            self._guard_status(),
-            self._footer(),
+        started = time.perf_counter()
+        src = self.load_sources()
+        load_ms = (time.perf_counter() - started) * 1000
+
+        render_started = time.perf_counter()
+        output = self.compose(self.render_sections(src))
+        render_ms = (time.perf_counter() - render_started) * 1000
+
+        self.timings = {
+            **src.timings,
+            "load": load_ms,
+            "render": render_ms,
+            "total": (time.perf_counter() - started) * 1000,
+        }
+        return output
+
+    def load_sources(
+        self,
+        only: set[str] | None = None,
+        previous: DashboardSources | None = None,
+    ) -> DashboardSources:
+        """并发加载数据源。
+
+        文件读取与 git 子进程均为 I/O 等待，线程池可让它们重叠执行；
+        总耗时约等于最慢的单个数据源 (通常是 git tag)。
+        指定 only 时只重新加载这些数据源，其余沿用 previous。
+        """
+        loaders = {
+            "active_context": lambda: load_document(self.memory_dir / "active_context.md"),
+            "knowledge_base": lambda: self._read_file(self.evolution_dir / "knowledge_base.md"),
+            "pattern_library": lambda: self._read_file(self.evolution_dir / "pattern_library.md"),
+            "learning_queue": lambda: self._read_file(self.evolution_dir / "learning_queue.md"),
+            "reflection_log": self._read_reflection_log,
+            "workflow_metrics": lambda: self._read_file(self.evolution_dir / "workflow_metrics.md"),
+            "agent_config": self._read_active_provider,
+            "git_hooks": self._find_git_hooks_dir,
+            "git_tag": self._get_last_checkpoint,
+        }
+        if previous is None:
+            only = None
+        elif only is not None:
+            loaders = {name: fn for name, fn in loaders.items() if name in only}
+        timings: dict[str, float] = {}
+
+        def timed(name: str, loader):
+            t0 = time.perf_counter()
+            try:
+                return loader()
+            finally:
+                timings[name] = (time.perf_counter() - t0) * 1000
+
+        with ThreadPoolExecutor(max_workers=max(1, len(loaders))) as pool:
+            futures = {name: pool.submit(timed, name, fn) for name, fn in loaders.items()}
+            results = {name: f.result() for name, f in futures.items()}
+
+        if previous is None:
+            src = DashboardSources(context=results["active_context"])
+        else:
+            src = replace(previous)
+        for name, value in results.items():
+            if name == "active_context":
+                src.context = value
+                src.context_mtime = value.mtime_ns / 1e9 if value.exists else None
+            else:
+                setattr(src, _SOURCE_FIELDS.get(name, name), value)
+        src.timings = timings
+        return src
+
+    def render_sections(
+        self,
+        src: DashboardSources,
+        names=None,
+    ) -> dict[str, str]:
+        """渲染指定区块 (默认全部)，按仪表盘顺序返回 {区块名: Markdown}。"""
+        wanted = SECTION_SOURCES if names is None else set(names)
+        return {
+            name: getattr(self, f"_{name}")(src)
+            for name in SECTION_SOURCES
+            if name in wanted
+        }
+
+    def compose(self, sections: dict[str, str]) -> str:
+        """拼接页眉、各区块与页脚。"""
+        return "\n".join([self._header(), *sections.values(), self._footer()])
+
+    def watched_paths(self) -> list[Path]:
+        """watch 模式监听的目录。"""
+        return [d for d in (self.memory_dir, self.config_dir) if d.is_dir()]
+
+    def sources_for(self, changed) -> set[str]:
+        """将变更的文件路径映射为数据源名称。
+
+        变更中含监听目录本身 (inotify 队列溢出，具体文件未知) 时返回全部数据源。
+        """
+        changed = [Path(p) for p in changed]
+        roots = {d.resolve() for d in self.watched_paths()}
+        if any(p in roots for p in changed):
+            return {name for deps in SECTION_SOURCES.values() for name in deps}
+        files = {
+            "active_context.md": "active_context",
+            "knowledge_base.md": "knowledge_base",
+            "pattern_library.md": "pattern_library",
+            "learning_queue.md": "learning_queue",
+            "reflection_log.md": "reflection_log",
+            "workflow_metrics.md": "workflow_metrics",
+            "agent_config.md": "agent_config",
+        }
+        return {files[p.name] for p in changed if p.name in files}
+
+    def watch(
+        self,
+        on_update,
+        debounce: float = 0.2,
+        stop: threading.Event | None = None,
+        backend: str = "auto",
+    ) -> None:
+        """
+        监听数据源变更并增量刷新。
+
+        首次调用 on_update 时携带全部区块；之后每批变更只重新加载受影响的
+        数据源并只重新渲染依赖它们的区块。stop 被 set 后返回。
+
+        Parameters
+        ----------
+        on_update : Callable[[dict[str, str], list[str]], None]
+            回调 (当前全部区块, 本次重新渲染的区块名)
+        debounce : float
+            合并突发写入的静默窗口 (秒)
+        stop : threading.Event | None
+            停止信号 (None 表示一直运行)
+        backend : str
+            "auto" | "inotify" | "polling"
+        """
+        with ChangeWatcher(self.watched_paths(), debounce=debounce, backend=backend) as watcher:
+            src = self.load_sources()
+            rendered = self.render_sections(src)
+            on_update(dict(rendered), list(rendered))
+
+            while stop is None or not stop.is_set():
+                changed = watcher.wait(timeout=0.5 if stop is not None else None)
+                names = self.sources_for(changed)
+                if not names:
+                    continue
+                src = self.load_sources(only=names, previous=src)
+                dirty = [s for s, deps in SECTION_SOURCES.items() if names & set(deps)]
+                rendered.update(self.render_sections(src, dirty))
+                on_update(dict(rendered), dirty)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+        """
+        创建本地 HTTP 服务 (调用方负责 serve_forever / shutdown)。
+
+        GET /status.json → collect() 快照；GET /status.md 或 / → Markdown 仪表盘。
+        响应携带基于数据源 mtime 的 ETag，请求头 If-None-Match 命中时
+        只做一次 stat 扫描即返回 304，不读取任何文件。
+        """
+        dashboard = self
+        cache: dict[str, tuple[str, bytes]] = {}
+        cache_lock = threading.Lock()
+
+        def render(kind: str, etag: str) -> bytes:
+            with cache_lock:
+                hit = cache.get(kind)
+            if hit and hit[0] == etag:
+                return hit[1]
+            if kind == "json":
+                snapshot = dashboard.collect()
+                snapshot.etag = etag
+                body = snapshot.to_json().encode("utf-8")
+            else:
+                body = dashboard.generate().encode("utf-8")
+            with cache_lock:
+                cache[kind] = (etag, body)
+            return body
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                route = self.path.split("?", 1)[0]
+                routes = {
+                    "/status.json": ("json", "application/json; charset=utf-8"),
+                    "/status.md": ("md", "text/markdown; charset=utf-8"),
+                    "/": ("md", "text/markdown; charset=utf-8"),
+                }
+                if route not in routes:
+                    self.send_error(404)
+                    return
+                kind, content_type = routes[route]
+                etag = dashboard.etag()
+                if etag in _parse_etags(self.headers.get("If-None-Match", "")):
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                body = render(kind, etag)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return ThreadingHTTPServer((host, port), Handler)
+
+    def format_timings(self) -> str:
+        """最近一次 generate() 的耗时明细 (Markdown 表格)。"""
+        lines = [
+            "## ⏱️ Timings\n",
+            "| Source | ms |",
+            "|--------|----|",
+        ]
+        phases = ("load", "render", "total")
+        for name, ms in sorted(self.timings.items(), key=lambda kv: -kv[1]):
+            if name not in phases:
+                lines.append(f"| {name} | {ms:.1f} |")
+        for name in phases:
+            if name in self.timings:
+                lines.append(f"| **{name}** | {self.timings[name]:.1f} |")
+        return "\n".join(lines)
+
+    # ── 结构化数据 ──────────────────────────────────────
+
+    def collect(self, src: DashboardSources | None = None) -> DashboardSnapshot:
+        """采集结构化快照 (与 Markdown 仪表盘同源同语义)。"""
+        etag = self.etag()
+        src = src or self.load_sources()
+        workflows, total_runs = self._collect_workflows(src)
+        return DashboardSnapshot(
+            generated_at=datetime.now().isoformat(timespec="seconds"),
+            etag=etag,
+            state=self._collect_state(src),
+            progress=self._collect_progress(src),
+            evolution=self._collect_evolution(src),
+            reflections=self._collect_reflections(src),
+            workflows=workflows,
+            total_workflow_runs=total_runs,
+            guards=self._collect_guards(src),
+        )
+
+    def source_signature(self) -> list[tuple[str, int, int]]:
+        """全部数据源文件的 (路径, mtime_ns, size)，只做 stat 不读内容。"""
+        git_dir = self._find_git_hooks_dir().parent
+        paths = [
+            self.memory_dir / "active_context.md",
+            self.evolution_dir / "knowledge_base.md",
+            self.evolution_dir / "pattern_library.md",
+            self.evolution_dir / "learning_queue.md",
+            self.evolution_dir / "reflection_log.md",
+            self.memory_dir / "reflection_log.md",
+            self.evolution_dir / "workflow_metrics.md",
+            self.config_dir / "agent_config.md",
+            git_dir / "hooks" / "pre-commit",
+            git_dir / "hooks" / "post-commit",
+            git_dir / "packed-refs",
+            git_dir / "refs" / "tags",
         ]
-        return "\n".join(sections)
+        signature = []
+        for path in paths:
+            try:
+                st = path.stat()
+                signature.append((str(path), st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append((str(path), 0, -1))
+        return signature
+
+    def etag(self) -> str:
+        """基于数据源 mtime 的 ETag (任一数据源变化即改变)。"""
+        digest = hashlib.sha1(repr(self.source_signature()).encode("utf-8")).hexdigest()
+        return f'"{digest[:16]}"'
+
+    def _collect_state(self, src: DashboardSources) -> SystemState:
+        ctx = src.context.frontmatter
+        age = None
+        if src.context_mtime is not None:
+            age = int((datetime.now().timestamp() - src.context_mtime) / 60)
+        return SystemState(
+            status=ctx.get("task_status", "UNKNOWN"),
+            session=ctx.get("session_id", "N/A"),
+            provider=src.active_provider,
+            last_checkpoint=ctx.get("last_checkpoint", "N/A"),
+            context_age_min=age,
+        )
+
+    def _collect_progress(self, src: DashboardSources) -> TaskProgress:
+        # 任务行语义由 context_doc 统一解析，兼容两种格式:
+        # 1) [✅ DONE] T-123
+        # 2) - [x] **[DONE]** T-MW-001: ...
+        buckets = src.context.tasks_by_status()
+        tasks = {status: [t.task_id for t in items] for status, items in buckets.items()}
+        total = sum(len(ids) for ids in tasks.values())
+        done = len(tasks["DONE"])
+        return TaskProgress(
+            tasks=tasks,
+            total=total,
+            done=done,
+            percent=int(done / total * 100) if total > 0 else 0,
+        )
+
+    def _collect_evolution(self, src: DashboardSources) -> EvolutionStats:
+        # 知识库统计
+        kb_content = src.knowledge_base
+        categories = re.findall(r"\|\s*(architecture|debugging|pattern|workflow|tooling)\s*\|\s*(\d+)\s*\|", kb_content)
+
+        # 模式库 / 学习队列 / 反思
+        pl_content = src.pattern_library
+        lq_content = src.learning_queue
+        rl_content = src.reflection_log
+        return EvolutionStats(
+            knowledge_items=len(re.findall(r"\|\s*k-\d+\s*\|", kb_content)),
+            knowledge_categories={c: int(n) for c, n in categories},
+            active_patterns=len(re.findall(r"Status:\s*ACTIVE", pl_content, re.IGNORECASE)),
+            candidate_patterns=len(re.findall(r"Status:\s*CANDIDATE", pl_content, re.IGNORECASE)),
+            learning_pending=len(re.findall(r"\|\s*pending\s*\|", lq_content, re.IGNORECASE)),
+            learning_processed=len(re.findall(r"\|\s*processed\s*\|", lq_content, re.IGNORECASE)),
+            reflections=len(re.findall(r"^##\s+\d{4}-\d{2}-\d{2}\b", rl_content, re.MULTILINE)),
+            last_reflection=self._get_last_reflection_date(rl_content),
+        )
+
+    def _collect_reflections(self, src: DashboardSources, last_n: int = 5) -> list[ReflectionEntry]:
+        rl_content = src.reflection_log
+        sessions = re.findall(r"##\s+(\d{4}-\d{2}-\d{2})\s+(.+?)(?:\n|$)", rl_content)
+        return [
+            ReflectionEntry(date, name.strip(), self._extract_learning(rl_content, date))
+            for date, name in sessions[-last_n:]
+        ]
+
+    def _collect_workflows(self, src: DashboardSources) -> tuple[list[WorkflowStat], int]:
+        wm_content = src.workflow_metrics
+        stats = []
+        for wf_name in ("feature-flow", "analyze-error", "start"):
+            rows = self._parse_workflow_rows(wm_content, wf_name)
+            if not rows:
+                stats.append(WorkflowStat(name=wf_name))
+                continue
+            durations = [int(r[1]) for r in rows]
+            successes = [r[2] == "✓" for r in rows]
+            stats.append(WorkflowStat(
+                name=wf_name,
+                runs=len(rows),
+                avg_duration_min=sum(durations) // len(durations),
+                success_rate=sum(successes) / len(successes),
+                last_run=rows[-1][0],
+            ))
+
+        # 全局统计
+        global_match = re.search(r"总执行次数 \| (\d+)", wm_content)
+        return stats, int(global_match.group(1)) if global_match else 0
+
+    def _collect_guards(self, src: DashboardSources) -> GuardStatus:
+        return GuardStatus(
+            pre_commit=(src.git_hooks_dir / "pre-commit").exists(),
+            post_commit=(src.git_hooks_dir / "post-commit").exists(),
+            watchdog_running=False,
+            last_checkpoint=src.last_checkpoint,
+        )
 
     # ── 各区块生成 ──────────────────────────────────────
 
     def _header(self) -> str:
         return "# 📊 Axiom — System Dashboard\n"
 
-    def _system_state(self) -> str:
+    def _system_state(self, src: DashboardSources) -> str:
         """系统状态区块。"""
-        ctx = self._read_active_context()
-        provider = self._read_active_provider()
-        
-        # 计算 uptime (距上次 context 更新)
-        context_file = self.memory_dir / "active_context.md"
-        uptime = "unknown"
-        if context_file.exists():
-            mtime = os.path.getmtime(context_file)
-            age_min = int((datetime.now().timestamp() - mtime) / 60)
-            uptime = f"{age_min} min"
+        state = self._collect_state(src)
+        # uptime (距上次 context 更新)
+        uptime = "unknown" if state.context_age_min is None else f"{state.context_age_min} min"
 
         lines = [
             "## 🎯 System State\n",
             "| Key | Value |",
             "|-----|-------|",
-            f"| Status | `{ctx.get('task_status', 'UNKNOWN')}` |",
-            f"| Session | `{ctx.get('session_id', 'N/A')}` |",
-            f"| Provider | **{provider}** |",
-            f"| Last Checkpoint | `{ctx.get('last_checkpoint', 'N/A')}` |",
+            f"| Status | `{state.status}` |",
+            f"| Session | `{state.session}` |",
+            f"| Provider | **{state.provider}** |",
+            f"| Last Checkpoint | `{state.last_checkpoint}` |",
             f"| Context Age | {uptime} since last update |",
             "",
             "---\n",
         ]
         return "\n".join(lines)
 
-    def _task_progress(self) -> str:
+    def _task_progress(self, src: DashboardSources) -> str:
         """任务进度区块。"""
-        ctx_content = self._read_file(self.memory_dir / "active_context.md")
-        
-        # 解析各状态任务，兼容两种格式:
-        # 1) [✅ DONE] T-123
-        # 2) - [x] **[DONE]** T-MW-001: ...
-        done_tasks: list[str] = []
-        pending_tasks: list[str] = []
-        progress_tasks: list[str] = []
-        blocked_tasks: list[str] = []
-        failed_tasks: list[str] = []
-
-        for line in ctx_content.splitlines():
-            if "[DONE]" in line:
-                bucket = done_tasks
-            elif "[PENDING]" in line:
-                bucket = pending_tasks
-            elif "[IN_PROGRESS]" in line:
-                bucket = progress_tasks
-            elif "[BLOCKED]" in line:
-                bucket = blocked_tasks
-            elif "[FAILED]" in line:
-                bucket = failed_tasks
-            else:
-                continue
+        progress = self._collect_progress(src)
+        tasks = progress.tasks
 
-            task_match = re.search(r"\b(T-[A-Za-z0-9-]+)\b", line)
-            if task_match:
-                bucket.append(task_match.group(1))
-            else:
-                bucket.append("-")
-        
-        total = len(done_tasks) + len(pending_tasks) + len(progress_tasks) + len(blocked_tasks) + len(failed_tasks)
-        done_count = len(done_tasks)
-        pct = int(done_count / total * 100) if total > 0 else 0
-        
         # 生成进度条
-        filled = pct // 5
+        filled = progress.percent // 5
         empty = 20 - filled
         bar = "█" * filled + "░" * empty
 
@@ -129,113 +582,71 @@ class StatusDashboard:
             "## 📋 Task Progress\n",
             "| Status | Count | Tasks |",
             "|--------|-------|-------|",
-            f"| ✅ Done | {len(done_tasks)} | {', '.join(done_tasks[:10]) or '-'} |",
-            f"| ⏳ Pending | {len(pending_tasks)} | {', '.join(pending_tasks[:10]) or '-'} |",
-            f"| 🔄 In Progress | {len(progress_tasks)} | {', '.join(progress_tasks) or '-'} |",
-            f"| 🚫 Blocked | {len(blocked_tasks)} | {', '.join(blocked_tasks) or '-'} |",
-            f"| ❌ Failed | {len(failed_tasks)} | {', '.join(failed_tasks) or '-'} |",
+            f"| ✅ Done | {len(tasks['DONE'])} | {', '.join(tasks['DONE'][:10]) or '-'} |",
+            f"| ⏳ Pending | {len(tasks['PENDING'])} | {', '.join(tasks['PENDING'][:10]) or '-'} |",
+            f"| 🔄 In Progress | {len(tasks['IN_PROGRESS'])} | {', '.join(tasks['IN_PROGRESS']) or '-'} |",
+            f"| 🚫 Blocked | {len(tasks['BLOCKED'])} | {', '.join(tasks['BLOCKED']) or '-'} |",
+            f"| ❌ Failed | {len(tasks['FAILED'])} | {', '.join(tasks['FAILED']) or '-'} |",
             "",
-            f"**Overall**: {bar} {pct}% ({done_count}/{total} tasks)",
+            f"**Overall**: {bar} {progress.percent}% ({progress.done}/{progress.total} tasks)",
             "",
             "---\n",
         ]
         return "\n".join(lines)
 
-    def _evolution_stats(self) -> str:
+    def _evolution_stats(self, src: DashboardSources) -> str:
         """进化引擎统计区块。"""
-        # 知识库统计
-        kb_content = self._read_file(self.evolution_dir / "knowledge_base.md")
-        knowledge_rows = re.findall(r"\|\s*k-\d+\s*\|", kb_content)
-        knowledge_count = len(knowledge_rows)
-
-        # 分类统计
-        categories = re.findall(r"\|\s*(architecture|debugging|pattern|workflow|tooling)\s*\|\s*(\d+)\s*\|", kb_content)
-        cat_summary = " / ".join(f"{c} {n}" for n, c in categories) if categories else "N/A"
-
-        # 模式库统计
-        pl_content = self._read_file(self.evolution_dir / "pattern_library.md")
-        active_patterns = len(re.findall(r"Status:\s*ACTIVE", pl_content, re.IGNORECASE))
-        candidate_patterns = len(re.findall(r"Status:\s*CANDIDATE", pl_content, re.IGNORECASE))
-
-        # 学习队列
-        lq_content = self._read_file(self.evolution_dir / "learning_queue.md")
-        pending_items = len(re.findall(r"\|\s*pending\s*\|", lq_content, re.IGNORECASE))
-        processed_items = len(re.findall(r"\|\s*processed\s*\|", lq_content, re.IGNORECASE))
-
-        # 反思次数
-        rl_content = self._read_reflection_log()
-        reflection_count = len(re.findall(r"^##\s+\d{4}-\d{2}-\d{2}\b", rl_content, re.MULTILINE))
+        evo = self._collect_evolution(src)
+        cat_summary = " / ".join(
+            f"{n} {c}" for c, n in evo.knowledge_categories.items()
+        ) if evo.knowledge_categories else "N/A"
 
         lines = [
             "## 🧬 Evolution Stats\n",
             "| Metric | Count | Details |",
             "|--------|-------|---------|",
-            f"| 📚 Knowledge Items | {knowledge_count} | {cat_summary} |",
-            f"| 🔄 Active Patterns | {active_patterns + candidate_patterns} | {active_patterns} ACTIVE / {candidate_patterns} CANDIDATE |",
-            f"| 📥 Learning Queue | {pending_items + processed_items} | {pending_items} pending / {processed_items} processed |",
-            f"| 💭 Reflections | {reflection_count} | Last: {self._get_last_reflection_date(rl_content)} |",
+            f"| 📚 Knowledge Items | {evo.knowledge_items} | {cat_summary} |",
+            f"| 🔄 Active Patterns | {evo.active_patterns + evo.candidate_patterns} | {evo.active_patterns} ACTIVE / {evo.candidate_patterns} CANDIDATE |",
+            f"| 📥 Learning Queue | {evo.learning_pending + evo.learning_processed} | {evo.learning_pending} pending / {evo.learning_processed} processed |",
+            f"| 💭 Reflections | {evo.reflections} | Last: {evo.last_reflection} |",
             "",
             "---\n",
         ]
         return "\n".join(lines)
 
-    def _recent_reflections(self) -> str:
+    def _recent_reflections(self, src: DashboardSources) -> str:
         """最近反思摘要区块。"""
-        rl_content = self._read_reflection_log()
-        
-        # 提取反思 Session
-        sessions = re.findall(r"##\s+(\d{4}-\d{2}-\d{2})\s+(.+?)(?:\n|$)", rl_content)
+        entries = self._collect_reflections(src)
 
         lines = [
             "## 💭 Recent Reflections\n",
             "| Date | Session | Key Learning |",
             "|------|---------|-------------|",
         ]
-
-        if sessions:
-            for date, session_name in sessions[-5:]:
-                # 尝试提取 Learnings 部分
-                learning = self._extract_learning(rl_content, date)
-                lines.append(f"| {date} | {session_name.strip()} | {learning} |")
+        if entries:
+            for entry in entries:
+                lines.append(f"| {entry.date} | {entry.session} | {entry.learning} |")
         else:
             lines.append("| - | 暂无反思记录 | - |")
 
         lines.extend(["", "---\n"])
         return "\n".join(lines)
 
-    def _workflow_metrics(self) -> str:
+    def _workflow_metrics(self, src: DashboardSources) -> str:
         """工作流指标趋势区块。"""
-        wm_content = self._read_file(self.evolution_dir / "workflow_metrics.md")
-
-        workflows = {
-            "feature-flow": {"runs": 0, "avg_dur": "-", "success_rate": "-", "last_run": "-"},
-            "analyze-error": {"runs": 0, "avg_dur": "-", "success_rate": "-", "last_run": "-"},
-            "start": {"runs": 0, "avg_dur": "-", "success_rate": "-", "last_run": "-"},
-        }
-
-        for wf_name in workflows:
-            rows = self._parse_workflow_rows(wm_content, wf_name)
-            if rows:
-                workflows[wf_name]["runs"] = len(rows)
-                durations = [int(r[1]) for r in rows]
-                successes = [r[2] == "✓" for r in rows]
-                workflows[wf_name]["avg_dur"] = f"{sum(durations) // len(durations)}min"
-                workflows[wf_name]["success_rate"] = f"{sum(successes) / len(successes) * 100:.0f}%"
-                workflows[wf_name]["last_run"] = rows[-1][0]
-
-        # 全局统计
-        global_match = re.search(r"总执行次数 \| (\d+)", wm_content)
-        total_runs = global_match.group(1) if global_match else "0"
+        workflows, total_runs = self._collect_workflows(src)
 
         lines = [
             "## 📈 Workflow Metrics\n",
             "| Workflow | Runs | Avg Duration | Success Rate | Last Run |",
             "|----------|------|-------------|-------------|----------|",
         ]
-        for name, data in workflows.items():
+        for wf in workflows:
+            avg_dur = "-" if wf.avg_duration_min is None else f"{wf.avg_duration_min}min"
+            success_rate = "-" if wf.success_rate is None else f"{wf.success_rate * 100:.0f}%"
             lines.append(
-                f"| {name} | {data['runs']} | {data['avg_dur']} "
-                f"| {data['success_rate']} | {data['last_run']} |"
+                f"| {wf.name} | {wf.runs} | {avg_dur} "
+                f"| {success_rate} | {wf.last_run or '-'} |"
             )
         lines.extend([
             "",
@@ -245,19 +656,13 @@ class StatusDashboard:
         ])
         return "\n".join(lines)
 
-    def _guard_status(self) -> str:
+    def _guard_status(self, src: DashboardSources) -> str:
         """守卫状态区块。"""
-        # 检查 Git Hooks
-        git_hooks_dir = self._find_git_hooks_dir()
-        
-        pre_commit = "✅ Installed" if (git_hooks_dir / "pre-commit").exists() else "❌ Not installed"
-        post_commit = "✅ Installed" if (git_hooks_dir / "post-commit").exists() else "❌ Not installed"
-
-        # 检查最近 checkpoint
-        last_cp = self._get_last_checkpoint()
-
+        guards = self._collect_guards(src)
+        pre_commit = "✅ Installed" if guards.pre_commit else "❌ Not installed"
+        post_commit = "✅ Installed" if guards.post_commit else "❌ Not installed"
         # 看门狗状态 (检查进程)
-        watchdog_status = "⏸️ Stopped"
+        watchdog_status = "▶️ Running" if guards.watchdog_running else "⏸️ Stopped"
 
         lines = [
             "## 🛡️ Guard Status\n",
@@ -266,7 +671,7 @@ class StatusDashboard:
             f"| Pre-commit | {pre_commit} | Warning-only (不阻断) |",
             f"| Post-commit | {post_commit} | Auto-checkpoint (30min) |",
             f"| Session Watchdog | {watchdog_status} | `python .agent/guards/session_watchdog.py` |",
-            f"| Last Checkpoint | {last_cp} | |",
+            f"| Last Checkpoint | {guards.last_checkpoint} | |",
             "",
             "---\n",
         ]
@@ -333,27 +738,13 @@ class StatusDashboard:
 
         return rows
 
-    def _read_active_context(self) -> dict[str, str]:
-        """解析 active_context.md 的 YAML frontmatter。"""
-        content = self._read_file(self.memory_dir / "active_context.md")
-        result: dict[str, str] = {}
-
-        # 提取 frontmatter
-        fm_match = re.search(r"^---\s*\n(.*?\n)---", content, re.DOTALL)
-        if fm_match:
-            for line in fm_match.group(1).splitlines():
-                kv = line.split(":", 1)
-                if len(kv) == 2:
-                    key = kv[0].strip()
-                    val = kv[1].strip().strip('"')
-                    result[key] = val
-
-        return result
-
     def _read_active_provider(self) -> str:
-        """读取当前激活的 Provider。"""
-        content = self._read_file(self.config_dir / "agent_config.md")
-        match = re.search(r"ACTIVE_PROVIDER:\s*(\w+)", content)
+        """读取当前激活的 Provider (经 config_loader 的 mtime 缓存，文件未变时不重新解析)。"""
+        config_file = self.config_dir / "agent_config.md"
+        get_config = import_get_config()
+        if get_config is not None:
+            return get_config(config_file).active_provider
+        match = re.search(r"ACTIVE_PROVIDER:\s*(\w+)", self._read_file(config_file))
         return match.group(1) if match else "gemini"
 
     def _get_last_reflection_date(self, content: str) -> str:
@@ -394,9 +785,32 @@ class StatusDashboard:
         return "N/A"
 
 
+def _parse_etags(header: str) -> set[str]:
+    """解析 If-None-Match 请求头 (支持多个值与弱校验前缀 W/)。"""
+    tags = set()
+    for part in header.split(","):
+        part = part.strip()
+        if part.startswith("W/"):
+            part = part[2:]
+        if part:
+            tags.add(part)
+    return tags
+
+
 # ── CLI 入口 ──────────────────────────────────────────
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Axiom Status Dashboard")
+    parser.add_argument("--timings", action="store_true", help="附加各数据源加载耗时")
+    parser.add_argument("--watch", action="store_true", help="持续监听数据源变更并刷新")
+    parser.add_argument("--jsonl", action="store_true", help="watch 模式下以 JSON Lines 输出变更区块")
+    parser.add_argument("--debounce", type=float, default=0.2, help="突发写入合并窗口 (秒)")
+    parser.add_argument("--json", action="store_true", help="输出结构化 JSON 快照")
+    parser.add_argument("--serve", action="store_true", help="启动本地 HTTP 服务 (/status.json, /status.md)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
     # 自动查找 .agent 目录
     base = Path(".agent")
     if not base.exists():
@@ -409,10 +823,62 @@ if __name__ == "__main__":
             current = current.parent
 
     dashboard = StatusDashboard(base_dir=base)
-    output = dashboard.generate()
     encoding = getattr(sys.stdout, "encoding", None) or "utf-8"
     stdout_buffer = getattr(sys.stdout, "buffer", None)
-    if stdout_buffer is not None:
-        stdout_buffer.write(output.encode(encoding, errors="backslashreplace") + b"\n")
-    else:
-        print(output.encode(encoding, errors="backslashreplace").decode(encoding, errors="ignore"))
+
+    def emit(text: str) -> None:
+        if stdout_buffer is not None:
+            stdout_buffer.write(text.encode(encoding, errors="backslashreplace") + b"\n")
+            stdout_buffer.flush()
+        else:
+            print(text.encode(encoding, errors="backslashreplace").decode(encoding, errors="ignore"), flush=True)
+
+    if args.serve:
+        server = dashboard.serve(args.host, args.port)
+        print(f"Serving dashboard on http://{args.host}:{server.server_address[1]}/status.json", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        sys.exit(0)
+
+    if args.json:
+        emit(dashboard.collect().to_json(indent=2))
+        sys.exit(0)
+
+    if args.watch:
+        live = None
+        if not args.jsonl:
+            try:
+                from rich.live import Live
+                from rich.markdown import Markdown
+            except ImportError:
+                pass  # 未安装 rich 时清屏重绘
+            else:
+                live = Live(auto_refresh=False)
+
+        def on_update(sections: dict[str, str], changed: list[str]) -> None:
+            if args.jsonl:
+                emit(json.dumps({
+                    "ts": datetime.now().isoformat(timespec="seconds"),
+                    "changed": changed,
+                    "sections": {name: sections[name] for name in changed},
+                }, ensure_ascii=False))
+            elif live is not None:
+                live.update(Markdown(dashboard.compose(sections)), refresh=True)
+            else:
+                emit("\033[2J\033[H" + dashboard.compose(sections))
+
+        try:
+            with live if live is not None else contextlib.nullcontext():
+                dashboard.watch(on_update, debounce=args.debounce)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    output = dashboard.generate()
+    if args.timings:
+        output += "\n\n" + dashboard.format_timings()
+    emit(output)
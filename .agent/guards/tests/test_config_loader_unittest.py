@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+AGENT_DIR = PROJECT_ROOT / ".agent"
+if str(AGENT_DIR) not in sys.path:
+    sys.path.insert(0, str(AGENT_DIR))
+
+from config.config_loader import AgentConfig, clear_config_cache, get_config, load_config
+
+
+CONFIG = """# Agent Config
+
+```yaml
+ACTIVE_PROVIDER: codex   # 当前
+```
+
+```yaml
+codex:
+  display_name: "Codex CLI"
+  capabilities:
+    file_read: "read"   # 读取
+    search: "grep # glob"
+  features:
+    context_window: 200000
+    streaming: true
+    ratio: 0.5
+```
+
+```yaml
+shared:
+  dispatcher:
+    max_restarts: 5
+    timeout_tiers:
+      simple: 600
+```
+
+```yaml
+ACTIVE_PROVIDER: copilot   # 切换指南示例，不生效
+```
+"""
+
+
+class TestConfigLoader(unittest.TestCase):
+    def setUp(self):
+        clear_config_cache()
+
+    def _write(self, td: str, content: str) -> Path:
+        path = Path(td) / "agent_config.md"
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    def test_providers_and_shared_parsed_from_markdown(self):
+        with tempfile.TemporaryDirectory() as td:
+            config = AgentConfig(self._write(td, CONFIG))
+
+            self.assertEqual(config.active_provider, "codex")
+            self.assertEqual(config.get_all_providers(), ["codex"])
+            self.assertEqual(config.get_capability("file_read"), "read")
+            self.assertEqual(config.get_capability("search"), "grep # glob")
+            self.assertEqual(config.get_feature("context_window"), 200000)
+            self.assertEqual(config.get_feature("ratio"), 0.5)
+            self.assertIs(config.supports("streaming"), True)
+            self.assertEqual(config.shared.dispatcher["timeout_tiers"], {"simple": 600})
+            # 未在文件中定义的共享分组使用内置默认值
+            self.assertEqual(config.get_path("memory"), ".agent/memory")
+
+    def test_missing_file_falls_back_to_builtin_defaults(self):
+        with tempfile.TemporaryDirectory() as td:
+            config = AgentConfig(Path(td) / "missing.md")
+
+            self.assertEqual(config.active_provider, "gemini")
+            self.assertIn("claude", config.get_all_providers())
+
+    def test_cache_hits_until_mtime_changes(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = self._write(td, CONFIG)
+            first = load_config(path)
+            self.assertIs(load_config(path), first)
+
+            config = get_config(path)
+            self.assertIs(get_config(str(path)), config)
+            path.write_text(CONFIG.replace("ACTIVE_PROVIDER: codex", "ACTIVE_PROVIDER: nope"), encoding="utf-8")
+            os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+            self.assertIsNot(load_config(path), first)
+            self.assertEqual(config.active_provider, "codex")   # 未定义的 Provider 回退
+            path.write_text(CONFIG.replace("max_restarts: 5", "max_restarts: 7"), encoding="utf-8")
+            os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 2 * 10**9))
+            self.assertEqual(config.shared.dispatcher["max_restarts"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
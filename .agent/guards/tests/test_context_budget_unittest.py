@@ -0,0 +1,111 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+MEMORY_DIR = PROJECT_ROOT / ".agent" / "memory"
+if str(MEMORY_DIR) not in sys.path:
+    sys.path.insert(0, str(MEMORY_DIR))
+
+from context_budget import ContextBudget, TokenEstimator, heuristic_tokens
+
+
+CONFIG = """```yaml
+ACTIVE_PROVIDER: tiny
+```
+
+```yaml
+tiny:
+  display_name: "Tiny"
+  capabilities:
+    file_read: "read"
+  features:
+    context_window: 1000
+```
+"""
+
+
+def make_memory(base: Path) -> Path:
+    agent = base / ".agent"
+    (agent / "config").mkdir(parents=True)
+    (agent / "config" / "agent_config.md").write_text(CONFIG, encoding="utf-8")
+    memory = agent / "memory"
+    (memory / "knowledge").mkdir(parents=True)
+    (memory / "active_context.md").write_text("---\ntask_status: IDLE\n---\n" + "x" * 200, encoding="utf-8")
+    entries = [
+        ("k-001", 0.9, "[config]", 120),
+        ("k-002", 0.95, "[git]", 200),
+        ("k-003", 0.5, "[config, git]", 40),
+        ("k-004", 0.99, "[misc]", 2000),
+    ]
+    for kid, confidence, tags, size in entries:
+        (memory / "knowledge" / f"{kid}.md").write_text(
+            f"---\nid: {kid}\nconfidence: {confidence}\ntags: {tags}\n---\n" + "y" * (size * 4),
+            encoding="utf-8",
+        )
+    (memory / "knowledge" / "k-005.md").write_text(
+        "---\nid: k-005\nconfidence: 1.0\nstatus: deprecated\n---\nold\n", encoding="utf-8",
+    )
+    return memory
+
+
+class TestContextBudget(unittest.TestCase):
+    def test_heuristic_counts_cjk_per_char_and_ascii_per_four(self):
+        self.assertEqual(heuristic_tokens(""), 0)
+        self.assertEqual(heuristic_tokens("abcdefgh"), 2)
+        self.assertEqual(heuristic_tokens("知识条目"), 4)
+        self.assertEqual(heuristic_tokens("abcd知识"), 3)
+
+    def test_estimates_are_cached_by_content_hash(self):
+        calls = []
+
+        def counter(text):
+            calls.append(text)
+            return len(text)
+
+        estimator = TokenEstimator(counter)
+        self.assertEqual(estimator.count("same"), 4)
+        self.assertEqual(estimator.count("same"), 4)
+        self.assertEqual(estimator.count("other"), 5)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((estimator.hits, estimator.misses), (1, 2))
+
+    def test_plan_uses_provider_window_and_picks_highest_value(self):
+        with tempfile.TemporaryDirectory() as td:
+            budget = ContextBudget(make_memory(Path(td)), fraction=0.5, estimator=TokenEstimator())
+
+            plan = budget.plan()
+
+            self.assertEqual((plan.provider, plan.context_window, plan.budget), ("tiny", 1000, 500))
+            # k-004 价值最高但放不下；deprecated 的 k-005 不参与
+            self.assertEqual([a.name for a in plan.selected], ["k-002", "k-001", "k-003"])
+            self.assertEqual([a.name for a in plan.skipped], ["k-004"])
+            self.assertLessEqual(plan.used, plan.budget)
+
+    def test_tags_boost_relevant_entries(self):
+        with tempfile.TemporaryDirectory() as td:
+            budget = ContextBudget(make_memory(Path(td)), context_window=400, fraction=1.0)
+
+            plan = budget.plan(tags={"config"})
+
+            self.assertEqual(plan.provider, "custom")
+            self.assertEqual([a.name for a in plan.selected], ["k-001", "k-003"])
+
+    def test_reflection_log_prefers_evolution_dir(self):
+        with tempfile.TemporaryDirectory() as td:
+            memory = make_memory(Path(td))
+            (memory / "reflection_log.md").write_text("legacy\n", encoding="utf-8")
+            budget = ContextBudget(memory, context_window=400)
+            legacy = {a.name: a.path for a in budget.artifacts()}["reflection_log"]
+            self.assertEqual(Path(legacy), memory / "reflection_log.md")
+
+            (memory / "evolution").mkdir()
+            (memory / "evolution" / "reflection_log.md").write_text("## 2026-01-01\n", encoding="utf-8")
+            current = {a.name: a.path for a in budget.artifacts()}["reflection_log"]
+            self.assertEqual(Path(current), memory / "evolution" / "reflection_log.md")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import sys
 import tempfile
 import unittest
@@ -9,7 +10,9 @@ MEMORY_DIR = PROJECT_ROOT / ".agent" / "memory"
 if str(MEMORY_DIR) not in sys.path:
     sys.path.insert(0, str(MEMORY_DIR))
 
+from context_doc import load_document, parse_document
 from context_manager import ContextManager
+from state_graph import load_state_graph
 
 
 class TestContextManager(unittest.TestCase):
@@ -105,6 +108,159 @@ last_checkpoint: cp-1
             self.assertIn("BuildError", text)
             self.assertIn("pin version", text)
 
+    def test_record_error_inserts_row_inside_table_not_at_eof(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            self._make_memory(base)
+            path = base / ".agent" / "memory" / "project_decisions.md"
+            path.write_text(
+                path.read_text(encoding="utf-8") + "\n## 6. Next\nkeep me last\n",
+                encoding="utf-8",
+            )
+            mgr = ContextManager(base_dir=base)
+
+            mgr.record_error("BuildError", "bad dep", "pin version", "build")
+            lines = path.read_text(encoding="utf-8").splitlines()
+            row = next(i for i, line in enumerate(lines) if "BuildError" in line)
+            self.assertIn("2026-02-12", lines[row - 1])
+            self.assertEqual(lines[-1], "keep me last")
+
+    def test_save_decision_lands_in_its_section(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            self._make_memory(base)
+            path = base / ".agent" / "memory" / "project_decisions.md"
+            path.write_text(
+                "# Project Decisions\n\n## 8. Runtime Decisions\n- old\n\n## 9. Other\ntail\n",
+                encoding="utf-8",
+            )
+            mgr = ContextManager(base_dir=base)
+
+            mgr.save_decision("Rule", "Use strict CI gate")
+            text = path.read_text(encoding="utf-8")
+            self.assertLess(text.index("Use strict CI gate"), text.index("## 9. Other"))
+            self.assertTrue(text.endswith("## 9. Other\ntail\n"))
+
+    def test_update_progress_keeps_earlier_lines_for_same_task(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            self._make_memory(base)
+            mgr = ContextManager(base_dir=base)
+
+            mgr.update_progress("T-002", "PENDING", "new item")
+            mgr.update_progress("T-002", "DONE", "new item")
+            text = (base / ".agent" / "memory" / "active_context.md").read_text(encoding="utf-8")
+            self.assertLess(
+                text.index("- [x] **[DONE]** T-002: new item"),
+                text.index("- [ ] **[PENDING]** T-002: new item"),
+            )
+            self.assertIn('session_id: "test-session"', text)
+
+    def test_update_state_writes_transition_audit_log(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            self._make_memory(base)
+            mgr = ContextManager(base_dir=base)
+
+            mgr.update_state("DRAFTING")
+            with self.assertRaises(ValueError):
+                mgr.update_state("IDLE")
+
+            log = base / ".agent" / "memory" / "monitor.log"
+            events = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([e["type"] for e in events], ["state_change", "state_change_rejected"])
+            self.assertEqual((events[0]["from"], events[0]["to"]), ("IDLE", "DRAFTING"))
+            self.assertEqual(events[0]["task_status"], "DRAFTING")
+
+    def test_can_reach_uses_state_graph(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            self._make_memory(base)
+            mgr = ContextManager(base_dir=base)
+            self.assertTrue(mgr.can_reach("IMPLEMENTING"))
+            self.assertFalse(mgr.state_graph().from_document)
+
+
+class TestStateGraph(unittest.TestCase):
+    def test_compiles_project_state_machine(self):
+        graph = load_state_graph(MEMORY_DIR / "state_machine.md")
+        self.assertTrue(graph.from_document)
+        self.assertIn("REVIEWING", graph.states)
+        self.assertTrue(graph.allows("DRAFTING", "CONFIRMING"))  # 经由复合状态 P1 展开
+        self.assertTrue(graph.allows("BLOCKED", "IMPLEMENTING"))
+        self.assertFalse(graph.allows("IDLE", "IMPLEMENTING"))
+        self.assertEqual(graph.trigger("IDLE", "DRAFTING"), "START_DRAFT")
+        self.assertEqual(graph.path("IDLE", "BLOCKED"), ["IDLE", "DRAFTING", "CONFIRMING", "IMPLEMENTING", "BLOCKED"])
+        self.assertIs(load_state_graph(MEMORY_DIR / "state_machine.md"), graph)
+
+    def test_document_transitions_override_defaults(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "state_machine.md"
+            path.write_text(
+                "## 1. 状态定义 (States)\n| 状态 | 代码 |\n|---|---|\n| a | `IDLE` |\n| b | `DONE` |\n\n"
+                "## 3. 转换触发器 (Triggers)\n| 触发器 | 源状态 | 目标状态 |\n|---|---|---|\n| `FINISH` | IDLE | DONE |\n",
+                encoding="utf-8",
+            )
+            graph = load_state_graph(path)
+            self.assertEqual(graph.states, frozenset({"IDLE", "DONE"}))
+            self.assertEqual(dict(graph.transitions), {"IDLE": frozenset({"DONE"})})
+            self.assertEqual(graph.reachable("DONE"), frozenset())
+
+
+class TestContextDocument(unittest.TestCase):
+    SAMPLE = """---
+session_id: "abc"
+task_status: IMPLEMENTING
+---
+
+# Active Context
+
+## 📝 任务队列 (Active Tasks)
+- [x] **[DONE]** T-MW-001: first
+- [ ] [⏳ PENDING] T-002: second
+- [ ] **[BLOCKED]** third
+
+```
+- [ ] **[DONE]** T-999: inside fence
+```
+
+## Scratchpad
+notes
+"""
+
+    def test_frontmatter_raw_and_unquoted(self):
+        doc = parse_document(self.SAMPLE)
+        self.assertEqual(doc.raw_frontmatter["session_id"], '"abc"')
+        self.assertEqual(doc.frontmatter["session_id"], "abc")
+        self.assertTrue(doc.body.startswith("\n# Active Context"))
+
+    def test_section_tree_and_tasks(self):
+        doc = parse_document(self.SAMPLE)
+        self.assertEqual([s.title for s in doc.sections], ["Active Context"])
+        tasks = doc.find_section("任务队列")
+        self.assertEqual(tasks.level, 2)
+        self.assertTrue(doc.section_text(tasks).lstrip().startswith("- [x]"))
+        self.assertEqual(doc.text[tasks.end:].splitlines()[0], "## Scratchpad")
+
+        self.assertEqual([(t.task_id, t.status) for t in doc.tasks], [
+            ("T-MW-001", "DONE"), ("T-002", "PENDING"), ("-", "BLOCKED"),
+        ])
+        self.assertEqual(doc.task_counts()["DONE"], 1)
+
+    def test_load_document_caches_by_mtime_and_size(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "active_context.md"
+            path.write_text(self.SAMPLE, encoding="utf-8")
+            first = load_document(path)
+            self.assertIs(load_document(path), first)
+
+            path.write_text(self.SAMPLE.replace("IMPLEMENTING", "IDLE"), encoding="utf-8")
+            self.assertEqual(load_document(path).frontmatter["task_status"], "IDLE")
+
+            self.assertFalse(load_document(Path(td) / "missing.md").exists)
+            with self.assertRaises(FileNotFoundError):
+                load_document(Path(td) / "missing.md", missing_ok=False)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+GUARDS_DIR = PROJECT_ROOT / ".agent" / "guards"
+if str(GUARDS_DIR) not in sys.path:
+    sys.path.insert(0, str(GUARDS_DIR))
+
+import fs_watch
+
+
+def collect(backend, expected, timeout=5.0):
+    """读取事件直到 expected 全部出现 (或超时)，返回累计的变更路径。"""
+    seen = set()
+    deadline = time.monotonic() + timeout
+    while not expected <= seen and time.monotonic() < deadline:
+        seen |= backend.read(0.2)
+    return seen
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+class TestInotifyBackend(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name).resolve()
+        self.backend = fs_watch._InotifyBackend([self.root])
+
+    def tearDown(self):
+        self.backend.close()
+        self._tmp.cleanup()
+
+    def test_reports_created_file(self):
+        target = self.root / "active_context.md"
+        target.write_text("x", encoding="utf-8")
+
+        self.assertIn(target, collect(self.backend, {target}))
+
+    def test_reports_atomic_rename_target(self):
+        target = self.root / "active_context.md"
+        target.write_text("old", encoding="utf-8")
+        collect(self.backend, {target})
+
+        tmp = self.root / ".active_context.md.tmp"
+        tmp.write_text("new", encoding="utf-8")
+        os.replace(tmp, target)
+
+        self.assertIn(target, collect(self.backend, {target}))
+
+    def test_watches_new_subdirectory(self):
+        subdir = self.root / "evolution"
+        subdir.mkdir()
+        # 可能早于新目录的 watch 建立
+        first = subdir / "knowledge_base.md"
+        first.write_text("x", encoding="utf-8")
+        self.assertIn(first, collect(self.backend, {first}))
+
+        second = subdir / "pattern_library.md"
+        second.write_text("x", encoding="utf-8")
+        self.assertIn(second, collect(self.backend, {second}))
+
+    def test_queue_overflow_reports_roots(self):
+        event = fs_watch._EVENT_HEADER.pack(-1, fs_watch._IN_Q_OVERFLOW, 0, 0)
+
+        self.assertEqual(self.backend._parse(event), {self.root})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import gzip
+import json
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+MEMORY_DIR = PROJECT_ROOT / ".agent" / "memory"
+if str(MEMORY_DIR) not in sys.path:
+    sys.path.insert(0, str(MEMORY_DIR))
+
+import monitor_log
+from monitor_analytics import MonitorAnalytics, aggregate
+from monitor_log import MonitorLog, iter_lines_reversed
+
+
+def event(hour: int, etype: str, **extra) -> dict:
+    return {"ts": f"2026-03-01T{hour:02d}:00:00.000Z", "type": etype, **extra}
+
+
+def write_events(path: Path, events: list[dict]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps(e) + "\n")
+
+
+class TestMonitorLog(unittest.TestCase):
+    def test_reverse_reader_handles_lines_across_blocks(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "monitor.log"
+            path.write_text("".join(f"line-{i}-{'x' * i}\n" for i in range(50)), encoding="utf-8")
+
+            lines = list(iter_lines_reversed(path, block_size=7))
+
+            self.assertEqual(lines[0], f"line-49-{'x' * 49}")
+            self.assertEqual(len(lines), 50)
+            self.assertEqual(lines[-1], "line-0-")
+
+    def test_tail_filters_by_type_and_skips_bad_lines(self):
+        with tempfile.TemporaryDirectory() as td:
+            log = MonitorLog(td)
+            write_events(log.path, [event(h, "hook_write" if h % 2 else "task_completed") for h in range(10)])
+            with open(log.path, "a", encoding="utf-8") as f:
+                f.write("not json\n")
+
+            self.assertEqual([e["ts"][11:13] for e in log.tail(3)], ["07", "08", "09"])
+            self.assertEqual(
+                [e["ts"][11:13] for e in log.tail(2, types={"task_completed"})],
+                ["06", "08"],
+            )
+
+    def test_rotate_gzips_segment_indexes_and_carries_state(self):
+        with tempfile.TemporaryDirectory() as td:
+            log = MonitorLog(td)
+            write_events(log.path, [
+                event(1, "session_start"),
+                event(2, "state_change", task_status="IMPLEMENTING"),
+                event(2, "hook_write"),
+            ])
+
+            segment = log.rotate()
+
+            self.assertTrue(segment.name.endswith(".log.gz"))
+            with gzip.open(segment, "rt", encoding="utf-8") as f:
+                self.assertEqual(len(f.read().splitlines()), 3)
+            seg = log.segments()[0]
+            self.assertEqual(seg.counts, {"session_start": 1, "state_change": 1, "hook_write": 1})
+            self.assertEqual(seg.first_ts[:13], "2026-03-01T01")
+
+            # 新活动日志只保留上一状态 (供 hook 读取)，查询与统计不会重复计入
+            carried = json.loads(log.path.read_text(encoding="utf-8"))
+            self.assertTrue(carried["carried_over"])
+            self.assertEqual(carried["task_status"], "IMPLEMENTING")
+            self.assertEqual(log.counts()["state_change"], 1)
+
+            write_events(log.path, [event(5, "hook_write"), event(6, "hook_write")])
+            self.assertEqual(log.counts(), {"session_start": 1, "state_change": 1, "hook_write": 3})
+            self.assertEqual(log.hourly("hook_write"), {
+                "2026-03-01T02": 1, "2026-03-01T05": 1, "2026-03-01T06": 1,
+            })
+            self.assertEqual(log.counts(since="2026-03-01T05:00:00"), {"hook_write": 2})
+            self.assertEqual([e["type"] for e in log.tail(4)], ["state_change", "hook_write", "hook_write", "hook_write"])
+            self.assertEqual(log.tail(1, types={"session_start"})[0]["ts"][11:13], "01")
+
+    def test_tail_reads_segment_tail_from_index(self):
+        with tempfile.TemporaryDirectory() as td:
+            log = MonitorLog(td)
+            write_events(log.path, [event(h % 24, "hook_write", i=h) for h in range(120)])
+            log.rotate()
+            seg = log.segments()[0]
+            self.assertEqual(len(seg.tail), monitor_log.TAIL_EVENTS)
+            self.assertEqual(seg.tail_start, 120 - monitor_log.TAIL_EVENTS)
+
+            opened = []
+            original = monitor_log.gzip.open
+            monitor_log.gzip.open = lambda *a, **k: opened.append(a) or original(*a, **k)
+            try:
+                self.assertEqual([e["i"] for e in log.tail(3)], [117, 118, 119])
+                self.assertEqual(opened, [])   # 只读索引，不解压分段
+
+                # 超出索引 tail 的部分才解压，且只读到 tail 之前
+                self.assertEqual([e["i"] for e in log.tail(60)], list(range(60, 120)))
+                self.assertEqual(len(opened), 1)
+            finally:
+                monitor_log.gzip.open = original
+
+    def test_tail_without_index_tail_reads_segment(self):
+        with tempfile.TemporaryDirectory() as td:
+            log = MonitorLog(td)
+            write_events(log.path, [event(h, "hook_write", i=h) for h in range(5)])
+            log.rotate()
+            # 旧版本写入的索引没有 tail 字段
+            data = json.loads(log.index_path.read_text(encoding="utf-8"))
+            for seg in data["segments"]:
+                del seg["tail"], seg["tail_start"]
+            log.index_path.write_text(json.dumps(data), encoding="utf-8")
+
+            self.assertEqual([e["i"] for e in log.tail(2)], [3, 4])
+
+    def test_active_index_is_incremental(self):
+        with tempfile.TemporaryDirectory() as td:
+            log = MonitorLog(td)
+            write_events(log.path, [event(1, "hook_write")])
+            with open(log.path, "a", encoding="utf-8") as f:
+                f.write('{"ts": "2026-03-01T02:00:00Z", "type": "hook_')   # 正在写入的半行
+
+            first = log.active_index()
+            self.assertEqual(first.events, 1)
+            with open(log.path, "a", encoding="utf-8") as f:
+                f.write('write"}\n')
+
+            second = log.active_index()
+            self.assertEqual(second.events, 2)
+            self.assertEqual(second.offset, log.path.stat().st_size)
+
+    def test_should_rotate_by_size_and_age(self):
+        with tempfile.TemporaryDirectory() as td:
+            log = MonitorLog(td, max_bytes=10_000, max_age=timedelta(days=1))
+            write_events(log.path, [event(1, "hook_write")])
+            now = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+            self.assertFalse(log.should_rotate(now=now))
+            self.assertTrue(log.should_rotate(now=now + timedelta(days=2)))
+            log.max_bytes = 10
+            self.assertTrue(log.should_rotate(now=now))
+
+
+class TestMonitorAnalytics(unittest.TestCase):
+    def _session(self, sid: str, start_hour: int) -> list[dict]:
+        return [
+            event(start_hour, "session_start", sessionId=sid),
+            event(start_hour, "hook_write", file="active_context.md"),
+            event(start_hour + 1, "hook_write", file="manifest.md"),
+            event(start_hour + 1, "hook_write", file="active_context.md"),
+            event(start_hour + 2, "task_completed", id="1"),
+        ]
+
+    def test_aggregate_sessions_files_and_hours(self):
+        stats = aggregate(self._session("a", 1) + self._session("b", 10))
+
+        self.assertEqual([s.session_id for s in stats.sessions], ["a", "b"])
+        first = stats.sessions[0]
+        self.assertEqual((first.writes, first.tasks_completed), (3, 1))
+        self.assertEqual(first.duration_min, 120)
+        self.assertEqual(first.writes_per_hour, 1.5)
+        self.assertEqual(stats.top_files(1), [("active_context.md", 4)])
+        self.assertEqual(stats.hour_histogram["hook_write"][2], 2)
+
+    def test_session_spanning_rotation_is_stitched_and_segments_cached(self):
+        with tempfile.TemporaryDirectory() as td:
+            log = MonitorLog(td)
+            events = self._session("a", 1)
+            write_events(log.path, events[:3])
+            log.rotate()
+            write_events(log.path, events[3:])
+
+            analytics = MonitorAnalytics(td)
+            stats = analytics.stats()
+            self.assertEqual(len(stats.sessions), 1)
+            self.assertEqual(stats.sessions[0].writes, 3)
+            self.assertEqual(stats.sessions[0].end[11:13], "03")
+
+            # 已轮转分段命中缓存，活动日志从上次偏移继续累加
+            segment = log.segment_dir / log.segments()[0].name
+            segment.write_bytes(b"")
+            write_events(log.path, self._session("b", 8))
+            stats = MonitorAnalytics(td).stats()
+            self.assertEqual([s.session_id for s in stats.sessions], ["a", "b"])
+            self.assertEqual(stats.event_counts["hook_write"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -41,6 +41,84 @@ class TestP0P1Fixes(unittest.TestCase):
             pending = engine.get_pending_action_items()
             self.assertEqual(pending, ["真正的 action"])
 
+    def test_reflection_task_stats_count_done_pending_blocked(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            (base / "active_context.md").write_text(
+                "- [✅ DONE] T-1\n- [⏳ PENDING] T-2\n- [🔴 BLOCKED] T-3\n"
+                "- [🔄 IN_PROGRESS] T-4\n- [FAILED] T-5\n",
+                encoding="utf-8",
+            )
+
+            stats = ReflectionEngine(base_dir=base).parse_active_context()
+            self.assertEqual(stats, {"completed": 1, "pending": 1, "blocked": 1, "total": 3})
+
+    def test_reflection_action_items_dedup_and_resolved_elsewhere(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            evo_dir = base / "evolution"
+            evo_dir.mkdir(parents=True, exist_ok=True)
+            (evo_dir / "reflection_log.md").write_text(
+                """
+## Session History
+
+### 2026-02-14 Session: First
+
+#### 🎯 Action Items (后续行动)
+- [ ] 补充 **集成测试**
+- [ ] 清理日志
+
+### 2026-02-15 Session: Second
+
+#### 🎯 Action Items (后续行动)
+- [ ] 补充  集成测试
+- [x] 清理日志
+""".strip()
+                + "\n",
+                encoding="utf-8",
+            )
+
+            engine = ReflectionEngine(base_dir=base)
+            self.assertEqual(engine.get_pending_action_items(), ["补充 **集成测试**"])
+            self.assertEqual(engine.action_items.get("补充 集成测试").session, "First")
+
+            self.assertTrue(engine.resolve_action_item("补充 集成测试"))
+            self.assertEqual(ReflectionEngine(base_dir=base).get_pending_action_items(), [])
+
+    def test_reflection_pending_action_items_does_not_write_store(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            evo_dir = base / "evolution"
+            evo_dir.mkdir(parents=True, exist_ok=True)
+            (evo_dir / "reflection_log.md").write_text(
+                "### 2026-02-14 Session: Demo\n\n#### 🎯 Action Items (后续行动)\n- [ ] 补充文档\n",
+                encoding="utf-8",
+            )
+
+            engine = ReflectionEngine(base_dir=base)
+            self.assertEqual(engine.get_pending_action_items(), ["补充文档"])
+            self.assertFalse((evo_dir / "action_items.json").exists())
+
+            self.assertTrue(engine.action_items.sync(force=True))
+            self.assertTrue((evo_dir / "action_items.json").exists())
+
+    def test_reflection_summary_reads_recent_sessions_from_tail(self):
+        with tempfile.TemporaryDirectory() as td:
+            base = Path(td)
+            evo_dir = base / "evolution"
+            evo_dir.mkdir(parents=True, exist_ok=True)
+            body = "\n\n".join(
+                f"### 2026-01-{day:02d} Session: S{day}\n\n#### 💡 Learnings (学到的)\n- " + "x" * 5000
+                for day in range(1, 11)
+            )
+            (evo_dir / "reflection_log.md").write_text(body + "\n", encoding="utf-8")
+
+            summary = ReflectionEngine(base_dir=base).get_reflection_summary(3)
+            self.assertEqual(
+                summary,
+                "最近 3 次反思:\n\n- 2026-01-08: S8\n- 2026-01-09: S9\n- 2026-01-10: S10",
+            )
+
     def test_metrics_persists_bottleneck_for_insights(self):
         with tempfile.TemporaryDirectory() as td:
             base = Path(td)
@@ -135,9 +135,9 @@ class TestConfigLoader:
             if config.get_capability("file_read", "gemini") != "view_file":
                 errors.append("Gemini file_read should be 'view_file'")
             
-            # Claude 映射
-            if config.get_capability("file_read", "claude") != "read_file":
-                errors.append("Claude file_read should be 'read_file'")
+            # Claude 映射 (以 agent_config.md 为准)
+            if config.get_capability("file_read", "claude") != "Read":
+                errors.append("Claude file_read should be 'Read'")
             
             # Copilot 映射
             if config.get_capability("run_command", "copilot") != "run_in_terminal":
@@ -154,8 +154,8 @@ class TestConfigLoader:
             config = AgentConfig(config_path=AGENT_DIR / "config" / "agent_config.md")
             
             shared = config.shared
-            if shared.project.get("type") != "flutter":
-                errors.append("Project type should be 'flutter'")
+            if shared.project.get("type") != "node":
+                errors.append("Project type should be 'node'")
             if shared.dispatcher.get("max_restarts") != 3:
                 errors.append("Max restarts should be 3")
             if shared.evolution.get("min_confidence") != 0.5:
@@ -0,0 +1,198 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+GUARDS_DIR = PROJECT_ROOT / ".agent" / "guards"
+if str(GUARDS_DIR) not in sys.path:
+    sys.path.insert(0, str(GUARDS_DIR))
+
+from session_watchdog import SessionWatchdog
+from deadline_scheduler import DeadlineScheduler
+from watchdog_daemon import SocketSink, WatchdogDaemon, expand_projects
+
+
+def make_project(base: Path, name: str) -> Path:
+    context = base / name / ".agent" / "memory" / "active_context.md"
+    context.parent.mkdir(parents=True)
+    context.write_text("---\ntask_status: IDLE\n---\n", encoding="utf-8")
+    return context
+
+
+class TestEventDrivenWatchdog(unittest.TestCase):
+    def test_deadline_is_mtime_plus_timeout(self):
+        with tempfile.TemporaryDirectory() as td:
+            context = make_project(Path(td), "p")
+            os.utime(context, (1000, 1000))
+            watchdog = SessionWatchdog(timeout_minutes=30, context_path=context)
+
+            self.assertEqual(watchdog.next_deadline(context), 1000 + 30 * 60)
+            missing = Path(td) / "missing.md"
+            self.assertEqual(watchdog.next_deadline(missing, now=50), 50 + watchdog.check_interval_seconds)
+
+    def _run(self, watchdog, stop, results, backend):
+        worker = threading.Thread(
+            target=watchdog.run_event_driven,
+            kwargs={"stop": stop, "backend": backend, "on_result": results.append},
+        )
+        worker.start()
+        return worker
+
+    def test_alerts_at_deadline_and_updates_postpone_it(self):
+        for backend in ("auto", "polling"):
+            with self.subTest(backend=backend), tempfile.TemporaryDirectory() as td:
+                stale_ctx = make_project(Path(td), "stale")
+                fresh_ctx = make_project(Path(td), "fresh")
+                watchdog = SessionWatchdog(context_path=stale_ctx, extra_context_paths=[fresh_ctx])
+                watchdog.timeout_seconds = 0.4
+                watchdog.check_interval_seconds = 60
+                results, stop = [], threading.Event()
+
+                started = time.time()
+                worker = self._run(watchdog, stop, results, backend)
+                # fresh 项目持续更新，截止时间不断顺延
+                while time.time() - started < 0.9:
+                    fresh_ctx.write_text(f"---\ntask_status: IDLE\nts: {time.time()}\n---\n", encoding="utf-8")
+                    time.sleep(0.1)
+                stop.set()
+                worker.join(timeout=5)
+
+                stale_alerts = [r for r in results if r["stale"] and r["file"] == str(stale_ctx)]
+                self.assertEqual(len(stale_alerts), 1)
+                self.assertFalse(any(r["stale"] and r["file"] == str(fresh_ctx) for r in results))
+
+    def test_update_after_alert_reports_recovery(self):
+        with tempfile.TemporaryDirectory() as td:
+            context = make_project(Path(td), "p")
+            watchdog = SessionWatchdog(context_path=context)
+            watchdog.timeout_seconds = 0.2
+            results, stop = [], threading.Event()
+
+            worker = self._run(watchdog, stop, results, "auto")
+            deadline = time.time() + 3
+            while not results and time.time() < deadline:
+                time.sleep(0.05)
+            context.write_text("---\ntask_status: IMPLEMENTING\n---\n", encoding="utf-8")
+            while len(results) < 2 and time.time() < deadline:
+                time.sleep(0.05)
+            stop.set()
+            worker.join(timeout=5)
+
+            self.assertTrue(results[0]["stale"])
+            self.assertFalse(results[1]["stale"])
+
+
+class TestWatchdogDaemon(unittest.TestCase):
+    def test_scheduler_orders_and_reschedules(self):
+        scheduler = DeadlineScheduler()
+        scheduler.schedule("a", 10)
+        scheduler.schedule("b", 5)
+        scheduler.schedule("a", 3)    # 顺延 / 提前时旧条目失效
+        scheduler.schedule("c", 7)
+        scheduler.cancel("c")
+
+        self.assertEqual(scheduler.next_time(), 3)
+        self.assertEqual(scheduler.pop_due(6), ["a", "b"])
+        self.assertIsNone(scheduler.next_time())
+
+    def test_expand_projects_glob_skips_non_projects(self):
+        with tempfile.TemporaryDirectory() as td:
+            make_project(Path(td), "one")
+            make_project(Path(td), "two")
+            (Path(td) / "empty").mkdir()
+
+            found = expand_projects([os.path.join(td, "*"), os.path.join(td, "one")])
+
+            self.assertEqual([p.parents[2].name for p in found], ["one", "two"])
+
+    def _run(self, daemon):
+        stop = threading.Event()
+        worker = threading.Thread(target=daemon.run, kwargs={"stop": stop})
+        worker.start()
+        return stop, worker
+
+    def test_single_heap_alerts_only_stale_projects(self):
+        with tempfile.TemporaryDirectory() as td:
+            make_project(Path(td), "stale")
+            fresh_ctx = make_project(Path(td), "fresh")
+            events = []
+            daemon = WatchdogDaemon(
+                [os.path.join(td, "*")],
+                timeout_minutes=0.4 / 60,
+                check_interval_minutes=1,
+                sink=events.append,
+                stats_interval=0.3,
+            )
+
+            started = time.time()
+            stop, worker = self._run(daemon)
+            while time.time() - started < 0.9:
+                fresh_ctx.write_text(f"---\nts: {time.time()}\n---\n", encoding="utf-8")
+                time.sleep(0.1)
+            stop.set()
+            worker.join(timeout=5)
+
+            types = [e["type"] for e in events]
+            self.assertEqual(types[0], "started")
+            self.assertEqual(types[-1], "stopped")
+            stale = [e for e in events if e["type"] == "stale"]
+            self.assertEqual([Path(e["project"]).name for e in stale], ["stale"])
+            stats = [e for e in events if e["type"] == "stats"]
+            self.assertTrue(stats)
+            self.assertEqual(stats[0]["projects"], 2)
+            self.assertGreater(stats[0]["cpu_seconds"], 0)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "需要 unix socket")
+    def test_socket_sink_broadcasts_json_lines(self):
+        with tempfile.TemporaryDirectory() as td:
+            sink = SocketSink(os.path.join(td, "watchdog.sock"))
+            try:
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(os.path.join(td, "watchdog.sock"))
+                client.settimeout(3)
+                deadline = time.time() + 3
+                while not sink._clients and time.time() < deadline:
+                    time.sleep(0.01)
+
+                sink({"type": "stale", "project": "p"})
+
+                line = client.makefile("r", encoding="utf-8").readline()
+                self.assertEqual(json.loads(line), {"type": "stale", "project": "p"})
+                client.close()
+            finally:
+                sink.close()
+            self.assertFalse(os.path.exists(os.path.join(td, "watchdog.sock")))
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "需要 unix socket")
+    def test_socket_sink_drops_stalled_client(self):
+        with tempfile.TemporaryDirectory() as td:
+            sink = SocketSink(os.path.join(td, "watchdog.sock"))
+            sink.SEND_TIMEOUT = 0.05
+            try:
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(os.path.join(td, "watchdog.sock"))
+                deadline = time.time() + 3
+                while not sink._clients and time.time() < deadline:
+                    time.sleep(0.01)
+
+                # 客户端从不读取: 缓冲区写满后发送超时，客户端被移除而不是阻塞
+                payload = {"type": "stale", "project": "x" * 65536}
+                start = time.monotonic()
+                while sink._clients and time.monotonic() - start < 5:
+                    sink(payload)
+                self.assertEqual(sink._clients, [])
+                self.assertLess(time.monotonic() - start, 5)
+                client.close()
+            finally:
+                sink.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import json
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+GUARDS_DIR = PROJECT_ROOT / ".agent" / "guards"
+if str(GUARDS_DIR) not in sys.path:
+    sys.path.insert(0, str(GUARDS_DIR))
+
+from status_dashboard import SECTION_SOURCES, StatusDashboard
+
+
+def make_agent_dir(base: Path) -> Path:
+    agent = base / ".agent"
+    evo = agent / "memory" / "evolution"
+    evo.mkdir(parents=True, exist_ok=True)
+    (agent / "config").mkdir(parents=True, exist_ok=True)
+    (agent / "memory" / "active_context.md").write_text(
+        """---
+session_id: "s-1"
+task_status: IMPLEMENTING
+last_checkpoint: cp-1
+---
+
+## 📝 任务队列 (Active Tasks)
+- [x] **[DONE]** T-001: first
+- [ ] **[PENDING]** T-002: second
+""",
+        encoding="utf-8",
+    )
+    (agent / "config" / "agent_config.md").write_text("ACTIVE_PROVIDER: claude\n", encoding="utf-8")
+    (evo / "knowledge_base.md").write_text("| k-001 | demo |\n| k-002 | demo |\n", encoding="utf-8")
+    (evo / "reflection_log.md").write_text(
+        "## 2026-02-14 Session: Demo\n\n### 💡 Learnings\n- keep it simple\n",
+        encoding="utf-8",
+    )
+    return agent
+
+
+class TestStatusDashboard(unittest.TestCase):
+    def test_sources_loaded_once_and_shared_across_sections(self):
+        with tempfile.TemporaryDirectory() as td:
+            dashboard = StatusDashboard(base_dir=make_agent_dir(Path(td)))
+            reads = Counter()
+            original = dashboard._read_file
+
+            def counting_read(path):
+                reads[path.name] += 1
+                return original(path)
+
+            dashboard._read_file = counting_read
+            output = dashboard.generate()
+
+            self.assertTrue(reads)
+            self.assertEqual(max(reads.values()), 1)
+            self.assertIn("`IMPLEMENTING`", output)
+            self.assertIn("**claude**", output)
+            self.assertIn("| ✅ Done | 1 | T-001 |", output)
+            self.assertIn("| 📚 Knowledge Items | 2 |", output)
+            self.assertIn("| 2026-02-14 | Session: Demo | keep it simple |", output)
+
+    def test_timings_cover_every_source(self):
+        with tempfile.TemporaryDirectory() as td:
+            dashboard = StatusDashboard(base_dir=make_agent_dir(Path(td)))
+            dashboard.generate()
+
+            for name in ("active_context", "reflection_log", "git_tag", "git_hooks", "load", "total"):
+                self.assertIn(name, dashboard.timings)
+            self.assertIn("| **total** |", dashboard.format_timings())
+
+    def test_partial_reload_only_touches_requested_sources(self):
+        with tempfile.TemporaryDirectory() as td:
+            agent = make_agent_dir(Path(td))
+            dashboard = StatusDashboard(base_dir=agent)
+            src = dashboard.load_sources()
+            (agent / "config" / "agent_config.md").write_text("ACTIVE_PROVIDER: gemini\n", encoding="utf-8")
+
+            refreshed = dashboard.load_sources(only={"agent_config"}, previous=src)
+
+            self.assertEqual(set(refreshed.timings), {"agent_config"})
+            self.assertIs(refreshed.context, src.context)
+            self.assertIn("**gemini**", dashboard.render_sections(refreshed, ["system_state"])["system_state"])
+
+    def test_watch_rerenders_only_affected_sections(self):
+        with tempfile.TemporaryDirectory() as td:
+            agent = make_agent_dir(Path(td))
+            dashboard = StatusDashboard(base_dir=agent)
+            updates = []
+            stop = threading.Event()
+
+            def on_update(sections, changed):
+                updates.append((sections, changed))
+                if len(updates) == 1:
+                    kb = agent / "memory" / "evolution" / "knowledge_base.md"
+                    kb.write_text("| k-001 | demo |\n", encoding="utf-8")
+                else:
+                    stop.set()
+
+            worker = threading.Thread(
+                target=dashboard.watch,
+                args=(on_update,),
+                kwargs={"debounce": 0.05, "stop": stop, "backend": "polling"},
+            )
+            worker.start()
+            worker.join(timeout=10)
+            stop.set()
+
+            self.assertEqual(len(updates), 2)
+            self.assertEqual(updates[1][1], ["evolution_stats"])
+            self.assertIn("| 📚 Knowledge Items | 1 |", updates[1][0]["evolution_stats"])
+
+    def test_watched_root_change_reloads_every_source(self):
+        with tempfile.TemporaryDirectory() as td:
+            dashboard = StatusDashboard(base_dir=make_agent_dir(Path(td)))
+            memory = dashboard.memory_dir.resolve()
+
+            self.assertEqual(dashboard.sources_for({memory / "active_context.md"}), {"active_context"})
+            # inotify 队列溢出时 ChangeWatcher 返回根目录本身
+            names = dashboard.sources_for({memory})
+            self.assertEqual(names, {s for deps in SECTION_SOURCES.values() for s in deps})
+
+    def test_collect_returns_typed_snapshot(self):
+        with tempfile.TemporaryDirectory() as td:
+            snapshot = StatusDashboard(base_dir=make_agent_dir(Path(td))).collect()
+
+            self.assertEqual(snapshot.state.status, "IMPLEMENTING")
+            self.assertEqual(snapshot.state.provider, "claude")
+            self.assertEqual(snapshot.progress.tasks["DONE"], ["T-001"])
+            self.assertEqual(snapshot.progress.percent, 50)
+            self.assertEqual(snapshot.evolution.knowledge_items, 2)
+            self.assertEqual(snapshot.reflections[0].learning, "keep it simple")
+            data = json.loads(snapshot.to_json())
+            self.assertEqual(data["etag"], snapshot.etag)
+            self.assertEqual([w["name"] for w in data["workflows"]], ["feature-flow", "analyze-error", "start"])
+
+    def test_http_endpoint_supports_if_none_match(self):
+        with tempfile.TemporaryDirectory() as td:
+            agent = make_agent_dir(Path(td))
+            server = StatusDashboard(base_dir=agent).serve(port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{server.server_address[1]}/status.json"
+            try:
+                with urllib.request.urlopen(url) as resp:
+                    etag = resp.headers["ETag"]
+                    self.assertEqual(json.loads(resp.read())["state"]["status"], "IMPLEMENTING")
+
+                request = urllib.request.Request(url, headers={"If-None-Match": etag})
+                with self.assertRaises(urllib.error.HTTPError) as ctx:
+                    urllib.request.urlopen(request)
+                self.assertEqual(ctx.exception.code, 304)
+
+                (agent / "config" / "agent_config.md").write_text("ACTIVE_PROVIDER: copilot\n", encoding="utf-8")
+                with urllib.request.urlopen(request) as resp:
+                    self.assertNotEqual(resp.headers["ETag"], etag)
+                    self.assertEqual(json.loads(resp.read())["state"]["provider"], "copilot")
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,354 @@
+"""
+watchdog_daemon.py — 多项目 Session 看门狗守护进程
+
+单个进程监控任意数量项目的 .agent/memory/active_context.md:
+  - 项目根目录来自列表或 glob (定期重新展开，新项目自动加入)
+  - 所有截止时间 (mtime + 超时阈值) 放在同一个最小堆中，进程只休眠到最近的截止时间
+  - 文件变更通过 fs_watch (inotify / 轮询回退) 到达，直接顺延对应截止时间
+  - 告警以 JSON Lines 输出到 stdout，或广播给连接到本地 socket 的客户端
+  - 定期输出自身 CPU / 内存占用 (type: "stats")
+
+Usage:
+    python .agent/guards/watchdog_daemon.py --projects "~/work/*" --timeout 30
+    python .agent/guards/watchdog_daemon.py --projects ~/a ~/b --socket /tmp/axiom-watchdog.sock
+    python .agent/guards/watchdog_daemon.py --projects "~/work/*" --socket tcp:127.0.0.1:8766
+
+    # 订阅 socket 告警
+    socat - UNIX-CONNECT:/tmp/axiom-watchdog.sock
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import glob
+import json
+import time
+import signal
+import socket
+import argparse
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable
+
+_GUARDS_DIR = str(Path(__file__).resolve().parent)
+if _GUARDS_DIR not in sys.path:
+    sys.path.insert(0, _GUARDS_DIR)
+
+from deadline_scheduler import DeadlineScheduler
+from fs_watch import ChangeWatcher
+from session_watchdog import (
+    CONTEXT_RELATIVE_PATH,
+    DEFAULT_CHECK_INTERVAL_MINUTES,
+    DEFAULT_TIMEOUT_MINUTES,
+    SessionWatchdog,
+)
+
+
+STATS_KEY = "__stats__"
+RESCAN_KEY = "__rescan__"
+
+
+# ── 告警输出 ──────────────────────────────────────────
+
+class JsonLinesSink:
+    """将事件逐行写入文本流 (默认 stdout)。"""
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream or sys.stdout
+
+    def __call__(self, event: dict) -> None:
+        self.stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class SocketSink:
+    """
+    本地 socket 广播: 监听 unix socket 路径或 tcp:HOST:PORT，
+    向所有已连接客户端推送 JSON Lines；断开的客户端自动移除。
+    发送带超时 (SEND_TIMEOUT)，不读数据的客户端填满缓冲区后被移除，不会卡住主循环。
+    """
+
+    SEND_TIMEOUT = 0.5
+
+    def __init__(self, address: str) -> None:
+        if address.startswith("tcp:"):
+            host, port = address[4:].rsplit(":", 1)
+            self._server = socket.create_server((host, int(port)))
+            self._unix_path = None
+        else:
+            self._unix_path = Path(address)
+            if self._unix_path.exists():
+                self._unix_path.unlink()
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(str(self._unix_path))
+            self._server.listen()
+        self.address = self._server.getsockname()
+        self._clients: list[socket.socket] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def __call__(self, event: dict) -> None:
+        data = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            alive = []
+            for client in self._clients:
+                try:
+                    client.sendall(data)
+                    alive.append(client)
+                except OSError:  # 含 socket.timeout
+                    client.close()
+            self._clients = alive
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients = []
+        self._server.close()
+        if self._unix_path is not None and self._unix_path.exists():
+            self._unix_path.unlink()
+
+    def _accept_loop(self) -> None:
+        while not self._closed:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            client.settimeout(self.SEND_TIMEOUT)
+            with self._lock:
+                self._clients.append(client)
+
+
+# ── 资源占用 ──────────────────────────────────────────
+
+def resource_usage() -> dict:
+    """进程自身的 CPU 时间与内存占用 (不可用的字段为 None)。"""
+    usage = {"cpu_seconds": time.process_time(), "rss_mb": None, "max_rss_mb": None}
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        usage["max_rss_mb"] = round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        usage["rss_mb"] = round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 2)
+    except (OSError, ValueError, AttributeError):
+        pass
+    return usage
+
+
+# ── 守护进程 ──────────────────────────────────────────
+
+def expand_projects(patterns: Iterable[str]) -> list[Path]:
+    """展开项目根目录列表 / glob，只保留含 active_context.md 的项目。"""
+    roots: dict[str, Path] = {}
+    for pattern in patterns:
+        expanded = os.path.expanduser(pattern)
+        matches = glob.glob(expanded) if glob.has_magic(expanded) else [expanded]
+        for match in sorted(matches):
+            context = Path(match).resolve() / CONTEXT_RELATIVE_PATH
+            if context.is_file():
+                roots.setdefault(str(context), context)
+    return list(roots.values())
+
+
+class WatchdogDaemon:
+    """多项目看门狗: 单个最小堆调度所有截止时间。"""
+
+    def __init__(
+        self,
+        projects: Iterable[str],
+        timeout_minutes: float = DEFAULT_TIMEOUT_MINUTES,
+        check_interval_minutes: float = DEFAULT_CHECK_INTERVAL_MINUTES,
+        sink: Callable[[dict], None] | None = None,
+        stats_interval: float = 300,
+        rescan_interval: float = 60,
+        backend: str = "auto",
+    ) -> None:
+        self.patterns = list(projects)
+        self.sink = sink or JsonLinesSink()
+        self.stats_interval = stats_interval
+        self.rescan_interval = rescan_interval
+        self.backend = backend
+        # 复用单项目看门狗的检查与截止时间计算
+        self.checker = SessionWatchdog(
+            timeout_minutes=timeout_minutes,
+            check_interval_minutes=check_interval_minutes,
+            context_path=CONTEXT_RELATIVE_PATH,
+        )
+        self.scheduler = DeadlineScheduler()
+        self.files: dict[str, Path] = {}
+        self.stale: set[str] = set()
+        self.alerts = 0
+        self._running = True
+        self._last_usage = (time.monotonic(), time.process_time())
+
+    # ── Public API ──
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """运行直到 stop 被 set (或 Ctrl+C / SIGTERM)。"""
+        if stop is None:
+            signal.signal(signal.SIGINT, self._interrupt)
+            if hasattr(signal, "SIGTERM"):
+                signal.signal(signal.SIGTERM, self._interrupt)
+
+        now = time.time()
+        self._rescan(now)
+        self._emit("started", projects=len(self.files), timeout_minutes=self.checker.timeout_seconds / 60)
+        if self.stats_interval > 0:
+            self.scheduler.schedule(STATS_KEY, now + self.stats_interval)
+        if self.rescan_interval > 0 and any(glob.has_magic(p) for p in self.patterns):
+            self.scheduler.schedule(RESCAN_KEY, now + self.rescan_interval)
+
+        watcher = self._open_watcher()
+        try:
+            while self._running and (stop is None or not stop.is_set()):
+                now = time.time()
+                for key in self.scheduler.pop_due(now):
+                    self._fire(key, now)
+                    if key == RESCAN_KEY and self._watched != set(self.files):
+                        watcher.close()
+                        watcher = self._open_watcher()
+
+                next_time = self.scheduler.next_time()
+                wait = None if next_time is None else max(0.0, next_time - time.time())
+                if stop is not None:
+                    wait = 0.5 if wait is None else min(wait, 0.5)   # 定期检查停止信号
+                for path in watcher.wait(timeout=wait):
+                    self._touched(str(path))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+            self._emit("stopped", alerts=self.alerts, **resource_usage())
+
+    def stats(self) -> dict:
+        """自身资源占用与调度状态。"""
+        now, cpu = time.monotonic(), time.process_time()
+        last_wall, last_cpu = self._last_usage
+        self._last_usage = (now, cpu)
+        wall = now - last_wall
+        return {
+            **resource_usage(),
+            "cpu_percent": round((cpu - last_cpu) / wall * 100, 3) if wall > 0 else 0.0,
+            "projects": len(self.files),
+            "stale": len(self.stale),
+            "alerts": self.alerts,
+            "heap_size": len(self.scheduler),
+        }
+
+    # ── Private Methods ──
+
+    def _open_watcher(self) -> ChangeWatcher:
+        self._watched = set(self.files)
+        return ChangeWatcher(list(self.files.values()), debounce=0.05, backend=self.backend)
+
+    def _rescan(self, now: float) -> None:
+        current = {str(p): p for p in expand_projects(self.patterns)}
+        for key in set(self.files) - set(current):
+            self.scheduler.cancel(key)
+            self.stale.discard(key)
+            self._emit("project_removed", file=key)
+        for key in set(current) - set(self.files):
+            self.scheduler.schedule(key, self.checker.next_deadline(current[key], now))
+            if self.files:
+                self._emit("project_added", file=key)
+        self.files = current
+
+    def _fire(self, key: str, now: float) -> None:
+        if key == STATS_KEY:
+            self._emit("stats", **self.stats())
+            self.scheduler.schedule(STATS_KEY, now + self.stats_interval)
+            return
+        if key == RESCAN_KEY:
+            self._rescan(now)
+            self.scheduler.schedule(RESCAN_KEY, now + self.rescan_interval)
+            return
+        if key not in self.files:
+            return
+
+        result = self.checker.check_once(self.files[key])
+        if result["stale"] or not result["exists"]:
+            self.stale.add(key)
+            self.alerts += 1
+            self._emit("stale" if result["exists"] else "missing", **self._describe(result))
+            self.scheduler.schedule(key, now + self.checker.check_interval_seconds)
+        else:
+            self.stale.discard(key)
+            self.scheduler.schedule(key, self.checker.next_deadline(self.files[key], now))
+
+    def _touched(self, key: str) -> None:
+        if key not in self.files:
+            return
+        self.scheduler.schedule(key, self.checker.next_deadline(self.files[key]))
+        if key in self.stale:
+            self.stale.discard(key)
+            self._emit("recovered", **self._describe(self.checker.check_once(self.files[key])))
+
+    def _describe(self, result: dict) -> dict:
+        path = Path(result["file"])
+        return {
+            "project": str(path.resolve().parents[2]),
+            "file": result["file"],
+            "age_minutes": result["age_minutes"],
+            "message": result["message"],
+        }
+
+    def _emit(self, event_type: str, **fields) -> None:
+        event = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+            "type": event_type,
+            **fields,
+        }
+        try:
+            self.sink(event)
+        except Exception:
+            pass   # 输出失败不影响监控
+
+    def _interrupt(self, signum: int, frame) -> None:
+        self._running = False
+        raise KeyboardInterrupt
+
+
+# ── CLI 入口 ──────────────────────────────────────────
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Axiom 多项目 Session 看门狗守护进程")
+    parser.add_argument("--projects", nargs="+", required=True, help="项目根目录或 glob (如 '~/work/*')")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_MINUTES, help="超时阈值 (分钟)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_CHECK_INTERVAL_MINUTES, help="过期后重复提醒间隔 (分钟)")
+    parser.add_argument("--socket", default=None, help="广播告警的 unix socket 路径或 tcp:HOST:PORT (默认输出到 stdout)")
+    parser.add_argument("--stats-interval", type=float, default=300, help="资源占用报告间隔 (秒, 0 关闭)")
+    parser.add_argument("--rescan-interval", type=float, default=60, help="glob 重新展开间隔 (秒)")
+    parser.add_argument("--backend", choices=["auto", "inotify", "polling"], default="auto")
+    args = parser.parse_args(argv)
+
+    sink = SocketSink(args.socket) if args.socket else JsonLinesSink()
+    daemon = WatchdogDaemon(
+        args.projects,
+        timeout_minutes=args.timeout,
+        check_interval_minutes=args.interval,
+        sink=sink,
+        stats_interval=args.stats_interval,
+        rescan_interval=args.rescan_interval,
+        backend=args.backend,
+    )
+    try:
+        daemon.run()
+    finally:
+        sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-import re
+
+from context_doc import ContextDocument, Section, edit_document, load_document
+from monitor_log import MonitorLog
+from state_graph import StateGraph, load_state_graph
+
+TASK_SECTION = "## 📝 任务队列 (Active Tasks)"
+DECISION_SECTION = "## 8. Runtime Decisions"
+KNOWN_ISSUE_SECTION = "## 5. 已知问题 (错误模式学习)"
+KNOWN_ISSUE_HEADER = "| 日期 | 错误类型 | 根因分析 | 修复方案 | 影响范围 |"
+KNOWN_ISSUE_DIVIDER = "|------|---------|---------|---------|---------|"
 
 
 @dataclass
@@ -21,9 +30,8 @@ class ContextManager:
         self.project_decisions_path = self.memory_dir / "project_decisions.md"
 
     def read_context(self) -> ContextData:
-        text = self.active_context_path.read_text(encoding="utf-8")
-        frontmatter, body = _split_frontmatter(text)
-        return ContextData(frontmatter=frontmatter, body=body)
+        doc = load_document(self.active_context_path, missing_ok=False)
+        return ContextData(frontmatter=dict(doc.raw_frontmatter), body=doc.body)
 
     def update_progress(self, task_id: str, status: str, summary: str) -> None:
         status_text = status.strip().upper()
@@ -32,111 +40,145 @@ class ContextManager:
             "PENDING": "[ ] **[PENDING]**",
             "BLOCKED": "[ ] **[BLOCKED]**",
         }.get(status_text, "[ ] **[PENDING]**")
-        new_line = f"- {marker} {task_id}: {summary}"
-
-        data = self.read_context()
-        body = data.body
-        section = "## 📝 任务队列 (Active Tasks)"
-        idx = body.find(section)
-        if idx == -1:
-            if body and not body.endswith("\n"):
-                body += "\n"
-            body += f"\n{section}\n{new_line}\n"
-        else:
-            insert_at = body.find("\n", idx)
-            if insert_at == -1:
-                insert_at = len(body)
-            body = body[: insert_at + 1] + new_line + "\n" + body[insert_at + 1 :]
-
-        self._write_context(data.frontmatter, body)
+        new_line = f"- {marker} {task_id}: {summary}\n"
+
+        def build(doc: ContextDocument) -> list[tuple[int, int, str]]:
+            _require(doc)
+            section = doc.find_section(TASK_SECTION)
+            if section is None:
+                return [_append_at_end(doc, f"\n{TASK_SECTION}\n{new_line}")]
+            return [_insert_at(doc, section.body_start, new_line)]
+
+        edit_document(self.active_context_path, build)
 
     def save_decision(self, decision_type: str, content: str) -> None:
         now = datetime.now().strftime("%Y-%m-%d")
         entry = f"- {now} [{decision_type}] {content}\n"
-        text = self.project_decisions_path.read_text(encoding="utf-8")
 
-        section = "## 8. Runtime Decisions"
-        if section not in text:
-            if not text.endswith("\n"):
-                text += "\n"
-            text += f"\n{section}\n"
-        text += entry
-        self.project_decisions_path.write_text(text, encoding="utf-8")
+        def build(doc: ContextDocument) -> list[tuple[int, int, str]]:
+            _require(doc)
+            section = doc.find_section(DECISION_SECTION)
+            if section is None:
+                return [_append_at_end(doc, f"\n{DECISION_SECTION}\n{entry}")]
+            return [_insert_at(doc, _section_content_end(doc, section), entry)]
+
+        edit_document(self.project_decisions_path, build)
 
     def update_state(self, new_state: str) -> str:
         new_state = new_state.strip().upper()
-        data = self.read_context()
-        old_state = data.frontmatter.get("task_status", "IDLE").strip().upper()
-
-        self._validate_state_transition(old_state, new_state)
-        data.frontmatter["task_status"] = new_state
-        self._write_context(data.frontmatter, data.body)
+        transition: dict[str, str] = {}
+
+        def build(doc: ContextDocument) -> list[tuple[int, int, str]]:
+            _require(doc)
+            old_state = doc.frontmatter.get("task_status", "IDLE").strip().upper()
+            self._validate_state_transition(old_state, new_state)
+            transition["old"] = old_state
+
+            frontmatter = dict(doc.raw_frontmatter)
+            frontmatter["task_status"] = new_state
+            ordered = [f"{k}: {v}" for k, v in frontmatter.items()]
+            block = "---\n" + "\n".join(ordered) + "\n---\n"
+            if doc.body_offset == 0 and doc.text and not doc.text.startswith("\n"):
+                block += "\n"
+            return [(0, doc.body_offset, block)]
+
+        edit_document(self.active_context_path, build)
+        old_state = transition["old"]
+        self._audit_transition(old_state, new_state, self.state_graph().trigger(old_state, new_state), accepted=True)
         return f"State: {old_state} -> {new_state}"
 
     def record_error(self, error_type: str, root_cause: str, fix_solution: str, scope: str) -> None:
         today = datetime.now().strftime("%Y-%m-%d")
         row = f"| {today} | {error_type} | {root_cause} | {fix_solution} | {scope} |\n"
-        text = self.project_decisions_path.read_text(encoding="utf-8")
-
-        header = "| 日期 | 错误类型 | 根因分析 | 修复方案 | 影响范围 |"
-        divider = "|------|---------|---------|---------|---------|"
-        known_issue_section = "## 5. 已知问题 (错误模式学习)"
-        if known_issue_section not in text:
-            if not text.endswith("\n"):
-                text += "\n"
-            text += f"\n{known_issue_section}\n{header}\n{divider}\n"
-        elif header not in text:
-            text = text.replace(known_issue_section, f"{known_issue_section}\n{header}\n{divider}")
-
-        text += row
-        self.project_decisions_path.write_text(text, encoding="utf-8")
-
-    def _write_context(self, frontmatter: dict[str, str], body: str) -> None:
-        ordered = [f"{k}: {v}" for k, v in frontmatter.items()]
-        content = "---\n" + "\n".join(ordered) + "\n---\n"
-        if body and not body.startswith("\n"):
-            content += "\n"
-        content += body
-        self.active_context_path.write_text(content, encoding="utf-8")
+
+        def build(doc: ContextDocument) -> list[tuple[int, int, str]]:
+            _require(doc)
+            section = doc.find_section(KNOWN_ISSUE_SECTION)
+            if section is None:
+                return [_append_at_end(
+                    doc,
+                    f"\n{KNOWN_ISSUE_SECTION}\n{KNOWN_ISSUE_HEADER}\n{KNOWN_ISSUE_DIVIDER}\n{row}",
+                )]
+            table_end = _table_end(doc, section)
+            if table_end is None:
+                return [_insert_at(
+                    doc, section.body_start, f"{KNOWN_ISSUE_HEADER}\n{KNOWN_ISSUE_DIVIDER}\n{row}"
+                )]
+            return [_insert_at(doc, table_end, row)]
+
+        edit_document(self.project_decisions_path, build)
+
+    def state_graph(self) -> StateGraph:
+        return load_state_graph(self.state_machine_path)
+
+    def can_reach(self, target_state: str) -> bool:
+        doc = load_document(self.active_context_path, missing_ok=False)
+        current = doc.frontmatter.get("task_status", "IDLE").strip().upper()
+        return target_state.strip().upper() in self.state_graph().reachable(current)
 
     def _validate_state_transition(self, old_state: str, new_state: str) -> None:
-        states = _extract_states(self.state_machine_path)
-        if new_state not in states:
+        graph = self.state_graph()
+        if new_state not in graph.states:
+            self._audit_transition(old_state, new_state, "", accepted=False)
             raise ValueError(f"Unknown state: {new_state}")
-
-        allowed: dict[str, set[str]] = {
-            "IDLE": {"DRAFTING"},
-            "DRAFTING": {"CONFIRMING"},
-            "REVIEWING": {"CONFIRMING"},
-            "CONFIRMING": {"REVIEWING", "IDLE", "DECOMPOSING", "IMPLEMENTING"},
-            "DECOMPOSING": {"CONFIRMING"},
-            "IMPLEMENTING": {"BLOCKED", "IDLE"},
-            "BLOCKED": {"IMPLEMENTING"},
-        }
-        next_states = allowed.get(old_state, set())
-        if new_state not in next_states:
+        if not graph.allows(old_state, new_state):
+            self._audit_transition(old_state, new_state, "", accepted=False)
             raise ValueError(f"Illegal state transition: {old_state} -> {new_state}")
 
-
-def _split_frontmatter(text: str) -> tuple[dict[str, str], str]:
-    if not text.startswith("---\n"):
-        return {}, text
-
-    end = text.find("\n---\n", 4)
-    if end == -1:
-        return {}, text
-
-    raw = text[4:end]
-    body = text[end + 5 :]
-    data: dict[str, str] = {}
-    for line in raw.splitlines():
-        if ":" not in line:
-            continue
-        key, value = line.split(":", 1)
-        data[key.strip()] = value.strip()
-    return data, body
-
-
-def _extract_states(path: Path) -> set[str]:
-    text = path.read_text(encoding="utf-8")
-    return set(re.findall(r"\|\s*[^|]+\|\s*([A-Z_]+)\s*\|", text))
+    def _audit_transition(self, old_state: str, new_state: str, trigger: str, accepted: bool) -> None:
+        # 与 hooks/post-tool-use.cjs 共用 monitor.log；state_change 事件同时作为 hook 的上一状态来源
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "type": "state_change" if accepted else "state_change_rejected",
+            "task_status": new_state if accepted else old_state,
+            "from": old_state,
+            "to": new_state,
+            "trigger": trigger,
+            "source": "context_manager",
+        }
+        try:
+            MonitorLog(self.memory_dir).append(entry)
+        except OSError:
+            pass
+
+
+def _require(doc: ContextDocument) -> None:
+    if not doc.exists:
+        raise FileNotFoundError(f"No such file: {doc.path}")
+
+
+def _insert_at(doc: ContextDocument, offset: int, text: str) -> tuple[int, int, str]:
+    """在行首偏移处插入文本；若偏移处于未换行的末行之后，先补换行。"""
+    if offset > 0 and doc.text[offset - 1] != "\n":
+        text = "\n" + text
+    return (offset, offset, text)
+
+
+def _append_at_end(doc: ContextDocument, text: str) -> tuple[int, int, str]:
+    end = len(doc.text)
+    if doc.text and not doc.text.endswith("\n"):
+        text = "\n" + text
+    return (end, end, text)
+
+
+def _section_content_end(doc: ContextDocument, section: Section) -> int:
+    """章节最后一个非空行的结束偏移 (不含尾部空行)。"""
+    content = doc.text[section.body_start:section.end].rstrip()
+    if not content:
+        return section.body_start
+    return doc.line_end(section.body_start + len(content) - 1)
+
+
+def _table_end(doc: ContextDocument, section: Section) -> int | None:
+    """章节内第一张表格最后一行的结束偏移；无表格时返回 None。"""
+    offset = section.body_start
+    end: int | None = None
+    while offset < section.end:
+        line_end = doc.line_end(offset)
+        line = doc.text[offset:line_end].strip()
+        if line.startswith("|"):
+            end = line_end
+        elif end is not None:
+            break
+        offset = line_end
+    return end
@@ -0,0 +1,330 @@
+"""
+monitor_analytics.py — monitor.log 事件聚合分析
+
+以生成器流水线流式读取 monitor.log (事件 → 会话切分 → 累加)，内存占用与日志
+大小无关，统计:
+  - 每个会话的持续时间、写入次数与写入速率 (hook_write / 小时)
+  - 最常写入的文件
+  - 按小时 (0-23) 的事件直方图
+
+hook 事件本身不带会话 ID，会话按 session_start 切分: 一个会话从 session_start
+开始，直到下一个 session_start 之前的最后一个事件结束。
+
+聚合结果可合并 (跨分段的会话在合并时拼接)，因此按分段缓存:
+  - 已轮转的 gzip 分段不可变，结果缓存后永不重算
+  - 活动日志按字节偏移增量累加
+重复查询只需处理上次之后新追加的事件。
+
+Usage:
+    from monitor_analytics import MonitorAnalytics
+    analytics = MonitorAnalytics(".agent/memory")
+    stats = analytics.stats()
+    stats.sessions[-1].writes_per_hour
+    stats.top_files(10)
+
+CLI:
+    python monitor_analytics.py [--top 10] [--json]
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import argparse
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from context_doc import write_atomic
+from monitor_log import MonitorLog, iter_complete_events, iter_segment_events
+
+
+CACHE_NAME = "analytics.json"
+CACHE_VERSION = 1
+
+
+@dataclass
+class SessionStats:
+    """单个会话的统计。"""
+    session_id: str = ""
+    start: str = ""
+    end: str = ""
+    events: int = 0
+    writes: int = 0
+    tasks_completed: int = 0
+    state_changes: int = 0
+    continued: bool = False   # 分段开头、未见 session_start 的事件 (合并时并入上一会话)
+
+    @property
+    def duration_min(self) -> float:
+        start, end = _parse_ts(self.start), _parse_ts(self.end)
+        if start is None or end is None:
+            return 0.0
+        return max(0.0, (end - start).total_seconds() / 60)
+
+    @property
+    def writes_per_hour(self) -> float:
+        minutes = self.duration_min
+        return self.writes / minutes * 60 if minutes > 0 else float(self.writes)
+
+    def absorb(self, other: SessionStats) -> None:
+        """并入同一会话的后续片段。"""
+        if other.end > self.end:
+            self.end = other.end
+        if not self.start:
+            self.start = other.start
+        self.events += other.events
+        self.writes += other.writes
+        self.tasks_completed += other.tasks_completed
+        self.state_changes += other.state_changes
+
+
+@dataclass
+class LogStats:
+    """可合并的聚合结果。"""
+    events: int = 0
+    event_counts: Counter = field(default_factory=Counter)
+    file_writes: Counter = field(default_factory=Counter)
+    hour_histogram: dict[str, Counter] = field(default_factory=dict)   # 类型 → Counter({0..23: n})
+    sessions: list[SessionStats] = field(default_factory=list)
+
+    def merge(self, later: LogStats) -> LogStats:
+        """原地并入时间上位于其后的结果并返回 self (later 的会话对象被接管，之后不应再使用)。"""
+        for i, session in enumerate(later.sessions):
+            if i == 0 and session.continued and self.sessions:
+                self.sessions[-1].absorb(session)
+            else:
+                self.sessions.append(session)
+        for etype, hours in later.hour_histogram.items():
+            self.hour_histogram.setdefault(etype, Counter()).update(hours)
+        self.events += later.events
+        self.event_counts.update(later.event_counts)
+        self.file_writes.update(later.file_writes)
+        return self
+
+    def top_files(self, n: int = 10) -> list[tuple[str, int]]:
+        return self.file_writes.most_common(n)
+
+    def to_dict(self) -> dict:
+        return {
+            "events": self.events,
+            "event_counts": dict(self.event_counts),
+            "file_writes": dict(self.file_writes),
+            "hour_histogram": {k: {str(h): n for h, n in v.items()} for k, v in self.hour_histogram.items()},
+            "sessions": [asdict(s) for s in self.sessions],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LogStats:
+        return cls(
+            events=data.get("events", 0),
+            event_counts=Counter(data.get("event_counts", {})),
+            file_writes=Counter(data.get("file_writes", {})),
+            hour_histogram={
+                k: Counter({int(h): n for h, n in v.items()})
+                for k, v in data.get("hour_histogram", {}).items()
+            },
+            sessions=[SessionStats(**s) for s in data.get("sessions", [])],
+        )
+
+
+# ── 流水线 ──────────────────────────────────────────────
+
+def live_events(events: Iterable[dict]) -> Iterator[dict]:
+    """过滤轮转时带入的 carried_over 事件。"""
+    return (e for e in events if not e.get("carried_over"))
+
+
+def aggregate(events: Iterable[dict], stats: LogStats | None = None) -> LogStats:
+    """流式累加事件 (可在已有结果上继续累加)。"""
+    stats = stats if stats is not None else LogStats()
+    session = stats.sessions[-1] if stats.sessions else None
+
+    for event in live_events(events):
+        etype = str(event.get("type", ""))
+        ts = str(event.get("ts", ""))
+
+        if etype == "session_start" or session is None:
+            session = SessionStats(
+                session_id=str(event.get("sessionId", "")) if etype == "session_start" else "",
+                start=ts,
+                end=ts,
+                continued=etype != "session_start",
+            )
+            stats.sessions.append(session)
+
+        stats.events += 1
+        stats.event_counts[etype] += 1
+        session.events += 1
+        if ts > session.end:
+            session.end = ts
+        if etype == "hook_write":
+            session.writes += 1
+            if event.get("file"):
+                stats.file_writes[str(event["file"])] += 1
+        elif etype == "task_completed":
+            session.tasks_completed += 1
+        elif etype == "state_change":
+            session.state_changes += 1
+
+        hour = _hour_of_day(ts)
+        if hour is not None:
+            stats.hour_histogram.setdefault(etype, Counter())[hour] += 1
+    return stats
+
+
+class MonitorAnalytics:
+    """按分段缓存的 monitor.log 聚合分析。"""
+
+    def __init__(self, memory_dir: str | Path = ".agent/memory") -> None:
+        self.log = MonitorLog(memory_dir)
+        self.cache_path = self.log.segment_dir / CACHE_NAME
+
+    # ── Public API ──
+
+    def stats(self) -> LogStats:
+        """全部事件的聚合结果 (已轮转分段读缓存，活动日志增量累加)。"""
+        cache = self._load_cache()
+        dirty = False
+        total = LogStats()
+
+        seg_cache = cache.setdefault("segments", {})
+        live_names = set()
+        for seg in self.log.segments():
+            live_names.add(seg.name)
+            raw = seg_cache.get(seg.name)
+            if raw is None:
+                part = aggregate(iter_segment_events(self.log.segment_dir / seg.name))
+                seg_cache[seg.name] = part.to_dict()
+                dirty = True
+            else:
+                part = LogStats.from_dict(raw)
+            total.merge(part)
+        for name in set(seg_cache) - live_names:
+            del seg_cache[name]
+            dirty = True
+
+        active, changed = self._active_stats(cache.get("active"))
+        if changed:
+            cache["active"] = active
+            dirty = True
+        total.merge(LogStats.from_dict(active["stats"]))
+
+        if dirty:
+            self._save_cache(cache)
+        return total
+
+    def report(self, top: int = 10, last_sessions: int = 10) -> str:
+        """Markdown 报告。"""
+        stats = self.stats()
+        lines = [
+            "## 📊 Monitor Analytics\n",
+            f"**Events**: {stats.events} / **Sessions**: {len(stats.sessions)}",
+            "",
+            "### Sessions\n",
+            "| Session | Start | Duration | Writes | Writes/h | Tasks |",
+            "|---------|-------|----------|--------|----------|-------|",
+        ]
+        for s in stats.sessions[-last_sessions:]:
+            lines.append(
+                f"| {s.session_id[:20] or '-'} | {s.start[:16]} | {s.duration_min:.0f}min "
+                f"| {s.writes} | {s.writes_per_hour:.1f} | {s.tasks_completed} |"
+            )
+        lines.extend(["", "### Most Written Files\n", "| File | Writes |", "|------|--------|"])
+        for name, count in stats.top_files(top):
+            lines.append(f"| {name} | {count} |")
+        lines.extend(["", "### Hourly Activity (UTC)\n", "```"])
+        histogram = Counter()
+        for hours in stats.hour_histogram.values():
+            histogram.update(hours)
+        peak = max(histogram.values(), default=0)
+        for hour in range(24):
+            count = histogram.get(hour, 0)
+            bar = "█" * (round(count / peak * 30) if peak else 0)
+            lines.append(f"{hour:02d}h {bar} {count}")
+        lines.append("```")
+        return "\n".join(lines)
+
+    # ── Private Methods ──
+
+    def _active_stats(self, cached: dict | None) -> tuple[dict, bool]:
+        """活动日志: 同一 inode 时从上次偏移继续累加，否则从头计算。"""
+        path = self.log.path
+        try:
+            st = path.stat()
+        except OSError:
+            return {"inode": 0, "offset": 0, "stats": LogStats().to_dict()}, cached is not None
+        if cached and cached.get("inode") == st.st_ino and cached.get("offset", 0) <= st.st_size:
+            if cached["offset"] == st.st_size:
+                return cached, False
+            offset = cached["offset"]
+            stats = LogStats.from_dict(cached["stats"])
+        else:
+            offset, stats = 0, LogStats()
+
+        start = offset
+
+        def events() -> Iterator[dict]:
+            nonlocal offset
+            for end, event in iter_complete_events(path, start):
+                offset = end
+                if event is not None:
+                    yield event
+
+        stats = aggregate(events(), stats)
+        return {"inode": st.st_ino, "offset": offset, "stats": stats.to_dict()}, True
+
+    def _load_cache(self) -> dict:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"version": CACHE_VERSION}
+        if data.get("version") != CACHE_VERSION:
+            return {"version": CACHE_VERSION}
+        return data
+
+    def _save_cache(self, data: dict) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.cache_path, json.dumps(data, ensure_ascii=False))
+
+
+def _parse_ts(ts: str) -> datetime | None:
+    if not ts:
+        return None
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _hour_of_day(ts: str) -> int | None:
+    # ISO 时间戳 YYYY-MM-DDTHH:...
+    if len(ts) >= 13 and ts[11:13].isdigit():
+        return int(ts[11:13])
+    return None
+
+
+# ── CLI 入口 ────────────────────────────────────────────
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="monitor.log 聚合分析")
+    parser.add_argument("--memory-dir", default=".agent/memory")
+    parser.add_argument("--top", type=int, default=10, help="最常写入文件数量")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args(argv)
+
+    analytics = MonitorAnalytics(args.memory_dir)
+    if args.json:
+        stats = analytics.stats()
+        data = stats.to_dict()
+        data["top_files"] = stats.top_files(args.top)
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        print(analytics.report(top=args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
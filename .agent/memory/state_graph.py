@@ -0,0 +1,221 @@
+"""
+state_graph.py — 状态机转换表编译器
+
+从 state_machine.md 编译状态集合与转换邻接表:
+  - 状态: "状态定义 (States)" 表格的「代码」列
+  - 转换: Mermaid stateDiagram 中的 `A --> B` (复合状态别名展开为其成员)
+          以及「转换触发器 (Triggers)」表格的 源状态 → 目标状态
+编译结果按文件 mtime + size 缓存 (复用 context_doc 的文档缓存)，
+文档未声明任何转换时回退到 DEFAULT_TRANSITIONS。
+
+Usage:
+    from state_graph import load_state_graph
+    graph = load_state_graph(".agent/memory/state_machine.md")
+    graph.allows("IDLE", "DRAFTING")
+    graph.reachable("IDLE")
+    graph.path("IDLE", "IMPLEMENTING")
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from context_doc import ContextDocument, load_document
+
+# 与 state_machine.md 的 Mermaid 图保持一致，仅在文档缺少转换定义时使用
+DEFAULT_TRANSITIONS: dict[str, set[str]] = {
+    "IDLE": {"DRAFTING"},
+    "DRAFTING": {"CONFIRMING"},
+    "REVIEWING": {"CONFIRMING"},
+    "CONFIRMING": {"REVIEWING", "IDLE", "DECOMPOSING", "IMPLEMENTING"},
+    "DECOMPOSING": {"CONFIRMING"},
+    "IMPLEMENTING": {"BLOCKED", "IDLE"},
+    "BLOCKED": {"IMPLEMENTING"},
+}
+
+_STATE_CODE = re.compile(r"^[A-Z][A-Z0-9_]*$")
+_ARROW = re.compile(r"^\s*([\w\[\]*]+)\s*-->\s*([\w\[\]*]+)\s*(?::\s*(.*))?$")
+_COMPOSITE = re.compile(r'^\s*state\s+"[^"]*"\s+as\s+(\w+)\s*\{')
+
+
+@dataclass
+class StateGraph:
+    """编译后的状态转换图 (只读)。"""
+    states: frozenset[str]
+    transitions: dict[str, frozenset[str]]
+    triggers: dict[tuple[str, str], str] = field(default_factory=dict)
+    from_document: bool = True
+    _reach: dict[str, frozenset[str]] = field(default_factory=dict, repr=False)
+
+    def allows(self, old_state: str, new_state: str) -> bool:
+        return new_state in self.transitions.get(old_state, frozenset())
+
+    def next_states(self, state: str) -> frozenset[str]:
+        return self.transitions.get(state, frozenset())
+
+    def trigger(self, old_state: str, new_state: str) -> str:
+        return self.triggers.get((old_state, new_state), "")
+
+    def reachable(self, state: str) -> frozenset[str]:
+        """从 state 出发 (经过一次或多次转换) 可到达的所有状态。"""
+        cached = self._reach.get(state)
+        if cached is not None:
+            return cached
+        seen: set[str] = set()
+        queue = deque(self.next_states(state))
+        while queue:
+            current = queue.popleft()
+            if current in seen:
+                continue
+            seen.add(current)
+            queue.extend(self.next_states(current) - seen)
+        result = frozenset(seen)
+        self._reach[state] = result
+        return result
+
+    def path(self, source: str, target: str) -> list[str] | None:
+        """最短转换路径 (含首尾)，不可达时返回 None。"""
+        if source == target:
+            return [source]
+        parents: dict[str, str] = {}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for nxt in sorted(self.next_states(current)):
+                if nxt in parents or nxt == source:
+                    continue
+                parents[nxt] = current
+                if nxt == target:
+                    route = [target]
+                    while route[-1] != source:
+                        route.append(parents[route[-1]])
+                    return route[::-1]
+                queue.append(nxt)
+        return None
+
+
+def compile_state_graph(doc: ContextDocument) -> StateGraph:
+    """将 state_machine.md 文档编译为 StateGraph。"""
+    states = _parse_states(doc)
+    edges: dict[str, set[str]] = {}
+    triggers: dict[tuple[str, str], str] = {}
+
+    for src, dst, _label in _parse_mermaid(doc.text):
+        edges.setdefault(src, set()).add(dst)
+
+    section = doc.find_section("转换触发器") or doc.find_section("Triggers")
+    if section is not None:
+        for cells in _table_rows(doc.section_text(section)):
+            if len(cells) < 3:
+                continue
+            trigger, src, dst = cells[0], cells[1], cells[2]
+            if _STATE_CODE.match(src) and _STATE_CODE.match(dst):
+                edges.setdefault(src, set()).add(dst)
+                triggers[(src, dst)] = trigger
+
+    from_document = bool(edges)
+    if not from_document:
+        edges = {k: set(v) for k, v in DEFAULT_TRANSITIONS.items()}
+    if not states:
+        states = set(edges) | {d for targets in edges.values() for d in targets}
+
+    return StateGraph(
+        states=frozenset(states),
+        transitions={k: frozenset(v) for k, v in edges.items()},
+        triggers=triggers,
+        from_document=from_document,
+    )
+
+
+_cache: dict[str, tuple[ContextDocument, StateGraph]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_state_graph(path: str | Path) -> StateGraph:
+    """加载 (并缓存) state_machine.md 的转换图；文件未变化时为 O(1)。"""
+    p = Path(path)
+    doc = load_document(p, missing_ok=False)
+    key = str(p.resolve())
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit and hit[0] is doc:
+        return hit[1]
+    graph = compile_state_graph(doc)
+    with _cache_lock:
+        _cache[key] = (doc, graph)
+    return graph
+
+
+# ── 内部方法 ────────────────────────────────────────────
+
+def _clean(cell: str) -> str:
+    return cell.strip().strip("`*").strip()
+
+
+def _table_rows(text: str):
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith("|") or set(line) <= set("|-: "):
+            continue
+        yield [_clean(c) for c in line.strip("|").split("|")]
+
+
+def _parse_states(doc: ContextDocument) -> set[str]:
+    section = doc.find_section("状态定义") or doc.find_section("States")
+    text = doc.section_text(section) if section is not None else doc.text
+    states: set[str] = set()
+    for cells in _table_rows(text):
+        if len(cells) >= 2 and _STATE_CODE.match(cells[1]):
+            states.add(cells[1])
+    return states
+
+
+def _parse_mermaid(text: str):
+    """产出 Mermaid stateDiagram 中的 (src, dst, label)，复合状态别名展开为成员。"""
+    aliases: dict[str, set[str]] = {}
+    arrows: list[tuple[str, str, str]] = []
+    in_diagram = False
+    composite_stack: list[str] = []
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("stateDiagram"):
+            in_diagram = True
+            continue
+        if not in_diagram:
+            continue
+        if stripped.startswith("```"):
+            in_diagram = False
+            composite_stack.clear()
+            continue
+
+        composite = _COMPOSITE.match(stripped)
+        if composite:
+            composite_stack.append(composite.group(1))
+            aliases.setdefault(composite.group(1), set())
+            continue
+        if stripped == "}":
+            if composite_stack:
+                composite_stack.pop()
+            continue
+
+        arrow = _ARROW.match(stripped)
+        if arrow:
+            arrows.append((arrow.group(1), arrow.group(2), arrow.group(3) or ""))
+            if composite_stack:
+                for name in (arrow.group(1), arrow.group(2)):
+                    if _STATE_CODE.match(name):
+                        aliases[composite_stack[-1]].add(name)
+        elif composite_stack and _STATE_CODE.match(stripped):
+            aliases[composite_stack[-1]].add(stripped)
+
+    for src, dst, label in arrows:
+        if "[*]" in (src, dst):
+            continue
+        for s in aliases.get(src) or {src}:
+            for d in aliases.get(dst) or {dst}:
+                yield s, d, label
@@ -0,0 +1,354 @@
+"""
+context_budget.py — 按 Provider 上下文窗口做记忆注入预算
+
+估算每个记忆文件 (active_context / 反思日志 / 知识条目) 注入会话时的 token 开销，
+并在当前 Provider 的 context_window 的一定比例内挑选价值最高的知识条目。
+
+token 估算:
+  - 默认使用字节启发式: ASCII 约 4 字符 / token，非 ASCII (中文等) 约 1 字符 / token，
+    只需一次 UTF-8 编码，无需分词
+  - 可选精确分词器: 传入 str -> int 的可调用对象，或 "tiktoken" (已安装时)
+  - 估算结果按内容哈希缓存，同一内容只计算一次 (文件移动 / 重复读取均命中)
+
+Usage:
+    from context_budget import ContextBudget
+    budget = ContextBudget(".agent/memory", fraction=0.05)
+    plan = budget.plan(tags={"config"})
+    [a.name for a in plan.selected]
+    plan.used, plan.budget
+
+CLI:
+    python context_budget.py [--provider claude] [--fraction 0.05] [--tags config,git] [--json]
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from context_doc import load_document
+
+
+DEFAULT_FRACTION = 0.1          # 记忆注入占上下文窗口的默认比例
+DEFAULT_CONTEXT_WINDOW = 128_000  # 无法读取 Provider 配置时的保守窗口
+SKIPPED_STATUSES = ("archived", "deprecated")
+
+# config_loader 位于 .agent/config (scripts/ 下的副本没有该包，需显式传入 context_window)
+_AGENT_DIR = Path(__file__).resolve().parents[1]
+
+
+# ── token 估算 ──────────────────────────────────────────
+
+def heuristic_tokens(text: str) -> int:
+    """字节启发式估算: ASCII 4 字符 / token，非 ASCII 1 字符 / token。"""
+    if not text:
+        return 0
+    n_chars = len(text)
+    extra_bytes = len(text.encode("utf-8", errors="replace")) - n_chars
+    # 非 ASCII 字符多为 3 字节 (中文)，按每字符多 2 字节折算
+    non_ascii = min(n_chars, (extra_bytes + 1) // 2)
+    ascii_chars = n_chars - non_ascii
+    return -(-ascii_chars // 4) + non_ascii
+
+
+class TokenEstimator:
+    """
+    带内容哈希缓存的 token 估算器。
+
+    Parameters
+    ----------
+    tokenizer : Callable[[str], int] | str | None
+        None 使用字节启发式；"tiktoken" 在已安装时使用 cl100k_base 精确计数
+        (未安装则回退启发式)；也可传入任意 str -> int 的计数函数。
+    """
+
+    def __init__(self, tokenizer: Callable[[str], int] | str | None = None) -> None:
+        self.method = "heuristic"
+        self._count: Callable[[str], int] = heuristic_tokens
+        if tokenizer == "tiktoken":
+            try:
+                import tiktoken
+                encoding = tiktoken.get_encoding("cl100k_base")
+                self._count = lambda text: len(encoding.encode(text, disallowed_special=()))
+                self.method = "tiktoken"
+            except ImportError:
+                pass
+        elif callable(tokenizer):
+            self._count = tokenizer
+            self.method = getattr(tokenizer, "__name__", "custom")
+        self._cache: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str) -> int:
+        key = hashlib.blake2b(text.encode("utf-8", errors="replace"), digest_size=16).hexdigest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        tokens = self._count(text)
+        with self._lock:
+            self._cache[key] = tokens
+            self.misses += 1
+        return tokens
+
+
+# ── 预算 ────────────────────────────────────────────────
+
+@dataclass
+class Artifact:
+    """一个可注入会话的记忆文件。"""
+    name: str
+    kind: str            # "context" | "reflection" | "index" | "knowledge"
+    path: str
+    tokens: int
+    value: float = 0.0   # 知识条目的价值分 (confidence × 标签相关度)
+    tags: list[str] = field(default_factory=list)
+
+
+@dataclass
+class BudgetPlan:
+    """一次预算分配结果。"""
+    provider: str
+    context_window: int
+    budget: int                      # 可用于记忆注入的 token 数
+    fixed: list[Artifact]            # 必须注入的文件 (先扣除)
+    selected: list[Artifact]         # 选中的知识条目 (按价值排序)
+    skipped: list[Artifact]          # 放不下的知识条目
+
+    @property
+    def used(self) -> int:
+        return sum(a.tokens for a in self.fixed) + sum(a.tokens for a in self.selected)
+
+    @property
+    def remaining(self) -> int:
+        return self.budget - self.used
+
+    def to_dict(self) -> dict:
+        return {
+            "provider": self.provider,
+            "context_window": self.context_window,
+            "budget": self.budget,
+            "used": self.used,
+            "fixed": [asdict(a) for a in self.fixed],
+            "selected": [asdict(a) for a in self.selected],
+            "skipped": [asdict(a) for a in self.skipped],
+        }
+
+
+class ContextBudget:
+    """
+    记忆注入预算。
+
+    Parameters
+    ----------
+    memory_dir : str | Path
+        .agent/memory 目录
+    fraction : float
+        记忆注入可占用的上下文窗口比例
+    provider : str | None
+        Provider 名称 (None 为 agent_config.md 中的 ACTIVE_PROVIDER)
+    context_window : int | None
+        显式指定窗口大小 (跳过 Provider 配置)
+    estimator : TokenEstimator | None
+        共享估算器 (默认使用进程级实例，缓存跨调用复用)
+    """
+
+    def __init__(
+        self,
+        memory_dir: str | Path = ".agent/memory",
+        fraction: float = DEFAULT_FRACTION,
+        provider: str | None = None,
+        context_window: int | None = None,
+        estimator: TokenEstimator | None = None,
+    ) -> None:
+        self.memory_dir = Path(memory_dir)
+        self.knowledge_dir = self.memory_dir / "knowledge"
+        self.fraction = fraction
+        self.estimator = estimator or _default_estimator()
+        self.provider, self.context_window = self._resolve_window(provider, context_window)
+
+    # ── Public API ──
+
+    @property
+    def budget(self) -> int:
+        return int(self.context_window * self.fraction)
+
+    def artifacts(self) -> list[Artifact]:
+        """全部记忆文件及其 token 开销 (固定文件在前，知识条目按文件名排序)。"""
+        fixed = [
+            ("active_context", "context", [self.memory_dir / "active_context.md"]),
+            # ReflectionEngine 写入 evolution/，旧版本写在 memory 根目录
+            ("reflection_log", "reflection", [
+                self.memory_dir / "evolution" / "reflection_log.md",
+                self.memory_dir / "reflection_log.md",
+            ]),
+            ("knowledge_base", "index", [self.memory_dir / "evolution" / "knowledge_base.md"]),
+        ]
+        result = []
+        for name, kind, candidates in fixed:
+            for path in candidates:
+                doc = load_document(path)
+                if doc.exists and doc.text.strip():
+                    result.append(Artifact(name, kind, str(path), self.estimator.count(doc.text)))
+                    break
+        return result + self.knowledge_entries()
+
+    def knowledge_entries(self, tags: Iterable[str] = ()) -> list[Artifact]:
+        """可注入的知识条目 (跳过 archived / deprecated)。"""
+        wanted = {t.lower() for t in tags}
+        entries = []
+        for path in sorted(self.knowledge_dir.glob("*.md")):
+            doc = load_document(path)
+            meta = doc.frontmatter
+            if meta.get("status", "").lower() in SKIPPED_STATUSES:
+                continue
+            entry_tags = _parse_tags(meta.get("tags", ""))
+            entries.append(Artifact(
+                name=meta.get("id") or path.stem,
+                kind="knowledge",
+                path=str(path),
+                tokens=self.estimator.count(doc.text),
+                value=_entry_value(meta, entry_tags, wanted),
+                tags=entry_tags,
+            ))
+        return entries
+
+    def plan(self, tags: Iterable[str] = (), fixed: Iterable[str] = ("active_context",)) -> BudgetPlan:
+        """
+        先扣除固定注入的文件，再按价值从高到低贪心选择能放下的知识条目
+        (价值相同时优先更小的条目)。
+        """
+        fixed_names = set(fixed)
+        fixed_items = [a for a in self.artifacts() if a.kind != "knowledge" and a.name in fixed_names]
+        remaining = self.budget - sum(a.tokens for a in fixed_items)
+
+        selected, skipped = [], []
+        for entry in sorted(self.knowledge_entries(tags), key=lambda a: (-a.value, a.tokens, a.name)):
+            if entry.tokens <= remaining:
+                selected.append(entry)
+                remaining -= entry.tokens
+            else:
+                skipped.append(entry)
+        return BudgetPlan(
+            provider=self.provider,
+            context_window=self.context_window,
+            budget=self.budget,
+            fixed=fixed_items,
+            selected=selected,
+            skipped=skipped,
+        )
+
+    def report(self, tags: Iterable[str] = ()) -> str:
+        """Markdown 预算报告。"""
+        plan = self.plan(tags)
+        lines = [
+            "## 🧮 Context Budget\n",
+            f"**Provider**: {plan.provider} / **Window**: {plan.context_window:,} tokens"
+            f" / **Budget** ({self.fraction:.0%}): {plan.budget:,} tokens",
+            f"**Used**: {plan.used:,} / **Remaining**: {plan.remaining:,}"
+            f" (estimator: {self.estimator.method})",
+            "",
+            "| Artifact | Kind | Tokens | Value | Selected |",
+            "|----------|------|--------|-------|----------|",
+        ]
+        selected = {a.path for a in plan.fixed + plan.selected}
+        for a in self.artifacts():
+            mark = "✅" if a.path in selected else "-"
+            value = f"{a.value:.2f}" if a.kind == "knowledge" else "-"
+            lines.append(f"| {a.name} | {a.kind} | {a.tokens:,} | {value} | {mark} |")
+        return "\n".join(lines)
+
+    # ── Private Methods ──
+
+    def _resolve_window(self, provider: str | None, context_window: int | None) -> tuple[str, int]:
+        if context_window is not None:
+            return provider or "custom", int(context_window)
+        get_config = import_get_config()
+        if get_config is not None:
+            config = get_config(self.memory_dir.parent / "config" / "agent_config.md")
+            name = provider or config.active_provider
+            window = config.get_feature("context_window", name)
+            if isinstance(window, int) and window > 0:
+                return name, window
+        return provider or "unknown", DEFAULT_CONTEXT_WINDOW
+
+
+_ESTIMATOR: TokenEstimator | None = None
+
+
+def _default_estimator() -> TokenEstimator:
+    global _ESTIMATOR
+    if _ESTIMATOR is None:
+        _ESTIMATOR = TokenEstimator()
+    return _ESTIMATOR
+
+
+def import_get_config():
+    """导入 config_loader.get_config；找不到 .agent/config 时返回 None，由调用方回退。"""
+    if not (_AGENT_DIR / "config" / "config_loader.py").is_file():
+        return None
+    if str(_AGENT_DIR) not in sys.path:
+        sys.path.insert(0, str(_AGENT_DIR))
+    try:
+        from config.config_loader import get_config
+    except ImportError:
+        return None
+    return get_config
+
+
+def _parse_tags(raw: str) -> list[str]:
+    # frontmatter 中为 [a, b, c] 形式
+    return [t.strip().strip("'\"") for t in raw.strip("[] ").split(",") if t.strip()]
+
+
+def _entry_value(meta: dict[str, str], tags: list[str], wanted: set[str]) -> float:
+    try:
+        confidence = float(meta.get("confidence", 0.5))
+    except ValueError:
+        confidence = 0.5
+    if not wanted:
+        return confidence
+    overlap = len(wanted & {t.lower() for t in tags})
+    # 与当前任务标签相关的条目优先，不相关的条目仍按 confidence 参与排序
+    return confidence * (1 + overlap)
+
+
+# ── CLI 入口 ────────────────────────────────────────────
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="记忆注入 token 预算")
+    parser.add_argument("--memory-dir", default=".agent/memory")
+    parser.add_argument("--provider", default=None, help="Provider 名称 (默认 ACTIVE_PROVIDER)")
+    parser.add_argument("--fraction", type=float, default=DEFAULT_FRACTION, help="占上下文窗口的比例")
+    parser.add_argument("--window", type=int, default=None, help="显式指定上下文窗口 (tokens)")
+    parser.add_argument("--tags", default="", help="当前任务相关标签 (逗号分隔)")
+    parser.add_argument("--tokenizer", choices=["heuristic", "tiktoken"], default="heuristic")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args(argv)
+
+    budget = ContextBudget(
+        args.memory_dir,
+        fraction=args.fraction,
+        provider=args.provider,
+        context_window=args.window,
+        estimator=TokenEstimator("tiktoken" if args.tokenizer == "tiktoken" else None),
+    )
+    tags = [t for t in args.tags.split(",") if t]
+    if args.json:
+        print(json.dumps(budget.plan(tags).to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(budget.report(tags))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""
+context_doc.py — active_context.md 共享解析器
+
+将 Markdown 记忆文件解析为统一的文档模型 (frontmatter / 章节树 / 任务列表)，
+按文件 mtime + size 缓存，ContextManager / StatusDashboard / status.py /
+ReflectionEngine 共用同一份解析结果与语义。
+edit_document() 基于缓存的章节偏移量做局部拼接，并通过临时文件 + rename 原子写回。
+
+Usage:
+    from context_doc import load_document
+    doc = load_document(".agent/memory/active_context.md")
+    doc.frontmatter["task_status"]
+    doc.find_section("任务队列")
+    doc.task_counts()
+
+    edit_document(path, lambda doc: [(start, end, "replacement")])
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+TASK_STATUSES = ("DONE", "PENDING", "IN_PROGRESS", "BLOCKED", "FAILED")
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+# 兼容 `[DONE]` / `**[DONE]**` / `[✅ DONE]` / `[⏳ PENDING]` 等写法
+_TASK_STATUS = re.compile(r"\[[^\[\]\w]*(DONE|PENDING|IN_PROGRESS|BLOCKED|FAILED)\]")
+_TASK_ID = re.compile(r"\b(T-[A-Za-z0-9-]+)\b")
+_CHECKBOX = re.compile(r"^\s*[-*]\s+\[([ xX])\]")
+
+
+@dataclass
+class Section:
+    """Markdown 章节 (偏移量均相对于整个文件文本)。"""
+    title: str
+    level: int
+    start: int        # 标题行起始偏移
+    body_start: int   # 标题行结束后的偏移
+    end: int          # 章节结束偏移 (下一个同级/更高级标题或文件末尾)
+    line_no: int      # 标题行号 (从 1 开始)
+    children: list[Section] = field(default_factory=list)
+
+
+@dataclass
+class TaskItem:
+    """任务行。"""
+    task_id: str      # 无 T-xxx 编号时为 "-"
+    status: str       # TASK_STATUSES 之一
+    checked: bool
+    text: str
+    line_no: int
+    start: int
+    end: int
+
+
+@dataclass
+class ContextDocument:
+    """解析后的文档模型。"""
+    path: Path | None
+    text: str
+    raw_frontmatter: dict[str, str]   # 原始值 (保留引号，用于回写)
+    frontmatter: dict[str, str]       # 去除引号后的值
+    body_offset: int
+    sections: list[Section]
+    tasks: list[TaskItem]
+    exists: bool = True
+    mtime_ns: int = 0
+    size: int = 0
+
+    @property
+    def body(self) -> str:
+        return self.text[self.body_offset:]
+
+    def iter_sections(self):
+        """深度优先遍历所有章节。"""
+        stack = list(reversed(self.sections))
+        while stack:
+            section = stack.pop()
+            yield section
+            stack.extend(reversed(section.children))
+
+    def find_section(self, title: str) -> Section | None:
+        """按标题查找章节: 先精确匹配，再按包含关系匹配。"""
+        wanted = title.lstrip("#").strip()
+        fallback = None
+        for section in self.iter_sections():
+            if section.title == wanted:
+                return section
+            if fallback is None and wanted in section.title:
+                fallback = section
+        return fallback
+
+    def section_text(self, section: Section) -> str:
+        return self.text[section.body_start:section.end]
+
+    def tasks_by_status(self) -> dict[str, list[TaskItem]]:
+        buckets: dict[str, list[TaskItem]] = {s: [] for s in TASK_STATUSES}
+        for task in self.tasks:
+            buckets[task.status].append(task)
+        return buckets
+
+    def task_counts(self) -> Counter:
+        return Counter(task.status for task in self.tasks)
+
+    def line_end(self, offset: int) -> int:
+        """offset 所在行的结束偏移 (包含换行符)。"""
+        idx = self.text.find("\n", offset)
+        return len(self.text) if idx == -1 else idx + 1
+
+
+class ConcurrentModificationError(RuntimeError):
+    """文件在读取与写回之间被其他进程修改。"""
+
+
+Edit = tuple[int, int, str]  # (start, end, replacement)
+
+
+def parse_document(text: str, path: str | Path | None = None) -> ContextDocument:
+    """解析 Markdown 文本为 ContextDocument。"""
+    lines = text.splitlines(keepends=True)
+    raw_frontmatter: dict[str, str] = {}
+    body_offset = 0
+    first_body_line = 0
+
+    if lines and lines[0].strip() == "---":
+        offset = len(lines[0])
+        for i in range(1, len(lines)):
+            line = lines[i]
+            if line.strip() == "---":
+                body_offset = offset + len(line)
+                first_body_line = i + 1
+                break
+            offset += len(line)
+        if first_body_line:
+            for line in lines[1:first_body_line - 1]:
+                if ":" not in line or line.lstrip().startswith("#"):
+                    continue
+                key, value = line.split(":", 1)
+                raw_frontmatter[key.strip()] = value.strip()
+
+    frontmatter = {k: _unquote(v) for k, v in raw_frontmatter.items()}
+    sections, tasks = _parse_body(lines, first_body_line, body_offset, len(text))
+    return ContextDocument(
+        path=Path(path) if path is not None else None,
+        text=text,
+        raw_frontmatter=raw_frontmatter,
+        frontmatter=frontmatter,
+        body_offset=body_offset,
+        sections=sections,
+        tasks=tasks,
+    )
+
+
+# ── 缓存 ────────────────────────────────────────────────
+
+_cache: dict[str, tuple[int, int, ContextDocument]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_document(path: str | Path, missing_ok: bool = True) -> ContextDocument:
+    """读取并解析文件；mtime 与 size 未变化时直接返回缓存的文档模型。
+
+    调用方应将返回的文档视为只读。
+    """
+    p = Path(path)
+    key = str(p.resolve())
+    try:
+        st = p.stat()
+    except OSError:
+        invalidate(p)
+        if not missing_ok:
+            raise FileNotFoundError(f"No such file: {p}")
+        doc = parse_document("", path=p)
+        doc.exists = False
+        return doc
+
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2]
+
+    text = p.read_bytes().decode("utf-8-sig", errors="replace")
+    doc = parse_document(text, path=p)
+    doc.mtime_ns, doc.size = st.st_mtime_ns, st.st_size
+    with _cache_lock:
+        _cache[key] = (st.st_mtime_ns, st.st_size, doc)
+    return doc
+
+
+def invalidate(path: str | Path | None = None) -> None:
+    """清除某个文件 (或全部) 的缓存。写入文件后调用，避免同一时钟刻度内的修改被忽略。"""
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(str(Path(path).resolve()), None)
+
+
+# ── 局部编辑 ────────────────────────────────────────────
+
+def apply_edits(text: str, edits: list[Edit]) -> str:
+    """按偏移量拼接若干互不重叠的编辑。"""
+    pieces: list[str] = []
+    cursor = 0
+    for start, end, replacement in sorted(edits, key=lambda e: (e[0], e[1])):
+        if start < cursor:
+            raise ValueError(f"Overlapping edit at offset {start}")
+        pieces.append(text[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
+def write_atomic(path: str | Path, text: str) -> None:
+    """写入临时文件后 rename 替换，读者永远不会看到写了一半的文件。"""
+    p = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{p.name}.", suffix=".tmp", dir=str(p.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        try:
+            shutil.copymode(p, tmp)
+        except OSError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    finally:
+        invalidate(p)
+
+
+def edit_document(path, build, retries: int = 3) -> ContextDocument:
+    """读取 (缓存) → build(doc) 生成编辑 → 拼接 → 原子写回。
+
+    build 返回空列表时不写文件。写回前若发现文件已被其他进程修改，
+    则基于最新内容重新计算编辑，最多重试 retries 次。
+
+    Returns:
+        写回后的文档模型
+    """
+    p = Path(path)
+    for _ in range(retries + 1):
+        doc = load_document(p)
+        edits = build(doc)
+        if not edits:
+            return doc
+        new_text = apply_edits(doc.text, edits)
+        try:
+            _check_unchanged(p, doc)
+        except ConcurrentModificationError:
+            invalidate(p)
+            continue
+        write_atomic(p, new_text)
+        return load_document(p)
+    raise ConcurrentModificationError(f"{p} kept changing while editing")
+
+
+# ── 内部方法 ────────────────────────────────────────────
+
+def _check_unchanged(path: Path, doc: ContextDocument) -> None:
+    if not doc.exists:
+        if path.exists():
+            raise ConcurrentModificationError(str(path))
+        return
+    try:
+        st = path.stat()
+    except OSError:
+        raise ConcurrentModificationError(str(path))
+    if (st.st_mtime_ns, st.st_size) != (doc.mtime_ns, doc.size):
+        raise ConcurrentModificationError(str(path))
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _parse_body(
+    lines: list[str],
+    first_line: int,
+    offset: int,
+    text_len: int,
+) -> tuple[list[Section], list[TaskItem]]:
+    roots: list[Section] = []
+    stack: list[Section] = []
+    tasks: list[TaskItem] = []
+    in_fence = False
+
+    for i in range(first_line, len(lines)):
+        line = lines[i]
+        start = offset
+        offset += len(line)
+        content = line.rstrip("\r\n")
+
+        if _FENCE.match(content):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        heading = _HEADING.match(content)
+        if heading:
+            level = len(heading.group(1))
+            while stack and stack[-1].level >= level:
+                stack.pop().end = start
+            section = Section(
+                title=heading.group(2),
+                level=level,
+                start=start,
+                body_start=offset,
+                end=text_len,
+                line_no=i + 1,
+            )
+            (stack[-1].children if stack else roots).append(section)
+            stack.append(section)
+            continue
+
+        status = _TASK_STATUS.search(content)
+        if status:
+            task_id = _TASK_ID.search(content)
+            checkbox = _CHECKBOX.match(content)
+            tasks.append(TaskItem(
+                task_id=task_id.group(1) if task_id else "-",
+                status=status.group(1),
+                checked=bool(checkbox and checkbox.group(1) != " "),
+                text=content.strip(),
+                line_no=i + 1,
+                start=start,
+                end=offset,
+            ))
+
+    return roots, tasks
@@ -0,0 +1,246 @@
+"""
+Action Item Tracker — Action Items 索引存储
+
+将 reflection_log.md 中 `Action Items` 区块的条目提取到键值存储
+(evolution/action_items.json)，按规范化文本去重并记录状态与所属 Session：
+  - 仅从 Action Items 区块提取 (忽略 "待改进" 等其他 checkbox)
+  - `- [x]` 或 resolve() 标记为已解决，任一处解决即视为解决
+  - 记录日志文件签名 (size / mtime)，未变化时直接读取存储，无需重扫日志
+
+Usage:
+    from evolution.action_items import ActionItemTracker
+    tracker = ActionItemTracker(base_dir=".agent/memory")
+    tracker.add(["补充集成测试"], session="Feature X")
+    tracker.pending()
+    tracker.resolve("补充集成测试")
+"""
+
+from __future__ import annotations
+
+import re
+import json
+import hashlib
+import datetime
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+
+SESSION_HEADER = re.compile(r"^#{2,3}\s+(\d{4}-\d{2}-\d{2})[:\s]*(?:Session:\s*)?(.*)$")
+ACTION_HEADER = re.compile(r"^#{2,4}\s+.*Action Items", re.IGNORECASE)
+ANY_HEADER = re.compile(r"^#{1,6}\s")
+CHECKBOX_ITEM = re.compile(r"^\s*-\s+\[([ xX])\]\s+(.+?)\s*$")
+
+
+def normalize_item(text: str) -> str:
+    """规范化 Action Item 文本 (用于去重)"""
+    text = re.sub(r"[*`_]", "", text)
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def item_key(text: str) -> str:
+    """由规范化文本生成稳定的条目 Key"""
+    return hashlib.sha1(normalize_item(text).encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class ActionItem:
+    """Action Item 存储条目"""
+    key: str
+    text: str
+    status: str = "pending"   # pending | resolved
+    session: str = ""         # 首次出现的 Session
+    date: str = ""
+    resolved_at: str = ""
+
+
+class ActionItemTracker:
+    """
+    Action Items 键值存储。
+
+    存储文件: evolution/action_items.json
+    日志文件签名一致时，查询只读取存储 (与条目数量成正比，与日志大小无关)；
+    日志被外部修改时自动重新同步一次。
+    查询只在内存中重扫，存储仅由 add / resolve / sync / mark_synced 写入。
+    """
+
+    def __init__(self, base_dir: str | Path = ".agent/memory"):
+        self.base_dir = Path(base_dir)
+        self.reflection_log = self.base_dir / "evolution" / "reflection_log.md"
+        self.store_file = self.base_dir / "evolution" / "action_items.json"
+        self._items: dict[str, ActionItem] | None = None
+        self._source: dict = {}
+
+    # ── Public API ──
+
+    def pending(self) -> list[ActionItem]:
+        """获取未解决的 Action Items (按首次出现顺序；只读，不写入存储)"""
+        self._refresh()
+        return [i for i in self._load().values() if i.status == "pending"]
+
+    def get(self, text_or_key: str) -> Optional[ActionItem]:
+        """按 Key 或文本查询条目"""
+        items = self._load()
+        return items.get(text_or_key) or items.get(item_key(text_or_key))
+
+    def add(self, texts: list[str], session: str = "", date: str = "") -> list[ActionItem]:
+        """
+        记录新的 Action Items (已存在的条目不会重复添加)。
+
+        Parameters
+        ----------
+        texts : list[str]
+            Action Item 文本
+        session : str
+            所属 Session 名称
+        date : str
+            日期 (默认今天)
+
+        Returns
+        -------
+        list[ActionItem]
+            新增的条目
+        """
+        date = date or datetime.date.today().isoformat()
+        items = self._load()
+        added = []
+        for text in texts:
+            item = self._upsert(items, text, "pending", session, date)
+            if item:
+                added.append(item)
+        self._save()
+        return added
+
+    def resolve(self, text_or_key: str) -> bool:
+        """将条目标记为已解决，返回是否找到该条目"""
+        item = self.get(text_or_key)
+        if item is None:
+            return False
+        if item.status != "resolved":
+            item.status = "resolved"
+            item.resolved_at = datetime.date.today().isoformat()
+            self._save()
+        return True
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        日志签名变化时重新扫描 reflection_log.md。
+
+        Returns
+        -------
+        bool
+            是否执行了重扫
+        """
+        rescanned = self._refresh(force)
+        if rescanned:
+            self._save()
+        return rescanned
+
+    def mark_synced(self) -> None:
+        """记录当前日志签名 (调用方已自行同步日志内容后使用)"""
+        self._load()
+        self._source = self._log_signature()
+        self._save()
+
+    # ── Private Methods ──
+
+    def _upsert(
+        self,
+        items: dict[str, ActionItem],
+        text: str,
+        status: str,
+        session: str,
+        date: str,
+    ) -> Optional[ActionItem]:
+        """插入或更新条目；返回新增的条目 (已存在时返回 None)"""
+        key = item_key(text)
+        existing = items.get(key)
+        if existing is None:
+            item = ActionItem(key=key, text=text.strip(), status=status,
+                              session=session, date=date)
+            if status == "resolved":
+                item.resolved_at = date
+            items[key] = item
+            return item
+        # 任一处已解决即视为解决；不会被重新打开
+        if status == "resolved" and existing.status != "resolved":
+            existing.status = "resolved"
+            existing.resolved_at = date
+        return None
+
+    def _refresh(self, force: bool = False) -> bool:
+        """日志签名变化时将日志条目合并进内存 (不写入存储)，返回是否执行了重扫"""
+        items = self._load()
+        signature = self._log_signature()
+        if not force and signature == self._source:
+            return False
+
+        if self.reflection_log.exists():
+            with open(self.reflection_log, encoding="utf-8", errors="replace") as f:
+                for checked, text, session, date in self._scan_action_items(f):
+                    status = "resolved" if checked else "pending"
+                    self._upsert(items, text, status, session, date)
+        self._source = signature
+        return True
+
+    @staticmethod
+    def _scan_action_items(lines):
+        """流式扫描日志，逐条产出 (checked, text, session, date)"""
+        session, date = "", ""
+        in_actions = False
+        for line in lines:
+            line = line.rstrip("\n")
+            if ANY_HEADER.match(line):
+                header = SESSION_HEADER.match(line)
+                if header:
+                    date = header.group(1)
+                    session = header.group(2).strip()
+                    in_actions = False
+                else:
+                    in_actions = bool(ACTION_HEADER.match(line))
+                continue
+            if not in_actions:
+                continue
+            match = CHECKBOX_ITEM.match(line)
+            if match:
+                yield match.group(1) != " ", match.group(2), session, date
+
+    def _log_signature(self) -> dict:
+        """日志文件签名 (size + mtime_ns)"""
+        try:
+            st = self.reflection_log.stat()
+        except OSError:
+            return {}
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _load(self) -> dict[str, ActionItem]:
+        """加载存储 (进程内缓存)"""
+        if self._items is not None:
+            return self._items
+
+        self._items = {}
+        self._source = {}
+        if self.store_file.exists():
+            try:
+                data = json.loads(self.store_file.read_text(encoding="utf-8"))
+                self._source = data.get("source", {})
+                for raw in data.get("items", []):
+                    item = ActionItem(**raw)
+                    self._items[item.key] = item
+            except (ValueError, TypeError):
+                self._items = {}
+                self._source = {}
+        return self._items
+
+    def _save(self) -> None:
+        """持久化存储"""
+        if self._items is None:
+            return
+        self.store_file.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "source": self._source,
+            "items": [asdict(i) for i in self._items.values()],
+        }
+        self.store_file.write_text(
+            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
@@ -0,0 +1,288 @@
+"""
+fs_watch.py — 文件变更监听 (inotify / 轮询回退)
+
+监听若干目录 (递归) 或单个文件的变更，将短时间内的突发写入合并为一批
+(debounce) 后返回发生变化的文件路径集合。
+Linux 上通过 ctypes 直接调用 libc 的 inotify (无第三方依赖)，
+其他平台或 inotify 不可用时回退为 mtime + size 轮询。
+inotify 事件队列溢出时返回的是被监听的根路径本身 (而非具体文件)。
+
+Usage:
+    from fs_watch import ChangeWatcher
+    with ChangeWatcher([".agent/memory"], debounce=0.2) as watcher:
+        changed = watcher.wait(timeout=5)   # set[Path]，超时返回空集合
+        for batch in watcher:               # 阻塞迭代
+            ...
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+
+# inotify 常量 (见 <sys/inotify.h>)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _PollingBackend:
+    """mtime + size 快照比对 (跨平台回退方案)。"""
+    name = "polling"
+
+    def __init__(self, roots: list[Path], interval: float = 1.0) -> None:
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def read(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {
+                Path(p) for p in current.keys() | self._snapshot.keys()
+                if current.get(p) != self._snapshot.get(p)
+            }
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is None:
+                time.sleep(self.interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot: dict[str, tuple[int, int]] = {}
+        for root in self.roots:
+            if root.is_dir():
+                files = (
+                    os.path.join(dirpath, name)
+                    for dirpath, _dirs, names in os.walk(root)
+                    for name in names
+                )
+            else:
+                files = (str(root),)
+            for path in files:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+
+class _InotifyBackend:
+    """Linux inotify (递归监听目录，新建子目录自动加入)。"""
+    name = "inotify"
+
+    def __init__(self, roots: list[Path]) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self._fd = fd
+        self._dirs: dict[int, Path] = {}
+        self.roots = roots
+        try:
+            for root in roots:
+                if root.is_dir():
+                    self._add_tree(root)
+                else:
+                    # 单个文件: 监听其父目录 (原子 rename 写入不会触发文件自身的 watch)
+                    self._add(root.parent)
+        except BaseException:
+            self.close()
+            raise
+
+    def read(self, timeout: float | None) -> set[Path]:
+        if self._fd < 0:
+            return set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            if not data:
+                break
+            changed |= self._parse(data)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _parse(self, data: bytes) -> set[Path]:
+        changed: set[Path] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                # 事件队列溢出: 无法得知具体文件，返回根路径本身，
+                # 调用方 (status.py / StatusDashboard) 见到根路径即全部重新加载
+                changed.update(self.roots)
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(raw_name) if raw_name else directory
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # 加入 watch 之前已写入新目录的文件不会再产生事件，直接视为变更
+                    changed.update(self._add_tree(path))
+                continue
+            changed.add(path)
+        return changed
+
+    def _add_tree(self, root: Path) -> list[Path]:
+        """递归加入目录 watch，返回其中已存在的文件。"""
+        files: list[Path] = []
+        for dirpath, _dirs, names in os.walk(root):
+            self._add(Path(dirpath))
+            files.extend(Path(dirpath) / name for name in names)
+        return files
+
+    def _add(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOENT:
+                return
+            raise OSError(err, f"inotify_add_watch {directory}: {os.strerror(err)}")
+        self._dirs[wd] = directory
+
+
+class ChangeWatcher:
+    """
+    带防抖的文件变更监听器。
+
+    wait() 在首个变更到达后继续收集，直到静默 debounce 秒
+    (或自首个变更起已过 max_delay 秒)，再一次性返回整批变更。
+    """
+
+    def __init__(
+        self,
+        paths,
+        debounce: float = 0.2,
+        max_delay: float = 2.0,
+        poll_interval: float = 1.0,
+        backend: str = "auto",
+    ) -> None:
+        self.roots = [Path(p).resolve() for p in paths]
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._files = {r for r in self.roots if not r.is_dir()}
+        self._dirs = [r for r in self.roots if r.is_dir()]
+        self._backend = self._open_backend(backend, poll_interval)
+
+    @property
+    def backend(self) -> str:
+        return self._backend.name
+
+    # ── Public API ──
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """阻塞直到有变更 (或超时)，返回防抖合并后的变更路径集合。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            changed = self._relevant(self._backend.read(remaining))
+            if changed:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+        first = time.monotonic()
+        while True:
+            budget = self.max_delay - (time.monotonic() - first)
+            if budget <= 0:
+                break
+            more = self._relevant(self._backend.read(min(self.debounce, budget)))
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self) -> None:
+        self._backend.close()
+
+    def __iter__(self):
+        while True:
+            yield self.wait()
+
+    def __enter__(self) -> ChangeWatcher:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── Private Methods ──
+
+    def _open_backend(self, backend: str, poll_interval: float):
+        if backend not in ("auto", "inotify", "polling"):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend != "polling" and sys.platform.startswith("linux"):
+            try:
+                return _InotifyBackend(self.roots)
+            except (OSError, AttributeError):
+                if backend == "inotify":
+                    raise
+        elif backend == "inotify":
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        return _PollingBackend(self.roots, interval=poll_interval)
+
+    def _relevant(self, paths: set[Path]) -> set[Path]:
+        """过滤掉单文件监听时父目录中的无关文件。"""
+        if not self._files:
+            return paths
+        return {
+            p for p in paths
+            if p in self._files or p in self.roots or any(d in p.parents for d in self._dirs)
+        }
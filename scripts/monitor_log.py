@@ -0,0 +1,473 @@
+"""
+monitor_log.py — monitor.log 读取 / 轮转 / 分段索引
+
+monitor.log 为 JSONL 事件流 (hooks/*.cjs 与 ContextManager 追加写入)。
+本模块提供:
+  - tail():  从文件末尾反向分块读取最近 N 条事件 (可按类型过滤)，不读取整个文件
+  - rotate(): 按大小 / 时间轮转，旧分段 gzip 压缩到 monitor_segments/
+  - 分段索引: 每个分段记录事件总数、首末时间、按类型计数与按小时计数，
+              当前活动日志的索引按字节偏移增量更新
+    counts() / hourly() 只需读取索引；tail() 跳过不含目标类型的分段，
+    并优先使用索引中保存的分段末尾事件，无需解压分段
+
+轮转由写入方触发: ContextManager 追加事件时 (MonitorLog.append → maybe_rotate)
+以及 CLI `monitor_log.py rotate`。hooks 只追加写入、从不轮转。
+
+轮转时会把最近一次 state_change 事件带入新的活动日志 (标记 carried_over)，
+保证 post-tool-use.cjs 的 getPrevStatus 在轮转后仍能取到上一状态；
+索引与查询均忽略 carried_over 事件，不会重复计数。
+
+Usage:
+    from monitor_log import MonitorLog
+    log = MonitorLog(".agent/memory")
+    log.tail(20)
+    log.tail(20, types={"task_completed"})
+    log.hourly("hook_write")
+    log.maybe_rotate()
+
+CLI:
+    python monitor_log.py tail [-n 20] [--type task_completed]
+    python monitor_log.py counts [--since 2026-01-01]
+    python monitor_log.py rotate [--force]
+"""
+
+from __future__ import annotations
+
+import os
+import io
+import sys
+import gzip
+import json
+import argparse
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from context_doc import write_atomic
+
+
+LOG_NAME = "monitor.log"
+SEGMENT_DIR = "monitor_segments"
+INDEX_NAME = "index.json"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_MAX_AGE = timedelta(days=7)
+TAIL_EVENTS = 50  # 每个分段在索引中保存的末尾事件数 (供 tail() 免解压读取)
+_BLOCK_SIZE = 64 * 1024
+
+
+@dataclass
+class SegmentIndex:
+    """单个日志分段的索引。"""
+    name: str                 # 分段文件名 (活动日志为 monitor.log)
+    first_ts: str = ""
+    last_ts: str = ""
+    events: int = 0
+    counts: dict[str, int] = field(default_factory=dict)              # 类型 → 事件数
+    hourly: dict[str, dict[str, int]] = field(default_factory=dict)   # 类型 → {YYYY-MM-DDTHH: 事件数}
+    offset: int = 0           # 活动日志: 已索引的字节偏移
+    inode: int = 0            # 活动日志: 索引对应的 inode (轮转后失效)
+    tail: list[str] = field(default_factory=list)  # 分段: 最后 TAIL_EVENTS 条事件的原始行
+    tail_start: int = -1      # 分段: tail 首行的行号 (0 表示 tail 即全部事件，-1 表示旧索引)
+
+    def add(self, event: dict) -> None:
+        if event.get("carried_over"):
+            return
+        ts = str(event.get("ts", ""))
+        etype = str(event.get("type", ""))
+        if ts:
+            if not self.first_ts or ts < self.first_ts:
+                self.first_ts = ts
+            if ts > self.last_ts:
+                self.last_ts = ts
+        self.events += 1
+        self.counts[etype] = self.counts.get(etype, 0) + 1
+        if ts:
+            hours = self.hourly.setdefault(etype, {})
+            hours[ts[:13]] = hours.get(ts[:13], 0) + 1
+
+    def overlaps(self, since: str | None, until: str | None) -> bool:
+        if since and self.last_ts and self.last_ts < since:
+            return False
+        if until and self.first_ts and self.first_ts > until:
+            return False
+        return True
+
+
+class MonitorLog:
+    """monitor.log 的读取、轮转与索引查询。"""
+
+    def __init__(
+        self,
+        memory_dir: str | Path = ".agent/memory",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.memory_dir = Path(memory_dir)
+        self.path = self.memory_dir / LOG_NAME
+        self.segment_dir = self.memory_dir / SEGMENT_DIR
+        self.index_path = self.segment_dir / INDEX_NAME
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    # ── Public API ──
+
+    def append(self, event: dict, rotate: bool = True) -> None:
+        """追加一条事件 (必要时先轮转)。"""
+        if rotate:
+            self.maybe_rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def tail(
+        self,
+        n: int = 20,
+        types: Iterable[str] | None = None,
+        since: str | datetime | None = None,
+    ) -> list[dict]:
+        """最近 n 条事件 (按时间正序)，从活动日志末尾反向读取，不足时继续读取旧分段。"""
+        wanted = set(types) if types else None
+        since = _ts_key(since)
+        found: list[dict] = []
+
+        def take(lines: Iterator[str]) -> bool:
+            for line in lines:
+                event = _parse(line)
+                if event is None or event.get("carried_over"):
+                    continue
+                if since and str(event.get("ts", "")) < since:
+                    return True
+                if wanted is None or event.get("type") in wanted:
+                    found.append(event)
+                    if len(found) >= n:
+                        return True
+            return False
+
+        def matches(event: dict) -> bool:
+            return wanted is None or event.get("type") in wanted
+
+        done = take(iter_lines_reversed(self.path)) if self.path.exists() else False
+        if not done:
+            for seg in reversed(self.segments()):
+                if since and seg.last_ts and seg.last_ts < since:
+                    break
+                if wanted is not None and not any(seg.counts.get(t) for t in wanted):
+                    continue
+                if take(reversed(seg.tail)):
+                    break
+                if seg.tail_start == 0:
+                    continue  # 索引中的 tail 即整个分段
+                # tail 之前的部分: 顺序解压，只保留还需要的最后几条匹配事件
+                older = _segment_lines_before(
+                    self.segment_dir / seg.name,
+                    seg.tail_start if seg.tail_start > 0 else None,
+                    keep=n - len(found),
+                    matches=matches,
+                )
+                if take(reversed(older)):
+                    break
+        found.reverse()
+        return found
+
+    def iter_events(
+        self,
+        types: Iterable[str] | None = None,
+        since: str | datetime | None = None,
+        until: str | datetime | None = None,
+        include_active: bool = True,
+    ) -> Iterator[dict]:
+        """按时间正序流式产出事件 (旧分段 → 活动日志)，按索引跳过不相关分段。"""
+        wanted = set(types) if types else None
+        since, until = _ts_key(since), _ts_key(until)
+        sources = [
+            self.segment_dir / seg.name
+            for seg in self.segments()
+            if seg.overlaps(since, until)
+            and (wanted is None or any(seg.counts.get(t) for t in wanted))
+        ]
+        if include_active and self.path.exists():
+            sources.append(self.path)
+        for path in sources:
+            for event in iter_segment_events(path):
+                if event.get("carried_over"):
+                    continue
+                ts = str(event.get("ts", ""))
+                if since and ts < since:
+                    continue
+                if until and ts > until:
+                    continue
+                if wanted is None or event.get("type") in wanted:
+                    yield event
+
+    def segments(self) -> list[SegmentIndex]:
+        """已轮转分段的索引 (按时间正序)。"""
+        return [SegmentIndex(**raw) for raw in self._load_index().get("segments", [])]
+
+    def active_index(self) -> SegmentIndex:
+        """活动日志的索引 (只扫描上次索引之后新追加的字节)。"""
+        with self._lock:
+            data = self._load_index()
+            raw = data.get("active")
+            index = SegmentIndex(**raw) if raw else SegmentIndex(name=LOG_NAME)
+            try:
+                st = self.path.stat()
+            except OSError:
+                return SegmentIndex(name=LOG_NAME)
+            if index.inode != st.st_ino or st.st_size < index.offset:
+                index = SegmentIndex(name=LOG_NAME, inode=st.st_ino)
+            if st.st_size > index.offset:
+                start = index.offset
+                for end, event in iter_complete_events(self.path, start):
+                    index.offset = end
+                    if event is not None:
+                        index.add(event)
+                if index.offset != start:
+                    data["active"] = asdict(index)
+                    self._save_index(data)
+            return index
+
+    def counts(
+        self,
+        since: str | datetime | None = None,
+        until: str | datetime | None = None,
+    ) -> dict[str, int]:
+        """按类型统计事件数 (小时粒度，仅读取索引)。"""
+        since, until = _ts_key(since), _ts_key(until)
+        totals: dict[str, int] = {}
+        for seg in [*self.segments(), self.active_index()]:
+            if not seg.overlaps(since, until):
+                continue
+            if since is None and until is None:
+                for etype, count in seg.counts.items():
+                    totals[etype] = totals.get(etype, 0) + count
+                continue
+            for etype, hours in seg.hourly.items():
+                for hour, count in hours.items():
+                    if _hour_in_range(hour, since, until):
+                        totals[etype] = totals.get(etype, 0) + count
+        return totals
+
+    def hourly(self, event_type: str) -> dict[str, int]:
+        """某类型事件的按小时计数 {YYYY-MM-DDTHH: 事件数} (仅读取索引)。"""
+        merged: dict[str, int] = {}
+        for seg in [*self.segments(), self.active_index()]:
+            for hour, count in seg.hourly.get(event_type, {}).items():
+                merged[hour] = merged.get(hour, 0) + count
+        return dict(sorted(merged.items()))
+
+    def should_rotate(self, now: datetime | None = None) -> bool:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return False
+        if size == 0:
+            return False
+        if size >= self.max_bytes:
+            return True
+        first = self.active_index().first_ts
+        if not first:
+            return False
+        now = now or datetime.now(timezone.utc)
+        return first < _ts_key(now - self.max_age)
+
+    def maybe_rotate(self) -> Path | None:
+        """达到大小或时间阈值时轮转。"""
+        if self.should_rotate():
+            return self.rotate()
+        return None
+
+    def rotate(self) -> Path | None:
+        """
+        轮转活动日志: rename → 单次扫描同时写 gzip 与构建索引 → 删除原文件。
+
+        hooks 每次追加都会重新按路径打开文件，rename 之后的写入自然进入新的活动日志。
+
+        Returns
+        -------
+        Path | None
+            新分段路径 (活动日志为空时返回 None)
+        """
+        with self._lock:
+            if not self.path.exists() or self.path.stat().st_size == 0:
+                return None
+            self.segment_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            pending = self.segment_dir / f"monitor-{stamp}.log"
+            os.replace(self.path, pending)
+
+            target = pending.with_suffix(".log.gz")
+            index = SegmentIndex(name=target.name)
+            last_state = None
+            tail: deque[tuple[int, str]] = deque(maxlen=TAIL_EVENTS)
+            with open(pending, "rb") as src, gzip.open(target, "wb") as dst:
+                for line_no, raw in enumerate(src):
+                    dst.write(raw)
+                    line = raw.decode("utf-8", errors="replace")
+                    event = _parse(line)
+                    if event is None:
+                        continue
+                    index.add(event)
+                    if not event.get("carried_over"):
+                        tail.append((line_no, line.rstrip("\n")))
+                    if event.get("type") == "state_change":
+                        last_state = event
+            pending.unlink()
+            index.tail = [line for _, line in tail]
+            # tail 未满说明分段中的事件全部在 tail 中
+            index.tail_start = tail[0][0] if len(tail) == TAIL_EVENTS else 0
+
+            data = self._load_index()
+            data.setdefault("segments", []).append(asdict(index))
+            data.pop("active", None)
+            self._save_index(data)
+
+        if last_state is not None:
+            self.append({**last_state, "carried_over": True}, rotate=False)
+        return target
+
+    # ── Private Methods ──
+
+    def _load_index(self) -> dict:
+        try:
+            return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, data: dict) -> None:
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.index_path, json.dumps(data, ensure_ascii=False))
+
+
+# ── 读取工具 ────────────────────────────────────────────
+
+def iter_lines_reversed(path: str | Path, block_size: int = _BLOCK_SIZE) -> Iterator[str]:
+    """从文件末尾按块反向产出行 (不含换行符)，内存占用与块大小成正比。"""
+    with open(path, "rb") as f:
+        f.seek(0, io.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step) + remainder
+            lines = block.split(b"\n")
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line.decode("utf-8", errors="replace")
+        if remainder:
+            yield remainder.decode("utf-8", errors="replace")
+
+
+def iter_segment_events(path: str | Path) -> Iterator[dict]:
+    """按正序流式产出某个分段 (普通或 .gz) 中的事件。"""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        for raw in f:
+            event = _parse(raw.decode("utf-8", errors="replace"))
+            if event is not None:
+                yield event
+
+
+def iter_complete_events(path: str | Path, offset: int = 0) -> Iterator[tuple[int, dict | None]]:
+    """从字节偏移 offset 起流式产出 (行结束偏移, 事件)，忽略尚未写完的末行。
+
+    无法解析的行产出 (偏移, None)，调用方据此推进已处理偏移。
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            yield offset, _parse(raw.decode("utf-8", errors="replace"))
+
+
+def _segment_lines_before(path: Path, stop: int | None, keep: int, matches) -> list[str]:
+    """顺序读取 .gz 分段的前 stop 行 (None 表示全部)，返回其中最后 keep 条匹配事件的原始行。"""
+    kept: deque[str] = deque(maxlen=max(keep, 0))
+    with gzip.open(path, "rb") as f:
+        for line_no, raw in enumerate(f):
+            if stop is not None and line_no >= stop:
+                break
+            line = raw.decode("utf-8", errors="replace")
+            event = _parse(line)
+            if event is not None and not event.get("carried_over") and matches(event):
+                kept.append(line)
+    return list(kept)
+
+
+def _parse(line: str) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def _ts_key(value: str | datetime | None) -> str | None:
+    """统一为与日志相同格式的 UTC 时间字符串 (可直接按字典序比较)。"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%dT%H:%M:%S")
+    return str(value)
+
+
+def _hour_in_range(hour: str, since: str | None, until: str | None) -> bool:
+    if since and hour < since[:13]:
+        return False
+    if until and hour > until[:13]:
+        return False
+    return True
+
+
+# ── CLI 入口 ────────────────────────────────────────────
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="monitor.log 查询与轮转")
+    parser.add_argument("--memory-dir", default=".agent/memory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_tail = sub.add_parser("tail", help="最近 N 条事件")
+    p_tail.add_argument("-n", type=int, default=20)
+    p_tail.add_argument("--type", action="append", dest="types")
+
+    p_counts = sub.add_parser("counts", help="按类型统计事件数")
+    p_counts.add_argument("--since")
+    p_counts.add_argument("--until")
+
+    p_hourly = sub.add_parser("hourly", help="某类型事件按小时计数")
+    p_hourly.add_argument("type")
+
+    p_rotate = sub.add_parser("rotate", help="轮转活动日志")
+    p_rotate.add_argument("--force", action="store_true", help="忽略阈值立即轮转")
+
+    args = parser.parse_args(argv)
+    log = MonitorLog(args.memory_dir)
+
+    if args.command == "tail":
+        for event in log.tail(args.n, types=args.types):
+            print(json.dumps(event, ensure_ascii=False))
+    elif args.command == "counts":
+        print(json.dumps(log.counts(args.since, args.until), ensure_ascii=False, indent=2))
+    elif args.command == "hourly":
+        print(json.dumps(log.hourly(args.type), ensure_ascii=False, indent=2))
+    elif args.command == "rotate":
+        segment = log.rotate() if args.force else log.maybe_rotate()
+        print(segment or "no rotation needed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
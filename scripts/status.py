@@ -3,6 +3,10 @@ from pathlib import Path
 from datetime import datetime
 from typing import Tuple
 
+# 共享的 active_context.md 解析器 (与 ContextManager / StatusDashboard 语义一致)
+from context_doc import load_document
+from monitor_log import MonitorLog
+
 PHASE_PROGRESS = [
     ('phase 1.5', ('Phase 1.5 - Reviewing',    40)),
     ('phase 3',   ('Phase 3 - Implementing',   70)),
@@ -23,11 +27,6 @@ def resolve_phase(task_status: str, raw_phase: str) -> Tuple[str, int]:
             return result
     return ('未知阶段', 0)
 
-def parse_frontmatter(text):
-    m = re.match(r'^---\s*\n(.*?)\n---', text, re.DOTALL)
-    if not m: return {}
-    return dict(re.findall(r'^(\w+):\s*"?([^"\n]*)"?', m.group(1), re.MULTILINE))
-
 def read_file(p):
     try: return Path(p).read_text(encoding='utf-8-sig')
     except: return ''
@@ -35,122 +34,263 @@ def read_file(p):
 def count_lines_matching(text, pattern):
     return sum(1 for l in text.splitlines() if re.search(pattern, l))
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--rich', action='store_true', help='使用 rich 渲染输出')
-    args = parser.parse_args()
+def load_context(root: Path) -> dict:
+    return dict(load_document(root / '.agent/memory/active_context.md').frontmatter)
 
-    if args.rich:
-        try:
-            import rich  # noqa: F401
-        except ImportError:
-            print('rich 未安装，请运行: pip install rich\n降级为 Markdown 输出。\n')
-            args.rich = False
+def render_status_section(root: Path) -> str:
+    ctx = load_context(root)
+    status = ctx.get('task_status', 'N/A')
+    omc_status = read_omc_status(root)
+    return f"""## 🎯 系统状态
+| 字段 | 值 |
+|------|-----|
+| Status | {status} |
+| Session | {ctx.get('session_name', '—')} |
+| Phase | {ctx.get('current_phase', '—')} |
+| Current Task | {ctx.get('current_task', '—')} |
+| Provider | {ctx.get('active_provider', 'claude_code')} |
+| Last Updated | {ctx.get('last_updated', '—')} |
+| OMC Status | {omc_status} |
+"""
 
-    sys.stdout.reconfigure(encoding='utf-8')
-    root = Path(__file__).parent.parent
-    mem = root / '.agent/memory'
+def read_omc_status(root: Path) -> str:
+    # OMC project-memory
+    pm = root / '.omc/project-memory.json'
+    if pm.exists():
+        try: return json.loads(pm.read_text('utf-8')).get('axiom_status', 'N/A')
+        except: pass
+    return 'N/A'
 
-    # 核心状态
-    ctx = parse_frontmatter(read_file(mem / 'active_context.md'))
-    status = ctx.get('task_status', 'N/A')
-    session = ctx.get('session_name', '—')
-    phase = ctx.get('current_phase', '—')
-    task = ctx.get('current_task', '—')
-    updated = ctx.get('last_updated', '—')
-    provider = ctx.get('active_provider', 'claude_code')
+def manifest_file(root: Path) -> Path:
+    # active_context 的 manifest_path 可指向 .agent/memory 之外的文件
+    return Path(load_context(root).get('manifest_path', '') or root / '.agent/memory/manifest.md')
 
+def read_progress(root: Path) -> Tuple[str, int, int, int]:
     # 任务进度（从 manifest.md checkbox 统计）
-    manifest_path = ctx.get('manifest_path', '') or str(mem / 'manifest.md')
-    manifest_text = read_file(manifest_path)
+    manifest_text = read_file(manifest_file(root))
     task_section = re.split(r'^##\s+', manifest_text, flags=re.MULTILINE)
     task_block = next((s for s in task_section if s.startswith('任务列表')), '')
     total = len(re.findall(r'^\s*-\s+\[[ xX]\]', task_block, re.MULTILINE))
     done = len(re.findall(r'^\s*-\s+\[[xX]\]', task_block, re.MULTILINE))
     pct = int(done / total * 100) if total > 0 else 0
     bar = '█' * (pct // 10) + '░' * (10 - pct // 10)
+    return bar, pct, done, total
+
+def render_progress_section(root: Path) -> str:
+    bar, pct, done, total = read_progress(root)
+    return f"""## 📋 任务进度
+**{bar} {pct}%** ({done}/{total if total > 0 else '—'} tasks)
+"""
 
+def read_evolution_counts(root: Path) -> Tuple[int, int, int]:
     # 知识库统计
-    kb_text = read_file(mem / 'evolution/knowledge_base.md')
-    kb_count = count_lines_matching(kb_text, r'^##\s+K-\d+')
-    pat_text = read_file(mem / 'evolution/pattern_library.md')
-    pat_count = count_lines_matching(pat_text, r'^##\s+P-\d+')
-    lq_text = read_file(mem / 'evolution/learning_queue.md')
-    lq_count = count_lines_matching(lq_text, r'^\s*-\s+\[')
+    mem = root / '.agent/memory'
+    kb_count = count_lines_matching(read_file(mem / 'evolution/knowledge_base.md'), r'^##\s+K-\d+')
+    pat_count = count_lines_matching(read_file(mem / 'evolution/pattern_library.md'), r'^##\s+P-\d+')
+    lq_count = count_lines_matching(read_file(mem / 'evolution/learning_queue.md'), r'^\s*-\s+\[')
+    return kb_count, pat_count, lq_count
+
+def render_evolution_section(root: Path) -> str:
+    kb_count, pat_count, lq_count = read_evolution_counts(root)
+    return f"""## 🧬 进化统计
+| 指标 | 数量 |
+|------|------|
+| 📚 知识条目 | {kb_count} |
+| 🔄 活跃模式 | {pat_count} |
+| 📥 学习队列 | {lq_count} |
+"""
 
+def render_reflection_section(root: Path) -> str:
     # 最近反思
-    ref_text = read_file(mem / 'reflection_log.md')
+    ref_text = read_file(root / '.agent/memory/reflection_log.md')
     ref_entries = re.findall(r'###\s+(.+?)\n.*?Key Learning[：:]\s*(.+?)(?:\n|$)', ref_text, re.DOTALL)
     ref_rows = '\n'.join(f'| {d.strip()} | {l.strip()[:60]} |' for d, l in ref_entries[-5:]) or '| — | — |'
+    return f"""## 💭 最近反思
+| 日期 | 关键学习 |
+|------|---------|
+{ref_rows}
+"""
 
+def render_guard_section(root: Path) -> str:
     # 守卫状态
     git_pre = '✅' if (root / '.git/hooks/pre-commit').exists() else '❌'
     git_post = '✅' if (root / '.git/hooks/post-commit').exists() else '❌'
+    return f"""## 🛡️ 守卫状态
+| 守卫 | 状态 |
+|------|------|
+| Pre-commit | {git_pre} |
+| Post-commit | {git_post} |
+"""
 
+def render_phase_section(root: Path) -> str:
     # 阶段进度
+    ctx = load_context(root)
+    phase_name, phase_pct = resolve_phase(ctx.get('task_status', 'N/A'), ctx.get('current_phase', '—'))
+    return f"""## 📈 阶段进度
+当前阶段：{phase_name}
+完成进度：{phase_pct}%
+"""
+
+# 区块 → (渲染函数, 依赖的文件名)；--watch 只重新渲染依赖文件发生变化的区块
+SECTIONS = {
+    'status':      (render_status_section,     ('active_context.md', 'project-memory.json')),
+    'progress':    (render_progress_section,   ('active_context.md', 'manifest.md')),
+    'evolution':   (render_evolution_section,  ('knowledge_base.md', 'pattern_library.md', 'learning_queue.md')),
+    'reflections': (render_reflection_section, ('reflection_log.md',)),
+    'guards':      (render_guard_section,      ('pre-commit', 'post-commit')),
+    'phase':       (render_phase_section,      ('active_context.md',)),
+    'monitor':     (lambda root: render_monitor_section(root), ('monitor.log',)),
+}
+
+def render_sections(root: Path, names=None) -> dict:
+    wanted = SECTIONS if names is None else set(names)
+    return {name: fn(root) for name, (fn, _) in SECTIONS.items() if name in wanted}
+
+def sections_for(changed, roots=(), manifest=None) -> list:
+    """变更路径 → 需重新渲染的区块；含监听根目录本身 (inotify 队列溢出) 时全部重新渲染。"""
+    changed = {Path(p) for p in changed}
+    if changed & set(roots):
+        return list(SECTIONS)
+    changed_names = {p.name for p in changed}
+    return [
+        name for name, (_, deps) in SECTIONS.items()
+        if changed_names & set(deps) or (name == 'progress' and manifest in changed)
+    ]
+
+def collect(root: Path) -> dict:
+    """结构化快照（与 Markdown 输出同源同语义），供 --json 与其他工具使用。"""
+    ctx = load_context(root)
+    status = ctx.get('task_status', 'N/A')
+    phase = ctx.get('current_phase', '—')
+    _, pct, done, total = read_progress(root)
+    kb_count, pat_count, lq_count = read_evolution_counts(root)
     phase_name, phase_pct = resolve_phase(status, phase)
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'state': {
+            'status': status,
+            'session': ctx.get('session_name', '—'),
+            'phase': phase,
+            'current_task': ctx.get('current_task', '—'),
+            'provider': ctx.get('active_provider', 'claude_code'),
+            'last_updated': ctx.get('last_updated', '—'),
+            'omc_status': read_omc_status(root),
+        },
+        'progress': {'done': done, 'total': total, 'percent': pct},
+        'evolution': {'knowledge': kb_count, 'patterns': pat_count, 'learning_queue': lq_count},
+        'guards': {
+            'pre_commit': (root / '.git/hooks/pre-commit').exists(),
+            'post_commit': (root / '.git/hooks/post-commit').exists(),
+        },
+        'phase': {'name': phase_name, 'percent': phase_pct},
+    }
 
-    # OMC project-memory
-    omc_status = 'N/A'
-    pm = root / '.omc/project-memory.json'
-    if pm.exists():
-        try: omc_status = json.loads(pm.read_text('utf-8')).get('axiom_status', 'N/A')
-        except: pass
+def compose_markdown(sections: dict) -> str:
+    body = '\n'.join(text for name, text in sections.items() if name != 'monitor')
+    parts = ['# 📊 Axiom — System Dashboard\n', body]
+    if 'monitor' in sections:
+        parts.append(sections['monitor'])
+    return '\n'.join(parts)
 
-    if args.rich:
-        render_rich_status(ctx, status, session, phase, task, provider, updated, omc_status)
-        render_rich_progress(bar, pct, done, total)
-        render_rich_evolution(kb_count, pat_count, lq_count)
+def watch(root: Path, rich_output: bool, jsonl: bool, debounce: float):
+    """监听 .agent/memory 与 manifest (inotify / 轮询) 并增量刷新变化的区块。"""
+    from fs_watch import ChangeWatcher
+
+    sections = render_sections(root)
+
+    def batches():
+        # manifest_path 改指向其他文件时按新路径重建监听
+        while True:
+            manifest = manifest_file(root).resolve()
+            paths = [p for p in (root / '.agent/memory', root / '.omc', root / '.git/hooks') if p.is_dir()]
+            dirs = [p.resolve() for p in paths]
+            if not any(d in manifest.parents for d in dirs):
+                paths.append(manifest)
+            with ChangeWatcher(paths, debounce=debounce) as watcher:
+                for changed_paths in watcher:
+                    changed = sections_for(changed_paths, dirs, manifest)
+                    if changed:
+                        sections.update(render_sections(root, changed))
+                        yield changed
+                    if 'progress' in changed and manifest_file(root).resolve() != manifest:
+                        break
+
+    def emit(changed):
+        if jsonl:
+            print(json.dumps({
+                'ts': datetime.now().isoformat(timespec='seconds'),
+                'changed': changed,
+                'sections': {name: sections[name] for name in changed},
+            }, ensure_ascii=False), flush=True)
+        elif not rich_output:
+            print('\033[2J\033[H' + compose_markdown(sections), flush=True)
+
+    if rich_output and not jsonl:
+        from rich.console import Group
+        from rich.live import Live
+        from rich.markdown import Markdown
+
+        def renderable():
+            return Group(*(Markdown(text) for text in sections.values()))
+
+        with Live(renderable(), auto_refresh=False) as live:
+            for _ in batches():
+                live.update(renderable(), refresh=True)
     else:
-        print(f"""# 📊 Axiom — System Dashboard
+        emit(list(sections))
+        for changed in batches():
+            emit(changed)
 
-## 🎯 系统状态
-| 字段 | 值 |
-|------|-----|
-| Status | {status} |
-| Session | {session} |
-| Phase | {phase} |
-| Current Task | {task} |
-| Provider | {provider} |
-| Last Updated | {updated} |
-| OMC Status | {omc_status} |
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rich', action='store_true', help='使用 rich 渲染输出')
+    parser.add_argument('--watch', action='store_true', help='监听 .agent/memory 变更并持续刷新')
+    parser.add_argument('--jsonl', action='store_true', help='--watch 时以 JSON Lines 输出变化的区块')
+    parser.add_argument('--debounce', type=float, default=0.2, help='突发写入合并窗口（秒）')
+    parser.add_argument('--json', action='store_true', help='输出结构化 JSON 快照')
+    args = parser.parse_args()
 
-## 📋 任务进度
-**{bar} {pct}%** ({done}/{total if total > 0 else '—'} tasks)
+    if args.rich:
+        try:
+            import rich  # noqa: F401
+        except ImportError:
+            print('rich 未安装，请运行: pip install rich\n降级为 Markdown 输出。\n')
+            args.rich = False
 
-## 🧬 进化统计
-| 指标 | 数量 |
-|------|------|
-| 📚 知识条目 | {kb_count} |
-| 🔄 活跃模式 | {pat_count} |
-| 📥 学习队列 | {lq_count} |
+    sys.stdout.reconfigure(encoding='utf-8')
+    root = Path(__file__).parent.parent
 
-## 💭 最近反思
-| 日期 | 关键学习 |
-|------|---------|
-{ref_rows}
+    if args.json:
+        print(json.dumps(collect(root), ensure_ascii=False, indent=2))
+        return
 
-## 🛡️ 守卫状态
-| 守卫 | 状态 |
-|------|------|
-| Pre-commit | {git_pre} |
-| Post-commit | {git_post} |
+    if args.watch:
+        try:
+            watch(root, args.rich, args.jsonl, args.debounce)
+        except KeyboardInterrupt:
+            pass
+        return
 
-## 📈 阶段进度
-当前阶段：{phase_name}
-完成进度：{phase_pct}%
-""")
-    print(render_monitor_section(root))
+    if args.rich:
+        ctx = load_context(root)
+        render_rich_status(ctx, ctx.get('task_status', 'N/A'), ctx.get('session_name', '—'),
+                           ctx.get('current_phase', '—'), ctx.get('current_task', '—'),
+                           ctx.get('active_provider', 'claude_code'), ctx.get('last_updated', '—'),
+                           read_omc_status(root))
+        render_rich_progress(*read_progress(root))
+        render_rich_evolution(*read_evolution_counts(root))
+        print(render_monitor_section(root))
+    else:
+        print(compose_markdown(render_sections(root)))
 
 def render_monitor_section(root: Path) -> str:
-    log_file = root / '.agent/memory/monitor.log'
-    if not log_file.exists():
+    # 反向分块读取末尾事件，不加载整个 monitor.log（含已轮转的 gzip 分段）
+    log = MonitorLog(root / '.agent/memory')
+    if not log.path.exists() and not log.segments():
         return '## 🔍 监控日志\n_暂无日志_\n'
-    lines = log_file.read_text(encoding='utf-8').splitlines()
     rows = []
-    for line in lines[-20:]:
+    for e in log.tail(20):
         try:
-            e = json.loads(line)
             try:
                 ts = datetime.fromisoformat(e.get('ts', '')).strftime('%Y-%m-%d %H:%M:%S')
             except (ValueError, TypeError):
@@ -163,9 +303,11 @@ def render_monitor_section(root: Path) -> str:
                 detail = f"{e.get('tool','')} → {e.get('file','')}"
             elif t == 'session_start':
                 detail = e.get('sessionId', '')[:20]
+            elif t in ('state_change', 'state_change_rejected'):
+                detail = f"{e['from']} → {e.get('to', '')}" if 'from' in e else e.get('task_status', '')
             detail = detail.replace('|', '\\|').replace('\n', ' ')
             rows.append(f'| {ts} | {t} | {detail} |')
-        except (json.JSONDecodeError, KeyError, ValueError):
+        except (KeyError, ValueError, TypeError, AttributeError):
             pass
     if not rows:
         return '## 🔍 监控日志\n_暂无日志_\n'